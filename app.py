@@ -1,23 +1,169 @@
+import csv
+import gzip
+import hashlib
+import io
 import json
 import os
 import re
+import shutil
+import threading
+import time
 from datetime import datetime, timezone
+from functools import wraps
 from pathlib import Path
 
 import pandas as pd
-from flask import Flask, jsonify, request, send_from_directory
-
-from job_title_cleaning import clean_job_title, clean_csv_file
+from flask import Flask, Response, jsonify, request, send_file, send_from_directory
+from werkzeug.http import is_resource_modified
+
+from checkpoint import CheckpointBusy, FileLock
+from classification import load_taxonomy
+from clustering import job_cluster_report
+from job_listing import JOBS_PAGE_MAX, JobListing, parse_time
+from job_title_cleaning import (
+    active_engine,
+    clean_csv_file,
+    clean_job_title,
+    clean_job_title_with_reason,
+    default_threads,
+    load_rule_hits,
+    profile_engine,
+    profile_names,
+    reload_rules,
+    use_rule_frequencies,
+)
+from metrics import MetricsRegistry
+from preview import PREVIEW_SAMPLE_MAX, PREVIEW_SAMPLE_SIZE, preview
+from progress import ProgressReporter, read_progress, write_progress
+from reclean import archive_ruleset, load_archived_engine
+from retention import apply_retention, policy_from_env, stored_path
+from title_cache import DEFAULT_MAX_AGE_DAYS, DEFAULT_MAX_ENTRIES, TitleCache
 
 
 BASE_DIR = Path(__file__).parent
-JOBS_DIR = Path(os.environ.get("JOBS_DIR", BASE_DIR / "jobs"))
-METADATA_PATH = JOBS_DIR / "jobs.json"
-LOG_PATH = JOBS_DIR / "runs.log"
+# Storage paths, set by configure(): from $JOBS_DIR at import, or from the jobs_dir given to create_app.
+JOBS_DIR = METADATA_PATH = LOG_PATH = RULESETS_DIR = METRICS_DIR = TITLE_CACHE_PATH = None
+RULE_ORDER = os.environ.get("RULE_ORDER", "declared")
+TITLE_CACHE_ENABLED = os.environ.get("TITLE_CACHE", "1") != "0"
+TITLE_CACHE_MAX_ENTRIES = int(os.environ.get("TITLE_CACHE_MAX_ENTRIES", DEFAULT_MAX_ENTRIES))
+TITLE_CACHE_MAX_AGE_DAYS = float(os.environ.get("TITLE_CACHE_MAX_AGE_DAYS", DEFAULT_MAX_AGE_DAYS))
+# Finish jobs left "running" by a worker that died, in a background thread at startup.
+RESUME_INTERRUPTED_JOBS = os.environ.get("RESUME_INTERRUPTED_JOBS", "1") != "0"
+# Hours between two retention passes over JOBS_DIR (see retention.py for the policy settings); off unless set.
+RETENTION_INTERVAL_HOURS = float(os.environ.get("RETENTION_INTERVAL_HOURS", "0"))
+# Threads cleaning each job's distinct titles; "auto" uses every CPU on free-threaded Python and 1 otherwise.
+CLEAN_THREADS = os.environ.get("CLEAN_THREADS", "auto")
+CLEAN_THREADS = default_threads() if CLEAN_THREADS == "auto" else max(int(CLEAN_THREADS), 1)
 JOB_PREFIX = "JobTitleClean"
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+# How often a progress stream checks for a new snapshot, and sends a comment to keep idle connections open.
+PROGRESS_POLL_SECONDS = 0.25
+PROGRESS_KEEPALIVE_SECONDS = 15
+# A running job that publishes no new snapshot for this long is taken to have lost its worker; the stream ends.
+PROGRESS_STALL_SECONDS = 300
 
 app = Flask(__name__, static_folder="static", static_url_path="")
 
+metrics = MetricsRegistry()
+REQUEST_LATENCY = metrics.histogram(
+    "jobtitle_request_duration_seconds", "Latency of API requests by endpoint.", ("endpoint",)
+)
+REQUESTS_TOTAL = metrics.counter(
+    "jobtitle_requests_total", "API requests by endpoint and HTTP status code.", ("endpoint", "status")
+)
+JOBS_TOTAL = metrics.counter("jobtitle_jobs_total", "Cleaning jobs by final status.", ("status",))
+JOBS_IN_FLIGHT = metrics.gauge("jobtitle_jobs_in_flight", "Cleaning jobs currently being processed.")
+JOB_DURATION = metrics.histogram("jobtitle_job_duration_seconds", "Wall time spent in clean_csv_file per job.")
+ROWS_TOTAL = metrics.counter("jobtitle_rows_total", "Rows processed by outcome.", ("outcome",))
+ROWS_REMOVED_TOTAL = metrics.counter("jobtitle_rows_removed_total", "Removed rows by removal reason.", ("reason",))
+UPLOADS_DEDUPLICATED_TOTAL = metrics.counter(
+    "jobtitle_uploads_deduplicated_total", "Uploads served from an identical earlier job instead of re-cleaning."
+)
+CACHE_LOOKUPS_TOTAL = metrics.counter(
+    "jobtitle_cache_lookups_total", "Distinct titles looked up in the persistent title cache.", ("result",)
+)
+
+
+def timed(endpoint: str):
+    """Record latency and status code for a view under the given endpoint label."""
+
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            status = 500
+            streamed = False
+
+            def record():
+                REQUEST_LATENCY.observe(time.perf_counter() - start, endpoint=endpoint)
+                REQUESTS_TOTAL.inc(endpoint=endpoint, status=status)
+
+            try:
+                response = app.make_response(view(*args, **kwargs))
+                status = response.status_code
+                # A streamed body is produced after the view returns, so it is timed until the server closes it.
+                streamed = response.is_streamed
+                if streamed:
+                    response.call_on_close(record)
+                return response
+            finally:
+                if not streamed:
+                    record()
+
+        return wrapper
+
+    return decorator
+
+
+def record_job_metrics(stats: dict) -> None:
+    for outcome in ("good", "cleaned", "removed"):
+        ROWS_TOTAL.inc(stats.get(outcome, 0), outcome=outcome)
+    for reason, count in stats.get("removed_reasons", {}).items():
+        ROWS_REMOVED_TOTAL.inc(count, reason=reason)
+    if "cache_hits" in stats:
+        CACHE_LOOKUPS_TOTAL.inc(stats["cache_hits"], result="hit")
+        CACHE_LOOKUPS_TOTAL.inc(stats["cache_misses"], result="miss")
+
+
+def open_title_cache(version: str):
+    if not TITLE_CACHE_ENABLED:
+        return None
+    return TitleCache(TITLE_CACHE_PATH, version, TITLE_CACHE_MAX_ENTRIES, TITLE_CACHE_MAX_AGE_DAYS)
+
+
+def current_engine(profile: str = ""):
+    """
+    Engine for rule ``profile`` (blank: the base ruleset), picking up edits to the rules file first; a broken
+    rules file is logged and the last good ruleset keeps serving. Raises KeyError for unknown profiles and
+    ValueError for profile files that cannot be parsed.
+    """
+    try:
+        reload_rules()
+    except (OSError, ValueError, KeyError) as exc:
+        log_run({"status": "rules_reload_failed", "error": str(exc)})
+    return profile_engine(profile)
+
+
+def requested_profile(payload=None) -> str:
+    profile = (payload or {}).get("profile", request.values.get("profile", ""))
+    return profile.strip() if isinstance(profile, str) else ""
+
+
+def profile_error(profile: str, exc: Exception):
+    if isinstance(exc, KeyError):
+        return jsonify({"error": f"Unknown rule profile: {profile}", "profiles": profile_names()}), 400
+    return jsonify({"error": f"Rule profile {profile} not loaded: {exc}"}), 400
+
+
+def rules_summary(engine) -> dict:
+    return {
+        "name": engine.name,
+        "label": engine.label,
+        "profile": engine.profile,
+        "version": engine.version,
+        "rules": len(engine.rule_names()),
+    }
+
 
 def ensure_storage() -> None:
     JOBS_DIR.mkdir(exist_ok=True)
@@ -34,7 +180,35 @@ def load_jobs() -> list:
 
 def save_jobs(jobs: list) -> None:
     ensure_storage()
-    METADATA_PATH.write_text(json.dumps(jobs, indent=2))
+    # Replace the file in one step: readers never see it half written, and every save changes its version.
+    tmp_path = METADATA_PATH.with_name(f"{METADATA_PATH.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    tmp_path.write_text(json.dumps(jobs, indent=2))
+    os.replace(tmp_path, METADATA_PATH)
+
+
+def update_job(job_entry: dict) -> None:
+    """Store ``job_entry`` in the job list, re-reading it first so jobs saved meanwhile by other requests are kept."""
+    jobs = load_jobs()
+    for idx, job in enumerate(jobs):
+        if job.get("name") == job_entry["name"]:
+            jobs[idx] = job_entry
+            break
+    else:
+        jobs.append(job_entry)
+    save_jobs(jobs)
+
+
+def find_job(job_name: str):
+    return next((job for job in load_jobs() if job.get("name") == job_name), None)
+
+
+def progress_path(job_name: str) -> Path:
+    return JOBS_DIR / job_name / f"{job_name}-progress.json"
+
+
+def job_lock(job_name: str) -> FileLock:
+    """The lock a worker holds while it runs the job, from before it marks the job ``running``."""
+    return FileLock(JOBS_DIR / job_name / f"{job_name}.lock", f"{job_name} is being cleaned by another worker")
 
 
 def log_run(entry: dict) -> None:
@@ -47,6 +221,220 @@ def log_run(entry: dict) -> None:
         f.write(json.dumps(payload) + "\n")
 
 
+def save_rule_hits(job_folder: Path, job_name: str, stats: dict) -> str:
+    """Move per-rule hit counts out of the job stats into their own file next to the job outputs."""
+    hits_name = f"{job_name}-rule-hits.json"
+    payload = {
+        "total_titles": stats.get("total_rows", 0),
+        "hits": stats.pop("rule_hits", {}),
+        # Per distinct title, so scripts/reclean_jobs.py can tell which titles a rule change can touch.
+        "titles": stats.pop("title_rule_hits", {}),
+    }
+    (job_folder / hits_name).write_text(json.dumps(payload, indent=2, sort_keys=True))
+    return hits_name
+
+
+def apply_rule_order() -> None:
+    """In ``RULE_ORDER=frequency`` mode, order and gate rules using hit counts from all stored jobs."""
+    if RULE_ORDER != "frequency":
+        return
+    hits, total_titles = load_rule_hits(JOBS_DIR.glob(f"{JOB_PREFIX}*/*-rule-hits.json"))
+    if hits:
+        use_rule_frequencies(hits, total_titles)
+
+
+def save_upload(upload, path: Path) -> str:
+    """Stream an uploaded file to disk and return the SHA-256 of its content, computed on the way."""
+    digest = hashlib.sha256()
+    with path.open("wb") as f:
+        while True:
+            chunk = upload.stream.read(UPLOAD_CHUNK_SIZE)
+            if not chunk:
+                break
+            digest.update(chunk)
+            f.write(chunk)
+    return digest.hexdigest()
+
+
+def find_duplicate_job(jobs: list, sha256: str, version: str, options: dict):
+    """Most recent completed job with identical input, ruleset version and options whose files still exist."""
+    for job in reversed(jobs):
+        if job.get("status") != "complete" or job.get("sha256") != sha256:
+            continue
+        if job.get("ruleset_version") != version or job.get("options", {}) != options:
+            continue
+        folder = JOBS_DIR / job["name"]
+        if all(stored_path(folder / job[key]).exists() for key in ("original_filename", "cleaned_filename")):
+            return job
+    return None
+
+
+def link_or_copy(src: Path, dst: Path) -> None:
+    """Hard-link ``src`` to ``dst`` (replacing it atomically), copying when links are not supported."""
+    tmp_path = dst.with_name(dst.name + ".tmp")
+    if tmp_path.exists():
+        tmp_path.unlink()
+    try:
+        os.link(src, tmp_path)
+    except OSError:
+        shutil.copy2(src, tmp_path)
+    os.replace(tmp_path, dst)
+
+
+def reuse_job(source: dict, job_entry: dict, job_folder: Path) -> None:
+    """
+    Point a new job at the artifacts of an identical earlier job instead of cleaning again. Artifacts retention
+    compressed are shared in that form, replacing the new job's own copy of the upload.
+    """
+    source_folder = JOBS_DIR / source["name"]
+    for key in ("original_filename", "cleaned_filename"):
+        source_path = stored_path(source_folder / source[key])
+        target = job_folder / (job_entry[key] + source_path.name[len(source[key]) :])
+        link_or_copy(source_path, target)
+        if target.name != job_entry[key]:
+            (job_folder / job_entry[key]).unlink(missing_ok=True)
+    if source.get("rule_hits_filename") and (source_folder / source["rule_hits_filename"]).exists():
+        hits_name = f"{job_entry['name']}-rule-hits.json"
+        link_or_copy(source_folder / source["rule_hits_filename"], job_folder / hits_name)
+        job_entry["rule_hits_filename"] = hits_name
+    job_entry["stats"] = dict(source.get("stats", {}))
+    job_entry["deduplicated_from"] = source["name"]
+    job_entry["status"] = "complete"
+
+
+def run_job(job_entry: dict, engine, taxonomy=None, lock=None) -> None:
+    """
+    Clean a job's upload with checkpoints, continuing from the last committed chunk if an earlier run died, and
+    record the outcome on ``job_entry`` and in the job list. The job's lock (``job_lock``) is taken before the
+    job is marked ``running`` and held until the outcome is recorded; pass it as ``lock`` when the caller holds
+    it already. Raises ``CheckpointBusy`` (leaving the job as it is) when another worker is cleaning it.
+    """
+    if lock is None:
+        lock = job_lock(job_entry["name"])
+        lock.acquire()
+    try:
+        _run_job_locked(job_entry, engine, taxonomy)
+    finally:
+        lock.release()
+
+
+def _run_job_locked(job_entry: dict, engine, taxonomy) -> None:
+    job_name = job_entry["name"]
+    job_folder = JOBS_DIR / job_name
+    options = job_entry.get("options", {})
+    job_entry["status"] = "running"
+    job_entry.pop("error", None)
+    update_job(job_entry)
+    progress_file = progress_path(job_name)
+    reporter = ProgressReporter(
+        lambda snapshot: write_progress(progress_file, {"job": job_name, "status": "running", **snapshot})
+    )
+
+    JOBS_IN_FLIGHT.inc()
+    started = time.perf_counter()
+    title_cache = None
+    try:
+        archive_ruleset(engine, RULESETS_DIR)
+        title_cache = open_title_cache(engine.version)
+        _, stats = clean_csv_file(
+            job_folder / job_entry["original_filename"],
+            job_folder / job_entry["cleaned_filename"],
+            count_rule_hits=True,
+            include_trace=options.get("trace", False),
+            cache=title_cache,
+            engine=engine,
+            taxonomy=taxonomy,
+            checkpoint=True,
+            progress=reporter,
+            threads=CLEAN_THREADS,
+        )
+        job_entry["rule_hits_filename"] = save_rule_hits(job_folder, job_name, stats)
+        job_entry["status"] = "complete"
+        job_entry["stats"] = stats
+    except CheckpointBusy:
+        raise
+    except Exception as exc:
+        job_entry["status"] = "error"
+        job_entry["error"] = str(exc)
+        log_run({"job": job_name, "status": "error", "error": str(exc)})
+    else:
+        log_run({"job": job_name, "status": "complete", "stats": stats})
+        record_job_metrics(stats)
+        JOB_DURATION.observe(time.perf_counter() - started)
+    finally:
+        if title_cache is not None:
+            title_cache.close()
+        JOBS_IN_FLIGHT.dec()
+    JOBS_TOTAL.inc(status=job_entry["status"])
+    update_job(job_entry)
+    final = read_progress(progress_file) or {"job": job_name}
+    final["status"] = job_entry["status"]
+    if "error" in job_entry:
+        final["error"] = job_entry["error"]
+    write_progress(progress_file, final)
+
+
+def run_job_in_background(job_entry: dict, engine, taxonomy=None, lock=None) -> None:
+    """``run_job`` for an async upload; when another worker is already cleaning the job, that worker finishes it."""
+    try:
+        run_job(job_entry, engine, taxonomy, lock)
+    except CheckpointBusy as exc:
+        log_run({"job": job_entry["name"], "status": "busy", "error": str(exc)})
+
+
+def resume_context(job: dict):
+    """
+    ``(engine, taxonomy)`` to finish ``job`` with: its own ruleset version while that is current or archived
+    (so a resumed run continues the same output), else the current one; the job's versions are updated to match.
+    Raises like ``current_engine`` and ``load_taxonomy``.
+    """
+    options = job.setdefault("options", {})
+    engine = current_engine(options.get("profile", ""))
+    if engine.version != job.get("ruleset_version"):
+        engine = load_archived_engine(job.get("ruleset_version", ""), RULESETS_DIR) or engine
+    job["ruleset_version"] = engine.version
+    taxonomy = None
+    if options.get("classify"):
+        taxonomy = load_taxonomy()
+        options["taxonomy_version"] = taxonomy.version
+    return engine, taxonomy
+
+
+def resume_interrupted_jobs() -> list:
+    """Finish every job left ``running``; jobs another worker is still cleaning are skipped. Returns their names."""
+    resumed = []
+    for job in load_jobs():
+        if job.get("status") != "running":
+            continue
+        try:
+            engine, taxonomy = resume_context(job)
+            run_job(job, engine, taxonomy)
+        except CheckpointBusy:
+            continue
+        except (KeyError, ValueError, OSError) as exc:
+            log_run({"job": job["name"], "status": "resume_failed", "error": str(exc)})
+            continue
+        resumed.append(job["name"])
+    return resumed
+
+
+def run_retention(dry_run=False) -> dict:
+    """Apply the retention policy from the environment to JOBS_DIR; real passes that changed something are logged."""
+    report = apply_retention(JOBS_DIR, policy_from_env(), dry_run=dry_run)
+    if report["actions"] and not dry_run:
+        log_run({"status": "retention", "actions": report["actions"], "bytes_reclaimed": report["bytes_reclaimed"]})
+    return report
+
+
+def retention_loop() -> None:
+    while True:
+        time.sleep(RETENTION_INTERVAL_HOURS * 3600)
+        try:
+            run_retention()
+        except (OSError, ValueError) as exc:
+            log_run({"status": "retention_failed", "error": str(exc)})
+
+
 def next_job_number(jobs: list) -> int:
     highest = 0
     for job in jobs:
@@ -62,6 +450,10 @@ def job_name_from_number(num: int) -> str:
     return f"{JOB_PREFIX}{num:03d}"
 
 
+def form_flag(name: str) -> bool:
+    return request.values.get(name, "").lower() in {"1", "true", "yes", "on"}
+
+
 def friendly_time(iso_value: str) -> str:
     try:
         dt = datetime.fromisoformat(iso_value)
@@ -70,19 +462,57 @@ def friendly_time(iso_value: str) -> str:
     return dt.astimezone().strftime("%b %d, %Y %I:%M %p")
 
 
+@app.route("/metrics", methods=["GET"])
+def metrics_endpoint():
+    return Response(metrics.render(), mimetype="text/plain; version=0.0.4")
+
+
+def add_display_time(job: dict) -> None:
+    if "created_at" in job:
+        job["created_at_display"] = friendly_time(job["created_at"])
+
+
+job_listing = None
+
+
 @app.route("/api/jobs", methods=["GET"])
+@timed("jobs")
 def list_jobs():
-    jobs = load_jobs()
-    result = []
-    for job in jobs:
-        item = dict(job)
-        if "created_at" in item:
-            item["created_at_display"] = friendly_time(item["created_at"])
-        result.append(item)
-    return jsonify({"jobs": result})
+    version, modified = job_listing.version()
+    # The response depends only on the job list and the query, so unchanged lists are answered before parsing.
+    etag = hashlib.sha1(f"{version}?{request.query_string.decode()}".encode()).hexdigest()
+    if not is_resource_modified(request.environ, etag=etag, last_modified=modified):
+        resp = Response(status=304)
+    else:
+        try:
+            limit = request.args.get("limit")
+            if limit is not None:
+                if not limit.isdigit() or not 1 <= int(limit) <= JOBS_PAGE_MAX:
+                    raise ValueError(f"limit must be between 1 and {JOBS_PAGE_MAX}")
+                limit = int(limit)
+            since = request.args.get("since")
+            until = request.args.get("until")
+            statuses = {status for status in request.args.get("status", "").split(",") if status}
+            jobs, next_cursor = job_listing.page(
+                version,
+                sort=request.args.get("sort", "-created_at"),
+                statuses=statuses,
+                since=parse_time(since) if since else None,
+                until=parse_time(until) if until else None,
+                cursor=request.args.get("cursor") or None,
+                limit=limit,
+            )
+        except ValueError as exc:
+            return jsonify({"error": str(exc)}), 400
+        resp = jsonify({"jobs": jobs, "next_cursor": next_cursor})
+    resp.set_etag(etag)
+    resp.last_modified = modified
+    resp.cache_control.no_cache = True  # browsers revalidate on every poll instead of reusing a stale list
+    return resp
 
 
 @app.route("/api/upload", methods=["POST"])
+@timed("upload")
 def upload_job():
     ensure_storage()
     upload = request.files.get("file")
@@ -93,6 +523,18 @@ def upload_job():
     if not filename.lower().endswith(".csv"):
         return jsonify({"error": "Only CSV files are supported"}), 400
 
+    profile = requested_profile()
+    try:
+        engine = current_engine(profile)
+    except (KeyError, ValueError) as exc:
+        return profile_error(profile, exc)
+    taxonomy = None
+    if form_flag("classify"):
+        try:
+            taxonomy = load_taxonomy()
+        except (OSError, ValueError, KeyError) as exc:
+            return jsonify({"error": f"Taxonomy not loaded: {exc}"}), 400
+
     jobs = load_jobs()
     job_number = next_job_number(jobs)
     job_name = job_name_from_number(job_number)
@@ -102,9 +544,16 @@ def upload_job():
     original_name = f"{job_name}-original.csv"
     cleaned_name = f"{job_name}-cleaned.csv"
     original_path = job_folder / original_name
-    cleaned_path = job_folder / cleaned_name
 
-    upload.save(original_path)
+    sha256 = save_upload(upload, original_path)
+    options = {"trace": form_flag("trace")}
+    if profile:
+        options["profile"] = profile
+    if taxonomy is not None:
+        # Part of the options so deduplication never reuses labels from an older taxonomy.
+        options["classify"] = True
+        options["taxonomy_version"] = taxonomy.version
+    version = engine.version
 
     job_entry = {
         "name": job_name,
@@ -112,21 +561,48 @@ def upload_job():
         "created_at": datetime.now(timezone.utc).isoformat(),
         "original_filename": original_name,
         "cleaned_filename": cleaned_name,
+        "sha256": sha256,
+        "ruleset_version": version,
+        "options": options,
     }
 
+    duplicate = find_duplicate_job(jobs, sha256, version, options)
+    if duplicate is not None:
+        try:
+            reuse_job(duplicate, job_entry, job_folder)
+        except OSError as exc:
+            # Fall back to a normal run if the earlier artifacts cannot be linked or copied.
+            job_entry.pop("deduplicated_from", None)
+            job_entry.pop("stats", None)
+            job_entry["status"] = "new"
+            log_run({"job": job_name, "status": "dedupe_failed", "error": str(exc)})
+        else:
+            log_run({"job": job_name, "status": "complete", "deduplicated_from": duplicate["name"]})
+            UPLOADS_DEDUPLICATED_TOTAL.inc()
+            JOBS_TOTAL.inc(status="complete")
+            jobs.append(job_entry)
+            save_jobs(jobs)
+            return jsonify({"job": job_entry, "download_url": f"/api/download/{job_name}"}), 200
+
+    progress_url = f"/api/jobs/{job_name}/progress"
+    if form_flag("async"):
+        # Answer straight away and clean in the background; the client follows the job's progress events. The
+        # job is locked before it is listed as running, so no resuming worker can take it over meanwhile.
+        lock = job_lock(job_name)
+        lock.acquire()
+        job_entry["status"] = "running"
+        update_job(job_entry)
+        response = jsonify({"job": job_entry, "progress_url": progress_url})
+        threading.Thread(
+            target=run_job_in_background, args=(job_entry, engine, taxonomy, lock), daemon=True
+        ).start()
+        return response, 202
+
+    # Listed as running before cleaning starts, so a worker that dies mid-job leaves it to be resumed.
     try:
-        _, stats = clean_csv_file(original_path, cleaned_path)
-        job_entry["status"] = "complete"
-        job_entry["stats"] = stats
-    except Exception as exc:
-        job_entry["status"] = "error"
-        job_entry["error"] = str(exc)
-        log_run({"job": job_name, "status": "error", "error": str(exc)})
-    else:
-        log_run({"job": job_name, "status": "complete", "stats": stats})
-
-    jobs.append(job_entry)
-    save_jobs(jobs)
+        run_job(job_entry, engine, taxonomy)
+    except CheckpointBusy as exc:
+        return jsonify({"error": str(exc), "job": job_entry, "progress_url": progress_url}), 409
 
     download_url = f"/api/download/{job_name}" if job_entry["status"] == "complete" else None
     return (
@@ -140,28 +616,186 @@ def upload_job():
     )
 
 
+@app.route("/api/preview", methods=["POST"])
+@timed("preview")
+def preview_upload():
+    """Projected outcome of cleaning an uploaded CSV, from a sample read while the upload streams in."""
+    upload = request.files.get("file")
+    if not upload:
+        return jsonify({"error": "No file provided"}), 400
+    if not (upload.filename or "").lower().endswith(".csv"):
+        return jsonify({"error": "Only CSV files are supported"}), 400
+    size = request.values.get("sample", str(PREVIEW_SAMPLE_SIZE))
+    seed = request.values.get("seed", "0")
+    if not size.isdigit() or not 1 <= int(size) <= PREVIEW_SAMPLE_MAX:
+        return jsonify({"error": f"sample must be a number from 1 to {PREVIEW_SAMPLE_MAX}"}), 400
+    if not seed.isdigit():
+        return jsonify({"error": "seed must be a non-negative number"}), 400
+
+    profile = requested_profile()
+    try:
+        engine = current_engine(profile)
+    except (KeyError, ValueError) as exc:
+        return profile_error(profile, exc)
+    stream = io.TextIOWrapper(upload.stream, encoding="utf-8-sig", newline="")
+    try:
+        result = preview(stream, int(size), int(seed), engine)
+    except (ValueError, csv.Error) as exc:  # UnicodeDecodeError is a ValueError
+        return jsonify({"error": f"Failed to read CSV: {exc}"}), 400
+    return jsonify({"filename": upload.filename, **result})
+
+
+@app.route("/api/jobs/<job_name>/resume", methods=["POST"])
+@timed("resume")
+def resume_job(job_name: str):
+    """Finish a job whose worker died (or that failed), continuing from its last committed chunk."""
+    if not re.fullmatch(rf"{JOB_PREFIX}\d{{3}}", job_name):
+        return jsonify({"error": "Invalid job name"}), 400
+    job_entry = find_job(job_name)
+    if job_entry is None:
+        return jsonify({"error": "Job not found"}), 404
+    if job_entry.get("status") != "complete":
+        try:
+            engine, taxonomy = resume_context(job_entry)
+        except (KeyError, ValueError, OSError) as exc:
+            return jsonify({"error": f"Job cannot be resumed: {exc}"}), 400
+        try:
+            run_job(job_entry, engine, taxonomy)
+        except CheckpointBusy as exc:
+            return jsonify({"error": str(exc), "job": job_entry}), 409
+
+    download_url = f"/api/download/{job_name}" if job_entry["status"] == "complete" else None
+    return (
+        jsonify({"job": job_entry, "download_url": download_url}),
+        (200 if job_entry["status"] == "complete" else 500),
+    )
+
+
+@app.route("/api/jobs/<job_name>/progress", methods=["GET"])
+@timed("progress")
+def job_progress(job_name: str):
+    """
+    Server-sent events with the job's progress snapshots (rows done, rows/second, ETA, good/cleaned/removed
+    counters). The stream ends after the snapshot whose ``status`` is no longer ``running``, or with a
+    ``stalled`` snapshot when a running job publishes nothing new for ``PROGRESS_STALL_SECONDS`` (its worker
+    died; ``/resume`` finishes it).
+    """
+    if not re.fullmatch(rf"{JOB_PREFIX}\d{{3}}", job_name):
+        return jsonify({"error": "Invalid job name"}), 400
+    if not (JOBS_DIR / job_name).is_dir():
+        return jsonify({"error": "Job not found"}), 404
+    path = progress_path(job_name)
+
+    def stream():
+        last = None
+        idle = stalled = 0.0
+        while True:
+            snapshot = read_progress(path)
+            if snapshot is None:
+                # Jobs served from an earlier identical upload, or finished before progress was recorded.
+                job = find_job(job_name) or {}
+                if job.get("status") in ("complete", "error"):
+                    stats = job.get("stats", {})
+                    snapshot = {"job": job_name, "status": job["status"], "rows_done": stats.get("total_rows", 0)}
+                    for name in ("total_rows", "good", "cleaned", "removed"):
+                        snapshot[name] = stats.get(name, 0)
+            if snapshot is not None and snapshot != last:
+                yield f"event: progress\ndata: {json.dumps(snapshot)}\n\n"
+                if snapshot.get("status") != "running":
+                    return
+                last = snapshot
+                idle = stalled = 0.0
+            elif stalled >= PROGRESS_STALL_SECONDS:
+                error = f"No progress for {PROGRESS_STALL_SECONDS:g} seconds; resume the job to finish it"
+                stalled_snapshot = {**(last or {"job": job_name}), "status": "stalled", "error": error}
+                yield f"event: progress\ndata: {json.dumps(stalled_snapshot)}\n\n"
+                return
+            elif idle >= PROGRESS_KEEPALIVE_SECONDS:
+                yield ": keep-alive\n\n"
+                idle = 0.0
+            time.sleep(PROGRESS_POLL_SECONDS)
+            idle += PROGRESS_POLL_SECONDS
+            stalled += PROGRESS_POLL_SECONDS
+
+    return Response(
+        stream(), mimetype="text/event-stream", headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@app.route("/api/explain", methods=["GET", "POST"])
+@timed("explain")
+def explain_title():
+    payload = request.get_json(silent=True) or {}
+    title = payload.get("title", request.values.get("title"))
+    if not isinstance(title, str):
+        return jsonify({"error": "No title provided"}), 400
+
+    profile = requested_profile(payload)
+    try:
+        engine = current_engine(profile)
+    except (KeyError, ValueError) as exc:
+        return profile_error(profile, exc)
+    steps = []
+    cleaned, reason = clean_job_title_with_reason(title, trace=steps, engine=engine)
+    result = {"title": title, "cleaned": cleaned, "reason": reason, "steps": steps, "ruleset_version": engine.version}
+    if payload.get("classify") is True or form_flag("classify"):
+        try:
+            result["function"], result["seniority"] = load_taxonomy().classify(cleaned)
+        except (OSError, ValueError, KeyError) as exc:
+            return jsonify({"error": f"Taxonomy not loaded: {exc}"}), 400
+    return jsonify(result)
+
+
+@app.route("/api/rules", methods=["GET"])
+@timed("rules")
+def rules_info():
+    profile = requested_profile()
+    try:
+        engine = current_engine(profile)
+    except (KeyError, ValueError) as exc:
+        return profile_error(profile, exc)
+    return jsonify({**rules_summary(engine), "profiles": profile_names()})
+
+
+@app.route("/api/rules/reload", methods=["POST"])
+@timed("rules_reload")
+def rules_reload():
+    try:
+        changed = reload_rules(force=form_flag("force"))
+    except (OSError, ValueError, KeyError) as exc:
+        return jsonify({"error": f"Ruleset not loaded: {exc}", **rules_summary(active_engine())}), 400
+    return jsonify({"changed": changed, **rules_summary(active_engine())})
+
+
 @app.route("/api/download/<job_name>", methods=["GET"])
+@timed("download")
 def download_job(job_name: str):
     if not re.fullmatch(rf"{JOB_PREFIX}\d{{3}}", job_name):
         return jsonify({"error": "Invalid job name"}), 400
 
     cleaned_name = f"{job_name}-cleaned.csv"
     job_folder = JOBS_DIR / job_name
-    cleaned_path = job_folder / cleaned_name
+    cleaned_path = stored_path(job_folder / cleaned_name)
     if not cleaned_path.exists():
         return jsonify({"error": "Cleaned file not found"}), 404
 
+    if cleaned_path.name != cleaned_name:
+        # Compressed by retention: stream it decompressed, so clients get the same file as before.
+        return send_file(
+            gzip.open(cleaned_path, "rb"), mimetype="text/csv", as_attachment=True, download_name=cleaned_name
+        )
     return send_from_directory(job_folder, cleaned_name, as_attachment=True)
 
 
 @app.route("/api/validate/<job_name>", methods=["GET"])
+@timed("validate")
 def validate_job(job_name: str):
     if not re.fullmatch(rf"{JOB_PREFIX}\d{{3}}", job_name):
         return jsonify({"error": "Invalid job name"}), 400
 
     job_folder = JOBS_DIR / job_name
-    original_path = job_folder / f"{job_name}-original.csv"
-    cleaned_path = job_folder / f"{job_name}-cleaned.csv"
+    original_path = stored_path(job_folder / f"{job_name}-original.csv")
+    cleaned_path = stored_path(job_folder / f"{job_name}-cleaned.csv")
 
     if not original_path.exists() or not cleaned_path.exists():
         return jsonify({"error": "Job files not found"}), 404
@@ -188,6 +822,24 @@ def validate_job(job_name: str):
     return jsonify(result)
 
 
+@app.route("/api/clusters/<job_name>", methods=["GET"])
+@timed("clusters")
+def job_clusters(job_name: str):
+    if not re.fullmatch(rf"{JOB_PREFIX}\d{{3}}", job_name):
+        return jsonify({"error": "Invalid job name"}), 400
+
+    job_folder = JOBS_DIR / job_name
+    cleaned_path = stored_path(job_folder / f"{job_name}-cleaned.csv")
+    if not cleaned_path.exists():
+        return jsonify({"error": "Cleaned file not found"}), 404
+
+    try:
+        report = job_cluster_report(cleaned_path, job_folder / f"{job_name}-clusters.json")
+    except Exception as exc:
+        return jsonify({"error": f"Failed to cluster titles: {exc}"}), 500
+    return jsonify({"job": job_name, **report})
+
+
 @app.route("/", defaults={"path": ""})
 @app.route("/<path:path>")
 def serve_frontend(path: str):
@@ -196,6 +848,51 @@ def serve_frontend(path: str):
     return app.send_static_file("index.html")
 
 
+def configure(jobs_dir=None) -> None:
+    """Point job storage, metrics and the job listing at ``jobs_dir`` (default: ``$JOBS_DIR``, else ``jobs/``)."""
+    global JOBS_DIR, METADATA_PATH, LOG_PATH, RULESETS_DIR, METRICS_DIR, TITLE_CACHE_PATH, job_listing
+    JOBS_DIR = Path(jobs_dir or os.environ.get("JOBS_DIR", BASE_DIR / "jobs"))
+    METADATA_PATH = JOBS_DIR / "jobs.json"
+    LOG_PATH = JOBS_DIR / "runs.log"
+    RULESETS_DIR = JOBS_DIR / "rulesets"
+    METRICS_DIR = Path(os.environ.get("METRICS_DIR", JOBS_DIR / "metrics"))
+    TITLE_CACHE_PATH = JOBS_DIR / "title_cache.sqlite3"
+    metrics.directory = METRICS_DIR
+    job_listing = JobListing(METADATA_PATH, add_display_time)
+
+
+_background_started = False
+
+
+def start_background_tasks() -> None:
+    """Resume interrupted jobs and start the retention loop, as configured; only the first call starts them."""
+    global _background_started
+    if _background_started:
+        return
+    _background_started = True
+    if RESUME_INTERRUPTED_JOBS:
+        threading.Thread(target=resume_interrupted_jobs, name="resume-interrupted-jobs", daemon=True).start()
+    if RETENTION_INTERVAL_HOURS > 0:
+        threading.Thread(target=retention_loop, name="retention", daemon=True).start()
+
+
+def create_app(jobs_dir=None, background_tasks=True) -> Flask:
+    """
+    Configure the app for ``jobs_dir`` (see ``configure``), apply the rule order and, with ``background_tasks``,
+    start the resume and retention threads. Importing this module does none of that; WSGI servers should load
+    ``app:create_app()``.
+    """
+    configure(jobs_dir)
+    apply_rule_order()
+    if background_tasks:
+        start_background_tasks()
+    return app
+
+
+configure()
+
+
 if __name__ == "__main__":
+    create_app()
     ensure_storage()
     app.run(debug=True, port=5000)
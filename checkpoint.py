@@ -0,0 +1,175 @@
+"""Chunk-level checkpoints that let an interrupted ``clean_csv_file`` run resume where it stopped.
+
+A checkpointed run writes the cleaned CSV to ``<output>.partial`` one chunk of rows at a time. After each chunk
+the output and a journal of the chunk's newly cleaned titles (``<output>.checkpoint.jsonl``) are flushed to
+disk, then a small marker (``<output>.checkpoint.json``) is replaced atomically with the rows done and both
+files' committed sizes. A run that finds a marker for the same input, ruleset and options truncates the files
+back to those sizes (dropping a half-written chunk), reloads the journal, and carries on from the next chunk,
+so the finished file is byte-identical to an uninterrupted run. The finished file is moved into place and the
+checkpoint files are removed.
+
+An exclusive lock on ``<output>.checkpoint.lock`` keeps two workers from cleaning the same output; the
+operating system drops it when its process dies, so a crashed run never blocks its own resume. The lock file
+is left in place: removing it while held would let two workers lock different files.
+"""
+import fcntl
+import hashlib
+import json
+import os
+from pathlib import Path
+
+# Rows cleaned and written between two checkpoints.
+CHECKPOINT_ROWS = 100_000
+_HASH_CHUNK_SIZE = 1024 * 1024
+
+
+class CheckpointBusy(RuntimeError):
+    """Another worker holds the checkpoint of this output."""
+
+
+def file_sha256(path) -> str:
+    digest = hashlib.sha256()
+    with Path(path).open("rb") as f:
+        while True:
+            chunk = f.read(_HASH_CHUNK_SIZE)
+            if not chunk:
+                break
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class FileLock:
+    """
+    Exclusive lock on ``path``, taken without waiting: ``acquire`` raises ``CheckpointBusy(message)`` while
+    another worker holds it. The operating system drops it when its process dies. Use as a context manager, or
+    ``acquire`` in one thread and ``release`` in another.
+    """
+
+    def __init__(self, path, message: str):
+        self.path = Path(path)
+        self.message = message
+        self._file = None
+
+    def acquire(self) -> None:
+        lock_file = self.path.open("a")
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            lock_file.close()
+            raise CheckpointBusy(self.message) from None
+        self._file = lock_file
+
+    def release(self) -> None:
+        if self._file is not None:
+            self._file.close()  # releases the lock
+            self._file = None
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.release()
+        return False
+
+
+def _fsync(f) -> None:
+    f.flush()
+    os.fsync(f.fileno())
+
+
+class Checkpoint:
+    """
+    Checkpoint files of one output path. Use as a context manager (it takes the lock), then ``load`` any
+    committed progress for ``key``, write through ``output`` and ``journal``, and ``commit`` after each chunk.
+    """
+
+    def __init__(self, output_path, key: dict):
+        output_path = Path(output_path)
+        self.output_path = output_path
+        self.partial_path = output_path.with_name(f"{output_path.name}.partial")
+        self.marker_path = output_path.with_name(f"{output_path.name}.checkpoint.json")
+        self.journal_path = output_path.with_name(f"{output_path.name}.checkpoint.jsonl")
+        self.lock_path = output_path.with_name(f"{output_path.name}.checkpoint.lock")
+        self.key = key
+        self.output = None
+        self.journal = None
+        self._lock = FileLock(self.lock_path, f"{output_path.name} is being cleaned by another worker")
+
+    def __enter__(self):
+        self._lock.acquire()
+        return self
+
+    def __exit__(self, *exc_info):
+        for f in (self.output, self.journal):
+            if f is not None:
+                f.close()
+        self._lock.release()
+        return False
+
+    def load(self):
+        """
+        Committed state (``{"rows", "state"}``) for this key, with the output and journal reopened for appending
+        after it; None (and fresh, empty files) when there is nothing to resume.
+        """
+        marker = None
+        try:
+            marker = json.loads(self.marker_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            pass
+        if marker is not None and (
+            marker.get("key") != self.key
+            or not self.partial_path.exists()
+            or not self.journal_path.exists()
+            or self.partial_path.stat().st_size < marker["output_bytes"]
+            or self.journal_path.stat().st_size < marker["journal_bytes"]
+        ):
+            marker = None
+        if marker is None:
+            self.output = self.partial_path.open("w", encoding="utf-8-sig", newline="")
+            self.journal = self.journal_path.open("w", encoding="utf-8")
+            return None
+        os.truncate(self.partial_path, marker["output_bytes"])
+        os.truncate(self.journal_path, marker["journal_bytes"])
+        # Appending at a non-zero offset, so utf-8-sig does not write a second BOM.
+        self.output = self.partial_path.open("a", encoding="utf-8-sig", newline="")
+        self.journal = self.journal_path.open("a", encoding="utf-8")
+        return {"rows": marker["rows"], "state": marker["state"]}
+
+    def journal_entries(self):
+        """Entries recorded by earlier ``record`` calls, in order."""
+        with self.journal_path.open(encoding="utf-8") as f:
+            for line in f:
+                yield json.loads(line)
+
+    def record(self, entries) -> None:
+        for entry in entries:
+            self.journal.write(json.dumps(entry, ensure_ascii=False) + "\n")
+
+    def commit(self, rows: int, state: dict) -> None:
+        """Make everything written so far durable and mark ``rows`` rows done; ``state`` is returned by ``load``."""
+        _fsync(self.output)
+        _fsync(self.journal)
+        marker = {
+            "key": self.key,
+            "rows": rows,
+            "output_bytes": os.fstat(self.output.fileno()).st_size,
+            "journal_bytes": os.fstat(self.journal.fileno()).st_size,
+            "state": state,
+        }
+        tmp_path = self.marker_path.with_name(f"{self.marker_path.name}.{os.getpid()}.tmp")
+        with tmp_path.open("w", encoding="utf-8") as f:
+            f.write(json.dumps(marker))
+            _fsync(f)
+        os.replace(tmp_path, self.marker_path)
+
+    def finish(self) -> None:
+        """Move the finished output into place and remove the checkpoint files (the lock file stays)."""
+        self.output.close()
+        self.journal.close()
+        os.replace(self.partial_path, self.output_path)
+        for path in (self.marker_path, self.journal_path):
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
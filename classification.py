@@ -0,0 +1,114 @@
+"""Job function and seniority classification of cleaned titles.
+
+The taxonomy file (``rules/taxonomy.json``, override with ``TAXONOMY_PATH``) lists the terms that point to
+each job function and seniority level. It is compiled once into an inverted index from a term's words to its
+``(function, seniority)`` labels. A title is classified by walking its words left to right and looking up
+the longest indexed phrase starting at each word, so the work per word is bounded by the longest phrase and
+does not grow with the size of the taxonomy.
+"""
+import hashlib
+import json
+import os
+import re
+import threading
+from pathlib import Path
+
+TAXONOMY_PATH = Path(os.environ.get("TAXONOMY_PATH", Path(__file__).parent / "rules" / "taxonomy.json"))
+word_pattern = re.compile(r"[a-z0-9]+(?:['&][a-z0-9]+)*")
+
+_cached = None
+_cached_key = None
+_cache_lock = threading.Lock()
+
+
+def title_words(text: str) -> list:
+    return word_pattern.findall(text.lower().replace("’", "'"))
+
+
+def build_index(taxonomy: dict) -> dict:
+    """``{phrase: [function, seniority]}`` over the taxonomy terms; phrases are words joined by single spaces."""
+    index = {}
+
+    def label(term, position, value):
+        key = " ".join(title_words(term))
+        if key:
+            index.setdefault(key, [None, None])[position] = value
+
+    for function, terms in taxonomy.get("functions", {}).items():
+        for term in terms:
+            label(term, 0, function)
+    for entry in taxonomy.get("seniority", []):
+        for term in entry["terms"]:
+            label(term, 1, entry["level"])
+    # A listed phrase only names one label ("lab manager" is a Lab term); take the other from its words.
+    rank = {entry["level"]: rank for rank, entry in enumerate(taxonomy.get("seniority", []))}
+    for key, labels in index.items():
+        if " " not in key or None not in labels:
+            continue
+        word_labels = [index[word] for word in key.split() if word in index]
+        if labels[0] is None:
+            labels[0] = next((function for function, _ in word_labels if function), None)
+        if labels[1] is None:
+            levels = [level for _, level in word_labels if level]
+            labels[1] = min(levels, key=rank.get) if levels else None
+    for term, (function, seniority) in taxonomy.get("phrases", {}).items():
+        key = " ".join(title_words(term))
+        if key:
+            index[key] = [function, seniority]
+    return index
+
+
+class Taxonomy:
+    """Compiled taxonomy; ``classify`` maps a cleaned title to ``(function, seniority)`` ("" when unknown)."""
+
+    def __init__(self, taxonomy: dict):
+        self.name = taxonomy.get("name", "")
+        self.label = taxonomy.get("version", "")
+        self.version = hashlib.sha256(json.dumps(taxonomy, sort_keys=True).encode("utf-8")).hexdigest()[:16]
+        self.levels = [entry["level"] for entry in taxonomy.get("seniority", [])]
+        self.rank = {level: rank for rank, level in enumerate(self.levels)}
+        self.index = build_index(taxonomy)
+        self.max_words = max((key.count(" ") + 1 for key in self.index), default=1)
+
+    def _lookup(self, words: list, start: int):
+        """``(words consumed, labels)`` for the longest indexed phrase at ``start``, or ``(1, None)``."""
+        for length in range(min(self.max_words, len(words) - start), 0, -1):
+            labels = self.index.get(" ".join(words[start : start + length]))
+            if labels is not None:
+                return length, labels
+        word = words[start]
+        if len(word) > 3 and word.endswith("s"):
+            return 1, self.index.get(word[:-1])  # plurals of single-word terms
+        return 1, None
+
+    def classify(self, title) -> tuple:
+        if not title:
+            return "", ""
+        words = title_words(title)
+        votes = {}
+        seniority = None
+        i = 0
+        while i < len(words):
+            consumed, labels = self._lookup(words, i)
+            if labels is not None:
+                function, level = labels
+                if function:
+                    votes.setdefault(function, [0, i])[0] += 1  # [terms, first position]
+                if level and (seniority is None or self.rank[level] < self.rank[seniority]):
+                    seniority = level
+            i += consumed
+        function = max(votes, key=lambda name: (votes[name][0], -votes[name][1]), default="")
+        return function, seniority or ""
+
+
+def load_taxonomy(path=None) -> Taxonomy:
+    """The compiled taxonomy at ``path`` (default ``TAXONOMY_PATH``), recompiled when the file changes."""
+    global _cached, _cached_key
+    path = Path(path or TAXONOMY_PATH)
+    stat = path.stat()
+    key = (str(path), stat.st_mtime_ns, stat.st_size)
+    with _cache_lock:
+        if _cached is None or _cached_key != key:
+            _cached = Taxonomy(json.loads(path.read_text(encoding="utf-8")))
+            _cached_key = key
+        return _cached
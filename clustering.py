@@ -0,0 +1,205 @@
+"""Near-duplicate clustering of a job's cleaned titles.
+
+Titles that survive cleaning can still be near-identical variants ("Senior Research Associate",
+"Senior Research Assoc", "Senior Researcher Associate"). Comparing every pair is quadratic, so titles are
+MinHashed over character 3-grams and bucketed with LSH banding: only titles sharing a band bucket are
+compared. A candidate pair joins a cluster when its words line up one to one and each pair of words is equal,
+a prefix of the other (truncation or inflection), or a small typo apart; word order may differ.
+
+Each cluster reports its variants with row counts and suggests the most frequent variant as the canonical
+form, with ``[variant, canonical, "full"]`` entries ready to paste into ``misspelling_entries``.
+"""
+import json
+import re
+import zlib
+from functools import lru_cache
+from pathlib import Path
+from random import Random
+
+import numpy as np
+import pandas as pd
+
+from fuzzy_correction import LONG_WORD_LENGTH, osa_distance
+
+token_pattern = re.compile(r'[^\W_]+')
+# 2**61 - 1: hash values stay exact in uint64 arithmetic with 31-bit coefficients and 32-bit shingle hashes.
+_PRIME = (1 << 61) - 1
+# Clusters kept in a stored job report, largest first.
+CLUSTER_REPORT_LIMIT = 500
+# Distinct candidates each title in an LSH bucket is compared with.
+BUCKET_REPRESENTATIVES = 16
+# Titles MinHashed per numpy batch; bounds the (hashes x shingles) matrix.
+_BATCH = 5000
+
+
+def _normalise(title: str) -> str:
+    return " ".join(token_pattern.findall(title.casefold()))
+
+
+def _shingle_hashes(text: str, cache: dict):
+    padded = f" {text} "
+    hashes = set()
+    for i in range(max(len(padded) - 2, 1)):
+        shingle = padded[i : i + 3]
+        value = cache.get(shingle)
+        if value is None:
+            value = cache[shingle] = zlib.crc32(shingle.encode("utf-8"))
+        hashes.add(value)
+    return hashes
+
+
+@lru_cache(maxsize=100_000)
+def _words_match(a: str, b: str) -> bool:
+    if a == b:
+        return True
+    if not (a.isalpha() and b.isalpha()):
+        return False  # numbers and codes ("Level 2", "Grade 12") must match exactly
+    if min(len(a), len(b)) >= 3 and (a.startswith(b) or b.startswith(a)):
+        return True
+    if min(len(a), len(b)) < 5:
+        return False
+    limit = 2 if min(len(a), len(b)) >= LONG_WORD_LENGTH else 1
+    return osa_distance(a, b, limit) <= limit
+
+
+def _word_lists_match(words_a: tuple, words_b: tuple, bag_a: tuple, bag_b: tuple) -> bool:
+    if len(words_a) != len(words_b):
+        return False
+    return bag_a == bag_b or all(_words_match(x, y) for x, y in zip(words_a, words_b))
+
+
+def titles_match(a: str, b: str) -> bool:
+    """Whether two normalised titles are variants of each other (see module docstring)."""
+    words_a, words_b = tuple(a.split()), tuple(b.split())
+    return _word_lists_match(words_a, words_b, tuple(sorted(words_a)), tuple(sorted(words_b)))
+
+
+class _DisjointSet:
+    def __init__(self, size: int):
+        self.parent = list(range(size))
+
+    def find(self, item: int) -> int:
+        while self.parent[item] != item:
+            self.parent[item] = self.parent[self.parent[item]]
+            item = self.parent[item]
+        return item
+
+    def union(self, a: int, b: int) -> None:
+        root_a, root_b = self.find(a), self.find(b)
+        if root_a != root_b:
+            self.parent[max(root_a, root_b)] = min(root_a, root_b)
+
+
+def _join_bucket(members: list, words: list, bags: list, groups: _DisjointSet) -> None:
+    """
+    Join bucket members that match one of the bucket's representatives (members that matched none so far).
+    At most ``BUCKET_REPRESENTATIVES`` are kept, which bounds the work per member; the disjoint set carries
+    matches across buckets and bands.
+    """
+    representatives = []
+    for idx in members:
+        for rep in representatives:
+            if groups.find(rep) == groups.find(idx) or _word_lists_match(words[rep], words[idx], bags[rep], bags[idx]):
+                groups.union(rep, idx)
+                break
+        else:
+            if len(representatives) < BUCKET_REPRESENTATIVES:
+                representatives.append(idx)
+
+
+def minhash_signatures(texts, num_hashes: int, seed: int = 1):
+    """``(len(texts), num_hashes)`` array of MinHash signatures over character 3-grams."""
+    rng = Random(seed)
+    coefficients = np.array([rng.randrange(1, 1 << 31) for _ in range(num_hashes)], dtype=np.uint64)
+    offsets = np.array([rng.randrange(0, 1 << 31) for _ in range(num_hashes)], dtype=np.uint64)
+    signatures = np.empty((len(texts), num_hashes), dtype=np.uint64)
+    shingle_cache = {}
+    for start in range(0, len(texts), _BATCH):
+        batch = [sorted(_shingle_hashes(text, shingle_cache)) for text in texts[start : start + _BATCH]]
+        lengths = np.fromiter((len(hashes) for hashes in batch), dtype=np.int64, count=len(batch))
+        flat = np.fromiter((h for hashes in batch for h in hashes), dtype=np.uint64, count=int(lengths.sum()))
+        permuted = (flat[:, None] * coefficients[None, :] + offsets[None, :]) % np.uint64(_PRIME)
+        bounds = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+        signatures[start : start + len(batch)] = np.minimum.reduceat(permuted, bounds, axis=0)
+    return signatures
+
+
+def cluster_titles(counts: dict, bands: int = 8, rows: int = 4, min_variants: int = 2) -> list:
+    """
+    Group ``{title: rows}`` into near-duplicate clusters. Returns clusters (largest first) as
+    ``{"canonical", "rows", "variants": [{"title", "rows"}], "suggested_rules"}``.
+    """
+    titles, normalised = [], []
+    for title in counts:
+        text = _normalise(title) if title else ""
+        if text:
+            titles.append(title)
+            normalised.append(text)
+    if not titles:
+        return []
+    signatures = minhash_signatures(normalised, bands * rows)
+
+    words = [tuple(text.split()) for text in normalised]
+    bags = [tuple(sorted(title_words)) for title_words in words]
+    # Numbers and codes only ever match exactly, so they can split buckets without losing any pair.
+    exact_tokens = [tuple(word for word in bag if not word.isalpha()) for bag in bags]
+    groups = _DisjointSet(len(titles))
+    for band in range(bands):
+        buckets = {}
+        band_rows = signatures[:, band * rows : (band + 1) * rows]
+        for idx, key in enumerate(map(bytes, band_rows)):
+            buckets.setdefault((key, exact_tokens[idx]), []).append(idx)
+        for members in buckets.values():
+            if len(members) > 1:
+                _join_bucket(members, words, bags, groups)
+
+    clustered = {}
+    for idx in range(len(titles)):
+        clustered.setdefault(groups.find(idx), []).append(titles[idx])
+    clusters = []
+    for members in clustered.values():
+        if len(members) < min_variants:
+            continue
+        members.sort(key=lambda title: (-counts[title], len(title), title))
+        canonical = members[0]
+        clusters.append(
+            {
+                "canonical": canonical,
+                "rows": sum(counts[title] for title in members),
+                "variants": [{"title": title, "rows": counts[title]} for title in members],
+                "suggested_rules": [[title, canonical, "full"] for title in members[1:]],
+            }
+        )
+    clusters.sort(key=lambda cluster: (-cluster["rows"], cluster["canonical"]))
+    return clusters
+
+
+def cluster_report(cleaned_titles, top=None, **options) -> dict:
+    """Cluster report for an iterable of cleaned titles (blank titles are ignored)."""
+    counts = {}
+    for title in cleaned_titles:
+        if title:
+            counts[title] = counts.get(title, 0) + 1
+    clusters = cluster_titles(counts, **options)
+    return {
+        "distinct_titles": len(counts),
+        "clusters": len(clusters),
+        "clustered_titles": sum(len(cluster["variants"]) for cluster in clusters),
+        "top": clusters[:top] if top else clusters,
+    }
+
+
+def job_cluster_report(cleaned_csv: Path, report_path: Path, top: int = CLUSTER_REPORT_LIMIT) -> dict:
+    """
+    Cluster report for a job's cleaned CSV, cached in ``report_path`` until the cleaned file changes
+    (a re-clean rewrites it).
+    """
+    if report_path.exists() and report_path.stat().st_mtime_ns >= cleaned_csv.stat().st_mtime_ns:
+        try:
+            return json.loads(report_path.read_text(encoding="utf-8"))
+        except ValueError:
+            pass
+    cleaned = pd.read_csv(cleaned_csv, usecols=["Cleaned Job Title"], dtype=str, keep_default_na=False)
+    report = cluster_report(cleaned["Cleaned Job Title"], top=top)
+    report_path.write_text(json.dumps(report, indent=2, ensure_ascii=False), encoding="utf-8")
+    return report
@@ -0,0 +1,178 @@
+"""Fuzzy misspelling correction over a vocabulary of canonical title words.
+
+A SymSpell-style delete index maps every string obtained by deleting up to ``max_distance`` characters
+from a vocabulary word back to that word. A token is looked up by generating its own deletes, which
+finds every vocabulary word within that many edits; candidates are then checked with the exact
+(optimal string alignment) edit distance. Lookups cost a few dozen dictionary probes per token,
+however large the vocabulary.
+
+Words found in an English dictionary are never corrected, even when they are one edit away from a title word
+("Reader" is not a typo of "Leader"). ``DICTIONARY_PATH`` is the GCIDE word list (words of 4+ letters); it is
+read once per process, and only by correctors that are enabled.
+"""
+import gzip
+import re
+from functools import lru_cache
+from pathlib import Path
+
+word_pattern = re.compile(r'[A-Za-z]+')
+# Words shorter than this may only be one edit away from their correction.
+LONG_WORD_LENGTH = 8
+# Upper bound on remembered lookups; title words repeat heavily, so most lookups are answered from memory.
+LOOKUP_MEMO_LIMIT = 100_000
+# Editing the word list changes results of rulesets with fuzzy correction enabled: bump PIPELINE_VERSION too.
+DICTIONARY_PATH = Path(__file__).parent / "rules" / "english_words.txt.gz"
+
+
+@lru_cache(maxsize=None)
+def load_dictionary(path=DICTIONARY_PATH) -> frozenset:
+    """Lower-case words of the word list at ``path`` (one per line, optionally gzipped)."""
+    path = Path(path)
+    opener = gzip.open if path.suffix == ".gz" else open
+    with opener(path, "rt", encoding="utf-8") as f:
+        return frozenset(line.strip().lower() for line in f if line.strip())
+
+
+def _deletes(word: str, distance: int):
+    """Every string obtained by deleting up to ``distance`` characters from ``word`` (including ``word``)."""
+    found = {word}
+    level = {word}
+    for _ in range(distance):
+        level = {variant[:i] + variant[i + 1 :] for variant in level if len(variant) > 1 for i in range(len(variant))}
+        found |= level
+    return found
+
+
+def osa_distance(a: str, b: str, limit: int) -> int:
+    """Optimal string alignment distance between ``a`` and ``b``; any value above ``limit`` is returned as ``limit + 1``."""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous2 = None
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                current[j] = min(current[j], previous2[j - 2] + 1)
+        if min(current) > limit:
+            return limit + 1
+        previous2, previous = previous, current
+    return min(previous[-1], limit + 1)
+
+
+class FuzzyCorrector:
+    """
+    Correct misspelt words to the closest vocabulary word. Words already in the vocabulary, protected
+    words, words of the word list at ``dictionary_path`` (and their plurals), and words shorter than
+    ``min_word_length`` are left alone, as are ties between candidates.
+    """
+
+    def __init__(self, vocabulary, max_distance=2, min_word_length=5, protected_words=(), dictionary_path=None):
+        self.max_distance = max_distance
+        self.min_word_length = min_word_length
+        self.vocabulary = frozenset(word.lower() for word in vocabulary)
+        self.protected_words = frozenset(word.lower() for word in protected_words)
+        self.dictionary_path = dictionary_path
+        self.dictionary = frozenset()
+        if max_distance > 0 and dictionary_path is not None:
+            self.dictionary = load_dictionary(dictionary_path)
+        self.index = {}
+        self._memo = {}
+        if max_distance > 0:
+            for word in self.vocabulary:
+                for variant in _deletes(word, max_distance):
+                    self.index.setdefault(variant, []).append(word)
+
+    def __getstate__(self):
+        # Pickled engine snapshots leave the word list out; it is shared by every corrector in the process.
+        state = dict(self.__dict__)
+        state["dictionary"] = None
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        if self.max_distance > 0 and self.dictionary_path is not None:
+            self.dictionary = load_dictionary(self.dictionary_path)
+        else:
+            self.dictionary = frozenset()
+
+    def _is_known(self, word: str) -> bool:
+        return word in self.vocabulary or word in self.dictionary
+
+    def _is_plural(self, word: str) -> bool:
+        if not word.endswith("s"):
+            return False
+        return self._is_known(word[:-1]) or (word.endswith("es") and self._is_known(word[:-2]))
+
+    def lookup(self, word: str, memo=None):
+        """
+        The vocabulary word ``word`` (lower-case) should be corrected to, or None. New lookups are remembered in
+        ``memo`` when given (a worker thread's own dict, folded in later with ``merge_memo``), else in the corrector.
+        """
+        try:
+            return self._memo[word]
+        except KeyError:
+            pass
+        if memo is not None and word in memo:
+            return memo[word]
+        corrected = self._lookup(word)
+        if memo is not None:
+            memo[word] = corrected
+        elif len(self._memo) < LOOKUP_MEMO_LIMIT:
+            self._memo[word] = corrected
+        return corrected
+
+    def merge_memo(self, memo) -> None:
+        """Remember the lookups a worker collected in ``memo``."""
+        for word, corrected in memo.items():
+            if len(self._memo) >= LOOKUP_MEMO_LIMIT:
+                break
+            self._memo.setdefault(word, corrected)
+
+    def _lookup(self, word: str):
+        if (
+            self.max_distance <= 0
+            or len(word) < self.min_word_length
+            or word in self.vocabulary
+            or word in self.protected_words
+            or word in self.dictionary
+            or self._is_plural(word)
+        ):
+            return None
+        limit = self.max_distance if len(word) >= LONG_WORD_LENGTH else min(self.max_distance, 1)
+        best, best_distance, tied = None, limit + 1, False
+        seen = set()
+        for variant in _deletes(word, limit):
+            for candidate in self.index.get(variant, ()):
+                if candidate in seen:
+                    continue
+                seen.add(candidate)
+                distance = osa_distance(word, candidate, limit)
+                if distance < best_distance:
+                    best, best_distance, tied = candidate, distance, False
+                elif distance == best_distance:
+                    tied = True
+        return None if tied or best_distance > limit else best
+
+    def correct(self, text: str, hits=None, memo=None):
+        """Correct every word of ``text``; corrected words keep the original's upper/title/lower case."""
+        if self.max_distance <= 0:
+            return text
+
+        def repl(m):
+            word = m.group(0)
+            corrected = self.lookup(word.lower(), memo)
+            if corrected is None:
+                return word
+            if hits is not None:
+                name = f"fuzzy:{corrected}"
+                hits[name] = hits.get(name, 0) + 1
+            if word.isupper():
+                return corrected.upper()
+            if word[0].isupper():
+                return corrected.capitalize()
+            return corrected
+
+        return word_pattern.sub(repl, text)
@@ -4,78 +4,192 @@ import unicodedata
 
 phone_pattern = re.compile(r'^\+?[0-9()\s\-]{7,}$')
 roman_pattern = re.compile(r'(\b[A-Za-z]+[ -])(i{1,3}|iv|vi{1,3}|ix)\b', re.IGNORECASE)
-email_pattern = re.compile(r'[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}', re.IGNORECASE)
+roman_hint_pattern = re.compile(r'[ -][iv]', re.IGNORECASE)
+email_pattern = re.compile(r'[A-Za-z0-9._%+-]{1,64}@[A-Za-z0-9.-]{1,255}\.[A-Za-z]{2,63}', re.IGNORECASE)
 non_latin_pattern = re.compile(r'[^\x00-\x7F]')
 punct_only_pattern = re.compile(r'[-_. \u2013\u2014]+$')
 
+# --- BEGIN GENERATED RULES (scripts/build_custom_code.py; edit rules/*.json instead) ---
+# Ruleset: default 2026.10.1
+# Taxonomy: default 2026.10.1
 junk_values = {
-    "job", "job title",
-    "test", "n/a", "none", "unknown", "???", "---", "-", "_", "zzz", "vmeinupi", "vivvixza",
-    "vivvviio", "vkodhyqc", "aaa", "aaaa", "aaaaa", "aaaaaa", "aaaaaaaab", "aaaaaaaaab", "abc", "youknowwho",
-    "who?", "no", "no response", "no title", "nobody", "no job title", "nil", "na", "aa", "abcf", "all",
-    "ddf", "dff", "do", "dude", "hh", "mr", "other", "4a", "god", "miss", "self", "xs", "xx", "xxx", "yes", "sale", "team", "temp", "staff",
-    "troublemaker", "testing", "wage earner",
-    "null", "none", "non", "jobtitle", "job title", "individual",
+    "-",
+    "---",
+    "4a",
+    "???",
+    "_",
+    "aa",
+    "aaa",
+    "aaaa",
+    "aaaaa",
+    "aaaaaa",
+    "aaaaaaaaab",
+    "aaaaaaaab",
+    "abc",
+    "abcf",
+    "all",
+    "ddf",
+    "dff",
+    "do",
+    "dude",
+    "god",
+    "hh",
+    "individual",
+    "job",
+    "job title",
+    "jobtitle",
+    "miss",
+    "mr",
+    "n/a",
+    "na",
+    "nil",
+    "no",
+    "no job title",
+    "no response",
+    "no title",
+    "nobody",
+    "non",
+    "none",
+    "null",
+    "other",
+    "sale",
+    "self",
+    "staff",
+    "team",
+    "temp",
+    "test",
+    "testing",
+    "troublemaker",
+    "unknown",
+    "vivvixza",
+    "vivvviio",
+    "vkodhyqc",
+    "vmeinupi",
+    "wage earner",
+    "who?",
+    "xs",
+    "xx",
+    "xxx",
+    "yes",
+    "youknowwho",
+    "zzz",
 }
 
-preserve_caps = {"IS", "IT", "IR", "IP", "PI", "PM", "PR", "PhD", "VP", "AIO", "AIOS", "APHL", "MD"}
-lower_middle_words = {"the", "at", "of", "in", "de", "en", "on"}
-def high_noise_ratio(text: str) -> bool:
-    total = len(text)
-    if total <= 5:
-        return False
-    non_letters = sum(1 for ch in text if not (ch.isalpha() or ch.isspace()))
-    return (non_letters / total) > 0.75
+preserve_caps = {
+    "AIO",
+    "AIOS",
+    "APHL",
+    "IP",
+    "IR",
+    "IS",
+    "IT",
+    "MD",
+    "PI",
+    "PM",
+    "PR",
+    "PhD",
+    "VP",
+}
+
+lower_middle_words = {
+    "at",
+    "de",
+    "en",
+    "in",
+    "of",
+    "on",
+    "the",
+}
 
 translation_map = {
+    "专员": "Specialist",
+    "专家": "Expert",
     "业务员": "Salesperson",
+    "中心": "Center",
+    "中级": "Intermediate",
+    "临床": "Clinical",
     "主任": "Director",
+    "主任医师": "Chief physician",
+    "主治医师": "Attending physician",
     "主管": "Manager",
+    "产品": "Product",
+    "人力资源": "Human resources",
+    "代理": "Acting",
+    "代表": "Representative",
+    "会计": "Accountant",
+    "公司": "Company",
     "兽医师": "Veterinarian",
     "内勤": "Supervisor",
+    "分子": "Molecular",
+    "分析师": "Analyst",
+    "初级": "Junior",
     "副主任": "Deputy director",
+    "副主任医师": "Associate chief physician",
+    "副总裁": "Vice president",
     "副所长": "Deputy institute director",
     "副教授": "Associate professor",
     "副研": "Research associate",
+    "副研究员": "Associate researcher",
     "副總": "Vice president",
     "副组长": "Deputy group leader",
     "副院长": "Deputy dean",
     "助教": "Teaching assistant",
     "助理": "Assistant",
+    "助理研究员": "Assistant researcher",
     "助研": "Research assistant",
+    "区域": "Regional",
+    "医学": "Medical",
     "医师": "Physician",
     "医師": "Physician",
     "医生": "Doctor",
+    "医院": "Hospital",
     "博后": "Postdoctoral researcher",
     "博士": "PhD",
     "博士后": "Postdoctoral researcher",
     "博士生": "PhD student",
+    "博士研究生": "PhD student",
     "员工": "Employee",
+    "售后": "After-sales",
     "商务": "Business",
     "営業": "Sales",
+    "国际": "International",
+    "大区": "Regional",
+    "大学": "University",
     "学员": "Student",
     "学士": "Bachelor's degree holder",
     "学生": "Student",
     "學生": "Student",
     "实习生": "Intern",
     "实验员": "Laboratory technician",
+    "实验室": "Laboratory",
     "实验师": "Laboratory technologist",
+    "客户": "Customer",
     "工程师": "Engineer",
     "市场": "Marketing",
     "干部": "Cadre",
+    "应用": "Application",
+    "开发": "Development",
     "待业": "Unemployed",
+    "总工程师": "Chief engineer",
     "总监": "Director",
     "总经理": "General manager",
+    "总裁": "President",
+    "战略": "Strategy",
     "所长": "Director",
     "技师": "Technician",
     "技术": "Technology",
     "技术员": "Technician",
     "技术岗": "Technical post",
+    "技术支持": "Technical support",
+    "技術": "Technology",
     "技術員": "Technician",
+    "护士": "Nurse",
+    "担当": "Representative",
     "提取": "Extraction",
     "教室": "Classroom",
     "教师": "Teacher",
     "教授": "Professor",
+    "数据": "Data",
     "本科生": "Undergraduate student",
     "检测员": "Inspector",
     "检验": "Testing",
@@ -84,14 +198,21 @@ translation_map = {
     "检验科": "Laboratory department",
     "法人": "Legal representative",
     "测序": "Sequencing",
+    "生产": "Production",
+    "生物信息": "Bioinformatics",
+    "病理": "Pathology",
     "研助": "Research assistant",
     "研发": "Research and development",
     "研发员": "R&D staff",
+    "研究": "Research",
+    "研究助理": "Research assistant",
     "研究员": "Researcher",
     "研究員": "Researcher",
+    "研究所": "Research institute",
     "研究生": "Graduate student",
     "研究者": "Researcher",
     "研究院": "Research institute",
+    "硕士": "Master's degree holder",
     "硕士生": "Master's student",
     "社員": "Employee",
     "科员": "Section staff",
@@ -99,6 +220,7 @@ translation_map = {
     "科研": "Scientific research",
     "科研员": "Research staff",
     "科长": "Section chief",
+    "秘书": "Secretary",
     "管理员": "Administrator",
     "系主任": "Department head",
     "组长": "Team leader",
@@ -106,15 +228,42 @@ translation_map = {
     "老师": "Teacher",
     "职工": "Employee",
     "药剂师": "Pharmacist",
+    "董事": "Board director",
     "董事长": "Chairman",
     "行政": "Administration",
+    "課長": "Section manager",
     "讲师": "Lecturer",
+    "資深": "Senior",
     "購物員": "Purchasing staff",
     "購買": "Purchasing",
+    "负责人": "Lead",
+    "财务": "Finance",
+    "质控": "Quality control",
+    "质检": "Quality inspection",
+    "质量": "Quality",
+    "资深": "Senior",
+    "软件": "Software",
+    "运营": "Operations",
+    "部": "Department",
+    "部長": "Department manager",
+    "部长": "Department head",
+    "部门": "Department",
     "醫檢師": "Medical laboratory scientist",
     "采购": "Purchasing",
     "采购员": "Purchasing staff",
     "销售": "Sales",
+    "開発": "Development",
+    "项目": "Project",
+    "顾问": "Consultant",
+    "首席": "Chief",
+    "高级": "Senior",
+    "교수": "Professor",
+    "매니저": "Manager",
+    "선임": "Senior",
+    "엔지니어": "Engineer",
+    "연구원": "Researcher",
+    "책임": "Principal",
+    "팀장": "Team leader",
 }
 
 abbreviation_map = {
@@ -208,10 +357,456 @@ abbreviation_map = {
     "vp": "Vice president",
 }
 
+limits = {
+    "max_title_length": 200,
+    "oversize_policy": "reject",
+}
+
+rule_profiles = {
+    "research": {
+        "abbreviation_map": {
+            "pi": "Principal investigator",
+        },
+    },
+}
+
+taxonomy_index = {
+    "academic": ["Education", None],
+    "account executive": ["Sales", None],
+    "account manager": ["Sales", "Manager"],
+    "accountant": ["Finance", None],
+    "accounting": ["Finance", None],
+    "adjunct": ["Education", None],
+    "administration": ["Administration", None],
+    "administrative": ["Administration", None],
+    "administrator": ["Administration", None],
+    "adviser": ["Consulting", None],
+    "advisor": ["Consulting", None],
+    "advisory": ["Consulting", None],
+    "after sales": ["Customer Support", None],
+    "analytics": ["Data", None],
+    "application scientist": ["Customer Support", None],
+    "application specialist": ["Customer Support", "Senior"],
+    "apprentice": ["Student", "Student"],
+    "architect": ["Engineering", None],
+    "assistant": [None, "Junior"],
+    "assistant professor": ["Education", "Director"],
+    "associate": [None, "Junior"],
+    "associate director": [None, "Director"],
+    "associate professor": ["Education", "Director"],
+    "attending physician": ["Clinical", "Senior"],
+    "attorney": ["Legal", None],
+    "auditing": ["Finance", None],
+    "auditor": ["Quality", None],
+    "avp": [None, "VP"],
+    "biochemist": ["Research", None],
+    "bioinformatician": ["Bioinformatics", None],
+    "bioinformatics": ["Bioinformatics", None],
+    "biologist": ["Research", None],
+    "biostatistician": ["Bioinformatics", None],
+    "biostatistics": ["Bioinformatics", None],
+    "board director": ["Executive", "Director"],
+    "bookkeeper": ["Finance", None],
+    "brand": ["Marketing", None],
+    "business development": ["Sales", None],
+    "buyer": ["Procurement", None],
+    "cadre": ["Administration", None],
+    "ceo": ["Executive", "C-level"],
+    "certified public accountant": ["Finance", None],
+    "cfo": ["Executive", "C-level"],
+    "chair": [None, "Director"],
+    "chair of the board": ["Executive", "Director"],
+    "chairman": ["Executive", "C-level"],
+    "chairwoman": ["Executive", "C-level"],
+    "chemist": ["Research", None],
+    "chief": [None, "C-level"],
+    "chief commercial officer": ["Executive", "C-level"],
+    "chief executive officer": ["Executive", "C-level"],
+    "chief financial officer": ["Executive", "C-level"],
+    "chief information officer": ["Executive", "C-level"],
+    "chief medical officer": ["Executive", "C-level"],
+    "chief of staff": ["Executive", "Director"],
+    "chief operating officer": ["Executive", "C-level"],
+    "chief scientific officer": ["Executive", "C-level"],
+    "chief technology officer": ["Executive", "C-level"],
+    "cio": ["Executive", "C-level"],
+    "clerk": ["Administration", None],
+    "clinical": ["Clinical", None],
+    "clinical research": ["Clinical", None],
+    "clinical research associate": ["Clinical", "Junior"],
+    "clinical research coordinator": ["Clinical", "Manager"],
+    "clinical trial": ["Clinical", None],
+    "clinician": ["Clinical", None],
+    "cmo": ["Executive", "C-level"],
+    "co founder": ["Executive", "C-level"],
+    "cofounder": ["Executive", "C-level"],
+    "commercial": ["Sales", None],
+    "communications": ["Marketing", None],
+    "compliance": ["Quality", None],
+    "computational biologist": ["Bioinformatics", None],
+    "computational biology": ["Bioinformatics", None],
+    "consultant": ["Consulting", None],
+    "consulting": ["Consulting", None],
+    "content": ["Marketing", None],
+    "contracts": ["Procurement", None],
+    "controller": ["Finance", None],
+    "coo": ["Executive", "C-level"],
+    "coordinator": [None, "Manager"],
+    "counsel": ["Legal", None],
+    "cso": ["Executive", "C-level"],
+    "cto": ["Executive", "C-level"],
+    "customer": ["Customer Support", None],
+    "customer service": ["Customer Support", None],
+    "customer success": ["Customer Support", None],
+    "data": ["Data", None],
+    "data analyst": ["Data", None],
+    "data engineer": ["Data", None],
+    "data scientist": ["Data", None],
+    "dean": ["Education", "Director"],
+    "dentist": ["Clinical", None],
+    "department head": ["Education", "Director"],
+    "deputy": [None, "Manager"],
+    "deputy director": [None, "Director"],
+    "deputy general manager": [None, "VP"],
+    "developer": ["Engineering", None],
+    "devops": ["Engineering", None],
+    "digital marketing": ["Marketing", None],
+    "director": [None, "Director"],
+    "distributor": ["Sales", None],
+    "doctor": ["Clinical", None],
+    "doctor of philosophy": ["Research", None],
+    "editor": ["Marketing", None],
+    "educator": ["Education", None],
+    "employee": ["Administration", None],
+    "engineer": ["Engineering", None],
+    "engineering": ["Engineering", None],
+    "entrepreneur": ["Executive", None],
+    "entry level": [None, "Junior"],
+    "evp": [None, "VP"],
+    "executive": ["Executive", None],
+    "executive director": ["Executive", "C-level"],
+    "executive vice president": ["Executive", "VP"],
+    "expert": [None, "Senior"],
+    "extraction": ["Lab", None],
+    "facilities": ["Operations", None],
+    "faculty": ["Education", None],
+    "fellow": ["Research", "Junior"],
+    "field application scientist": ["Customer Support", None],
+    "field service": ["Customer Support", None],
+    "finance": ["Finance", None],
+    "financial": ["Finance", None],
+    "founder": ["Executive", "C-level"],
+    "general manager": ["Executive", "C-level"],
+    "general staff": ["Administration", None],
+    "geneticist": ["Research", None],
+    "genomics": ["Research", None],
+    "graduate": ["Student", "Junior"],
+    "graduate student": ["Student", "Student"],
+    "group leader": [None, "Director"],
+    "hardware": ["Engineering", None],
+    "head": [None, "Director"],
+    "head of department": ["Education", "Director"],
+    "head of research": ["Research", "Director"],
+    "help desk": ["IT", None],
+    "helpdesk": ["IT", None],
+    "hospital": ["Clinical", None],
+    "hr": ["HR", None],
+    "human resources": ["HR", None],
+    "immunologist": ["Research", None],
+    "information systems": ["IT", None],
+    "information technology": ["IT", None],
+    "inspector": ["Lab", None],
+    "instructor": ["Education", None],
+    "intern": ["Student", "Student"],
+    "investigator": ["Research", None],
+    "it": ["IT", None],
+    "it manager": ["IT", "Manager"],
+    "jr": [None, "Junior"],
+    "junior": [None, "Junior"],
+    "key account manager": ["Sales", "Manager"],
+    "lab": ["Lab", None],
+    "lab manager": ["Lab", "Manager"],
+    "lab technician": ["Lab", None],
+    "laboratory": ["Lab", None],
+    "laboratory manager": ["Lab", "Manager"],
+    "laboratory technician": ["Lab", None],
+    "laboratory tester": ["Lab", None],
+    "lawyer": ["Legal", None],
+    "lead": [None, "Manager"],
+    "leader": [None, "Manager"],
+    "lecturer": ["Education", None],
+    "legal": ["Legal", None],
+    "legal representative": ["Legal", None],
+    "logistics": ["Operations", None],
+    "machine learning": ["Data", None],
+    "management": [None, "Manager"],
+    "manager": [None, "Manager"],
+    "managing director": ["Executive", "C-level"],
+    "manufacturing": ["Operations", None],
+    "marketing": ["Marketing", None],
+    "master's student": ["Student", "Student"],
+    "md": ["Clinical", None],
+    "medical": ["Clinical", None],
+    "medical doctor": ["Clinical", None],
+    "medical writer": ["Marketing", None],
+    "medicine": ["Clinical", None],
+    "microbiologist": ["Research", None],
+    "molecular": ["Research", None],
+    "network": ["IT", None],
+    "ngs": ["Lab", None],
+    "nurse": ["Clinical", None],
+    "office": ["Administration", None],
+    "office manager": ["Administration", "Manager"],
+    "operation": ["Operations", None],
+    "operations": ["Operations", None],
+    "owner": ["Executive", "C-level"],
+    "paralegal": ["Legal", None],
+    "partner": ["Executive", "C-level"],
+    "patent": ["Legal", None],
+    "pathologist": ["Clinical", None],
+    "pathology": ["Clinical", None],
+    "people operations": ["HR", None],
+    "pharmacist": ["Clinical", None],
+    "pharmacovigilance": ["Regulatory", None],
+    "phd student": ["Student", "Student"],
+    "physician": ["Clinical", None],
+    "physicist": ["Research", None],
+    "planner": ["Operations", None],
+    "post doc": ["Research", "Junior"],
+    "postdoc": ["Research", "Junior"],
+    "postdoctoral": ["Research", "Junior"],
+    "postdoctoral researcher": ["Research", "Junior"],
+    "postgraduate": ["Student", "Student"],
+    "practitioner": ["Clinical", None],
+    "president": ["Executive", "C-level"],
+    "primary investigator": ["Research", "Director"],
+    "principal": [None, "Senior"],
+    "principal investigator": ["Research", "Director"],
+    "process engineer": ["Engineering", None],
+    "procurement": ["Procurement", None],
+    "product manager": ["Marketing", "Manager"],
+    "product marketing": ["Marketing", None],
+    "production": ["Operations", None],
+    "professor": ["Education", "Director"],
+    "program manager": ["Operations", "Manager"],
+    "programmer": ["Engineering", None],
+    "project coordinator": ["Operations", "Manager"],
+    "project manager": ["Operations", "Manager"],
+    "public relations": ["Marketing", None],
+    "purchase": ["Procurement", None],
+    "purchaser": ["Procurement", None],
+    "purchasing": ["Procurement", None],
+    "purchasing staff": ["Procurement", None],
+    "qa": ["Quality", None],
+    "qc": ["Quality", None],
+    "qm": ["Quality", None],
+    "quality": ["Quality", None],
+    "quality assurance": ["Quality", None],
+    "quality control": ["Quality", None],
+    "quality inspection": ["Quality", None],
+    "quality manager": ["Quality", "Manager"],
+    "r&d": ["Research", None],
+    "radiologist": ["Clinical", None],
+    "receptionist": ["Administration", None],
+    "recruiter": ["HR", None],
+    "recruiting": ["HR", None],
+    "regulatory": ["Regulatory", None],
+    "regulatory affairs": ["Regulatory", None],
+    "representative": ["Sales", None],
+    "research": ["Research", None],
+    "research and development": ["Research", None],
+    "research assistant": ["Research", "Junior"],
+    "research associate": ["Research", "Junior"],
+    "research fellow": ["Research", "Junior"],
+    "researcher": ["Research", None],
+    "resident": ["Clinical", None],
+    "sales": ["Sales", None],
+    "sales representative": ["Sales", None],
+    "salesperson": ["Sales", None],
+    "scholar": ["Research", None],
+    "school": ["Education", None],
+    "science": ["Research", None],
+    "scientific": ["Research", None],
+    "scientific writer": ["Marketing", None],
+    "scientist": ["Research", None],
+    "secretary": ["Administration", None],
+    "section chief": [None, "Director"],
+    "section staff": ["Administration", None],
+    "senior": [None, "Senior"],
+    "senior vice president": ["Executive", "VP"],
+    "sequencing": ["Lab", None],
+    "service engineer": ["Customer Support", None],
+    "software": ["Engineering", None],
+    "software engineer": ["Engineering", None],
+    "sourcing": ["Procurement", None],
+    "specialist": [None, "Senior"],
+    "sr": [None, "Senior"],
+    "staff": ["Administration", None],
+    "staff scientist": ["Research", "Senior"],
+    "statistician": ["Data", None],
+    "statistics": ["Data", None],
+    "student": ["Student", "Student"],
+    "supervisor": [None, "Manager"],
+    "supply chain": ["Operations", None],
+    "support": ["Customer Support", None],
+    "surgeon": ["Clinical", None],
+    "svp": [None, "VP"],
+    "system administrator": ["IT", None],
+    "systems administrator": ["IT", None],
+    "talent": ["HR", None],
+    "talent acquisition": ["HR", None],
+    "teacher": ["Education", None],
+    "teaching": ["Education", None],
+    "teaching assistant": ["Education", "Junior"],
+    "team lead": [None, "Manager"],
+    "team leader": [None, "Manager"],
+    "technical support": ["Customer Support", None],
+    "technician": ["Lab", None],
+    "technologist": ["Lab", None],
+    "territory manager": ["Sales", "Manager"],
+    "tester": ["Lab", None],
+    "therapist": ["Clinical", None],
+    "trainee": ["Student", "Junior"],
+    "treasurer": ["Finance", None],
+    "tutor": ["Education", None],
+    "undergraduate": ["Student", "Student"],
+    "undergraduate student": ["Student", "Student"],
+    "university": ["Education", None],
+    "validation": ["Quality", None],
+    "veterinarian": ["Clinical", None],
+    "veterinary": ["Clinical", None],
+    "vice general manager": ["Executive", "VP"],
+    "vice president": ["Executive", "VP"],
+    "vp": [None, "VP"],
+    "warehouse": ["Operations", None],
+    "writer": ["Marketing", None],
+}
+
+seniority_levels = [
+    "C-level",
+    "VP",
+    "Director",
+    "Manager",
+    "Senior",
+    "Junior",
+    "Student",
+]
+# --- END GENERATED RULES ---
+
+def high_noise_ratio(text: str) -> bool:
+    total = len(text)
+    if total <= 5:
+        return False
+    non_letters = sum(1 for ch in text if not (ch.isalpha() or ch.isspace()))
+    return (non_letters / total) > 0.75
+
+default_tables = {
+    "junk_values": junk_values,
+    "preserve_caps": preserve_caps,
+    "lower_middle_words": lower_middle_words,
+    "translation_map": translation_map,
+    "abbreviation_map": abbreviation_map,
+}
+_profile_tables = {}
+
+
+def rules_for_profile(profile=""):
+    """Tables for a rule profile: its overrides from ``rule_profiles`` layered over the defaults."""
+    if not profile:
+        return default_tables
+    if profile not in _profile_tables:
+        overlay = rule_profiles.get(profile)
+        if overlay is None:
+            raise ValueError(f"Unknown rule profile: {profile}")
+        tables = dict(default_tables)
+        for key, change in overlay.items():
+            if key in ("translation_map", "abbreviation_map"):
+                table = dict(tables[key])
+                for name, value in change.items():
+                    if value is None:
+                        table.pop(name, None)
+                    else:
+                        table[name] = value
+                tables[key] = table
+            else:
+                tables[key] = (set(tables[key]) - set(change.get("remove", []))) | set(change.get("add", []))
+        _profile_tables[profile] = tables
+    return _profile_tables[profile]
+
+
 def remove_diacritics(s):
     n = unicodedata.normalize('NFD', s)
     return ''.join(ch for ch in n if unicodedata.category(ch) != 'Mn')
 
+_translation_terms = {}
+
+
+def translate_terms(t, profile=""):
+    """
+    Translate a non-Latin title made of known terms ("高级工程师" -> "Senior Engineer") by greedy longest match
+    over the translation_map keys; ASCII runs are kept. Returns None if some non-ASCII text is not a known term.
+    """
+    if profile not in _translation_terms:
+        table = rules_for_profile(profile)["translation_map"]
+        terms = {remove_diacritics(k).lower(): v for k, v in table.items() if not k.isascii()}
+        _translation_terms[profile] = (terms, max(map(len, terms), default=0))
+    terms, longest = _translation_terms[profile]
+    parts = []
+    i = 0
+    lowered = t.lower()
+    while i < len(t):
+        if t[i].isascii():
+            parts.append(t[i])
+            i += 1
+            continue
+        for end in range(min(len(t), i + longest), i, -1):
+            if lowered[i:end] in terms:
+                parts.append(f" {terms[lowered[i:end]]} ")
+                i = end
+                break
+        else:
+            separator = {"、": ",", "·": " ", "・": " ", "。": " "}.get(t[i]) or unicodedata.normalize("NFKC", t[i])
+            if not separator.isascii() or separator.isalnum():
+                return None
+            parts.append(separator)
+            i += 1
+    text = " ".join("".join(parts).split())
+    return re.sub(r'([(\[])\s+', r'\1', re.sub(r'\s+([,)\]])', r'\1', text))
+
+
+_seniority_rank = {level: rank for rank, level in enumerate(seniority_levels)}
+_taxonomy_words = max((phrase.count(" ") + 1 for phrase in taxonomy_index), default=1)
+
+
+def classify_title(title):
+    """
+    (function, seniority) of a cleaned title from taxonomy_index: the longest indexed phrase at each word
+    labels it; the function most phrases name wins (earliest on ties), and the highest seniority wins.
+    """
+    words = re.findall(r"[a-z0-9]+(?:['&][a-z0-9]+)*", (title or "").lower().replace("’", "'"))
+    votes = {}
+    seniority = None
+    i = 0
+    while i < len(words):
+        consumed, labels = 1, None
+        for length in range(min(_taxonomy_words, len(words) - i), 0, -1):
+            labels = taxonomy_index.get(" ".join(words[i : i + length]))
+            if labels is not None:
+                consumed = length
+                break
+        if labels is None and len(words[i]) > 3 and words[i].endswith("s"):
+            labels = taxonomy_index.get(words[i][:-1])
+        if labels is not None:
+            function, level = labels
+            if function:
+                votes.setdefault(function, [0, i])[0] += 1
+            if level and (seniority is None or _seniority_rank[level] < _seniority_rank[seniority]):
+                seniority = level
+        i += consumed
+    function = max(votes, key=lambda name: (votes[name][0], -votes[name][1]), default="")
+    return function, seniority or ""
+
+
 def roman_to_upper(m):
     return m.group(1) + m.group(2).upper()
 
@@ -228,11 +823,20 @@ def strip_edge_punctuation(t):
     t = re.sub(r'[\s"\'`“”‘’.,;:!?()\[\]{}<>-]+$', '', t)
     return t
 
-def clean_job_title_with_reason(title):
+def clean_job_title_with_reason(title, profile=""):
     if not isinstance(title, str):
         return None, "non_string"
+    rules = rules_for_profile(profile)
 
-    t = html.unescape(title.strip())
+    # Pasted paragraphs would otherwise run every regex below over kilobytes of text.
+    t = title.strip()
+    limit = limits["max_title_length"]
+    if limit and len(t) > limit:
+        if limits["oversize_policy"] == "reject":
+            return None, "too_long"
+        cut = t.rfind(" ", 0, limit + 1)
+        t = (t[:cut] if cut >= limit // 2 else t[:limit]).rstrip()
+    t = html.unescape(t)
     t = strip_edge_punctuation(t)
     t = re.sub(r'^"(.*)"$', r'\1', t)
     t = re.sub(r'^`+', '', t)
@@ -242,7 +846,9 @@ def clean_job_title_with_reason(title):
     if not t:
         return None, "empty"
 
-    translated = translation_map.get(t.lower())
+    translated = rules["translation_map"].get(t.lower())
+    if translated is None and non_latin_pattern.search(t):
+        translated = translate_terms(t, profile)
     if translated is not None:
         t = translated
 
@@ -258,15 +864,16 @@ def clean_job_title_with_reason(title):
         return None, "punct_only"
     if len(t) == 1:
         return None, "too_short"
-    if t.lower() in junk_values:
+    if t.lower() in rules["junk_values"]:
         return None, "junk_value"
 
-    expanded = abbreviation_map.get(t.lower())
+    expanded = rules["abbreviation_map"].get(t.lower())
     if expanded is not None:
         t = expanded
 
     # Roman numerals
-    t = roman_pattern.sub(roman_to_upper, t)
+    if roman_hint_pattern.search(t):
+        t = roman_pattern.sub(roman_to_upper, t)
 
     # Convert to words, preserve uppercase acronyms
     words = t.split()
@@ -274,10 +881,10 @@ def clean_job_title_with_reason(title):
     total = len(words)
     for idx, w in enumerate(words):
         lower_w = w.lower()
-        if 0 < idx < total - 1 and lower_w in lower_middle_words:
+        if 0 < idx < total - 1 and lower_w in rules["lower_middle_words"]:
             final_words.append(lower_w)
             continue
-        if w.isupper() or w.upper() in preserve_caps:
+        if w.isupper() or w.upper() in rules["preserve_caps"]:
             final_words.append("PhD" if lower_w == "phd" else w.upper())
         else:
             final_words.append("PhD" if lower_w == "phd" else w.title())
@@ -305,8 +912,8 @@ def clean_job_title_with_reason(title):
     return (t or None), ("" if t else "invalid_final")
 
 
-def clean_job_title(title):
-    cleaned, _ = clean_job_title_with_reason(title)
+def clean_job_title(title, profile=""):
+    cleaned, _ = clean_job_title_with_reason(title, profile)
     return cleaned
 
 
@@ -315,7 +922,15 @@ def main(event):
         job_title = event.get("inputFields", {}).get("jobTitle", "")
         if not isinstance(job_title, str):
             job_title = ""
-        cleaned, reason = clean_job_title_with_reason(job_title)
+        profile = event.get("inputFields", {}).get("ruleProfile", "")
+        if not isinstance(profile, str):
+            profile = ""
+        cleaned, reason = clean_job_title_with_reason(job_title, profile.strip())
+        # Optional outputs: "function" and "seniority" when the classifyTitle input is set.
+        labels = {}
+        if str(event.get("inputFields", {}).get("classifyTitle", "")).lower() in {"1", "true", "yes", "on"}:
+            function, seniority = classify_title(cleaned) if reason != "non_latin" else ("", "")
+            labels = {"function": function, "seniority": seniority}
 
         if reason == "non_latin":
             return {
@@ -326,6 +941,7 @@ def main(event):
                     "error": "",
                     "error_message": "",
                     "error_state": 0,
+                    **labels,
                 }
             }
 
@@ -338,6 +954,7 @@ def main(event):
                     "error": "",
                     "error_message": "",
                     "error_state": 0,
+                    **labels,
                 }
             }
 
@@ -352,6 +969,7 @@ def main(event):
                 "error": "",
                 "error_message": "",
                 "error_state": 0,
+                **labels,
             }
         }
 
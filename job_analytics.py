@@ -0,0 +1,294 @@
+"""Job analytics gathered while a job is cleaned: top titles, distinct counts, outcomes and title lengths.
+
+``JobAnalytics`` counts exactly. ``clean_csv_file`` already holds each distinct title and its row count to clean
+it once, so the job summary is counted per distinct title from that map. What a job persists for merging
+(``JobAnalytics.sketch``, e.g. each shard's ``analytics_state``) is an ``AnalyticsSketch`` instead, which has a
+fixed size however many distinct titles the part has, so combining the parts of a very large input stays
+small. Its sketches merge, and ``to_dict``/``from_dict`` carry them between processes as JSON:
+
+- ``HeavyHitters``: the most frequent titles (weighted Misra-Gries). Reported counts never exceed the true
+  count and fall short of it by at most ``error``.
+- ``HyperLogLog``: distinct-title estimates, about 1.6% standard error at the default precision.
+- ``LengthHistogram``: title lengths in fixed buckets (exact).
+"""
+import base64
+import hashlib
+import heapq
+import math
+from bisect import bisect_right
+
+# Heavy-hitter slots per sketch; titles seen on more than 1/(capacity + 1) of the rows are always kept.
+HEAVY_HITTER_CAPACITY = 256
+# HyperLogLog registers = 2**precision (one byte each).
+HLL_PRECISION = 12
+# Lower bounds of the title length buckets, in characters.
+LENGTH_BUCKETS = (0, 1, 10, 20, 30, 40, 60, 80, 120)
+# Titles listed per top-N table in a job summary.
+TOP_TITLES = 10
+
+
+def _add_count(counts: dict, item, rows: int) -> None:
+    counts[item] = counts.get(item, 0) + rows
+
+
+def _ranked(reasons: dict) -> dict:
+    return dict(sorted(reasons.items(), key=lambda kv: (-kv[1], kv[0])))
+
+
+def _top(counts: dict, n: int) -> list:
+    """The ``n`` largest ``[item, count]`` pairs, most frequent first (ties by item)."""
+    ranked = heapq.nsmallest(n, counts.items(), key=lambda kv: (-kv[1], kv[0]))
+    return [[item, count] for item, count in ranked]
+
+
+class HeavyHitters:
+    """Approximate top-N counts over weighted items that keeps at most ``2 * capacity`` counters."""
+
+    def __init__(self, capacity: int = HEAVY_HITTER_CAPACITY):
+        self.capacity = capacity
+        self.counts = {}
+        self.error = 0
+
+    def _purge(self) -> None:
+        # Subtracting the (capacity + 1)-th largest count from every counter leaves at most ``capacity``; batching
+        # the decrement keeps updates amortised O(1).
+        threshold = heapq.nlargest(self.capacity + 1, self.counts.values())[-1]
+        self.counts = {item: count - threshold for item, count in self.counts.items() if count > threshold}
+        self.error += threshold
+
+    @classmethod
+    def from_counts(cls, counts: dict, capacity: int = HEAVY_HITTER_CAPACITY) -> "HeavyHitters":
+        """A sketch of exact ``counts``: the ``capacity`` largest, undercounting the rest by at most ``error``."""
+        sketch = cls(capacity)
+        ranked = heapq.nsmallest(capacity + 1, counts.items(), key=lambda kv: (-kv[1], kv[0]))
+        sketch.counts = dict(ranked[:capacity])
+        sketch.error = ranked[capacity][1] if len(ranked) > capacity else 0
+        return sketch
+
+    def merge(self, other: "HeavyHitters") -> None:
+        for item, count in other.counts.items():
+            self.counts[item] = self.counts.get(item, 0) + count
+        self.error += other.error
+        if len(self.counts) > 2 * self.capacity:
+            self._purge()
+
+    def to_dict(self) -> dict:
+        counts = [[item, count] for item, count in self.counts.items()]
+        return {"capacity": self.capacity, "counts": counts, "error": self.error}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "HeavyHitters":
+        sketch = cls(data["capacity"])
+        sketch.counts = {item: count for item, count in data["counts"]}
+        sketch.error = data["error"]
+        return sketch
+
+    def top(self, n: int) -> list:
+        return _top(self.counts, n)
+
+
+class HyperLogLog:
+    """Distinct-count estimator over strings."""
+
+    def __init__(self, precision: int = HLL_PRECISION):
+        self.precision = precision
+        self.registers = bytearray(1 << precision)
+        self._rest_bits = 64 - precision
+
+    def add(self, value: str) -> None:
+        hashed = int.from_bytes(hashlib.blake2b(value.encode("utf-8"), digest_size=8).digest(), "big")
+        index = hashed >> self._rest_bits
+        # Position of the leftmost 1-bit in the remaining bits.
+        rank = self._rest_bits - (hashed & ((1 << self._rest_bits) - 1)).bit_length() + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def merge(self, other: "HyperLogLog") -> None:
+        if other.precision != self.precision:
+            raise ValueError("Cannot merge HyperLogLog sketches of different precision")
+        self.registers = bytearray(map(max, self.registers, other.registers))
+
+    def to_dict(self) -> dict:
+        return {"precision": self.precision, "registers": base64.b64encode(self.registers).decode("ascii")}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "HyperLogLog":
+        sketch = cls(data["precision"])
+        registers = base64.b64decode(data["registers"])
+        if len(registers) != len(sketch.registers):
+            raise ValueError("HyperLogLog registers do not match the precision")
+        sketch.registers = bytearray(registers)
+        return sketch
+
+    def count(self) -> int:
+        m = len(self.registers)
+        estimate = 0.7213 / (1 + 1.079 / m) * m * m / sum(2.0 ** -rank for rank in self.registers)
+        zeros = self.registers.count(0)
+        if estimate <= 2.5 * m and zeros:
+            estimate = m * math.log(m / zeros)  # linear counting is more accurate for small sets
+        return round(estimate)
+
+
+class LengthHistogram:
+    """Rows per title-length bucket (``LENGTH_BUCKETS``) plus the mean and maximum length."""
+
+    def __init__(self):
+        self.buckets = [0] * len(LENGTH_BUCKETS)
+        self.rows = 0
+        self.total = 0
+        self.longest = 0
+
+    def add(self, length: int, weight: int = 1) -> None:
+        self.buckets[bisect_right(LENGTH_BUCKETS, length) - 1] += weight
+        self.rows += weight
+        self.total += length * weight
+        self.longest = max(self.longest, length)
+
+    def merge(self, other: "LengthHistogram") -> None:
+        self.buckets = [a + b for a, b in zip(self.buckets, other.buckets)]
+        self.rows += other.rows
+        self.total += other.total
+        self.longest = max(self.longest, other.longest)
+
+    def to_dict(self) -> dict:
+        return {"buckets": list(self.buckets), "rows": self.rows, "total": self.total, "longest": self.longest}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "LengthHistogram":
+        histogram = cls()
+        if len(data["buckets"]) != len(histogram.buckets):
+            raise ValueError("Length histogram buckets do not match LENGTH_BUCKETS")
+        histogram.buckets = list(data["buckets"])
+        histogram.rows, histogram.total, histogram.longest = data["rows"], data["total"], data["longest"]
+        return histogram
+
+    def summary(self) -> dict:
+        labels = [
+            str(low) if high - low == 1 else f"{low}-{high - 1}"
+            for low, high in zip(LENGTH_BUCKETS, LENGTH_BUCKETS[1:])
+        ] + [f"{LENGTH_BUCKETS[-1]}+"]
+        return {
+            "buckets": dict(zip(labels, self.buckets)),
+            "mean": round(self.total / self.rows, 1) if self.rows else 0,
+            "max": self.longest,
+        }
+
+
+class JobAnalytics:
+    """Top titles, distinct counts, outcome histogram and length distributions for one job."""
+
+    def __init__(self):
+        self.title_counts = {}
+        self.cleaned_counts = {}
+        self.reasons = {}
+        self.title_lengths = LengthHistogram()
+        self.cleaned_lengths = LengthHistogram()
+
+    def add(self, title: str, cleaned: str, reason: str, rows: int = 1) -> None:
+        """
+        Record ``rows`` rows holding ``title``, cleaned to ``cleaned`` (blank when removed) for ``reason`` (the
+        removal reason, or the row's outcome when kept).
+        """
+        _add_count(self.reasons, reason, rows)
+        self.title_lengths.add(len(title), rows)
+        if title:
+            _add_count(self.title_counts, title, rows)
+        if cleaned:
+            _add_count(self.cleaned_counts, cleaned, rows)
+            self.cleaned_lengths.add(len(cleaned), rows)
+
+    def merge(self, other: "JobAnalytics") -> None:
+        for mine, theirs in (
+            (self.title_counts, other.title_counts),
+            (self.cleaned_counts, other.cleaned_counts),
+            (self.reasons, other.reasons),
+        ):
+            for item, rows in theirs.items():
+                _add_count(mine, item, rows)
+        self.title_lengths.merge(other.title_lengths)
+        self.cleaned_lengths.merge(other.cleaned_lengths)
+
+    def sketch(self) -> "AnalyticsSketch":
+        """The analytics as a fixed-size ``AnalyticsSketch``, for persisting and merging with other parts."""
+        sketch = AnalyticsSketch()
+        sketch.top_titles = HeavyHitters.from_counts(self.title_counts)
+        sketch.top_cleaned = HeavyHitters.from_counts(self.cleaned_counts)
+        for title in self.title_counts:
+            sketch.distinct_titles.add(title)
+        for cleaned in self.cleaned_counts:
+            sketch.distinct_cleaned.add(cleaned)
+        sketch.reasons = dict(self.reasons)
+        sketch.title_lengths.merge(self.title_lengths)
+        sketch.cleaned_lengths.merge(self.cleaned_lengths)
+        return sketch
+
+    def summary(self, top: int = TOP_TITLES) -> dict:
+        return {
+            "distinct_titles": len(self.title_counts),
+            "distinct_cleaned_titles": len(self.cleaned_counts),
+            "top_titles": _top(self.title_counts, top),
+            "top_cleaned_titles": _top(self.cleaned_counts, top),
+            "reasons": _ranked(self.reasons),
+            "title_lengths": self.title_lengths.summary(),
+            "cleaned_lengths": self.cleaned_lengths.summary(),
+        }
+
+
+class AnalyticsSketch:
+    """Fixed-size, mergeable form of ``JobAnalytics``; its summary estimates the distinct counts."""
+
+    def __init__(self):
+        self.top_titles = HeavyHitters()
+        self.top_cleaned = HeavyHitters()
+        self.distinct_titles = HyperLogLog()
+        self.distinct_cleaned = HyperLogLog()
+        self.reasons = {}
+        self.title_lengths = LengthHistogram()
+        self.cleaned_lengths = LengthHistogram()
+
+    def merge(self, other: "AnalyticsSketch") -> None:
+        self.top_titles.merge(other.top_titles)
+        self.top_cleaned.merge(other.top_cleaned)
+        self.distinct_titles.merge(other.distinct_titles)
+        self.distinct_cleaned.merge(other.distinct_cleaned)
+        for reason, rows in other.reasons.items():
+            _add_count(self.reasons, reason, rows)
+        self.title_lengths.merge(other.title_lengths)
+        self.cleaned_lengths.merge(other.cleaned_lengths)
+
+    def to_dict(self) -> dict:
+        """The sketches' state as JSON-ready data; ``AnalyticsSketch.from_dict`` restores it."""
+        return {
+            "top_titles": self.top_titles.to_dict(),
+            "top_cleaned": self.top_cleaned.to_dict(),
+            "distinct_titles": self.distinct_titles.to_dict(),
+            "distinct_cleaned": self.distinct_cleaned.to_dict(),
+            "reasons": dict(self.reasons),
+            "title_lengths": self.title_lengths.to_dict(),
+            "cleaned_lengths": self.cleaned_lengths.to_dict(),
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "AnalyticsSketch":
+        sketch = cls()
+        sketch.top_titles = HeavyHitters.from_dict(data["top_titles"])
+        sketch.top_cleaned = HeavyHitters.from_dict(data["top_cleaned"])
+        sketch.distinct_titles = HyperLogLog.from_dict(data["distinct_titles"])
+        sketch.distinct_cleaned = HyperLogLog.from_dict(data["distinct_cleaned"])
+        sketch.reasons = dict(data["reasons"])
+        sketch.title_lengths = LengthHistogram.from_dict(data["title_lengths"])
+        sketch.cleaned_lengths = LengthHistogram.from_dict(data["cleaned_lengths"])
+        return sketch
+
+    def summary(self, top: int = TOP_TITLES) -> dict:
+        """Like ``JobAnalytics.summary``, with ``top_titles_error`` bounding how far the top counts may undercount."""
+        return {
+            "distinct_titles": self.distinct_titles.count(),
+            "distinct_cleaned_titles": self.distinct_cleaned.count(),
+            "top_titles": self.top_titles.top(top),
+            "top_cleaned_titles": self.top_cleaned.top(top),
+            "top_titles_error": max(self.top_titles.error, self.top_cleaned.error),
+            "reasons": _ranked(self.reasons),
+            "title_lengths": self.title_lengths.summary(),
+            "cleaned_lengths": self.cleaned_lengths.summary(),
+        }
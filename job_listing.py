@@ -0,0 +1,145 @@
+"""Paginated, cacheable listing of the job list in ``jobs.json``.
+
+``JobListing`` parses the file only when its version changes. The version is the file's inode, modification
+time and size, the same validator web servers derive ETags from. Each parse sorts the jobs once per sort order,
+so a page costs a binary search to the cursor plus a scan over the jobs it returns (and any filtered out on
+the way). Cursors are opaque, URL-safe strings holding the sort key of the last job of a page. Jobs added
+meanwhile therefore never shift later pages, whereas offsets would.
+"""
+import base64
+import bisect
+import json
+import threading
+from datetime import datetime, timezone
+
+JOBS_PAGE_SIZE = 50
+JOBS_PAGE_MAX = 500
+JOB_SORTS = ("created_at", "name")
+
+
+def _created_timestamp(job: dict) -> float:
+    try:
+        created = datetime.fromisoformat(job["created_at"])
+    except (KeyError, TypeError, ValueError):
+        return 0.0
+    if created.tzinfo is None:
+        created = created.replace(tzinfo=timezone.utc)
+    return created.timestamp()
+
+
+def _sort_key(sort: str, job: dict) -> tuple:
+    name = job.get("name", "")
+    # Names by length first, so JobTitleClean1000 follows JobTitleClean999.
+    if sort == "created_at":
+        return (_created_timestamp(job), len(name), name)
+    return (len(name), name)
+
+
+def parse_time(value: str) -> float:
+    """Timestamp of an ISO date or datetime (UTC unless it names a zone); raises ValueError."""
+    parsed = datetime.fromisoformat(value)
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp()
+
+
+def encode_cursor(sort: str, key: tuple) -> str:
+    payload = json.dumps([sort, *key], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(payload).decode().rstrip("=")
+
+
+def decode_cursor(sort: str, cursor: str) -> tuple:
+    """The sort key in ``cursor``; raises ValueError if it is malformed or belongs to another sort."""
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except (ValueError, TypeError):
+        raise ValueError("Invalid cursor") from None
+    expected = [float, int, str] if sort == "created_at" else [int, str]
+    if (
+        not isinstance(payload, list)
+        or payload[:1] != [sort]
+        or len(payload) != len(expected) + 1
+        or not all(isinstance(value, kind) for value, kind in zip(payload[1:], expected))
+    ):
+        raise ValueError("Invalid cursor")
+    return tuple(payload[1:])
+
+
+class JobListing:
+    """Pages of the jobs stored in ``metadata_path``; ``decorate(job)`` adds display fields once per parse."""
+
+    def __init__(self, metadata_path, decorate=None):
+        self.metadata_path = metadata_path
+        self.decorate = decorate
+        self._lock = threading.Lock()
+        self._version = None
+        self._jobs = []
+        self._orders = {}
+
+    def version(self):
+        """``(version, modified)`` of the job list: an opaque string and the file's mtime (None while missing)."""
+        try:
+            st = self.metadata_path.stat()
+        except FileNotFoundError:
+            return "none", None
+        modified = datetime.fromtimestamp(st.st_mtime, timezone.utc)
+        return f"{st.st_ino:x}-{st.st_mtime_ns:x}-{st.st_size:x}", modified
+
+    def _load(self, version: str) -> None:
+        try:
+            jobs = json.loads(self.metadata_path.read_text())
+        except (OSError, json.JSONDecodeError):
+            jobs = []
+        if self.decorate is not None:
+            for job in jobs:
+                self.decorate(job)
+        self._jobs = jobs
+        self._orders = {}
+        self._version = version
+
+    def _order(self, sort: str):
+        """Jobs in ascending ``sort`` order with their keys."""
+        if sort not in self._orders:
+            ranked = sorted(((_sort_key(sort, job), job) for job in self._jobs), key=lambda item: item[0])
+            self._orders[sort] = ([key for key, _ in ranked], [job for _, job in ranked])
+        return self._orders[sort]
+
+    def page(self, version: str, sort="-created_at", statuses=None, since=None, until=None, cursor=None, limit=None):
+        """
+        ``(jobs, next_cursor)``: up to ``limit`` jobs in ``sort`` order (a field of ``JOB_SORTS``, ``-`` for
+        descending) after ``cursor``, keeping jobs whose status is in ``statuses`` and that were created at or
+        after ``since`` and before ``until`` (timestamps). ``next_cursor`` is None on the last page. Raises
+        ValueError for an unknown sort or a bad cursor.
+        """
+        descending = sort.startswith("-")
+        field = sort.lstrip("-")
+        if field not in JOB_SORTS:
+            raise ValueError(f"Unknown sort: {sort}")
+        limit = JOBS_PAGE_SIZE if limit is None else limit
+        with self._lock:
+            if version != self._version:
+                self._load(version)
+            keys, jobs = self._order(field)
+
+        if descending:
+            end = len(keys) if cursor is None else bisect.bisect_left(keys, decode_cursor(field, cursor))
+            positions = range(end - 1, -1, -1)
+        else:
+            start = 0 if cursor is None else bisect.bisect_right(keys, decode_cursor(field, cursor))
+            positions = range(start, len(keys))
+
+        result = []
+        last = None
+        for position in positions:
+            job = jobs[position]
+            if statuses and job.get("status") not in statuses:
+                continue
+            if since is not None or until is not None:
+                created = _created_timestamp(job)
+                if (since is not None and created < since) or (until is not None and created >= until):
+                    continue
+            if len(result) == limit:
+                return result, encode_cursor(field, keys[last])
+            result.append(job)
+            last = position
+        return result, None
@@ -1,29 +1,70 @@
 import re
+import csv
 import html
+import hashlib
+import json
+import os
+import pickle
+import sys
+import threading
 import unicodedata
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
 from pathlib import Path
-import pandas as pd
+
+from checkpoint import CHECKPOINT_ROWS, Checkpoint, file_sha256
+from fuzzy_correction import DICTIONARY_PATH, FuzzyCorrector
+from job_analytics import JobAnalytics
+from segmentation import TranslationTrie
+
+# pandas is imported by the CSV functions that use it, so title-level callers (HubSpot, explain, short CLI runs)
+# start without it.
 
 phone_pattern = re.compile(r'^\+?[0-9()\s\-]{7,}$')
 roman_pattern = re.compile(r'(\b[A-Za-z]+[ -])(i{1,3}|iv|vi{1,3}|ix)\b', re.IGNORECASE)
-email_pattern = re.compile(r'[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}', re.IGNORECASE)
+# Every roman_pattern match contains this; one linear search rules most titles out before the full pattern.
+roman_hint_pattern = re.compile(r'[ -][iv]', re.IGNORECASE)
+# Bounded by the RFC 5321 part lengths so that a long run of address characters cannot make a search quadratic.
+email_pattern = re.compile(r'[A-Za-z0-9._%+-]{1,64}@[A-Za-z0-9.-]{1,255}\.[A-Za-z]{2,63}', re.IGNORECASE)
 non_latin_pattern = re.compile(r'[^\x00-\x7F]')
 punct_only_pattern = re.compile(r'[-_. \u2013\u2014]+$')
+enclosing_quotes_pattern = re.compile(r'^"(.*)"$')
+leading_backticks_pattern = re.compile(r'^`+')
+repeated_quotes_pattern = re.compile(r'"{2,}')
+other_prefix_pattern = re.compile(r'^\s*other\s*-\s*', re.IGNORECASE)
+ordinal_pattern = re.compile(r'\b(\d+)(st|nd|rd|th)\b', re.IGNORECASE)
+vertical_bar_pattern = re.compile(r'\s*\|\s*')
+slash_pattern = re.compile(r'(\b\w{4,}\b)\s*/\s*(\b\w{4,}\b)')
+and_pattern = re.compile(r'(\b\w+)\s+And\s+(\w+\b)')
+post_doc_pattern = re.compile(r'\bPost Doc\b', re.IGNORECASE)
+leading_trim_pattern = re.compile(r'^[\s"\'`“”‘’.,;:!?-]+')
+trailing_trim_pattern = re.compile(r'[\s"\'`“”‘’.,;:!?-]+$')
+leading_edge_pattern = re.compile(r'^[\s"\'`“”‘’.,;:!?()\[\]{}<>-]+')
+trailing_edge_pattern = re.compile(r'[\s"\'`“”‘’.,;:!?()\[\]{}<>-]+$')
+# Characters the edge/final trims can remove (besides whitespace); titles not starting or ending with one skip them.
+EDGE_CHARS = frozenset('"\'`“”‘’.,;:!?()[]{}<>-')
+TRIM_CHARS = frozenset('"\'`“”‘’.,;:!?-')
+# Upper bound on canonical titles learned at runtime for the fast path.
+CANONICAL_TITLES_LIMIT = 200_000
+# Distinct titles cleaned between two ``clean_csv_file`` progress reports, however large the checkpoint chunks.
+PROGRESS_TITLES = 10_000
+# Input-size policy for rulesets without a ``limits`` table. Titles longer than ``max_title_length`` (after
+# stripping) are pasted paragraphs or garbage; "reject" removes them as ``too_long`` before any regex runs,
+# "truncate" cuts them at a word boundary and cleans the rest. A length of 0 disables the guard.
+DEFAULT_LIMITS = {"max_title_length": 200, "oversize_policy": "reject"}
+OVERSIZE_POLICIES = ("reject", "truncate")
+# Layouts ``clean_csv_file`` can write: one row per input row, or one per distinct raw title.
+OUTPUT_FORMATS = ("rows", "mapping")
+# Bump when the cleaning logic changes in a way that is not captured by the rule tables.
+PIPELINE_VERSION = "3"
+# Bump when the RuleEngine layout changes so stale pickled snapshots are ignored.
+SNAPSHOT_FORMAT = "4"
+RULES_PATH = Path(os.environ.get("RULES_PATH", Path(__file__).parent / "rules" / "default.json"))
+RULES_SNAPSHOT_DIR = Path(os.environ.get("RULES_SNAPSHOT_DIR", RULES_PATH.parent / ".snapshots"))
+RULES_PROFILES_DIR = Path(os.environ.get("RULES_PROFILES_DIR", RULES_PATH.parent / "profiles"))
+profile_name_pattern = re.compile(r'^[A-Za-z0-9_-]+$')
+
 
-junk_values = {
-    "job", "job title",
-    "test", "n/a", "none", "unknown", "???", "---", "-", "_", "zzz", "vmeinupi", "vivvixza",
-    "vivvviio", "vkodhyqc", "aaa", "aaaa", "aaaaa", "aaaaaa", "aaaaaaaab", "aaaaaaaaab",
-    "abc", "youknowwho", "who?", "no", "no response", "no title", "nobody", "no job title",
-    "nil", "na", "aa", "abcf", "all", "ddf", "dff", "do", "dude", "hh", "mr", "other", "4a",
-    "god", "miss", "self", "xs", "xx", "xxx", "yes", "sale", "team", "temp", "staff",
-    "troublemaker", "testing", "wage earner",
-    "null", "none", "non", "jobtitle", "job title", "job title", "individual",
-}
-
-preserve_caps = {"IS", "IT", "IR", "IP", "PI", "PM", "PR", "PhD", "VP", "AIO", "AIOS", "APHL", "MD"}
-lower_middle_words = {"the", "at", "of", "in", "de", "en", "on"}
-ordinal_suffixes = {"1": "st", "2": "nd", "3": "rd"}
 def high_noise_ratio(text: str) -> bool:
     total = len(text)
     if total <= 5:
@@ -31,316 +72,6 @@ def high_noise_ratio(text: str) -> bool:
     non_letters = sum(1 for ch in text if not (ch.isalpha() or ch.isspace()))
     return (non_letters / total) > 0.75
 
-translation_map = {
-    "业务员": "Salesperson",
-    "主任": "Director",
-    "主管": "Manager",
-    "兽医师": "Veterinarian",
-    "内勤": "Supervisor",
-    "副主任": "Deputy director",
-    "副所长": "Deputy institute director",
-    "副教授": "Associate professor",
-    "副研": "Research associate",
-    "副總": "Vice president",
-    "副组长": "Deputy group leader",
-    "副院长": "Deputy dean",
-    "助教": "Teaching assistant",
-    "助理": "Assistant",
-    "助研": "Research assistant",
-    "医师": "Physician",
-    "医師": "Physician",
-    "医生": "Doctor",
-    "博后": "Postdoctoral researcher",
-    "博士": "PhD",
-    "博士后": "Postdoctoral researcher",
-    "博士生": "PhD student",
-    "员工": "Employee",
-    "商务": "Business",
-    "営業": "Sales",
-    "学员": "Student",
-    "学士": "Bachelor's degree holder",
-    "学生": "Student",
-    "學生": "Student",
-    "实习生": "Intern",
-    "实验员": "Laboratory technician",
-    "实验师": "Laboratory technologist",
-    "工程师": "Engineer",
-    "市场": "Marketing",
-    "干部": "Cadre",
-    "待业": "Unemployed",
-    "总监": "Director",
-    "总经理": "General manager",
-    "所长": "Director",
-    "技师": "Technician",
-    "技术": "Technology",
-    "技术员": "Technician",
-    "技术岗": "Technical post",
-    "技術員": "Technician",
-    "提取": "Extraction",
-    "教室": "Classroom",
-    "教师": "Teacher",
-    "教授": "Professor",
-    "本科生": "Undergraduate student",
-    "检测员": "Inspector",
-    "检验": "Testing",
-    "检验员": "Laboratory tester",
-    "检验师": "Laboratory technologist",
-    "检验科": "Laboratory department",
-    "法人": "Legal representative",
-    "测序": "Sequencing",
-    "研助": "Research assistant",
-    "研发": "Research and development",
-    "研发员": "R&D staff",
-    "研究员": "Researcher",
-    "研究員": "Researcher",
-    "研究生": "Graduate student",
-    "研究者": "Researcher",
-    "研究院": "Research institute",
-    "硕士生": "Master's student",
-    "社員": "Employee",
-    "科员": "Section staff",
-    "科学家": "Scientist",
-    "科研": "Scientific research",
-    "科研员": "Research staff",
-    "科长": "Section chief",
-    "管理员": "Administrator",
-    "系主任": "Department head",
-    "组长": "Team leader",
-    "经理": "Manager",
-    "老师": "Teacher",
-    "职工": "Employee",
-    "药剂师": "Pharmacist",
-    "董事长": "Chairman",
-    "行政": "Administration",
-    "讲师": "Lecturer",
-    "購物員": "Purchasing staff",
-    "購買": "Purchasing",
-    "醫檢師": "Medical laboratory scientist",
-    "采购": "Purchasing",
-    "采购员": "Purchasing staff",
-    "销售": "Sales",
-}
-
-abbreviation_map = {
-    "adiunct": "Adiunct professor",
-    "adiunkt": "Adiunct professor",
-    "adj. prof, pi": "Adiunct professor, principal investigator",
-    "avp": "Assistant vice president",
-    "bdm": "Business development manager",
-    "bio": "Biologist",
-    "cao": "Chief analytics officer",
-    "cbo": "Chief business officer",
-    "cco": "Chief commercial officer",
-    "cdo": "Chief data officer",
-    "ceo": "Chief executive officer",
-    "cfo": "Chief financial officer",
-    "cio": "Chief information officer",
-    "cls": "Clinical laboratory scientist",
-    "cma": "Certified management accountant",
-    "cmo": "Chief medical officer",
-    "coo": "Chief operating officer",
-    "cpo": "Chief product officer",
-    "crc": "Clinical research coordinator",
-    "cro": "Chief research officer",
-    "csm": "Customer success manager",
-    "cso": "Chief scientific officer",
-    "cta": "Clinical trial associate",
-    "cto": "Chief technical/technology officer",
-    "cts": "Clinical trial specialist",
-    "dev": "Developer",
-    "dir": "Director",
-    "doc": "Doctor",
-    "dr": "Doctor / Doctorate",
-    "dr.": "Doctor / Doctorate",
-    "dvm": "Doctor of veterinary medicine",
-    "eir": "Entrepreneur in residence",
-    "eng": "Engineer",
-    "gm": "General manager",
-    "gp": "General practitioner",
-    "ing": "Engineer",
-    "inv": "Investigator",
-    "it": "Information technology",
-    "lab": "Laboratory",
-    "m.d": "M.D",
-    "m.d.": "M.D",
-    "mai": "MAI",
-    "md": "MD",
-    "mgr": "Manager",
-    "mla": "Medical laboratory assistant",
-    "mls": "Medical laboratory scientist",
-    "mlt": "Medical laboratory technologist",
-    "msl": "Medical science liaison",
-    "ned": "Non-executive director",
-    "p i": "Principal investigator",
-    "pa": "Physician assistant",
-    "pdra": "Postdoctoral research associate",
-    "pdrf": "Postdoctoral research fellow",
-    "phd": "Doctor of philosophy",
-    "pi": "Primary investigator",
-    "pm": "Project manager",
-    "pmo": "Project management office",
-    "pr": "Professor",
-    "prof": "Professor",
-    "ps": "Project manager",
-    "qa": "QA / QC / QM",
-    "qc": "QA / QC / QM",
-    "qm": "QA / QC / QM",
-    "r&d": "Research and development",
-    "r&amp;d": "Research and development",
-    "ra": "Research assistant",
-    "ra1": "Research assistant 1",
-    "ra2": "Research assistant 2",
-    "rco": "Research contracts officer",
-    "res": "Researcher",
-    "rse": "Research software engineer",
-    "sci": "Scientist",
-    "sra": "Senior research associate",
-    "sro": "Senior research officer",
-    "sso": "Senior scientific officer",
-    "ste": "Senior test engineer",
-    "stu": "Student",
-    "svp": "Senior vice president",
-    "tam": "Technical account manager",
-    "tas": "Technical assistant",
-    "tea": "Teacher",
-    "tec": "Technician",
-    "tech": "Technician",
-    "tmm": "Technical marketing manager",
-    "tsm": "Technical support manager",
-    "tss": "Technical support specialist",
-    "vgm": "Vice general manager",
-    "vp": "Vice president",
-}
-
-misspelling_entries = [
-    ("Co-Ordinator", "Coordinator", "partial"),
-    ("Labtechician", "Laboratory Technician", "partial"),
-    ("Lanoratory ", "Laboratory ", "partial"),
-    ("Laobratory ", "Laboratory ", "partial"),
-    ("Laoratory ", "Laboratory ", "partial"),
-    ("Sientist", "Scientist", "partial"),
-    ("Lecteur", "Lecturer", "partial"),
-    ("Lector", "Lecturer", "partial"),
-    ("Lectrurer", "Lecturer", "partial"),
-    ("Lectuer", "Lecturer", "partial"),
-    ("Lecturar", "Lecturer", "partial"),
-    ("Lecture", "Lecturer", "partial"),
-    ("Life Science ", "Life Sciences ", "partial"),
-    ("Microbilogest", "Microbiologist", "full"),
-    ("Microbilogist", "Microbiologist", "full"),
-    ("Microbiolgist", "Microbiologist", "full"),
-    ("Microbiologa", "Microbiologist", "full"),
-    ("Microbiologia", "Microbiologist", "full"),
-    ("Microbiologiest", "Microbiologist", "full"),
-    ("Microbiologis", "Microbiologist", "full"),
-    ("Microbiologista", "Microbiologist", "full"),
-    ("Microbiologiste", "Microbiologist", "full"),
-    ("Microbiologo", "Microbiologist", "full"),
-    ("Moelcualr ", "Molecular ", "partial"),
-    ("Moelcular ", "Molecular ", "partial"),
-    ("MS Student", "M.Sc student", "partial"),
-    ("Reearch", "Research", "partial"),
-    ("STUDEND", "Student", "partial"),
-    ("Studennt", "Student", "partial"),
-    ("Studen ", "Student", "partial"),
-]
-
-abbreviation_entries = [
-    ("A. Prof", "Associate professor", "partial"),
-    ("A/Prof", "Associate professor", "partial"),
-    ("A Prof", "Associate professor", "partial"),
-    ("A Professor", "Associate professor", "partial"),
-    ("A.Professor", "Associate professor", "partial"),
-    ("A/Professor", "Associate professor", "partial"),
-    ("Prof ", "Professor ", "partial"),
-    ("Exec ", "Executive ", "partial"),
-    ("Exec.", "Executive ", "partial"),
-    ("A/Senior", "Acting Senior", "partial"),
-    ("Mfg", "Manufacturing", "partial"),
-    ("AAI", "Administrative Assistant I", "partial"),
-    ("AA I", "Administrative Assistant I", "partial"),
-    ("AAII", "Administrative Assistant II", "partial"),
-    ("AA II", "Administrative Assistant II", "partial"),
-    ("AAIII", "Administrative Assistant III", "partial"),
-    ("AA III", "Administrative Assistant III", "partial"),
-    ("Sr ", "Senior ", "partial"),
-    ("Sr.", "Senior ", "partial"),
-    ("Jr ", "Junior ", "partial"),
-    ("Jr.", "Junior ", "partial"),
-    ("LA", "Laboratory Assistant", "partial"),
-    ("Tech", "Technician", "partial"),
-    ("Lab Assist", "Laboratory Assistant", "partial"),
-    ("Lab Asst", "Laboratory Assistant", "partial"),
-    ("Lab ", "Laboratory ", "partial"),
-    ("Labtech", "Laboratory Technician", "partial"),
-    ("Labtechnician", "Laboratory Technician", "partial"),
-    ("Lab Coordinator", "Laboratory Coordinator", "partial"),
-    ("Lan Manager", "Laboratory Technician", "partial"),
-    ("Lan Technician", "Laboratory Technician", "partial"),
-    ("Life Sci Tech", "Life Sciences Technician", "partial"),
-    ("DEPT. MANAGER", "Department Manager", "partial"),
-    ("M.S.C ", "M.Sc", "partial"),
-    ("Master Course", "Masters Course", "partial"),
-    ("Master Degree", "Masters Degree", "partial"),
-    ("Master Student", "Masters Student", "partial"),
-    ("Mech Eng", "Mechanical Engineer", "partial"),
-    ("Medic Specialist", "Medical Specialist", "partial"),
-    ("GRA", "Graduate Research Assistant", "partial"),
-    ("Med Lab Tech", "Medical laboratory technician", "partial"),
-    ("MED TECH", "Medical technologist", "partial"),
-    ("Med. Biologas", "Medical biologist", "partial"),
-    ("Med. Tech. Assistant", "Medical technical assistant", "partial"),
-    ("Med. Technologist", "Medical technologist", "partial"),
-    ("Medecin Biologiste", "Medical biologist", "partial"),
-    ("Medical Labtech", "Medical laboratory technician", "partial"),
-    ("Mgr Inz", "Magister Inżynier", "full"),
-    ("Micro", "Microbiologist", "full"),
-    ("Micro Molecular", "Microbiology and molecular biology", "partial"),
-    ("Micro Tech", "Microbiology technician", "partial"),
-    ("Micro- And Molecular Biology", "Microbiology and molecular biology", "partial"),
-    ("Microbio ", "Microbiologist ", "partial"),
-    ("Microbiologis ", "Microbiologist ", "partial"),
-    ("Microbiologo Molecular", "Microbiology and molecular biology", "full"),
-    ("Mol. Lab. Coordinator", "Molecular laboratory coordinator", "full"),
-    ("MTA", "Medical technical assistant", "full"),
-    ("Next Generation Sequencing ", "NGS ", "partial"),
-    ("MSE Professor", "Professor of materials science and engineering", "full"),
-    ("MSTP Student", "Medical scientist training programme (MSTP) student", "full"),
-    ("MST Conservation Biology Instructor", "Math, science and technology conservation biology instructor", "full"),
-    ("MT", "Medical technologist", "full"),
-    ("MTL", "Medical technologist for laboratory analysis", "full"),
-    ("MTLA", "Medical-technical laboratory assistant", "full"),
-    ("P.H.D Student", "PhD Student", "partial"),
-    ("P.H.D. Candidate", "PhD Student", "partial"),
-    ("P.Hd Student", "PhD Student", "partial"),
-    ("P.Hd. Student", "PhD Student", "partial"),
-    ("P.I", "Principal investigator", "partial"),
-    ("P.I.", "Principal investigator", "partial"),
-    ("PI", "Principal investigator", "full"),
-    ("P&D Analyst ", "Population and development analyst", "full"),
-    ("P&D Coordinator ", "People and development coordinator", "full"),
-    ("PA/DA Division Of Genetics & Genomics", "Physician assistant, Division of Genetics & Genomics", "full"),
-    ("PAU Teacher", "Secondary School Teacher", "full"),
-    ("Payables Specialist", "Account Payables", "full"),
-    ("PAYMENT", "Account Payables", "full"),
-    ("PDF ", "Postdoctoral fellow ", "partial"),
-    ("PDRA", "Postdoctoral research associate", "partial"),
-    ("PDRO", "Postdoctoral research officer", "partial"),
-    ("Pg ", "Postgraduate", "partial"),
-    ("Pg-", "Postgraduate", "partial"),
-    ("Pgd", "PGD Scientist", "full"),
-    ("PGR", "Postgraduate Researcher", "full"),
-    ("Pgr Student", "Postgraduate Research Student", "full"),
-    ("Pgx ", "Pharmacogenomics ", "partial"),
-    ("Ph D", "PhD", "partial"),
-    ("Ph. D ", "PhD ", "partial"),
-    ("PH D-", "PhD ", "partial"),
-    ("Ph.D", "PhD", "partial"),
-    ("Phd- XL Cycle", "PhD student", "full"),
-    ("Phd, CRI Inserm", "PhD research student", "full"),
-    ("Phd, CSO", "Phd, Chief scientific officer", "full"),
-    ("Phdc", "PhD Candidate", "full"),
-]
 
 def _compile_partial_pattern(raw: str):
     trailing_space = raw.endswith(" ")
@@ -353,7 +84,15 @@ def _compile_partial_pattern(raw: str):
     return re.compile(pattern, re.IGNORECASE)
 
 
-def _prepare_rules(entries):
+def _is_word_char(ch: str) -> bool:
+    return ch.isalnum() or ch == "_"
+
+
+def _prepare_rules(entries, group, reuse=None):
+    """
+    Compile ``entries`` into rule dicts. ``reuse`` maps ``(name, replacement, full)`` to rules prepared
+    earlier, which are shared instead of compiled again.
+    """
     rules = []
     seen = set()
     for pattern, replacement, match_type in entries:
@@ -363,30 +102,520 @@ def _prepare_rules(entries):
         if key in seen:
             continue
         seen.add(key)
+        name = f"{group}:{pattern}"
+        if reuse is not None and (name, replacement, match_type == "full") in reuse:
+            rules.append(reuse[(name, replacement, match_type == "full")])
+            continue
         if match_type == "full":
-            rules.append({"full": True, "pattern": pattern.lower().strip(), "replacement": replacement})
-        else:
-            rules.append({"full": False, "pattern": _compile_partial_pattern(pattern), "replacement": replacement})
+            rules.append({"full": True, "name": name, "pattern": pattern.lower().strip(), "replacement": replacement})
+            continue
+        core = pattern.rstrip()
+        trailing_space = pattern.endswith(" ")
+        # The regex only matches where the lowercased core occurs, so an ASCII core doubles as a cheap gate.
+        literal = core.lower() if core.isascii() else None
+        match_text = core.lower() + (" " if trailing_space else "")
+        # Word-ness of the replaced span's edges decides whether neighbouring boundary checks can change.
+        first_stable = _is_word_char(core[0]) == _is_word_char(replacement[0])
+        last_stable = (not trailing_space and _is_word_char(core[-1])) == _is_word_char(replacement[-1])
+        rules.append(
+            {
+                "full": False,
+                "name": name,
+                "pattern": _compile_partial_pattern(pattern),
+                "replacement": replacement,
+                "literal": literal,
+                "match_text": match_text,
+                "boundary_stable": first_stable and last_stable,
+            }
+        )
     return rules
 
 
-misspelling_rules = _prepare_rules(misspelling_entries)
-abbreviation_rules = _prepare_rules(
-    [(k, v, "full") for k, v in abbreviation_map.items()] + abbreviation_entries
+def _overlaps(a: str, b: str) -> bool:
+    if a in b or b in a:
+        return True
+    for k in range(1, min(len(a), len(b))):
+        if a.endswith(b[:k]) or b.endswith(a[:k]):
+            return True
+    return False
+
+
+def _rules_commute(first, second) -> bool:
+    """Conservatively decide whether two partial rules give the same result in either order.
+
+    They must not compete for the same characters, neither may create or destroy a match of the
+    other, and neither may flip the word/non-word character at the edges of what it rewrites.
+    """
+    if first["full"] or second["full"]:
+        return False
+    if first["literal"] is None or second["literal"] is None:
+        return False
+    if not (first["boundary_stable"] and second["boundary_stable"]):
+        return False
+    for this, other in ((first, second), (second, first)):
+        if _overlaps(this["match_text"], other["match_text"]):
+            return False
+        if _overlaps(this["replacement"].lower(), other["match_text"]):
+            return False
+    return True
+
+
+def _order_by_hits(run, hit_counts):
+    """Move frequently hit rules ahead of colder ones, only across rules they commute with."""
+    ordered = list(run)
+    for i in range(1, len(ordered)):
+        j = i
+        while j > 0:
+            prev, cur = ordered[j - 1], ordered[j]
+            if hit_counts.get(cur["name"], 0) <= hit_counts.get(prev["name"], 0):
+                break
+            if not _rules_commute(prev, cur):
+                break
+            ordered[j - 1], ordered[j] = cur, prev
+            j -= 1
+    return ordered
+
+
+def build_rule_plan(rules, hit_counts=None, hot_ratio=0.5, total_titles=0):
+    """
+    Compile prepared rules into an execution plan with the same results as applying them in order.
+
+    Runs of consecutive full-match rules become a single dict lookup; partial rules are gated behind a
+    substring check of their literal. With ``hit_counts`` (rule name -> hits) from earlier jobs, partial
+    rules are reordered hottest-first where that is provably safe, and rules that fire on at least
+    ``hot_ratio`` of ``total_titles`` skip the gate because it would almost always pass.
+    """
+    plan = []
+    full_run = {}
+    partial_run = []
+
+    def flush_full():
+        if full_run:
+            plan.append(("full", dict(full_run)))
+            full_run.clear()
+
+    def flush_partial():
+        if not partial_run:
+            return
+        ordered = _order_by_hits(partial_run, hit_counts) if hit_counts else list(partial_run)
+        for rule in ordered:
+            gate = rule["literal"]
+            if hit_counts and total_titles and hit_counts.get(rule["name"], 0) >= hot_ratio * total_titles:
+                gate = None
+            plan.append(("partial", rule, gate))
+        partial_run.clear()
+
+    for position, rule in enumerate(rules):
+        if rule["full"]:
+            flush_partial()
+            full_run.setdefault(rule["pattern"], []).append((position, rule))
+        else:
+            flush_full()
+            partial_run.append(rule)
+    flush_full()
+    flush_partial()
+    return tuple(plan)
+
+
+def load_ruleset(path) -> dict:
+    """Read a ruleset data file into plain tables (lists of entries become tuples)."""
+    tables = json.loads(Path(path).read_text(encoding="utf-8"))
+    for key in ("misspelling_entries", "abbreviation_entries"):
+        tables[key] = [tuple(entry) for entry in tables.get(key, [])]
+    return tables
+
+
+def apply_overlay(tables: dict, overlay: dict) -> dict:
+    """
+    Layer a rule profile over base tables and return the merged tables. In ``overlay``, map tables
+    (``translation_map``, ``abbreviation_map``, ``ordinal_suffixes``) set keys, or delete them with null;
+    set tables (``junk_values``, ``preserve_caps``, ``lower_middle_words``) take ``{"add": [...], "remove": [...]}``;
+    entry lists replace the base entry with the same pattern (case-insensitive) and match type in place,
+    append new ones, and remove an entry whose replacement is null. ``fuzzy`` settings are replaced, except
+    ``vocabulary`` and ``protected_words``, which take add/remove lists like the set tables; ``limits``
+    settings are replaced.
+    """
+    merged = dict(tables)
+    for key in ("translation_map", "abbreviation_map", "ordinal_suffixes"):
+        if key in overlay:
+            table = dict(tables[key])
+            for name, value in overlay[key].items():
+                if value is None:
+                    table.pop(name, None)
+                else:
+                    table[name] = value
+            merged[key] = table
+    for key in ("junk_values", "preserve_caps", "lower_middle_words"):
+        if key in overlay:
+            change = overlay[key]
+            merged[key] = sorted((set(tables[key]) - set(change.get("remove", ()))) | set(change.get("add", ())))
+    if "fuzzy" in overlay:
+        fuzzy = dict(tables.get("fuzzy") or {})
+        for name, value in overlay["fuzzy"].items():
+            if name in ("vocabulary", "protected_words"):
+                current = set(fuzzy.get(name, ()))
+                fuzzy[name] = sorted((current - set(value.get("remove", ()))) | set(value.get("add", ())))
+            else:
+                fuzzy[name] = value
+        merged["fuzzy"] = fuzzy
+    if "limits" in overlay:
+        merged["limits"] = {**(tables.get("limits") or {}), **overlay["limits"]}
+    for key in ("misspelling_entries", "abbreviation_entries"):
+        if key in overlay:
+            entries = list(tables[key])
+            positions = {(pattern.lower(), match_type): idx for idx, (pattern, _, match_type) in enumerate(entries)}
+            for pattern, replacement, match_type in overlay[key]:
+                idx = positions.get((pattern.lower(), match_type))
+                if idx is None:
+                    positions[(pattern.lower(), match_type)] = len(entries)
+                    entries.append((pattern, replacement, match_type))
+                else:
+                    entries[idx] = (pattern, replacement, match_type)
+            # _prepare_rules skips entries without a replacement, so null removes; drop them here for a clean hash.
+            merged[key] = [entry for entry in entries if entry[1] is not None]
+    return merged
+
+
+def ruleset_hash(tables: dict) -> str:
+    """Short hash of the rule tables and pipeline version; cached results are only valid for the same value."""
+    payload = json.dumps(
+        {
+            "pipeline": PIPELINE_VERSION,
+            "junk_values": sorted(tables["junk_values"]),
+            "preserve_caps": sorted(tables["preserve_caps"]),
+            "lower_middle_words": sorted(tables["lower_middle_words"]),
+            "ordinal_suffixes": tables["ordinal_suffixes"],
+            "translation_map": tables["translation_map"],
+            "abbreviation_map": tables["abbreviation_map"],
+            "misspelling_entries": tables["misspelling_entries"],
+            "abbreviation_entries": tables["abbreviation_entries"],
+            # Only hashed when present, so rulesets without fuzzy correction keep their version.
+            **({"fuzzy": tables["fuzzy"]} if tables.get("fuzzy") else {}),
+            **({"limits": tables["limits"]} if tables.get("limits") else {}),
+        },
+        sort_keys=True,
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+_SHARED_TABLES = (
+    "junk_values",
+    "preserve_caps",
+    "lower_middle_words",
+    "ordinal_suffixes",
+    "translation_map",
+    "abbreviation_map",
+    "misspelling_entries",
+    "abbreviation_entries",
 )
 
-def _apply_rules(text, rules):
+
+class RuleEngine:
+    """
+    Compiled snapshot of a ruleset. The tables and plans are never mutated after construction, so an
+    engine can be swapped in with one assignment while in-flight calls keep using the one they started with.
+    Only ``canonical_titles`` grows, with titles verified to be their own cleaned form under these rules, and
+    the fuzzy corrector's lookup memo; both take one idempotent entry at a time, which is safe with or without
+    the GIL. Threads cleaning in parallel only read them and ``learn`` their ``CleaningScratch`` afterwards.
+    """
+
+    def __init__(self, tables: dict, reuse=None, fuzzy=None):
+        self.name = tables.get("name", "")
+        self.label = tables.get("version", "")
+        self.profile = tables.get("profile", "")
+        self.version = ruleset_hash(tables)
+        self.junk_values = frozenset(tables["junk_values"])
+        self.preserve_caps = frozenset(tables["preserve_caps"])
+        self.lower_middle_words = frozenset(tables["lower_middle_words"])
+        self.ordinal_suffixes = dict(tables["ordinal_suffixes"])
+        self.translation_map = dict(tables["translation_map"])
+        self.translation_trie = TranslationTrie(self.translation_map, remove_diacritics)
+        self.abbreviation_map = dict(tables["abbreviation_map"])
+        self.misspelling_entries = tuple(tuple(entry) for entry in tables["misspelling_entries"])
+        self.abbreviation_entries = tuple(tuple(entry) for entry in tables["abbreviation_entries"])
+        self.misspelling_rules = _prepare_rules(self.misspelling_entries, "misspelling", reuse)
+        self.abbreviation_rules = _prepare_rules(
+            [(k, v, "full") for k, v in self.abbreviation_map.items()] + list(self.abbreviation_entries),
+            "abbreviation",
+            reuse,
+        )
+        self.misspelling_plan = build_rule_plan(self.misspelling_rules)
+        self.abbreviation_plan = build_rule_plan(self.abbreviation_rules)
+        self.fuzzy_config = dict(tables.get("fuzzy") or {})
+        # Opt-in: a ruleset or profile turns fuzzy correction on with ``"enabled": true``.
+        self.fuzzy = fuzzy or FuzzyCorrector(
+            self.fuzzy_config.get("vocabulary", ()),
+            max_distance=self.fuzzy_config.get("max_distance", 1) if self.fuzzy_config.get("enabled") else 0,
+            min_word_length=self.fuzzy_config.get("min_word_length", 5),
+            protected_words=self.fuzzy_config.get("protected_words", ()),
+            dictionary_path=DICTIONARY_PATH,
+        )
+        self.limits = dict(tables.get("limits") or {})
+        self.max_title_length = int(self.limits.get("max_title_length", DEFAULT_LIMITS["max_title_length"]))
+        self.oversize_policy = self.limits.get("oversize_policy", DEFAULT_LIMITS["oversize_policy"])
+        if self.oversize_policy not in OVERSIZE_POLICIES:
+            raise ValueError(f"Unknown oversize_policy {self.oversize_policy!r}; expected one of {OVERSIZE_POLICIES}")
+        self.canonical_titles = set()
+
+    def rule_names(self):
+        return [rule["name"] for rule in self.misspelling_rules + self.abbreviation_rules]
+
+    def learn(self, scratch) -> None:
+        """Keep the canonical titles and fuzzy lookups a worker collected in ``scratch``."""
+        room = CANONICAL_TITLES_LIMIT - len(self.canonical_titles)
+        if room > 0:
+            self.canonical_titles.update(islice(scratch.canonical_titles, room))
+        self.fuzzy.merge_memo(scratch.fuzzy_memo)
+
+    def tables(self) -> dict:
+        """The ruleset in its data-file layout; ``ruleset_hash(engine.tables()) == engine.version``."""
+        return {
+            "name": self.name,
+            "version": self.label,
+            "junk_values": sorted(self.junk_values),
+            "preserve_caps": sorted(self.preserve_caps),
+            "lower_middle_words": sorted(self.lower_middle_words),
+            "ordinal_suffixes": dict(self.ordinal_suffixes),
+            "translation_map": dict(self.translation_map),
+            "abbreviation_map": dict(self.abbreviation_map),
+            "misspelling_entries": [list(entry) for entry in self.misspelling_entries],
+            "abbreviation_entries": [list(entry) for entry in self.abbreviation_entries],
+            **({"fuzzy": dict(self.fuzzy_config)} if self.fuzzy_config else {}),
+            **({"limits": dict(self.limits)} if self.limits else {}),
+        }
+
+    def with_profile(self, name: str, overlay: dict):
+        """
+        Engine for rule profile ``name``: ``overlay`` layered over this engine's tables. Unchanged tables and
+        compiled rules are shared with this engine; only the plans and canonical titles are the profile's own.
+        """
+        tables = apply_overlay(self.tables(), overlay)
+        tables["profile"] = name
+        return self.derive(tables)
+
+    def derive(self, tables: dict):
+        """
+        Engine for ``tables`` that shares this engine's unchanged tables, compiled rules and (with the same fuzzy
+        settings) fuzzy corrector, e.g. a candidate ruleset next to the one in production.
+        """
+        reuse = {
+            (rule["name"], rule["replacement"], rule["full"]): rule
+            for rule in self.misspelling_rules + self.abbreviation_rules
+        }
+        fuzzy = self.fuzzy if (tables.get("fuzzy") or {}) == self.fuzzy_config else None
+        engine = RuleEngine(tables, reuse, fuzzy)
+        for attr in _SHARED_TABLES:
+            if getattr(engine, attr) == getattr(self, attr):
+                setattr(engine, attr, getattr(self, attr))
+        if engine.translation_map is self.translation_map:
+            engine.translation_trie = self.translation_trie
+        return engine
+
+    def with_rule_frequencies(self, hit_counts, total_titles=0, hot_ratio=0.5):
+        """Copy of this engine whose plans are ordered and gated by ``hit_counts`` (``None`` = declared order)."""
+        engine = object.__new__(RuleEngine)
+        engine.__dict__.update(self.__dict__)
+        engine.misspelling_plan = build_rule_plan(self.misspelling_rules, hit_counts, hot_ratio, total_titles)
+        engine.abbreviation_plan = build_rule_plan(self.abbreviation_rules, hit_counts, hot_ratio, total_titles)
+        return engine
+
+
+def compile_ruleset(path, snapshot_dir=None) -> RuleEngine:
+    """
+    Load the ruleset at ``path`` as a compiled engine, reusing a pickled snapshot keyed by the ruleset hash
+    when one exists so that only the first process to see a new ruleset pays for compiling it.
+    """
+    tables = load_ruleset(path)
+    snapshot_dir = Path(snapshot_dir) if snapshot_dir is not None else RULES_SNAPSHOT_DIR
+    snapshot_path = snapshot_dir / f"{ruleset_hash(tables)}-{SNAPSHOT_FORMAT}.pickle"
+    try:
+        with snapshot_path.open("rb") as f:
+            engine = pickle.load(f)
+        if isinstance(engine, RuleEngine):
+            return engine
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+        pass
+
+    engine = RuleEngine(tables)
+    engine.canonical_titles.update(_seed_canonical_titles(engine))
+    try:
+        snapshot_dir.mkdir(parents=True, exist_ok=True)
+        tmp_path = snapshot_path.with_name(f"{snapshot_path.name}.{os.getpid()}.tmp")
+        with tmp_path.open("wb") as f:
+            pickle.dump(engine, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, snapshot_path)
+    except OSError:
+        pass  # Read-only deployments still work; they just compile at startup.
+    return engine
+
+
+_base_engine = None
+_active_engine = None
+_rules_path = RULES_PATH
+_rules_stamp = None
+_rule_frequencies = None
+_profile_engines = {}
+_reload_lock = threading.Lock()
+
+
+def active_engine() -> RuleEngine:
+    return _active_engine
+
+
+def _with_frequencies(engine: RuleEngine) -> RuleEngine:
+    if _rule_frequencies is None:
+        return engine
+    return engine.with_rule_frequencies(*_rule_frequencies)
+
+
+def _activate(engine: RuleEngine) -> None:
+    global _base_engine, _active_engine
+    _base_engine = engine
+    _active_engine = _with_frequencies(engine)
+
+
+def profile_names():
+    """Names of the rule profiles available under ``RULES_PROFILES_DIR``."""
+    if not RULES_PROFILES_DIR.is_dir():
+        return []
+    return sorted(path.stem for path in RULES_PROFILES_DIR.glob("*.json") if profile_name_pattern.match(path.stem))
+
+
+def profile_engine(name=None) -> RuleEngine:
+    """
+    Engine for rule profile ``name`` (falsy: the base ruleset). Profiles are built on first use and kept until
+    their file or the base ruleset changes, so switching between them per call is a dictionary lookup.
+    Raises KeyError for unknown profiles.
+    """
+    base = _active_engine
+    if not name:
+        return base
+    if not profile_name_pattern.match(name):
+        raise KeyError(name)
+    path = RULES_PROFILES_DIR / f"{name}.json"
+    try:
+        stat = path.stat()
+    except OSError:
+        raise KeyError(name) from None
+    stamp = (base, stat.st_mtime_ns, stat.st_size)
+    cached = _profile_engines.get(name)
+    if cached is not None and cached[0] == stamp:
+        return cached[1]
+    with _reload_lock:
+        overlay = json.loads(path.read_text(encoding="utf-8"))
+        engine = _base_engine.with_profile(name, overlay)
+        engine.canonical_titles.update(_seed_canonical_titles(engine))
+        engine = _with_frequencies(engine)
+        _profile_engines[name] = (stamp, engine)
+    return engine
+
+
+def reload_rules(path=None, force=False) -> bool:
+    """
+    Swap in the ruleset at ``path`` (default: the current rules file) if it changed since it was loaded.
+    Returns True when a different ruleset version became active. Invalid files raise and leave the
+    current engine in place.
+    """
+    global _rules_path, _rules_stamp
+    target = Path(path) if path is not None else _rules_path
+    stat = target.stat()
+    stamp = (str(target), stat.st_mtime_ns, stat.st_size)
+    if stamp == _rules_stamp and not force:
+        return False
+    with _reload_lock:
+        if stamp == _rules_stamp and not force:
+            return False
+        engine = compile_ruleset(target)
+        previous = _active_engine
+        _activate(engine)
+        _rules_path, _rules_stamp = target, stamp
+        return previous is None or previous.version != engine.version
+
+
+def ruleset_version() -> str:
+    """Hash of the active ruleset; cached and deduplicated results are only valid for the same value."""
+    return _active_engine.version
+
+
+def rule_names():
+    """Names of every active rule, in declaration order (used by hit-rate reports)."""
+    return _active_engine.rule_names()
+
+
+def use_rule_frequencies(hit_counts, total_titles=0, hot_ratio=0.5):
+    """Order and gate the active plans (and those of reloaded rulesets) by historical hit counts; ``None`` resets."""
+    global _rule_frequencies
+    with _reload_lock:
+        _rule_frequencies = None if hit_counts is None else (hit_counts, total_titles, hot_ratio)
+        _activate(_base_engine)
+
+
+def load_rule_hits(paths):
+    """Sum per-job rule hit files (``{"total_titles": n, "hits": {...}}``) into one ``(hits, total)`` pair."""
+    totals = {}
+    total_titles = 0
+    for path in paths:
+        try:
+            payload = json.loads(Path(path).read_text())
+        except (OSError, ValueError):
+            continue
+        total_titles += payload.get("total_titles", 0)
+        for name, count in payload.get("hits", {}).items():
+            totals[name] = totals.get(name, 0) + count
+    return totals, total_titles
+
+
+def rule_hit_report(hit_counts, total_titles, top=20):
+    """Split active rules into the hottest ``top`` (with hit rates) and those that never fired."""
+    names = rule_names()
+    fired = sorted((n for n in names if hit_counts.get(n)), key=lambda n: -hit_counts[n])
+    hot = [
+        {"rule": n, "hits": hit_counts[n], "rate": (hit_counts[n] / total_titles) if total_titles else 0.0}
+        for n in fired[:top]
+    ]
+    never = [n for n in names if not hit_counts.get(n)]
+    return {"total_titles": total_titles, "rules": len(names), "hot": hot, "never_fired": never}
+
+
+def _apply_rules(text, plan, hits=None, trace=None):
     updated = text
-    for rule in rules:
-        if rule["full"]:
-            if updated.lower() == rule["pattern"]:
+    lowered = updated.lower()
+    gated = updated.isascii()
+    for step in plan:
+        if step[0] == "full":
+            position = -1
+            while True:
+                for idx, rule in step[1].get(lowered, ()):
+                    if idx > position:
+                        break
+                else:
+                    break
+                position = idx
+                if trace is not None:
+                    trace.append({"stage": rule["name"], "before": updated, "after": rule["replacement"]})
                 updated = rule["replacement"]
-        else:
-            updated = rule["pattern"].sub(rule["replacement"], updated)
+                lowered = updated.lower()
+                gated = updated.isascii()
+                if hits is not None:
+                    hits[rule["name"]] = hits.get(rule["name"], 0) + 1
+            continue
+        _, rule, gate = step
+        if gate is not None and gated and gate not in lowered:
+            continue
+        replaced, count = rule["pattern"].subn(rule["replacement"], updated)
+        if count:
+            if trace is not None:
+                trace.append({"stage": rule["name"], "before": updated, "after": replaced})
+            updated = replaced
+            lowered = updated.lower()
+            gated = updated.isascii()
+            if hits is not None:
+                hits[rule["name"]] = hits.get(rule["name"], 0) + count
     return updated
 
 
-def _normalise_ordinals(text: str) -> str:
+def _normalise_ordinals(text: str, ordinal_suffixes: dict) -> str:
     def repl(m):
         number = m.group(1)
         tail = number[-2:] if len(number) > 1 else number[-1]
@@ -395,7 +624,7 @@ def _normalise_ordinals(text: str) -> str:
             base_suffix = "th"
         return f"{number}{base_suffix}"
 
-    return re.sub(r'\b(\d+)(st|nd|rd|th)\b', repl, text, flags=re.IGNORECASE)
+    return ordinal_pattern.sub(repl, text)
 
 def remove_diacritics(s):
     n = unicodedata.normalize('NFD', s)
@@ -414,50 +643,152 @@ def strip_edge_punctuation(t):
     if left or right:
         return t.strip(' \t\n\r"\'`“”‘’.,;:!?-')
     # No brackets, fall back to generic trim.
-    t = re.sub(r'^[\s"\'`“”‘’.,;:!?()\[\]{}<>-]+', '', t)
-    t = re.sub(r'[\s"\'`“”‘’.,;:!?()\[\]{}<>-]+$', '', t)
+    t = leading_edge_pattern.sub('', t)
+    t = trailing_edge_pattern.sub('', t)
     return t
 
-def clean_job_title_with_reason(title):
+
+def truncate_title(t, limit):
+    """``t`` cut to at most ``limit`` characters, at the last space when that keeps at least half of them."""
+    if len(t) <= limit:
+        return t
+    cut = t.rfind(" ", 0, limit + 1)
+    return (t[:cut] if cut >= limit // 2 else t[:limit]).rstrip()
+
+def _edges_clean(t, chars) -> bool:
+    """True when neither end of ``t`` is whitespace or one of ``chars``, so an edge trim is a no-op."""
+    return not t or not (t[0] in chars or t[0].isspace() or t[-1] in chars or t[-1].isspace())
+
+def _replace_and(m):
+    return f"{m.group(1)} and {m.group(2)}"
+
+
+def _trace_step(trace, stage, before, after):
+    if before != after:
+        trace.append({"stage": stage, "before": before, "after": after})
+
+
+def clean_job_title_with_reason(title, rule_hits=None, trace=None, fast_path=True, engine=None, scratch=None):
+    """
+    Clean a single title and return ``(cleaned, reason)`` using ``engine`` (default: the active ruleset).
+    Pass a dict as ``rule_hits`` to have the number of times each rule fired added to it.
+    Pass a list as ``trace`` to have every transformation appended to it in order, as
+    ``{"stage", "before", "after"}`` dicts where ``stage`` names the pipeline stage or rule.
+    ``fast_path`` returns known canonical titles immediately and skips stages whose trigger
+    characters are absent; ``fast_path=False`` runs every stage (used for differential tests).
+    A ``CleaningScratch`` as ``scratch`` keeps what the call learns to the calling thread.
+    """
     if not isinstance(title, str):
         return None, "non_string"
+    if engine is None:
+        engine = _active_engine
+    if fast_path and rule_hits is None and trace is None:
+        if scratch is None:
+            if title in engine.canonical_titles:
+                return title, ""
+        elif title in scratch.known_canonical_titles or title in scratch.canonical_titles:
+            return title, ""
 
-    t = html.unescape(title.strip())
-    t = strip_edge_punctuation(t)
-    t = re.sub(r'^"(.*)"$', r'\1', t)
-    t = re.sub(r'^`+', '', t)
-    t = re.sub(r'"{2,}', '', t)
-    t = remove_diacritics(t)
-    t = email_pattern.sub('', t).strip()
+    # Checked before any regex runs, so oversized input costs one strip whatever it contains.
+    t = title.strip()
+    before = title
+    limit = engine.max_title_length
+    if limit and len(t) > limit:
+        if engine.oversize_policy == "reject":
+            if trace is not None:
+                _trace_step(trace, "too_long", title, None)
+            return None, "too_long"
+        before = t = truncate_title(t, limit)
+        if trace is not None:
+            _trace_step(trace, "truncate", title, t)
+    t = html.unescape(t)
+    if trace is not None:
+        _trace_step(trace, "html_unescape", before, t)
+    before = t
+    if not fast_path or not _edges_clean(t, EDGE_CHARS):
+        t = strip_edge_punctuation(t)
+    if trace is not None:
+        _trace_step(trace, "edge_punctuation", before, t)
+    before = t
+    if not fast_path or '"' in t or '`' in t:
+        t = enclosing_quotes_pattern.sub(r'\1', t)
+        t = leading_backticks_pattern.sub('', t)
+        t = repeated_quotes_pattern.sub('', t)
+    if trace is not None:
+        _trace_step(trace, "quotes", before, t)
+    before = t
+    if not fast_path or not t.isascii():
+        t = remove_diacritics(t)
+    if trace is not None:
+        _trace_step(trace, "diacritics", before, t)
+    before = t
+    if not fast_path or "@" in t:
+        t = email_pattern.sub('', t)
+    t = t.strip()
+    if trace is not None:
+        _trace_step(trace, "email", before, t)
     if not t:
         return None, "empty"
+    before = t
     t = t.replace("_", " ")
-    t = re.sub(r'^\s*other\s*-\s*', '', t, flags=re.IGNORECASE)
-    t = _apply_rules(t, misspelling_rules)
+    if trace is not None:
+        _trace_step(trace, "underscores", before, t)
+    before = t
+    if not fast_path or "-" in t:
+        t = other_prefix_pattern.sub('', t)
+    if trace is not None:
+        _trace_step(trace, "other_prefix", before, t)
+    t = _apply_rules(t, engine.misspelling_plan, rule_hits, trace)
 
-    translated = translation_map.get(t.lower())
+    translated = engine.translation_map.get(t.lower())
     if translated is not None:
+        if trace is not None:
+            _trace_step(trace, "translation", t, translated)
         t = translated
+    elif not t.isascii():
+        translated = engine.translation_trie.translate(t)
+        if translated is not None:
+            if trace is not None:
+                _trace_step(trace, "segmented_translation", t, translated)
+            t = translated
 
     # Preserve non-Latin content but flag it for downstream filtering.
-    if non_latin_pattern.search(t):
+    if not t.isascii():
         return t, "non_latin_preserved"
 
     if phone_pattern.fullmatch(t):
-        return None, "phone_like"
-    if t.isdigit():
-        return None, "numeric"
-    if punct_only_pattern.fullmatch(t):
-        return None, "punct_only"
-    if len(t) == 1:
-        return None, "too_short"
-    if t.lower() in junk_values:
-        return None, "junk_value"
+        reason = "phone_like"
+    elif t.isdigit():
+        reason = "numeric"
+    elif punct_only_pattern.fullmatch(t):
+        reason = "punct_only"
+    elif len(t) == 1:
+        reason = "too_short"
+    elif t.lower() in engine.junk_values:
+        reason = "junk_value"
+    else:
+        reason = None
+    if reason is not None:
+        if trace is not None:
+            _trace_step(trace, reason, t, None)
+        return None, reason
+
+    t = _apply_rules(t, engine.abbreviation_plan, rule_hits, trace)
 
-    t = _apply_rules(t, abbreviation_rules)
+    before = t
+    t = engine.fuzzy.correct(t, rule_hits, None if scratch is None else scratch.fuzzy_memo)
+    if trace is not None:
+        _trace_step(trace, "fuzzy_correction", before, t)
 
-    t = roman_pattern.sub(roman_to_upper, t)
+    before = t
+    if not fast_path or roman_hint_pattern.search(t):
+        t = roman_pattern.sub(roman_to_upper, t)
+    if trace is not None:
+        _trace_step(trace, "roman_numerals", before, t)
 
+    before = t
+    lower_middle_words = engine.lower_middle_words
+    preserve_caps = engine.preserve_caps
     words = t.split()
     final = []
     total = len(words)
@@ -477,66 +808,221 @@ def clean_job_title_with_reason(title):
             continue
         final.append(w.title())
     t = ' '.join(final)
-    t = _normalise_ordinals(t)
+    if trace is not None:
+        _trace_step(trace, "casing", before, t)
+    before = t
+    t = _normalise_ordinals(t, engine.ordinal_suffixes)
+    if trace is not None:
+        _trace_step(trace, "ordinals", before, t)
 
-    t = re.sub(r'\s*\|\s*', ', ', t)
-    t = re.sub(r'(\b\w{4,}\b)\s*/\s*(\b\w{4,}\b)', r'\1 / \2', t)
+    before = t
+    if not fast_path or "|" in t:
+        t = vertical_bar_pattern.sub(', ', t)
+    if trace is not None:
+        _trace_step(trace, "vertical_bars", before, t)
+    before = t
+    if not fast_path or "/" in t:
+        t = slash_pattern.sub(r'\1 / \2', t)
+    if trace is not None:
+        _trace_step(trace, "slash_spacing", before, t)
 
-    def replace_and(m):
-        return f"{m.group(1)} and {m.group(2)}"
-    t = re.sub(r'(\b\w+)\s+And\s+(\w+\b)', replace_and, t)
+    before = t
+    if not fast_path or "And" in t:
+        t = and_pattern.sub(_replace_and, t)
+    if trace is not None:
+        _trace_step(trace, "lowercase_and", before, t)
 
-    t = re.sub(r'\bPost Doc\b', 'Post Doc', t, flags=re.IGNORECASE)
+    before = t
+    if not fast_path or not t.isascii() or "doc" in t.lower():
+        t = post_doc_pattern.sub('Post Doc', t)
     # Final light trim of edge punctuation/spaces (do not alter bracket pairs already handled).
-    t = re.sub(r'^[\s"\'`“”‘’.,;:!?-]+', '', t)
-    t = re.sub(r'[\s"\'`“”‘’.,;:!?-]+$', '', t)
-    if t and high_noise_ratio(t):
+    if not fast_path or not _edges_clean(t, TRIM_CHARS):
+        t = leading_trim_pattern.sub('', t)
+        t = trailing_trim_pattern.sub('', t)
+    if trace is not None:
+        _trace_step(trace, "final_trim", before, t)
+    if t and (not fast_path or not t.replace(" ", "").isalpha()) and high_noise_ratio(t):
+        if trace is not None:
+            _trace_step(trace, "non_letter_ratio", t, None)
         return None, "non_letter_ratio"
+    if fast_path and t == title:
+        if scratch is not None:
+            scratch.canonical_titles.add(t)
+        elif len(engine.canonical_titles) < CANONICAL_TITLES_LIMIT:
+            engine.canonical_titles.add(t)
     return (t or None), ("" if t else "invalid_final")
 
 
+def _seed_canonical_titles(engine):
+    """Known canonical outputs: rule and translation targets that the full pipeline leaves unchanged."""
+    candidates = set(engine.translation_map.values()) | set(engine.abbreviation_map.values())
+    candidates.update(entry[1] for entry in engine.misspelling_entries + engine.abbreviation_entries)
+    seeded = set()
+    for candidate in candidates:
+        for variant in (candidate, candidate.strip().title()):
+            if clean_job_title_with_reason(variant, fast_path=False, engine=engine) == (variant, ""):
+                seeded.add(variant)
+    return seeded
+
+
+reload_rules()
+
+
 def clean_job_title(title):
     cleaned, _ = clean_job_title_with_reason(title)
     return cleaned
 
 
-def clean_csv_file(input_csv, output_csv):
+class CleaningScratch:
     """
-    Clean a CSV file and write output with index, original, cleaned, change flag, removed, and removed reason columns.
-    Returns (output_path, stats).
+    Per-thread state for cleaning in parallel. Workers share a frozen copy of the engine's canonical titles
+    (frozensets are read without locking on free-threaded builds) and keep the canonical titles and fuzzy
+    lookups they learn here until the engine ``learn``s them, so no shared structure is written meanwhile.
     """
-    input_path = Path(input_csv)
-    output_path = Path(output_csv)
 
-    df = pd.read_csv(input_path, dtype=str, keep_default_na=False)
+    def __init__(self, known_canonical_titles=frozenset()):
+        self.known_canonical_titles = known_canonical_titles
+        self.canonical_titles = set()
+        self.fuzzy_memo = {}
+
+
+def default_threads() -> int:
+    """Worker threads worth using: one per CPU on free-threaded builds, else 1 (the GIL runs one at a time)."""
+    gil_enabled = getattr(sys, "_is_gil_enabled", lambda: True)()
+    return 1 if gil_enabled else os.cpu_count() or 1
+
+
+def _clean_batch(titles, count_hits, include_trace, engine, scratch=None):
+    """``[(title, (cleaned, reason, hits, trace))]`` for ``titles``, as in ``_clean_distinct``."""
+    cleaned_titles = []
+    for title in titles:
+        hits = {} if count_hits else None
+        trace = [] if include_trace else None
+        cleaned, reason = clean_job_title_with_reason(title, hits, trace, engine=engine, scratch=scratch)
+        trace_json = None if trace is None else json.dumps(trace, ensure_ascii=False)
+        cleaned_titles.append((title, (cleaned, reason, hits, trace_json)))
+    return cleaned_titles
+
+
+def _clean_parallel(titles, count_hits, include_trace, engine, threads):
+    """``_clean_batch`` over ``threads`` contiguous slices of ``titles`` in a thread pool; results in input order."""
+    size = -(-len(titles) // threads)
+    slices = [titles[start : start + size] for start in range(0, len(titles), size)]
+    known = frozenset(engine.canonical_titles)
+    scratches = [CleaningScratch(known) for _ in slices]
+    with ThreadPoolExecutor(max_workers=len(slices), thread_name_prefix="clean") as pool:
+        futures = [
+            pool.submit(_clean_batch, part, count_hits, include_trace, engine, scratch)
+            for part, scratch in zip(slices, scratches)
+        ]
+        batches = [future.result() for future in futures]
+    for scratch in scratches:
+        engine.learn(scratch)
+    return [item for batch in batches for item in batch]
+
+
+def _clean_distinct(titles, rule_hits, include_trace, cache, engine, threads=1, on_cleaned=None):
+    """
+    Clean each distinct title once, on ``threads`` threads. Returns ``{title: (cleaned, reason, hits, trace)}``
+    where ``hits`` holds that title's own rule hits (only when counting) and ``trace`` its JSON trace (only when
+    tracing). ``on_cleaned`` is called with the titles served from ``cache`` and then with each batch of up to
+    ``PROGRESS_TITLES`` freshly cleaned titles.
+    """
+    results = {}
+    pending = titles
+    if cache is not None and not include_trace:
+        for title, (cleaned, reason, hits) in cache.get_many(titles).items():
+            results[title] = (cleaned, reason, hits, None)
+        pending = [title for title in titles if title not in results]
+
+    count_hits = rule_hits is not None or cache is not None
+    batch_size = PROGRESS_TITLES if on_cleaned is not None else max(len(pending), 1)
+    if on_cleaned is not None and results:
+        on_cleaned(list(results))
+    cleaned_titles = []
+    for start in range(0, len(pending), batch_size):
+        batch = pending[start : start + batch_size]
+        if threads > 1 and len(batch) > 1:
+            cleaned_titles += _clean_parallel(batch, count_hits, include_trace, engine, threads)
+        else:
+            cleaned_titles += _clean_batch(batch, count_hits, include_trace, engine)
+        if on_cleaned is not None:
+            on_cleaned(batch)
+    fresh = {}
+    for title, result in cleaned_titles:
+        results[title] = result
+        fresh[title] = result[:3]
+    if cache is not None and fresh:
+        cache.put_many(fresh)
+    return results, len(titles) - len(pending)
+
+
+def clean_job_titles(titles, threads=1, engine=None):
+    """
+    ``(cleaned, reason)`` for each of ``titles``, cleaning each distinct title once with ``engine`` (default: the
+    active ruleset) on ``threads`` threads. Results do not depend on the number of threads.
+    """
+    results = clean_distinct_titles(titles, threads=threads, engine=engine)
+    return [results[title][:2] for title in titles]
+
+
+def clean_distinct_titles(titles, count_rule_hits=False, cache=None, engine=None, threads=1) -> dict:
+    """
+    ``{title: (cleaned, reason, hits)}`` for the distinct ``titles``, like ``clean_job_titles``. ``hits`` holds
+    the title's own rule hits when counting (or with a ``title_cache.TitleCache`` as ``cache``), else None.
+    """
+    if engine is None:
+        engine = _active_engine
+    rule_hits = {} if count_rule_hits else None
+    results, _ = _clean_distinct(list(dict.fromkeys(titles)), rule_hits, False, cache, engine, threads)
+    return {title: result[:3] for title, result in results.items()}
+
+
+def read_titles(input_csv):
+    """Read an upload; returns the frame (title column renamed to ``Original Job Title``) and the stripped titles."""
+    import pandas as pd
+
+    df = pd.read_csv(Path(input_csv), dtype=str, keep_default_na=False)
     if df.empty:
         raise ValueError("Uploaded file is empty")
 
-    if "Original Job Title" in df.columns:
-        col_to_clean = "Original Job Title"
-    elif "Job Title" in df.columns:
-        df.rename(columns={"Job Title": "Original Job Title"}, inplace=True)
-        col_to_clean = "Original Job Title"
-    else:
-        first_col = df.columns[0]
-        df.rename(columns={first_col: "Original Job Title"}, inplace=True)
-        col_to_clean = "Original Job Title"
-    stats = {"total_rows": 0, "good": 0, "cleaned": 0, "removed": 0}
+    if "Original Job Title" not in df.columns:
+        source = "Job Title" if "Job Title" in df.columns else df.columns[0]
+        df.rename(columns={source: "Original Job Title"}, inplace=True)
+    originals = ["" if not isinstance(val, str) else val.strip() for val in df["Original Job Title"]]
+    return df, originals
+
 
+def write_cleaned_csv(
+    df, originals, results, output_csv, include_trace=False, classifications=None, start=0, header=True
+) -> dict:
+    """
+    Write the cleaned CSV for ``originals`` from per-title ``results`` (as returned by ``_clean_distinct``) and
+    return the row stats. ``classifications`` (``{title: (function, seniority)}``) adds ``Function`` and
+    ``Seniority`` columns. To write a file in chunks, pass an open text file as ``output_csv``, each chunk's
+    first row number as ``start`` and ``header=False`` after the first chunk.
+    """
+    import pandas as pd
+
+    stats = {"total_rows": 0, "good": 0, "cleaned": 0, "removed": 0, "removed_reasons": {}}
     cleaned_series = []
     changed_flags = []
     removed_values = []
     removed_reasons = []
-    for val in df[col_to_clean]:
+    traces = [] if include_trace else None
+    for original in originals:
         stats["total_rows"] += 1
-        original = "" if not isinstance(val, str) else val.strip()
-        cleaned, removed_reason = clean_job_title_with_reason(original)
+        cleaned, removed_reason, _, trace = results[original]
+        if traces is not None:
+            traces.append(trace)
         if cleaned is None or cleaned == "":
             stats["removed"] += 1
+            reason = removed_reason or "removed"
+            stats["removed_reasons"][reason] = stats["removed_reasons"].get(reason, 0) + 1
             cleaned_series.append("")
             changed_flags.append(True)
             removed_values.append(original)
-            removed_reasons.append(removed_reason or "removed")
+            removed_reasons.append(reason)
         elif removed_reason == "non_latin_preserved":
             stats["good"] += 1
             cleaned_series.append(cleaned)
@@ -558,8 +1044,8 @@ def clean_csv_file(input_csv, output_csv):
 
     output_df = pd.DataFrame(
         {
-            "Index": range(1, len(df) + 1),
-            "Original Job Title": df[col_to_clean],
+            "Index": range(start + 1, start + len(df) + 1),
+            "Original Job Title": df["Original Job Title"],
             "Cleaned Job Title": cleaned_series,
             "Has Changed": changed_flags,
             "Removed": removed_values,
@@ -570,18 +1056,402 @@ def clean_csv_file(input_csv, output_csv):
     output_df["Cleaned Job Title"] = output_df["Cleaned Job Title"].fillna("")
     output_df["Removed"] = output_df["Removed"].fillna("")
     output_df["Removed Reason"] = output_df["Removed Reason"].fillna("")
+    columns = ["Index", "Original Job Title", "Cleaned Job Title", "Has Changed", "Removed", "Removed Reason"]
+    if classifications is not None:
+        output_df["Function"] = [classifications[original][0] for original in originals]
+        output_df["Seniority"] = [classifications[original][1] for original in originals]
+        columns += ["Function", "Seniority"]
+    if traces is not None:
+        output_df["Trace"] = traces
+        columns.append("Trace")
     output_df.to_csv(
-        output_path,
+        output_csv,
         index=False,
+        header=header,
         encoding="utf-8-sig",  # BOM for better Excel compatibility
-        columns=["Index", "Original Job Title", "Cleaned Job Title", "Has Changed", "Removed", "Removed Reason"],
+        columns=columns,
     )
+    return stats
+
+
+def write_mapping_csv(
+    df, originals, results, output_csv, include_trace=False, classifications=None, row_ids_csv=None
+) -> dict:
+    """
+    Write a lookup table with one row per distinct raw title (as it appears in the upload) from per-title
+    ``results``: ``Mapping Id`` (from 1, in order of first appearance), ``Original Job Title``, ``Cleaned Job
+    Title``, ``Has Changed``, ``Removed Reason`` and ``Occurrences``, plus ``Function``/``Seniority`` and
+    ``Trace`` like ``write_cleaned_csv``. With ``row_ids_csv`` each input row's ``Mapping Id`` is written
+    there too, by ``Index``. Both files are replaced atomically. Returns the row stats, as ``write_cleaned_csv``
+    does, plus ``mapping_rows``.
+    """
+    mapping_ids = {}
+    entries = []
+    row_ids = [] if row_ids_csv is not None else None
+    for raw, original in zip(df["Original Job Title"], originals):
+        mapping_id = mapping_ids.get(raw)
+        if mapping_id is None:
+            mapping_id = mapping_ids[raw] = len(entries) + 1
+            entries.append([raw, original, 0])
+        entries[mapping_id - 1][2] += 1
+        if row_ids is not None:
+            row_ids.append(mapping_id)
+
+    stats = {"total_rows": len(originals), "good": 0, "cleaned": 0, "removed": 0, "removed_reasons": {}}
+    header = ["Mapping Id", "Original Job Title", "Cleaned Job Title", "Has Changed", "Removed Reason", "Occurrences"]
+    if classifications is not None:
+        header += ["Function", "Seniority"]
+    if include_trace:
+        header.append("Trace")
+    output_path = Path(output_csv)
+    tmp_path = output_path.with_name(f"{output_path.name}.{os.getpid()}.tmp")
+    with tmp_path.open("w", newline="", encoding="utf-8-sig") as f:
+        writer = csv.writer(f, lineterminator="\n")
+        writer.writerow(header)
+        for mapping_id, (raw, original, rows) in enumerate(entries, 1):
+            cleaned, removed_reason, _, trace = results[original]
+            # Outcomes as in write_cleaned_csv, each counted once per row holding the title.
+            if not cleaned:
+                reason = removed_reason or "removed"
+                stats["removed"] += rows
+                stats["removed_reasons"][reason] = stats["removed_reasons"].get(reason, 0) + rows
+                row = [mapping_id, raw, "", True, reason, rows]
+            elif removed_reason == "non_latin_preserved":
+                stats["good"] += rows
+                row = [mapping_id, raw, cleaned, False, removed_reason, rows]
+            elif cleaned == original:
+                stats["good"] += rows
+                row = [mapping_id, raw, cleaned, False, "", rows]
+            else:
+                stats["cleaned"] += rows
+                row = [mapping_id, raw, cleaned, True, "", rows]
+            if classifications is not None:
+                row += classifications[original]
+            if include_trace:
+                row.append(trace)
+            writer.writerow(row)
+    if row_ids is not None:
+        row_ids_path = Path(row_ids_csv)
+        row_ids_tmp = row_ids_path.with_name(f"{row_ids_path.name}.{os.getpid()}.tmp")
+        with row_ids_tmp.open("w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f, lineterminator="\n")
+            writer.writerow(["Index", "Mapping Id"])
+            writer.writerows(enumerate(row_ids, 1))
+        os.replace(row_ids_tmp, row_ids_path)
+    os.replace(tmp_path, output_path)
+    stats["mapping_rows"] = len(entries)
+    return stats
+
+
+def clean_csv_file(
+    input_csv,
+    output_csv,
+    count_rule_hits=False,
+    include_trace=False,
+    cache=None,
+    engine=None,
+    taxonomy=None,
+    checkpoint=False,
+    chunk_rows=CHECKPOINT_ROWS,
+    progress=None,
+    threads=1,
+    row_offset=0,
+    analytics_state=False,
+    output_format="rows",
+    row_ids_csv=None,
+):
+    """
+    Clean a CSV file and write output with index, original, cleaned, change flag, removed, and removed reason columns.
+    Returns (output_path, stats). With ``count_rule_hits`` the stats include ``rule_hits`` (rule name -> hits)
+    and ``title_rule_hits`` (distinct title -> its own hits, only for titles where a rule fired).
+    With ``include_trace`` a ``Trace`` column holds each row's transformations as a JSON list.
+    The stats also carry exact ``analytics`` (top titles, distinct counts, outcomes, lengths).
+    Each distinct title is cleaned once; pass a ``title_cache.TitleCache`` as ``cache`` to reuse results across
+    jobs (the stats then include ``cache_hits`` and ``cache_misses`` counted per distinct title).
+    The whole file is cleaned with one ``engine`` (default: the ruleset active when the call starts).
+    With a ``classification.Taxonomy`` as ``taxonomy``, ``Function`` and ``Seniority`` columns classify each
+    cleaned title (once per distinct title).
+    With ``checkpoint`` the file is cleaned and written ``chunk_rows`` rows at a time with a durable progress
+    marker next to the output (see ``checkpoint.py``); calling again with the same arguments after the process
+    died continues from the last committed chunk and writes the same bytes as an uninterrupted run. Raises
+    ``checkpoint.CheckpointBusy`` while another worker is cleaning to the same output.
+    ``progress`` (e.g. a ``progress.ProgressReporter``) is called as ``progress(rows_done, total_rows, stats)``
+    when cleaning starts, after every ``PROGRESS_TITLES`` distinct titles (counting the rows holding them) and
+    after every chunk; ``stats`` are those of the rows written so far.
+    With ``threads`` > 1 distinct titles are cleaned on that many threads (see ``default_threads``); the output
+    is the same as with one.
+    ``row_offset`` numbers the output rows from ``row_offset + 1``, e.g. a shard's place in a larger file
+    (see ``sharding.py``). With ``analytics_state`` the stats also hold ``analytics_state``, a fixed-size,
+    mergeable sketch of ``analytics`` (``job_analytics.AnalyticsSketch.to_dict``).
+    With ``output_format="mapping"`` the output is a lookup table of the distinct raw titles instead (see
+    ``write_mapping_csv``, which also writes ``row_ids_csv`` when given); it is written in one go, so it cannot
+    be combined with ``checkpoint`` or ``row_offset``. Raises ValueError for an unknown format, and for
+    ``row_ids_csv`` without mapping output.
+    """
+    if output_format not in OUTPUT_FORMATS:
+        raise ValueError(f"Unknown output format: {output_format}")
+    if output_format == "mapping" and (checkpoint or row_offset):
+        raise ValueError("Mapping output is written in one go and cannot be checkpointed or offset")
+    if output_format == "rows" and row_ids_csv is not None:
+        raise ValueError("Row ids are only written with mapping output")
+    if engine is None:
+        engine = _active_engine
+    output_path = Path(output_csv)
+    df, originals = read_titles(input_csv)
+
+    occurrences = {}
+    for original in originals:
+        occurrences[original] = occurrences.get(original, 0) + 1
+    rule_hits = {} if count_rule_hits else None
+    if checkpoint:
+        key = {
+            "input_sha256": file_sha256(input_csv),
+            "ruleset_version": engine.version,
+            "rule_hits": count_rule_hits,
+            "trace": include_trace,
+            "taxonomy_version": taxonomy.version if taxonomy is not None else None,
+        }
+        if row_offset:
+            key["row_offset"] = row_offset
+        results, classifications, stats, cache_hits = _clean_in_chunks(
+            df,
+            originals,
+            output_path,
+            key,
+            chunk_rows,
+            rule_hits,
+            include_trace,
+            cache,
+            engine,
+            taxonomy,
+            progress,
+            threads,
+            row_offset,
+        )
+    else:
+        on_cleaned = None
+        if progress is not None:
+            progress(0, len(originals), {})
+            on_cleaned = _row_progress(progress, occurrences, 0, len(originals), {})
+        results, cache_hits = _clean_distinct(
+            list(occurrences), rule_hits, include_trace, cache, engine, threads, on_cleaned
+        )
+        classifications = classify_results(results, taxonomy) if taxonomy is not None else None
+        if output_format == "mapping":
+            stats = write_mapping_csv(df, originals, results, output_path, include_trace, classifications, row_ids_csv)
+        else:
+            stats = write_cleaned_csv(df, originals, results, output_path, include_trace, classifications, row_offset)
+        if progress is not None:
+            progress(len(originals), len(originals), stats)
+    analytics = build_analytics(results, occurrences)
+    stats["analytics"] = analytics.summary()
+    if analytics_state:
+        stats["analytics_state"] = analytics.sketch().to_dict()
+    if rule_hits is not None:
+        stats["rule_hits"] = sum_rule_hits(results, occurrences)
+        stats["title_rule_hits"] = {title: hits for title, (_, _, hits, _) in results.items() if hits}
+    if cache is not None:
+        stats["cache_hits"] = cache_hits
+        stats["cache_misses"] = len(results) - cache_hits
     return output_path, stats
 
 
+def _clean_in_chunks(
+    df,
+    originals,
+    output_path,
+    key,
+    chunk_rows,
+    rule_hits,
+    include_trace,
+    cache,
+    engine,
+    taxonomy,
+    progress,
+    threads=1,
+    row_offset=0,
+):
+    """
+    Checkpointed body of ``clean_csv_file``. Returns the per-title results and classifications, the row stats
+    and the cache hits, restoring those of chunks committed by an earlier, interrupted run.
+    """
+    with Checkpoint(output_path, key) as checkpoint:
+        resumed = checkpoint.load()
+        results = {}
+        if resumed is None:
+            rows = 0
+            stats = {"total_rows": 0, "good": 0, "cleaned": 0, "removed": 0, "removed_reasons": {}}
+            cache_hits = 0
+        else:
+            rows = resumed["rows"]
+            stats = resumed["state"]["stats"]
+            cache_hits = resumed["state"]["cache_hits"]
+            for title, cleaned, reason, hits, trace in checkpoint.journal_entries():
+                results[title] = (cleaned, reason, hits, trace)
+        classifications = classify_results(results, taxonomy) if taxonomy is not None else None
+        if progress is not None:
+            progress(rows, len(originals), stats)
+
+        while rows < len(originals):
+            end = min(rows + chunk_rows, len(originals))
+            chunk = originals[rows:end]
+            pending = [title for title in dict.fromkeys(chunk) if title not in results]
+            on_cleaned = None
+            if progress is not None:
+                chunk_occurrences = {}
+                for title in chunk:
+                    chunk_occurrences[title] = chunk_occurrences.get(title, 0) + 1
+                # Rows of the chunk whose title was cleaned in an earlier chunk are done already.
+                done = rows + sum(count for title, count in chunk_occurrences.items() if title in results)
+                on_cleaned = _row_progress(progress, chunk_occurrences, done, len(originals), stats, end)
+            fresh, hits = _clean_distinct(pending, rule_hits, include_trace, cache, engine, threads, on_cleaned)
+            results.update(fresh)
+            cache_hits += hits
+            if classifications is not None:
+                classifications.update(classify_results(fresh, taxonomy))
+            chunk_stats = write_cleaned_csv(
+                df.iloc[rows:end],
+                chunk,
+                results,
+                checkpoint.output,
+                include_trace,
+                classifications,
+                row_offset + rows,
+                rows == 0,
+            )
+            for name in ("total_rows", "good", "cleaned", "removed"):
+                stats[name] += chunk_stats[name]
+            for reason, count in chunk_stats["removed_reasons"].items():
+                stats["removed_reasons"][reason] = stats["removed_reasons"].get(reason, 0) + count
+            checkpoint.record([title, *result] for title, result in fresh.items())
+            rows = end
+            checkpoint.commit(rows, {"stats": stats, "cache_hits": cache_hits})
+            if progress is not None:
+                progress(rows, len(originals), stats)
+        checkpoint.finish()
+    return results, classifications, stats, cache_hits
+
+
+def _row_progress(progress, occurrences, rows_done, total_rows, stats, until=None):
+    """
+    ``_clean_distinct`` callback reporting to ``progress`` the rows holding each batch of cleaned titles, counted
+    from ``rows_done``. Reports stop short of ``until`` (default ``total_rows``): the caller reports those rows
+    once they are written.
+    """
+    until = total_rows if until is None else until
+    done = rows_done
+
+    def on_cleaned(titles):
+        nonlocal done
+        done += sum(occurrences[title] for title in titles)
+        if done < until:
+            progress(done, total_rows, stats)
+
+    return on_cleaned
+
+
+def classify_results(results, taxonomy) -> dict:
+    """``{title: (function, seniority)}`` for per-title ``results``; removed titles get blank labels."""
+    return {title: taxonomy.classify(cleaned) for title, (cleaned, *_) in results.items()}
+
+
+def collect_analytics(results, occurrences) -> dict:
+    """Summary of the job analytics ``build_analytics`` gathers."""
+    return build_analytics(results, occurrences).summary()
+
+
+def build_analytics(results, occurrences) -> JobAnalytics:
+    """
+    Job analytics (``job_analytics.JobAnalytics``) from the per-title ``results``, each distinct title weighted by
+    how many rows hold it; outcomes mirror ``write_cleaned_csv``.
+    """
+    analytics = JobAnalytics()
+    for title, rows in occurrences.items():
+        cleaned, removed_reason = results[title][:2]
+        if not cleaned:
+            reason = removed_reason or "removed"
+        elif removed_reason == "non_latin_preserved":
+            reason = removed_reason
+        else:
+            reason = "unchanged" if cleaned == title else "cleaned"
+        analytics.add(title, cleaned or "", reason, rows)
+    return analytics
+
+
+def sum_rule_hits(results, occurrences) -> dict:
+    """Job-wide rule hits: each distinct title's hits weighted by how many rows hold it."""
+    rule_hits = {}
+    for title, (_, _, hits, _) in results.items():
+        for name, count in (hits or {}).items():
+            rule_hits[name] = rule_hits.get(name, 0) + count * occurrences[title]
+    return rule_hits
+
+
 if __name__ == "__main__":
-    input_csv = "job_titles.csv"
-    output_csv = "cleaned_job_titles.csv"
+    import argparse
 
-    _, stats = clean_csv_file(input_csv, output_csv)
-    print(f"Done! Cleaned output written to {output_csv}. Stats: {stats}")
+    parser = argparse.ArgumentParser(description="Clean a CSV of job titles.")
+    parser.add_argument("input_csv", nargs="?", default="job_titles.csv", help="Input CSV (default: job_titles.csv)")
+    parser.add_argument(
+        "output_csv", nargs="?", default="cleaned_job_titles.csv", help="Output CSV (default: cleaned_job_titles.csv)"
+    )
+    parser.add_argument(
+        "--cache",
+        help="SQLite title cache to reuse results across runs, e.g. jobs/title_cache.sqlite3 to share the app's cache",
+    )
+    parser.add_argument(
+        "--classify", action="store_true", help="Add Function and Seniority columns from rules/taxonomy.json"
+    )
+    parser.add_argument(
+        "--checkpoint",
+        action="store_true",
+        help="Write in committed chunks; rerun the same command after an interruption to continue where it stopped",
+    )
+    parser.add_argument(
+        "--mapping",
+        action="store_true",
+        help="Write one row per distinct raw title (cleaned value, reason, occurrences) instead of one per input row",
+    )
+    parser.add_argument("--row-ids", help="With --mapping, also write each input row's Mapping Id to this CSV")
+    parser.add_argument(
+        "--threads",
+        type=int,
+        default=1,
+        help="Threads cleaning distinct titles (0: one per CPU on free-threaded Python, else 1; default: 1)",
+    )
+    args = parser.parse_args()
+    threads = args.threads or default_threads()
+    output_options = {"output_format": "mapping" if args.mapping else "rows", "row_ids_csv": args.row_ids}
+    if args.row_ids and not args.mapping:
+        parser.error("--row-ids needs --mapping")
+    if args.mapping and args.checkpoint:
+        parser.error("--mapping output cannot be checkpointed")
+    taxonomy = None
+    if args.classify:
+        from classification import load_taxonomy
+
+        taxonomy = load_taxonomy()
+
+    if args.cache:
+        from title_cache import TitleCache
+
+        with TitleCache(args.cache, ruleset_version()) as title_cache:
+            _, stats = clean_csv_file(
+                args.input_csv,
+                args.output_csv,
+                cache=title_cache,
+                taxonomy=taxonomy,
+                checkpoint=args.checkpoint,
+                threads=threads,
+                **output_options,
+            )
+    else:
+        _, stats = clean_csv_file(
+            args.input_csv,
+            args.output_csv,
+            taxonomy=taxonomy,
+            checkpoint=args.checkpoint,
+            threads=threads,
+            **output_options,
+        )
+    print(f"Done! Cleaned output written to {args.output_csv}. Stats: {stats}")
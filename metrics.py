@@ -0,0 +1,307 @@
+"""Prometheus text-format metrics that stay correct across worker processes.
+
+Each process keeps its own samples in memory and mirrors them to
+``<directory>/metrics-<pid>.json``, at most once per ``flush_interval`` seconds
+and once more at exit. ``render`` merges all of the files, so any worker can
+answer a scrape for the whole deployment: counters and histograms are summed
+across every file and gauges are summed across live processes only. Files left
+by exited workers are folded into ``metrics-merged.json`` (dropping their
+gauges) and removed, so totals never go backwards and the directory does not
+grow with every restart. A process that finds a file for its own pid before
+its first write (pid reuse) folds that file too. A forked child starts with
+empty samples. Use one registry per directory in each process.
+"""
+import atexit
+import fcntl
+import json
+import os
+import threading
+import time
+from pathlib import Path
+
+# Seconds between two writes of a process's metrics file.
+FLUSH_INTERVAL = 1.0
+MERGED_FILE = "metrics-merged.json"
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+
+
+def _label_key(labelnames, labels: dict) -> str:
+    missing = set(labelnames) - set(labels)
+    extra = set(labels) - set(labelnames)
+    if missing or extra:
+        raise ValueError(f"Expected labels {sorted(labelnames)}, got {sorted(labels)}")
+    return json.dumps([str(labels[name]) for name in labelnames])
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", r"\\").replace("\n", r"\n").replace('"', r"\"")
+
+
+def _format_labels(pairs) -> str:
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _pid_alive(pid: int) -> bool:
+    if pid == os.getpid():
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, registry, name: str, help_text: str, labelnames=()):
+        self.registry = registry
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        if amount < 0:
+            raise ValueError("Counters can only increase")
+        key = _label_key(self.labelnames, labels)
+        with self.registry.lock:
+            values = self.registry.samples.setdefault(self.name, {})
+            values[key] = values.get(key, 0) + amount
+            self.registry.changed_locked()
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = _label_key(self.labelnames, labels)
+        with self.registry.lock:
+            values = self.registry.samples.setdefault(self.name, {})
+            values[key] = values.get(key, 0) + amount
+            self.registry.changed_locked()
+
+    def dec(self, amount: float = 1, **labels) -> None:
+        self.inc(-amount, **labels)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, registry, name: str, help_text: str, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(registry, name, help_text, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels) -> None:
+        key = _label_key(self.labelnames, labels)
+        with self.registry.lock:
+            values = self.registry.samples.setdefault(self.name, {})
+            entry = values.get(key)
+            if entry is None:
+                entry = {"buckets": [0] * len(self.buckets), "count": 0, "sum": 0.0}
+                values[key] = entry
+            for idx, bound in enumerate(self.buckets):
+                if value <= bound:
+                    entry["buckets"][idx] += 1
+            entry["count"] += 1
+            entry["sum"] += value
+            self.registry.changed_locked()
+
+
+def _merge_into(merged: dict, samples: dict, metrics: dict, gauges=False) -> None:
+    """Add ``samples`` to ``merged``; gauges only with ``gauges``."""
+    for name, values in samples.items():
+        metric = metrics.get(name)
+        if metric is None or (metric.kind == "gauge" and not gauges):
+            continue
+        target = merged.setdefault(name, {})
+        for key, value in values.items():
+            if metric.kind == "histogram":
+                entry = target.setdefault(key, {"buckets": [0] * len(metric.buckets), "count": 0, "sum": 0.0})
+                for idx, count in enumerate(value["buckets"][: len(metric.buckets)]):
+                    entry["buckets"][idx] += count
+                entry["count"] += value["count"]
+                entry["sum"] += value["sum"]
+            else:
+                target[key] = target.get(key, 0) + value
+
+
+def _read_samples(path: Path):
+    try:
+        return json.loads(path.read_text())
+    except (OSError, json.JSONDecodeError):
+        return None
+
+
+def _write_samples(path: Path, samples: dict) -> None:
+    tmp_path = path.with_suffix(".tmp")
+    tmp_path.write_text(json.dumps(samples))
+    os.replace(tmp_path, path)
+
+
+class MetricsRegistry:
+    """Holds metric definitions and the current process's samples."""
+
+    def __init__(self, directory=None, flush_interval=FLUSH_INTERVAL):
+        self.directory = Path(directory) if directory is not None else None
+        self.flush_interval = flush_interval
+        self.metrics = {}
+        self._reset()
+        # ``directory`` may be set later; without one nothing is ever written.
+        os.register_at_fork(after_in_child=self._reset)
+        atexit.register(self.flush)
+
+    def _reset(self) -> None:
+        # Also runs in a forked child, before it can apply any update: the parent's samples and pending
+        # timer stay with the parent.
+        self.samples = {}
+        self.lock = threading.Lock()
+        self._pid = os.getpid()
+        self._claimed = False
+        self._dirty = False
+        self._timer = None
+        self._last_flush = 0.0
+
+    def counter(self, name: str, help_text: str, labelnames=()) -> Counter:
+        return self._register(Counter(self, name, help_text, labelnames))
+
+    def gauge(self, name: str, help_text: str, labelnames=()) -> Gauge:
+        return self._register(Gauge(self, name, help_text, labelnames))
+
+    def histogram(self, name: str, help_text: str, labelnames=(), buckets=DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram(self, name, help_text, labelnames, buckets))
+
+    def _register(self, metric):
+        if metric.name in self.metrics:
+            raise ValueError(f"Metric {metric.name} already registered")
+        self.metrics[metric.name] = metric
+        return metric
+
+    def _path_for(self, pid: int) -> Path:
+        return self.directory / f"metrics-{pid}.json"
+
+    def changed_locked(self) -> None:
+        """Note an update; writes now if the last write is ``flush_interval`` old, else schedules one."""
+        if self.directory is None:
+            return
+        self._dirty = True
+        if self._timer is not None:
+            return
+        delay = self._last_flush + self.flush_interval - time.monotonic()
+        if delay <= 0:
+            self.flush_locked()
+            return
+        self._timer = threading.Timer(delay, self.flush)
+        self._timer.daemon = True
+        self._timer.start()
+
+    def flush(self) -> None:
+        with self.lock:
+            self._timer = None
+            if self._dirty:
+                self.flush_locked()
+
+    def flush_locked(self) -> None:
+        if self.directory is None:
+            return
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._claim_locked()
+        _write_samples(self._path_for(self._pid), self.samples)
+        self._dirty = False
+        self._last_flush = time.monotonic()
+
+    def _claim_locked(self) -> None:
+        # A file under our pid written before our first write belongs to an exited process.
+        if self._claimed:
+            return
+        path = self._path_for(self._pid)
+        if path.exists():
+            with self._directory_lock():
+                self._fold([path])
+        self._claimed = True
+
+    def _directory_lock(self):
+        lock = (self.directory / "metrics.lock").open("a")
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        return lock
+
+    def _fold(self, paths) -> None:
+        """Add the files in ``paths`` to the merged file and remove them. Hold the directory lock."""
+        merged_path = self.directory / MERGED_FILE
+        merged = _read_samples(merged_path) or {}
+        for path in paths:
+            samples = _read_samples(path)
+            if samples is not None:
+                _merge_into(merged, samples, self.metrics)
+        _write_samples(merged_path, merged)
+        for path in paths:
+            path.unlink(missing_ok=True)
+
+    def _collect(self) -> list:
+        """Return ``(pid, samples)`` for every live process, plus ``(None, samples)`` for exited ones."""
+        with self.lock:
+            own = json.loads(json.dumps(self.samples))
+            if self.directory is None or not self.directory.exists():
+                return [(os.getpid(), own)]
+            self._claim_locked()
+        collected = []
+        with self._directory_lock():
+            dead = []
+            for path in sorted(self.directory.glob("metrics-*.json")):
+                suffix = path.stem[len("metrics-") :]
+                if not suffix.isdigit():
+                    continue
+                pid = int(suffix)
+                if pid == os.getpid():
+                    continue
+                if not _pid_alive(pid):
+                    dead.append(path)
+                    continue
+                samples = _read_samples(path)
+                if samples is not None:
+                    collected.append((pid, samples))
+            if dead:
+                self._fold(dead)
+            merged = _read_samples(self.directory / MERGED_FILE)
+        if merged is not None:
+            collected.append((None, merged))
+        collected.append((os.getpid(), own))
+        return collected
+
+    def render(self) -> str:
+        merged = {name: {} for name in self.metrics}
+        for pid, samples in self._collect():
+            _merge_into(merged, samples, self.metrics, gauges=pid is not None)
+
+        lines = []
+        for name, metric in self.metrics.items():
+            lines.append(f"# HELP {name} {metric.help}")
+            lines.append(f"# TYPE {name} {metric.kind}")
+            for key in sorted(merged[name]):
+                pairs = list(zip(metric.labelnames, json.loads(key)))
+                value = merged[name][key]
+                if metric.kind != "histogram":
+                    lines.append(f"{name}{_format_labels(pairs)} {_format_value(value)}")
+                    continue
+                for bound, count in zip(metric.buckets, value["buckets"]):
+                    le = pairs + [("le", _format_value(bound))]
+                    lines.append(f"{name}_bucket{_format_labels(le)} {count}")
+                lines.append(f"{name}_bucket{_format_labels(pairs + [('le', '+Inf')])} {value['count']}")
+                lines.append(f"{name}_sum{_format_labels(pairs)} {_format_value(value['sum'])}")
+                lines.append(f"{name}_count{_format_labels(pairs)} {value['count']}")
+        return "\n".join(lines) + "\n"
@@ -0,0 +1,147 @@
+"""Quick projections of a cleaning run from a uniform sample of its rows.
+
+``sample_titles`` reads a CSV once, streaming, and keeps a uniform random sample of ``size`` rows. It uses
+reservoir sampling with Li's Algorithm L, which draws how many rows to skip instead of one random number per
+row, so memory holds only the sample whatever the file size. ``preview`` cleans just the sampled titles and
+projects the row outcomes and removal reasons onto the whole file with 95% Wilson score intervals, narrowed by
+the finite population correction. When the sample holds every row, the figures are exact.
+"""
+import csv
+import math
+import random
+from collections import deque
+from itertools import islice
+from pathlib import Path
+
+from job_title_cleaning import active_engine, clean_job_titles
+
+PREVIEW_SAMPLE_SIZE = 1000
+PREVIEW_SAMPLE_MAX = 20_000
+# Sampled rows the cleaner changes or removes, listed in a preview.
+PREVIEW_EXAMPLES = 20
+_Z95 = 1.959963984540054
+
+
+def _title_column(header: list) -> int:
+    """Column ``read_titles`` takes the titles from."""
+    for name in ("Original Job Title", "Job Title"):
+        if name in header:
+            return header.index(name)
+    return 0
+
+
+def _reservoir(items, size: int, rng: random.Random):
+    """``(sample, count)``: a uniform sample of up to ``size`` ``(number, item)`` pairs and how many there were."""
+    numbered = enumerate(items)
+    sample = list(islice(numbered, size))
+    if len(sample) < size:
+        return sample, len(sample)
+    seen = size
+    weight = math.exp(math.log(1.0 - rng.random()) / size)
+    while True:
+        skip = math.floor(math.log(1.0 - rng.random()) / math.log(1.0 - weight)) if weight < 1.0 else 0
+        if skip:
+            last = deque(islice(numbered, skip), maxlen=1)
+            if last:
+                seen = last[0][0] + 1
+        item = next(numbered, None)
+        if item is None:
+            return sample, seen
+        seen = item[0] + 1
+        sample[rng.randrange(size)] = item
+        weight *= math.exp(math.log(1.0 - rng.random()) / size)
+
+
+def sample_titles(source, size: int = PREVIEW_SAMPLE_SIZE, seed: int = 0):
+    """
+    ``(sample, total_rows)`` for a CSV path or text stream: ``sample`` holds up to ``size`` ``(row_number,
+    title)`` pairs (from 0, in file order) drawn uniformly in one pass; the same seed draws the same rows. Titles
+    come from the column ``read_titles`` uses and blank lines are skipped, as it does. Raises ValueError for a
+    file without rows.
+    """
+    if isinstance(source, (str, Path)):
+        with open(source, newline="", encoding="utf-8-sig") as f:
+            return sample_titles(f, size, seed)
+    reader = csv.reader(source)
+    header = next(reader, None)
+    if header is None:
+        raise ValueError("Uploaded file is empty")
+    column = _title_column(header)
+    sample, total_rows = _reservoir((row for row in reader if row), size, random.Random(seed))
+    if not total_rows:
+        raise ValueError("Uploaded file is empty")
+    titles = [(number, row[column].strip() if column < len(row) else "") for number, row in sorted(sample)]
+    return titles, total_rows
+
+
+def wilson_interval(hits: int, sample_rows: int, total_rows: int) -> tuple:
+    """95% interval for the share of ``total_rows`` that ``hits`` of ``sample_rows`` sampled rows estimate."""
+    share = hits / sample_rows
+    if sample_rows >= total_rows:
+        return share, share
+    z = _Z95 * math.sqrt((total_rows - sample_rows) / (total_rows - 1))
+    denominator = 1 + z * z / sample_rows
+    centre = (share + z * z / (2 * sample_rows)) / denominator
+    half = z * math.sqrt(share * (1 - share) / sample_rows + z * z / (4 * sample_rows * sample_rows)) / denominator
+    return max(0.0, centre - half), min(1.0, centre + half)
+
+
+def _outcome(title: str, cleaned, reason: str):
+    """Row outcome and removal reason, as ``write_cleaned_csv`` counts them."""
+    if not cleaned:
+        return "removed", reason or "removed"
+    if reason == "non_latin_preserved" or cleaned == title:
+        return "good", ""
+    return "cleaned", ""
+
+
+def _projection(hits: int, sample_rows: int, total_rows: int) -> dict:
+    low, high = wilson_interval(hits, sample_rows, total_rows)
+    return {
+        "sampled": hits,
+        "ratio": round(hits / sample_rows, 4),
+        "ratio_low": round(low, 4),
+        "ratio_high": round(high, 4),
+        "projected_rows": round(hits / sample_rows * total_rows),
+        "projected_rows_low": math.floor(low * total_rows),
+        "projected_rows_high": math.ceil(high * total_rows),
+    }
+
+
+def preview(source, size: int = PREVIEW_SAMPLE_SIZE, seed: int = 0, engine=None) -> dict:
+    """
+    Projected outcome of cleaning a CSV path or text stream with ``engine`` (default: the active ruleset),
+    from ``size`` sampled rows: ``outcomes`` (good/cleaned/removed) and ``removed_reasons``, each with the
+    sampled count, ratio, 95% interval and projected rows, plus up to ``PREVIEW_EXAMPLES`` changed rows.
+    """
+    if engine is None:
+        engine = active_engine()
+    sample, total_rows = sample_titles(source, size, seed)
+    results = clean_job_titles([title for _, title in sample], engine=engine)
+
+    outcomes = {"good": 0, "cleaned": 0, "removed": 0}
+    reasons = {}
+    examples = []
+    for (number, title), (cleaned, reason) in zip(sample, results):
+        outcome, removed_reason = _outcome(title, cleaned, reason)
+        outcomes[outcome] += 1
+        if removed_reason:
+            reasons[removed_reason] = reasons.get(removed_reason, 0) + 1
+        if outcome != "good" and len(examples) < PREVIEW_EXAMPLES:
+            examples.append(
+                {"index": number + 1, "original": title, "cleaned": cleaned or "", "removed_reason": removed_reason}
+            )
+    sample_rows = len(sample)
+    return {
+        "total_rows": total_rows,
+        "sample_rows": sample_rows,
+        "exact": sample_rows == total_rows,
+        "seed": seed,
+        "ruleset_version": engine.version,
+        "outcomes": {name: _projection(hits, sample_rows, total_rows) for name, hits in outcomes.items()},
+        "removed_reasons": {
+            reason: _projection(hits, sample_rows, total_rows)
+            for reason, hits in sorted(reasons.items(), key=lambda kv: (-kv[1], kv[0]))
+        },
+        "examples": examples,
+    }
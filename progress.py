@@ -0,0 +1,70 @@
+"""Throttled progress reports for long cleaning runs.
+
+``clean_csv_file(progress=...)`` calls its callback after every batch of ``PROGRESS_TITLES`` distinct titles
+and every committed chunk with the rows done and the running row stats. ``ProgressReporter`` turns those calls
+into snapshots (rows done, rows/second, ETA, good / cleaned / removed counters) and publishes at most one per
+``interval`` seconds, so reporting costs one clock read per call. The app publishes snapshots to ``<job>-progress.json`` in the job folder, which any worker can
+stream to the UI as server-sent events.
+"""
+import json
+import os
+import time
+from pathlib import Path
+
+# Minimum seconds between two published snapshots (the first and final ones are always published).
+PROGRESS_INTERVAL = 0.5
+
+
+class ProgressReporter:
+    """Callback for ``clean_csv_file(progress=...)`` that publishes throttled snapshots through ``publish``."""
+
+    def __init__(self, publish, interval: float = PROGRESS_INTERVAL, clock=time.monotonic):
+        self.publish = publish
+        self.interval = interval
+        self.clock = clock
+        self.started = None
+        self.start_rows = 0
+        self.last_published = None
+
+    def __call__(self, rows_done: int, total_rows: int, stats: dict) -> None:
+        now = self.clock()
+        if self.started is None:
+            # Rates count from the first report, so a resumed run is not credited with rows done before it.
+            self.started = now
+            self.start_rows = rows_done
+        finished = rows_done >= total_rows
+        if not finished and self.last_published is not None and now - self.last_published < self.interval:
+            return
+        self.last_published = now
+        self.publish(self.snapshot(rows_done, total_rows, stats, now))
+
+    def snapshot(self, rows_done: int, total_rows: int, stats: dict, now: float) -> dict:
+        elapsed = now - self.started
+        rate = (rows_done - self.start_rows) / elapsed if elapsed > 0 else 0.0
+        remaining = total_rows - rows_done
+        return {
+            "rows_done": rows_done,
+            "total_rows": total_rows,
+            "percent": round(100 * rows_done / total_rows, 1) if total_rows else 100.0,
+            "rows_per_second": round(rate),
+            "eta_seconds": round(remaining / rate, 1) if rate > 0 else None,
+            "elapsed_seconds": round(elapsed, 1),
+            "good": stats.get("good", 0),
+            "cleaned": stats.get("cleaned", 0),
+            "removed": stats.get("removed", 0),
+        }
+
+
+def write_progress(path, snapshot: dict) -> None:
+    path = Path(path)
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    tmp_path.write_text(json.dumps(snapshot), encoding="utf-8")
+    os.replace(tmp_path, path)
+
+
+def read_progress(path):
+    """The last snapshot written to ``path``, or None."""
+    try:
+        return json.loads(Path(path).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
@@ -0,0 +1,295 @@
+"""Incremental re-clean of stored jobs after a ruleset change.
+
+Every job records the ruleset version it was cleaned with, and the app archives each version's tables under
+``jobs/rulesets/``. Diffing a job's ruleset against the current one gives the trigger text of the rules and
+tables that changed. An inverted index from word tokens to the job's distinct titles then narrows the job
+to the titles whose cleaning could have passed through that text: a title is indexed under the words of
+the raw value, its cleaned output, and the trigger and replacement of every rule that fired for it. Only
+those titles are cleaned again; all other rows keep their stored result.
+
+Jobs without an archived ruleset or per-title rule hits (older jobs), or whose difference cannot be pinned
+to trigger text (ordinal suffixes, fuzzy correction settings, limits, rule order, pipeline changes), are
+cleaned in full.
+"""
+import html
+import json
+import os
+import re
+from datetime import datetime, timezone
+from pathlib import Path
+
+import pandas as pd
+
+from classification import load_taxonomy
+from job_title_cleaning import (
+    RuleEngine,
+    classify_results,
+    clean_job_title_with_reason,
+    collect_analytics,
+    load_ruleset,
+    profile_engine,
+    read_titles,
+    remove_diacritics,
+    ruleset_hash,
+    sum_rule_hits,
+    write_cleaned_csv,
+)
+from retention import COMPRESSED_SUFFIX, stored_path
+
+_token_pattern = re.compile(r"\w+")
+
+
+def _write_atomic(path: Path, text: str) -> None:
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    tmp_path.write_text(text, encoding="utf-8")
+    os.replace(tmp_path, path)
+
+
+def archive_ruleset(engine: RuleEngine, archive_dir) -> Path:
+    """Keep a copy of ``engine``'s tables keyed by version so later re-cleans can diff against it."""
+    path = Path(archive_dir) / f"{engine.version}.json"
+    if not path.exists():
+        path.parent.mkdir(parents=True, exist_ok=True)
+        _write_atomic(path, json.dumps(engine.tables(), indent=2, ensure_ascii=False))
+    return path
+
+
+def load_archived_engine(version: str, archive_dir):
+    """The archived ruleset for ``version``, or None if it is missing or the pipeline changed since."""
+    path = Path(archive_dir) / f"{version}.json"
+    if not path.exists():
+        return None
+    tables = load_ruleset(path)
+    if ruleset_hash(tables) != version:
+        return None
+    return RuleEngine(tables)
+
+
+def title_tokens(text) -> set:
+    if not text:
+        return set()
+    tokens = set(_token_pattern.findall(text.casefold()))
+    tokens.update(_token_pattern.findall(remove_diacritics(html.unescape(text)).casefold()))
+    return tokens
+
+
+def _rule_keys(engine: RuleEngine):
+    """``[((group, trigger, full), rule)]`` in application order; trigger is the lower-cased match text."""
+    keyed = []
+    for rule in engine.misspelling_rules + engine.abbreviation_rules:
+        group = rule["name"].split(":", 1)[0]
+        trigger = rule["pattern"] if rule["full"] else rule["match_text"]
+        keyed.append(((group, trigger, rule["full"]), rule))
+    return keyed
+
+
+def changed_rules(old: RuleEngine, new: RuleEngine) -> dict:
+    """
+    ``{(group, trigger, full): names}`` for the misspelling and abbreviation rules added, removed or given another
+    replacement from ``old`` to ``new``, with the names (as counted in rule hits) the rule has in either.
+    """
+    old_rules, new_rules = dict(_rule_keys(old)), dict(_rule_keys(new))
+    changed = {}
+    for key in old_rules.keys() | new_rules.keys():
+        rule_a, rule_b = old_rules.get(key), new_rules.get(key)
+        if rule_a is None or rule_b is None or rule_a["replacement"] != rule_b["replacement"]:
+            changed[key] = {rule["name"] for rule in (rule_a, rule_b) if rule is not None}
+    return changed
+
+
+def changed_triggers(old: RuleEngine, new: RuleEngine):
+    """
+    Lower-cased text whose presence while cleaning a title means the change from ``old`` to ``new`` can alter
+    its result, or None when any title may be affected.
+    """
+    if (
+        old.ordinal_suffixes != new.ordinal_suffixes
+        or old.fuzzy_config != new.fuzzy_config
+        or old.limits != new.limits
+    ):
+        return None
+    triggers = set()
+    for attr in ("junk_values", "preserve_caps", "lower_middle_words"):
+        triggers.update(getattr(old, attr) ^ getattr(new, attr))
+    old_map, new_map = old.translation_map, new.translation_map
+    triggers.update(key for key in old_map.keys() | new_map.keys() if old_map.get(key) != new_map.get(key))
+    triggers.update(key[1] for key in changed_rules(old, new))
+
+    old_keys, new_keys = _rule_keys(old), _rule_keys(new)
+    common = {key for key, _ in old_keys} & {key for key, _ in new_keys}
+    # Reordering rules that both still exist can change any title where both apply.
+    if [key for key, _ in old_keys if key in common] != [key for key, _ in new_keys if key in common]:
+        return None
+    return {trigger.casefold() for trigger in triggers}
+
+
+class TitleIndex:
+    """Inverted index from word tokens to the distinct titles whose cleaning passed through them."""
+
+    def __init__(self):
+        self.postings = {}
+
+    def add(self, title: str, tokens) -> None:
+        for token in tokens:
+            self.postings.setdefault(token, set()).add(title)
+
+    def candidates(self, triggers):
+        """Titles that may contain any of ``triggers``, or None if a trigger has no word to look up."""
+        found = set()
+        for trigger in triggers:
+            words = _token_pattern.findall(trigger)
+            if not words:
+                return None
+            # Rule text can start or end mid-word in the indexed text, so match the longest word as a substring.
+            word = max(words, key=len)
+            for token, titles in self.postings.items():
+                if word in token:
+                    found |= titles
+        return found
+
+
+def build_title_index(results: dict, old: RuleEngine) -> TitleIndex:
+    """Index each title of ``results`` (``{title: (cleaned, reason, hits, trace)}``) cleaned under ``old``."""
+    rule_text = {}
+    for rule in old.misspelling_rules + old.abbreviation_rules:
+        trigger = rule["pattern"] if rule["full"] else rule["match_text"]
+        rule_text[rule["name"]] = title_tokens(trigger) | title_tokens(rule["replacement"])
+    index = TitleIndex()
+    for title, (cleaned, _, hits, _) in results.items():
+        tokens = title_tokens(title) | title_tokens(cleaned)
+        for name in hits or ():
+            tokens |= rule_text.get(name, set())
+        index.add(title, tokens)
+    return index
+
+
+def _stored_results(originals, cleaned_df, title_hits) -> dict:
+    """Per-title results as recorded in a job's cleaned CSV and rule-hits file."""
+    traces = cleaned_df["Trace"] if "Trace" in cleaned_df.columns else [None] * len(cleaned_df)
+    results = {}
+    for original, cleaned, reason, trace in zip(
+        originals, cleaned_df["Cleaned Job Title"], cleaned_df["Removed Reason"], traces
+    ):
+        if original not in results:
+            results[original] = (cleaned or None, reason, title_hits.get(original, {}), trace)
+    return results
+
+
+def _row_values(cleaned, reason):
+    """What a result looks like in the cleaned CSV (mirrors ``write_cleaned_csv``)."""
+    if not cleaned:
+        return "", reason or "removed"
+    return cleaned, reason if reason == "non_latin_preserved" else ""
+
+
+def reclean_job(job: dict, job_folder: Path, engine: RuleEngine, archive_dir, dry_run=False) -> dict:
+    """
+    Bring one stored job up to ``engine``'s ruleset, re-cleaning only titles the change can touch. Updates
+    ``job`` (stats, ruleset version) in place unless ``dry_run`` and returns a per-job report.
+    """
+    report = {
+        "job": job["name"],
+        "mode": "current",
+        "titles": 0,
+        "titles_checked": 0,
+        "titles_changed": 0,
+        "rows_changed": 0,
+    }
+    if job.get("ruleset_version") == engine.version:
+        return report
+
+    df, originals = read_titles(stored_path(job_folder / job["original_filename"]))
+    cleaned_path = job_folder / job["cleaned_filename"]
+    cleaned_df = pd.read_csv(stored_path(cleaned_path), dtype=str, keep_default_na=False, encoding="utf-8-sig")
+    include_trace = "Trace" in cleaned_df.columns
+    hits_path = job_folder / job.get("rule_hits_filename", f"{job['name']}-rule-hits.json")
+    stored_hits = json.loads(hits_path.read_text()) if hits_path.exists() else {}
+    title_hits = stored_hits.get("titles")
+
+    occurrences = {}
+    for original in originals:
+        occurrences[original] = occurrences.get(original, 0) + 1
+    results = _stored_results(originals, cleaned_df, title_hits or {})
+
+    old_engine = load_archived_engine(job["ruleset_version"], archive_dir) if job.get("ruleset_version") else None
+    candidates = None
+    if old_engine is not None and title_hits is not None:
+        triggers = changed_triggers(old_engine, engine)
+        if triggers is not None:
+            candidates = build_title_index(results, old_engine).candidates(triggers)
+    report["mode"] = "full" if candidates is None else "incremental"
+    if candidates is None:
+        candidates = set(results)
+    report["titles"] = len(results)
+    report["titles_checked"] = len(candidates)
+
+    for title in candidates:
+        hits = {}
+        trace = [] if include_trace else None
+        cleaned, reason = clean_job_title_with_reason(title, hits, trace, engine=engine)
+        if _row_values(cleaned, reason) != _row_values(*results[title][:2]):
+            report["titles_changed"] += 1
+            report["rows_changed"] += occurrences[title]
+        results[title] = (cleaned, reason, hits, None if trace is None else json.dumps(trace, ensure_ascii=False))
+    if dry_run:
+        return report
+
+    stats = dict(job.get("stats", {}))
+    if report["rows_changed"]:
+        # Write beside the old file and swap it in: deduplicated jobs hard-link their outputs.
+        tmp_path = cleaned_path.with_name(f"{cleaned_path.name}.{os.getpid()}.tmp")
+        classifications = None
+        if "Function" in cleaned_df.columns:
+            taxonomy = load_taxonomy()
+            classifications = classify_results(results, taxonomy)
+            job.setdefault("options", {})["taxonomy_version"] = taxonomy.version
+        stats.update(write_cleaned_csv(df, originals, results, tmp_path, include_trace, classifications))
+        os.replace(tmp_path, cleaned_path)
+        compressed = cleaned_path.with_name(cleaned_path.name + COMPRESSED_SUFFIX)
+        if compressed.exists():
+            compressed.unlink()  # superseded by the rewritten file
+        stats["analytics"] = collect_analytics(results, occurrences)
+    hits_payload = {
+        "total_titles": stats.get("total_rows", len(originals)),
+        "hits": sum_rule_hits(results, occurrences),
+        "titles": {title: hits for title, (_, _, hits, _) in results.items() if hits},
+    }
+    _write_atomic(hits_path, json.dumps(hits_payload, indent=2, sort_keys=True))
+    job["rule_hits_filename"] = hits_path.name
+    job["stats"] = stats
+    job["ruleset_version"] = engine.version
+    job["recleaned_at"] = datetime.now(timezone.utc).isoformat()
+    return report
+
+
+def reclean_jobs(jobs_dir, engine=None, dry_run=False, job_names=None) -> list:
+    """
+    Re-clean every completed job under ``jobs_dir`` (or just ``job_names``) and return per-job reports. Each job
+    is brought up to ``engine`` if given, else to the current version of the rule profile it was cleaned with.
+    """
+    jobs_dir = Path(jobs_dir)
+    archive_dir = jobs_dir / "rulesets"
+    metadata_path = jobs_dir / "jobs.json"
+    jobs = json.loads(metadata_path.read_text()) if metadata_path.exists() else []
+
+    reports = []
+    for job in jobs:
+        if job.get("status") != "complete" or (job_names and job["name"] not in job_names):
+            continue
+        profile = job.get("options", {}).get("profile", "")
+        try:
+            job_engine = engine or profile_engine(profile)
+        except KeyError:
+            reports.append({"job": job["name"], "mode": "skipped", "error": f"Unknown rule profile: {profile}"})
+            continue
+        if not dry_run:
+            archive_ruleset(job_engine, archive_dir)
+        reports.append(reclean_job(job, jobs_dir / job["name"], job_engine, archive_dir, dry_run=dry_run))
+    updated = {report["job"] for report in reports if report["mode"] in ("full", "incremental")}
+    if not dry_run and updated:
+        # Re-read so jobs uploaded while this ran are kept.
+        by_name = {job["name"]: job for job in jobs if job["name"] in updated}
+        latest = json.loads(metadata_path.read_text())
+        latest = [by_name.get(job["name"], job) for job in latest]
+        _write_atomic(metadata_path, json.dumps(latest, indent=2))
+    return reports
@@ -0,0 +1,306 @@
+"""Retention for stored jobs: compress old artifacts, expire old jobs, and rotate ``runs.log``.
+
+A completed job's ``-original.csv`` and ``-cleaned.csv`` are gzipped in place (``<name>.gz``, keeping their
+modification time) once the job is ``compress_after_days`` old. Readers go through ``stored_path``, which
+returns whichever form exists, and pandas reads both. Jobs older than ``expire_after_days``, and the oldest
+finished jobs while the job folders hold more than ``max_total_bytes``, are expired: their folder is packed
+into ``<archive_dir>/<job>.tar.gz`` when an archive directory is set, then removed, and the job stays listed
+with status ``expired``. ``runs.log`` is rotated to ``runs.log.1.gz`` … ``runs.log.<log_backups>.gz`` once it
+is larger than ``log_max_bytes``. A value of 0 turns the respective policy off; only log rotation is on by
+default, and nothing runs unless retention is applied (the app's ``RETENTION_INTERVAL_HOURS``, or
+``scripts/apply_retention.py``).
+
+Bytes reclaimed count a hard-linked file (deduplicated jobs share their outputs) only once all of its links
+are gone, and copies of one shared file are compressed once and linked again. A dry run compresses into a
+byte counter instead of a file, so it reports exactly what a real run would reclaim.
+"""
+import gzip
+import io
+import json
+import os
+import shutil
+import tarfile
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+COMPRESSED_SUFFIX = ".gz"
+DEFAULT_POLICY = {
+    "compress_after_days": 0,
+    "expire_after_days": 0,
+    "max_total_bytes": 0,
+    "archive_dir": None,
+    "log_max_bytes": 10 * 1024 * 1024,
+    "log_backups": 5,
+}
+_ENV_POLICY = {
+    "compress_after_days": "RETENTION_COMPRESS_DAYS",
+    "expire_after_days": "RETENTION_EXPIRE_DAYS",
+    "max_total_bytes": "RETENTION_MAX_BYTES",
+    "archive_dir": "RETENTION_ARCHIVE_DIR",
+    "log_max_bytes": "RUNS_LOG_MAX_BYTES",
+    "log_backups": "RUNS_LOG_BACKUPS",
+}
+_COPY_CHUNK_SIZE = 1024 * 1024
+
+
+def policy_from_env(environ=os.environ) -> dict:
+    """``DEFAULT_POLICY`` with the values set in ``environ`` (``RETENTION_*``, ``RUNS_LOG_*``)."""
+    policy = dict(DEFAULT_POLICY)
+    for key, name in _ENV_POLICY.items():
+        value = environ.get(name)
+        if value:
+            policy[key] = value if key == "archive_dir" else float(value) if key.endswith("_days") else int(value)
+    return policy
+
+
+def stored_path(path) -> Path:
+    """``path``, or its compressed form when only that exists."""
+    path = Path(path)
+    if path.exists():
+        return path
+    compressed = path.with_name(path.name + COMPRESSED_SUFFIX)
+    return compressed if compressed.exists() else path
+
+
+class _ByteCounter(io.RawIOBase):
+    def __init__(self):
+        self.size = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self.size += len(data)
+        return len(data)
+
+
+def _gzip_into(path: Path, target, name=None) -> None:
+    with path.open("rb") as src, gzip.GzipFile(name or path.name, "wb", fileobj=target, mtime=0) as dst:
+        shutil.copyfileobj(src, dst, _COPY_CHUNK_SIZE)
+
+
+def _link_or_copy(src: Path, dst: Path) -> None:
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copy2(src, dst)
+
+
+def _directory_files(folder: Path):
+    return [path for path in folder.rglob("*") if path.is_file() and not path.is_symlink()]
+
+
+class _Storage:
+    """Bookkeeping of one retention pass: bytes freed and compressed copies, per inode."""
+
+    def __init__(self, dry_run: bool):
+        self.dry_run = dry_run
+        self.links = {}  # (dev, ino) -> [links not yet removed, size]
+        self.compressed = {}  # (dev, ino) -> compressed path (or size, in a dry run)
+        self.pending = {}  # folder -> bytes of compressed files a dry run did not write
+
+    def _key(self, st):
+        return st.st_dev, st.st_ino
+
+    def removed(self, st) -> int:
+        """Note one link of a file as removed; returns its size once the last link is gone."""
+        key = self._key(st)
+        entry = self.links.setdefault(key, [st.st_nlink, st.st_size])
+        entry[0] -= 1
+        if entry[0]:
+            return 0
+        if not self.dry_run:
+            # The file is deleted, so a file created later may get the same inode number.
+            del self.links[key]
+            self.compressed.pop(key, None)
+        return entry[1]
+
+    def compress(self, path: Path) -> int:
+        """Gzip ``path`` in place and return the bytes reclaimed (negative while other links keep the original)."""
+        st = path.stat()
+        key = self._key(st)
+        target = path.with_name(path.name + COMPRESSED_SUFFIX)
+        added = 0
+        if self.dry_run:
+            if key not in self.compressed:
+                counter = _ByteCounter()
+                _gzip_into(path, counter)
+                self.compressed[key] = counter.size
+                added = counter.size
+                self.pending[path.parent] = self.pending.get(path.parent, 0) + added
+        elif key in self.compressed:
+            _link_or_copy(self.compressed[key], target)
+        else:
+            tmp_path = target.with_name(f"{target.name}.{os.getpid()}.tmp")
+            with tmp_path.open("wb") as f:
+                _gzip_into(path, f)
+            shutil.copystat(path, tmp_path)  # keeps the mtime that cached reports are checked against
+            os.replace(tmp_path, target)
+            self.compressed[key] = target
+            added = target.stat().st_size
+        reclaimed = self.removed(st) - added
+        if not self.dry_run:
+            path.unlink()
+        return reclaimed
+
+    def folder_bytes(self, folder: Path) -> int:
+        """Bytes of ``folder`` not already counted for another folder by ``folder_bytes``."""
+        total = 0
+        for path in _directory_files(folder):
+            st = path.stat()
+            if self._key(st) not in self.links:
+                self.links[self._key(st)] = [st.st_nlink, st.st_size]
+                total += st.st_size
+        return total
+
+    def expire(self, folder: Path, archive_path) -> int:
+        """Remove ``folder`` (packed into ``archive_path`` first, if given) and return the bytes reclaimed."""
+        reclaimed = sum(self.removed(path.stat()) for path in _directory_files(folder)) + self.pending.pop(folder, 0)
+        if not self.dry_run:
+            if archive_path is not None:
+                archive_path.parent.mkdir(parents=True, exist_ok=True)
+                tmp_path = archive_path.with_name(f"{archive_path.name}.{os.getpid()}.tmp")
+                with tarfile.open(tmp_path, "w:gz") as tar:
+                    tar.add(folder, arcname=folder.name)
+                os.replace(tmp_path, archive_path)
+            shutil.rmtree(folder)
+        return reclaimed
+
+
+def _created_at(job: dict):
+    try:
+        created = datetime.fromisoformat(job["created_at"])
+    except (KeyError, TypeError, ValueError):
+        return None
+    return created if created.tzinfo else created.replace(tzinfo=timezone.utc)
+
+
+def rotate_log(log_path, max_bytes: int, backups: int, dry_run=False) -> int:
+    """
+    Rotate ``log_path`` to ``<log>.1.gz`` once it is larger than ``max_bytes``, keeping ``backups`` old logs.
+    Returns the bytes reclaimed.
+    """
+    log_path = Path(log_path)
+    if not max_bytes or not log_path.exists() or log_path.stat().st_size <= max_bytes:
+        return 0
+
+    def backup(index: int) -> Path:
+        return log_path.with_name(f"{log_path.name}.{index}{COMPRESSED_SUFFIX}")
+
+    size = log_path.stat().st_size
+    dropped = backup(max(backups, 1))
+    reclaimed = size + (dropped.stat().st_size if backups and dropped.exists() else 0)
+    if dry_run:
+        if backups:
+            counter = _ByteCounter()
+            _gzip_into(log_path, counter)
+            reclaimed -= counter.size
+        return reclaimed
+
+    # Moving the log aside first means lines appended meanwhile start a fresh runs.log instead of getting lost.
+    rotating = log_path.with_name(f"{log_path.name}.{os.getpid()}.rotating")
+    os.replace(log_path, rotating)
+    if not backups:
+        rotating.unlink()
+        return reclaimed
+    if dropped.exists():
+        dropped.unlink()
+    for index in range(backups - 1, 0, -1):
+        if backup(index).exists():
+            os.replace(backup(index), backup(index + 1))
+    tmp_path = backup(1).with_name(f"{backup(1).name}.tmp")
+    with tmp_path.open("wb") as f:
+        _gzip_into(rotating, f, log_path.name)
+    os.replace(tmp_path, backup(1))
+    rotating.unlink()
+    return reclaimed - backup(1).stat().st_size
+
+
+def apply_retention(jobs_dir, policy=None, dry_run=False, now=None) -> dict:
+    """
+    Apply ``policy`` (``DEFAULT_POLICY`` keys) to the jobs under ``jobs_dir`` and return a report of the actions
+    taken (or, with ``dry_run``, that would be taken) and the bytes they reclaim. Jobs still ``running`` are
+    never touched.
+    """
+    jobs_dir = Path(jobs_dir)
+    policy = {**DEFAULT_POLICY, **(policy or {})}
+    now = now or datetime.now(timezone.utc)
+    metadata_path = jobs_dir / "jobs.json"
+    jobs = json.loads(metadata_path.read_text()) if metadata_path.exists() else []
+    storage = _Storage(dry_run)
+    actions = []
+
+    finished = []
+    for job in jobs:
+        created = _created_at(job)
+        folder = jobs_dir / job.get("name", "")
+        if job.get("status") not in ("complete", "error") or created is None or not folder.is_dir():
+            continue
+        finished.append((created, job, folder))
+    finished.sort(key=lambda item: item[0])
+
+    total_bytes = sum(storage.folder_bytes(folder) for _, _, folder in finished)
+    expire_before = now - timedelta(days=policy["expire_after_days"])
+    compress_before = now - timedelta(days=policy["compress_after_days"])
+    for created, job, folder in finished:
+        if not policy["compress_after_days"] or created > compress_before or job["status"] != "complete":
+            continue
+        if policy["expire_after_days"] and created <= expire_before:
+            continue  # removed below anyway
+        files = [
+            folder / job[name]
+            for name in ("original_filename", "cleaned_filename")
+            if job.get(name) and (folder / job[name]).is_file()
+        ]
+        if files:
+            reclaimed = sum(storage.compress(path) for path in files)
+            total_bytes -= reclaimed
+            actions.append(
+                {
+                    "job": job["name"],
+                    "action": "compress",
+                    "files": [path.name for path in files],
+                    "bytes_reclaimed": reclaimed,
+                }
+            )
+
+    expired = {}
+    for created, job, folder in finished:
+        too_old = policy["expire_after_days"] and created <= expire_before
+        too_big = policy["max_total_bytes"] and total_bytes > policy["max_total_bytes"]
+        if not (too_old or too_big):
+            continue
+        archive_path = Path(policy["archive_dir"]) / f"{job['name']}.tar.gz" if policy["archive_dir"] else None
+        reclaimed = storage.expire(folder, archive_path)
+        total_bytes -= reclaimed
+        action = {"job": job["name"], "action": "archive" if archive_path else "delete", "bytes_reclaimed": reclaimed}
+        if archive_path:
+            action["archive"] = str(archive_path)
+        actions.append(action)
+        expired[job["name"]] = action
+
+    reclaimed = rotate_log(jobs_dir / "runs.log", policy["log_max_bytes"], policy["log_backups"], dry_run=dry_run)
+    if reclaimed:
+        actions.append({"job": None, "action": "rotate_log", "files": ["runs.log"], "bytes_reclaimed": reclaimed})
+
+    if expired and not dry_run:
+        # Re-read so jobs saved while this ran are kept.
+        expired_at = now.isoformat()
+        latest = json.loads(metadata_path.read_text())
+        for job in latest:
+            action = expired.get(job.get("name"))
+            if action is not None:
+                job["status"] = "expired"
+                job["expired_at"] = expired_at
+                if "archive" in action:
+                    job["archive"] = action["archive"]
+        tmp_path = metadata_path.with_name(f"{metadata_path.name}.{os.getpid()}.tmp")
+        tmp_path.write_text(json.dumps(latest, indent=2))
+        os.replace(tmp_path, metadata_path)
+
+    return {
+        "dry_run": dry_run,
+        "actions": actions,
+        "bytes_reclaimed": sum(action["bytes_reclaimed"] for action in actions),
+        "job_bytes": total_bytes,
+    }
@@ -0,0 +1,161 @@
+"""Diff two rulesets over a corpus of titles, for reviewing a rule change before it ships.
+
+``diff_rulesets`` cleans each distinct title of the corpus once with the baseline ruleset (``a``), counting rule
+hits. The candidate (``b``) is built with ``RuleEngine.derive``, so it shares the baseline's unchanged tables,
+compiled rules and fuzzy lookups. It then re-cleans only the titles the change can touch. These are found the
+way ``reclean.py`` finds them: the trigger text of the changed rules and tables is looked up in an index of the
+words each title passed through. Every other title keeps its baseline result. A change that cannot be pinned
+to trigger text (ordinal suffixes, fuzzy settings, limits, rule order) re-cleans every title. Both passes can
+use a ``title_cache.TitleCache`` per ruleset version and several threads (see ``clean_distinct_titles``).
+
+Each changed title is attributed to the rules whose hits differ between the two runs, and to the rules it hit
+in either run whose definition changed (a new replacement leaves the hit counts alone). A change without such
+a rule is attributed to its removal reason, or to ``tables`` (caps, connector words, translations, fuzzy
+vocabulary). The report counts changed titles and rows per attribution and per kind of change, with the most
+frequent titles as samples.
+"""
+from pathlib import Path
+
+from job_title_cleaning import (
+    RuleEngine,
+    active_engine,
+    clean_distinct_titles,
+    load_ruleset,
+    profile_engine,
+    profile_names,
+)
+from reclean import build_title_index, changed_rules, changed_triggers
+
+# Titles listed per attribution and overall in a report.
+DIFF_SAMPLES = 5
+CHANGE_KINDS = ("changed", "removed", "restored", "reason_changed")
+
+
+def load_tables(spec: str, archive_dir=None) -> dict:
+    """
+    Ruleset tables for ``spec``: a rules file, a version archived in ``archive_dir`` (see
+    ``reclean.archive_ruleset``), ``current`` for the active ruleset, or a rule profile name. Raises ValueError
+    for anything else.
+    """
+    if Path(spec).is_file():
+        return load_ruleset(spec)
+    if archive_dir is not None and (Path(archive_dir) / f"{spec}.json").is_file():
+        return load_ruleset(Path(archive_dir) / f"{spec}.json")
+    if spec in ("", "current"):
+        return active_engine().tables()
+    if spec in profile_names():
+        return profile_engine(spec).tables()
+    raise ValueError(f"Unknown ruleset: {spec} (expected a rules file, an archived version or a profile)")
+
+
+def _change_kind(before, after) -> str:
+    (cleaned_a, _), (cleaned_b, _) = before, after
+    if cleaned_a and not cleaned_b:
+        return "removed"
+    if cleaned_b and not cleaned_a:
+        return "restored"
+    return "changed" if cleaned_a != cleaned_b else "reason_changed"
+
+
+def _attributions(result_a, result_b, edited_rules=frozenset()) -> list:
+    """
+    Rules whose hits differ between the two results or that fired in either and are among ``edited_rules`` (the
+    names of rules whose definition changed), else the removal reason or ``tables``.
+    """
+    hits_a, hits_b = result_a[2] or {}, result_b[2] or {}
+    rules = sorted(
+        name
+        for name in hits_a.keys() | hits_b.keys()
+        if hits_a.get(name) != hits_b.get(name) or name in edited_rules
+    )
+    if rules:
+        return rules
+    if result_a[1] != result_b[1]:
+        return [f"reason:{result_b[1] or result_a[1]}"]
+    return ["tables"]
+
+
+def _sample(title: str, rows: int, result_a, result_b) -> dict:
+    return {
+        "title": title,
+        "rows": rows,
+        "a": result_a[0] or "",
+        "b": result_b[0] or "",
+        "a_reason": result_a[1],
+        "b_reason": result_b[1],
+    }
+
+
+def _engine_summary(engine: RuleEngine) -> dict:
+    return {"name": engine.name, "label": engine.label, "profile": engine.profile, "version": engine.version}
+
+
+def diff_rulesets(
+    occurrences: dict,
+    engine_a: RuleEngine,
+    engine_b: RuleEngine,
+    threads=1,
+    cache_a=None,
+    cache_b=None,
+    samples=DIFF_SAMPLES,
+) -> dict:
+    """
+    Divergence report of ``engine_b`` against ``engine_a`` over ``occurrences`` (``{title: rows}``). Pass
+    ``engine_b`` as ``engine_a.derive(tables)`` to share what did not change.
+    """
+    titles = list(occurrences)
+    results_a = clean_distinct_titles(titles, count_rule_hits=True, cache=cache_a, engine=engine_a, threads=threads)
+    edited_rules = set()
+    if engine_a.version == engine_b.version:
+        mode, candidates = "identical", []
+    else:
+        edited_rules = set().union(*changed_rules(engine_a, engine_b).values())
+        triggers = changed_triggers(engine_a, engine_b)
+        found = None
+        if triggers is not None:
+            index = build_title_index({title: (*result, None) for title, result in results_a.items()}, engine_a)
+            found = index.candidates(triggers)
+        mode = "full" if found is None else "incremental"
+        candidates = titles if found is None else [title for title in titles if title in found]
+    results_b = clean_distinct_titles(candidates, count_rule_hits=True, cache=cache_b, engine=engine_b, threads=threads)
+
+    kinds = {kind: {"titles": 0, "rows": 0} for kind in CHANGE_KINDS}
+    rules = {}
+    changed = []
+    for title in candidates:
+        result_a, result_b = results_a[title], results_b[title]
+        if result_a[:2] == result_b[:2]:
+            continue
+        rows = occurrences[title]
+        changed.append((title, rows))
+        kind = kinds[_change_kind(result_a[:2], result_b[:2])]
+        kind["titles"] += 1
+        kind["rows"] += rows
+        for name in _attributions(result_a, result_b, edited_rules):
+            rule = rules.setdefault(name, {"rule": name, "titles": 0, "rows": 0, "samples": []})
+            rule["titles"] += 1
+            rule["rows"] += rows
+            rule["samples"].append((title, rows))
+
+    def top(items):
+        ranked = sorted(items, key=lambda item: (-item[1], item[0]))[:samples]
+        return [_sample(title, rows, results_a[title], results_b[title]) for title, rows in ranked]
+
+    for rule in rules.values():
+        rule["samples"] = top(rule["samples"])
+    total_rows = sum(occurrences.values())
+    changed_rows = sum(rows for _, rows in changed)
+    return {
+        "a": _engine_summary(engine_a),
+        "b": _engine_summary(engine_b),
+        "mode": mode,
+        "total_rows": total_rows,
+        "distinct_titles": len(titles),
+        "titles_checked": len(candidates),
+        "changed_titles": len(changed),
+        "changed_rows": changed_rows,
+        "changed_share": round(changed_rows / total_rows, 6) if total_rows else 0.0,
+        "kinds": kinds,
+        "rules": sorted(rules.values(), key=lambda rule: (-rule["rows"], rule["rule"])),
+        "samples": top(changed),
+    }
@@ -0,0 +1,40 @@
+import argparse
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from retention import apply_retention, policy_from_env  # noqa: E402
+
+
+def print_retention(jobs_dir: Path, policy: dict, dry_run: bool):
+    report = apply_retention(jobs_dir, policy, dry_run=dry_run)
+    print(f"{'Job':<20} {'Action':<12} {'Reclaimed':>12}  Details")
+    for action in report["actions"]:
+        details = action.get("archive") or ", ".join(action.get("files", []))
+        print(f"{action['job'] or '-':<20} {action['action']:<12} {action['bytes_reclaimed']:>12}  {details}")
+    verb = "would be reclaimed" if dry_run else "reclaimed"
+    print(
+        f"{len(report['actions'])} actions; {report['bytes_reclaimed']} bytes {verb};"
+        f" {report['job_bytes']} bytes left in job folders"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Compress old job files, expire old jobs and rotate runs.log (defaults from RETENTION_* env)."
+    )
+    parser.add_argument("--jobs-dir", default="jobs", help="Jobs directory (default: jobs)")
+    parser.add_argument("--compress-after-days", type=float, help="Gzip outputs of jobs older than this (0: never)")
+    parser.add_argument("--expire-after-days", type=float, help="Expire jobs older than this (0: never)")
+    parser.add_argument("--max-total-bytes", type=int, help="Size cap of all job folders (0: none)")
+    parser.add_argument("--archive-dir", help="Pack expired jobs into <dir>/<job>.tar.gz instead of deleting them")
+    parser.add_argument("--log-max-bytes", type=int, help="Rotate runs.log once larger than this (0: never)")
+    parser.add_argument("--log-backups", type=int, help="Rotated runs.log files to keep")
+    parser.add_argument("--dry-run", action="store_true", help="Report what would be done without changing anything")
+    args = parser.parse_args()
+    policy = policy_from_env()
+    for key in policy:
+        if getattr(args, key) is not None:
+            policy[key] = getattr(args, key)
+    print_retention(Path(args.jobs_dir), policy, args.dry_run)
@@ -0,0 +1,131 @@
+import argparse
+import json
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from classification import TAXONOMY_PATH, build_index  # noqa: E402
+from job_title_cleaning import (  # noqa: E402
+    DEFAULT_LIMITS,
+    RULES_PATH,
+    RULES_PROFILES_DIR,
+    load_ruleset,
+    profile_name_pattern,
+)
+
+CUSTOM_CODE_PATH = ROOT / "hs-custom_code_action.py"
+BEGIN_MARKER = "# --- BEGIN GENERATED RULES (scripts/build_custom_code.py; edit rules/*.json instead) ---"
+END_MARKER = "# --- END GENERATED RULES ---"
+# Tables the custom code action uses; profile overrides of other tables (rule entries) only apply in the app.
+PROFILE_TABLES = ("junk_values", "preserve_caps", "lower_middle_words", "translation_map", "abbreviation_map")
+
+
+def _literal(value: str) -> str:
+    # JSON strings are valid Python literals and keep the file's double-quote style.
+    return json.dumps(value, ensure_ascii=False)
+
+
+def _render_value(value, indent: str) -> str:
+    if value is None:
+        return "None"
+    if isinstance(value, (str, bool, int, float)):
+        return _literal(value)
+    inner = indent + "    "
+    if isinstance(value, dict):
+        items = [f"{inner}{_literal(key)}: {_render_value(item, inner)}," for key, item in value.items()]
+        return "{\n" + "\n".join(items) + f"\n{indent}}}" if items else "{}"
+    items = [f"{inner}{_render_value(item, inner)}," for item in value]
+    return "[\n" + "\n".join(items) + f"\n{indent}]" if items else "[]"
+
+
+def load_profiles(profiles_dir) -> dict:
+    """Overlays of every rule profile, restricted to the tables the custom code action uses."""
+    profiles = {}
+    for path in sorted(Path(profiles_dir).glob("*.json")):
+        if not profile_name_pattern.match(path.stem):
+            continue
+        overlay = json.loads(path.read_text(encoding="utf-8"))
+        profiles[path.stem] = {key: overlay[key] for key in PROFILE_TABLES if key in overlay}
+    return profiles
+
+
+def _render_set(name: str, values) -> str:
+    lines = [f"{name} = {{"]
+    lines.extend(f"    {_literal(value)}," for value in sorted(values))
+    lines.append("}")
+    return "\n".join(lines)
+
+
+def _render_dict(name: str, mapping: dict) -> str:
+    lines = [f"{name} = {{"]
+    lines.extend(f"    {_literal(key)}: {_literal(value)}," for key, value in mapping.items())
+    lines.append("}")
+    return "\n".join(lines)
+
+
+def load_taxonomy_file(path) -> dict:
+    return json.loads(Path(path).read_text(encoding="utf-8"))
+
+
+def _render_taxonomy(taxonomy: dict) -> str:
+    # The compiled index (phrase -> [function, seniority]), so the action does no taxonomy processing per run.
+    index = build_index(taxonomy)
+    lines = ["taxonomy_index = {"]
+    lines.extend(
+        f"    {_literal(phrase)}: [{_render_value(function, '')}, {_render_value(level, '')}],"
+        for phrase, (function, level) in sorted(index.items())
+    )
+    lines.append("}")
+    levels = [entry["level"] for entry in taxonomy.get("seniority", [])]
+    return "\n".join(lines) + f"\n\nseniority_levels = {_render_value(levels, '')}"
+
+
+def render_rules_block(tables: dict, profiles=None, taxonomy=None) -> str:
+    """The HubSpot custom code action cannot import modules, so its tables are inlined from the ruleset file."""
+    header = f"# Ruleset: {tables.get('name', '')} {tables.get('version', '')}".rstrip()
+    if taxonomy:
+        header += f"\n# Taxonomy: {taxonomy.get('name', '')} {taxonomy.get('version', '')}".rstrip()
+    tables_source = "\n\n".join(
+        [
+            _render_set("junk_values", tables["junk_values"]),
+            _render_set("preserve_caps", tables["preserve_caps"]),
+            _render_set("lower_middle_words", tables["lower_middle_words"]),
+            _render_dict("translation_map", tables["translation_map"]),
+            _render_dict("abbreviation_map", tables["abbreviation_map"]),
+            f"limits = {_render_value({**DEFAULT_LIMITS, **(tables.get('limits') or {})}, '')}",
+            f"rule_profiles = {_render_value(profiles or {}, '')}",
+            _render_taxonomy(taxonomy or {}),
+        ]
+    )
+    return f"{BEGIN_MARKER}\n{header}\n{tables_source}\n{END_MARKER}"
+
+
+def build(source: str, tables: dict, profiles=None, taxonomy=None) -> str:
+    start = source.index(BEGIN_MARKER)
+    end = source.index(END_MARKER) + len(END_MARKER)
+    return source[:start] + render_rules_block(tables, profiles, taxonomy) + source[end:]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Regenerate the rule tables inlined in hs-custom_code_action.py.")
+    parser.add_argument("--rules", default=str(RULES_PATH), help="Ruleset file (default: %(default)s)")
+    parser.add_argument("--profiles", default=str(RULES_PROFILES_DIR), help="Rule profiles directory (default: %(default)s)")
+    parser.add_argument("--taxonomy", default=str(TAXONOMY_PATH), help="Taxonomy file (default: %(default)s)")
+    parser.add_argument("--check", action="store_true", help="Exit non-zero if the file is out of date instead of writing it")
+    args = parser.parse_args()
+
+    current = CUSTOM_CODE_PATH.read_text(encoding="utf-8")
+    updated = build(
+        current, load_ruleset(args.rules), load_profiles(args.profiles), load_taxonomy_file(args.taxonomy)
+    )
+    if args.check:
+        if updated != current:
+            sys.exit(f"{CUSTOM_CODE_PATH.name} is out of date; run scripts/build_custom_code.py")
+        print(f"{CUSTOM_CODE_PATH.name} is up to date")
+    elif updated != current:
+        CUSTOM_CODE_PATH.write_text(updated, encoding="utf-8")
+        print(f"Updated {CUSTOM_CODE_PATH.name}")
+    else:
+        print(f"{CUSTOM_CODE_PATH.name} already up to date")
@@ -0,0 +1,41 @@
+import argparse
+import json
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from clustering import job_cluster_report  # noqa: E402
+from retention import stored_path  # noqa: E402
+
+
+def print_clusters(job_name: str, jobs_dir: Path, top: int, as_rules: bool):
+    job_folder = jobs_dir / job_name
+    cleaned_path = stored_path(job_folder / f"{job_name}-cleaned.csv")
+    if not cleaned_path.exists():
+        raise FileNotFoundError(f"Missing cleaned CSV in {job_folder}")
+
+    report = job_cluster_report(cleaned_path, job_folder / f"{job_name}-clusters.json")
+    clusters = report["top"][:top]
+    if as_rules:
+        # Paste into misspelling_entries in rules/default.json (or a profile) to fold the variants together.
+        print(json.dumps([rule for cluster in clusters for rule in cluster["suggested_rules"]], indent=2))
+        return
+
+    print(f"Job: {job_name}")
+    print(f"Distinct cleaned titles: {report['distinct_titles']}")
+    print(f"Clusters: {report['clusters']} ({report['clustered_titles']} titles)")
+    for cluster in clusters:
+        print(f"\n{cluster['canonical']} ({cluster['rows']} rows)")
+        for variant in cluster["variants"][1:]:
+            print(f"  {variant['rows']:>7}  {variant['title']}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Group a job's cleaned titles into near-duplicate clusters.")
+    parser.add_argument("job_name", help="Job name, e.g., JobTitleClean001")
+    parser.add_argument("--jobs-dir", default="jobs", help="Jobs directory (default: jobs)")
+    parser.add_argument("--top", type=int, default=25, help="Clusters to show, largest first (default: 25)")
+    parser.add_argument("--rules", action="store_true", help="Print suggested misspelling_entries as JSON")
+    args = parser.parse_args()
+    print_clusters(args.job_name, Path(args.jobs_dir), args.top, args.rules)
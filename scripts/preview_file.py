@@ -0,0 +1,41 @@
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from preview import PREVIEW_SAMPLE_SIZE, preview  # noqa: E402
+
+
+def print_preview(input_csv: Path, size: int, seed: int):
+    started = time.perf_counter()
+    result = preview(input_csv, size, seed)
+    elapsed = time.perf_counter() - started
+    kind = "exact" if result["exact"] else "95% interval"
+    print(f"{result['sample_rows']} of {result['total_rows']} rows sampled (seed {seed}) in {elapsed:.2f}s")
+    print(f"{'Outcome':<24} {'Ratio':>7} {kind:>17} {'Projected rows':>16}")
+    for section in ("outcomes", "removed_reasons"):
+        if section == "removed_reasons" and result[section]:
+            print("Removed reasons:")
+        for name, figures in result[section].items():
+            interval = f"{figures['ratio_low']:.1%}-{figures['ratio_high']:.1%}"
+            print(f"{name:<24} {figures['ratio']:>7.1%} {interval:>17} {figures['projected_rows']:>16}")
+    if result["examples"]:
+        print("Examples:")
+    for example in result["examples"]:
+        outcome = example["cleaned"] or f"(removed: {example['removed_reason']})"
+        print(f"{example['index']:>10}  {example['original']} -> {outcome}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Project the outcome of cleaning a CSV from a random sample of its rows, without cleaning it."
+    )
+    parser.add_argument("input_csv", help="CSV of job titles")
+    parser.add_argument(
+        "--sample", type=int, default=PREVIEW_SAMPLE_SIZE, help=f"Rows to sample (default: {PREVIEW_SAMPLE_SIZE})"
+    )
+    parser.add_argument("--seed", type=int, default=0, help="Random seed; the same seed samples the same rows")
+    args = parser.parse_args()
+    print_preview(Path(args.input_csv), args.sample, args.seed)
@@ -0,0 +1,45 @@
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from job_title_cleaning import active_engine, reload_rules  # noqa: E402
+from reclean import reclean_jobs  # noqa: E402
+
+
+def print_reclean(jobs_dir: Path, dry_run: bool, job_names):
+    engine = active_engine()
+    started = time.perf_counter()
+    reports = reclean_jobs(jobs_dir, dry_run=dry_run, job_names=job_names)
+    elapsed = time.perf_counter() - started
+
+    print(f"Ruleset: {engine.name} {engine.label} ({engine.version}); profile jobs use their profile over it")
+    print(f"{'Job':<20} {'Mode':<12} {'Titles':>8} {'Checked':>8} {'Changed':>8} {'Rows changed':>13}")
+    for report in reports:
+        if report["mode"] == "skipped":
+            print(f"{report['job']:<20} {'skipped':<12} {report['error']}")
+            continue
+        print(
+            f"{report['job']:<20} {report['mode']:<12} {report['titles']:>8} {report['titles_checked']:>8}"
+            f" {report['titles_changed']:>8} {report['rows_changed']:>13}"
+        )
+    total_rows = sum(report.get("rows_changed", 0) for report in reports)
+    updated = sum(1 for report in reports if report["mode"] in ("full", "incremental"))
+    verb = "would be updated" if dry_run else "updated"
+    print(f"{updated} of {len(reports)} jobs {verb}; {total_rows} rows changed in {elapsed:.1f}s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Re-clean stored jobs after a ruleset change, touching only titles the change can affect."
+    )
+    parser.add_argument("--jobs-dir", default="jobs", help="Jobs directory (default: jobs)")
+    parser.add_argument("--rules", help="Ruleset file to apply (default: RULES_PATH)")
+    parser.add_argument("--job", action="append", dest="jobs", help="Only this job (repeatable)")
+    parser.add_argument("--dry-run", action="store_true", help="Report what would change without writing")
+    args = parser.parse_args()
+    if args.rules:
+        reload_rules(args.rules)
+    print_reclean(Path(args.jobs_dir), args.dry_run, args.jobs)
@@ -0,0 +1,33 @@
+import argparse
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from job_title_cleaning import load_rule_hits, rule_hit_report  # noqa: E402
+
+
+def print_report(jobs_dir: Path, top: int):
+    paths = sorted(jobs_dir.glob("*/*-rule-hits.json"))
+    if not paths:
+        raise FileNotFoundError(f"No rule hit files found under {jobs_dir}")
+    hits, total_titles = load_rule_hits(paths)
+    report = rule_hit_report(hits, total_titles, top=top)
+
+    print(f"Jobs: {len(paths)}")
+    print(f"Titles cleaned: {report['total_titles']}")
+    print(f"Rules: {report['rules']} ({len(report['never_fired'])} never fired)")
+    print(f"Hottest rules (up to {top}):")
+    for item in report["hot"]:
+        print(f"  {item['hits']:>8}  {item['rate']:7.2%}  {item['rule']!r}")
+    print("Never fired:")
+    for name in report["never_fired"]:
+        print(f"  {name!r}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Report hot and never-fired cleaning rules across stored jobs.")
+    parser.add_argument("--jobs-dir", default="jobs", help="Jobs directory (default: jobs)")
+    parser.add_argument("--top", type=int, default=20, help="Number of hottest rules to list (default: 20)")
+    args = parser.parse_args()
+    print_report(Path(args.jobs_dir), args.top)
@@ -0,0 +1,79 @@
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from job_title_cleaning import RuleEngine, default_threads, read_titles  # noqa: E402
+from ruleset_diff import DIFF_SAMPLES, diff_rulesets, load_tables  # noqa: E402
+
+
+def load_corpus(paths) -> dict:
+    """``{title: rows}`` over every CSV in ``paths``, titles read as uploads are."""
+    occurrences = {}
+    for path in paths:
+        _, originals = read_titles(path)
+        for title in originals:
+            occurrences[title] = occurrences.get(title, 0) + 1
+    return occurrences
+
+
+def print_diff(args):
+    started = time.perf_counter()
+    archive_dir = Path(args.jobs_dir) / "rulesets"
+    engine_a = RuleEngine(load_tables(args.a, archive_dir))
+    engine_b = engine_a.derive(load_tables(args.b, archive_dir))
+    occurrences = load_corpus(args.corpus)
+    caches = []
+    if args.cache:
+        from title_cache import TitleCache
+
+        caches = [TitleCache(args.cache, engine.version) for engine in (engine_a, engine_b)]
+    try:
+        report = diff_rulesets(
+            occurrences, engine_a, engine_b, args.threads or default_threads(), *caches, samples=args.samples
+        )
+    finally:
+        for cache in caches:
+            cache.close()
+    elapsed = time.perf_counter() - started
+    if args.json:
+        Path(args.json).write_text(json.dumps(report, indent=2, ensure_ascii=False), encoding="utf-8")
+
+    print(f"A: {report['a']['label'] or report['a']['name']} ({report['a']['version'][:12]})")
+    print(f"B: {report['b']['label'] or report['b']['name']} ({report['b']['version'][:12]})")
+    print(
+        f"{report['total_rows']} rows, {report['distinct_titles']} distinct titles, {report['titles_checked']} checked"
+        f" ({report['mode']}) in {elapsed:.2f}s"
+    )
+    print(f"Changed: {report['changed_titles']} titles, {report['changed_rows']} rows ({report['changed_share']:.2%})")
+    for kind, counts in report["kinds"].items():
+        if counts["titles"]:
+            print(f"  {kind:<16} {counts['titles']:>8} titles {counts['rows']:>10} rows")
+    print(f"{'Rule':<48} {'Titles':>8} {'Rows':>10}")
+    for rule in report["rules"]:
+        print(f"{rule['rule'][:48]:<48} {rule['titles']:>8} {rule['rows']:>10}")
+        for sample in rule["samples"]:
+            before = sample["a"] or f"(removed: {sample['a_reason']})"
+            after = sample["b"] or f"(removed: {sample['b_reason']})"
+            print(f"    {sample['rows']:>6}x {sample['title']}: {before} -> {after}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Compare two rulesets over a corpus: which titles change, how many rows, and which rules did it."
+    )
+    parser.add_argument("corpus", nargs="+", help="CSV files of job titles")
+    parser.add_argument(
+        "--a", default="current", help="Baseline: rules file, archived version, profile or 'current' (default)"
+    )
+    parser.add_argument("--b", required=True, help="Candidate: rules file, archived version or profile")
+    parser.add_argument("--jobs-dir", default="jobs", help="Jobs directory holding archived rulesets (default: jobs)")
+    parser.add_argument("--cache", help="SQLite title cache to reuse results per ruleset version")
+    parser.add_argument("--threads", type=int, default=1, help="Cleaning threads (0: default for this interpreter)")
+    parser.add_argument("--samples", type=int, default=DIFF_SAMPLES, help="Sample titles per rule")
+    parser.add_argument("--json", help="Also write the full report to this JSON file")
+    args = parser.parse_args()
+    print_diff(args)
@@ -0,0 +1,82 @@
+import argparse
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from job_title_cleaning import default_threads, ruleset_version  # noqa: E402
+from sharding import clean_shard, merge_shards, split_csv  # noqa: E402
+
+
+def print_split(input_csv: Path, shard_dir: Path, shards: int):
+    manifest = split_csv(input_csv, shard_dir, shards)
+    print(f"{'Shard':<12} {'First row':>10} {'Rows':>10}")
+    for shard in manifest["shards"]:
+        print(f"{shard['name']:<12} {shard['first_row'] + 1:>10} {shard['rows']:>10}")
+    print(f"{manifest['total_rows']} rows in {len(manifest['shards'])} shards under {shard_dir}")
+
+
+def print_clean(shard_dir: Path, index: int, args):
+    taxonomy = None
+    if args.classify:
+        from classification import load_taxonomy
+
+        taxonomy = load_taxonomy()
+    options = {
+        "count_rule_hits": args.rule_hits,
+        "include_trace": args.trace,
+        "taxonomy": taxonomy,
+        "checkpoint": args.checkpoint,
+        "threads": args.threads or default_threads(),
+    }
+    if args.cache:
+        from title_cache import TitleCache
+
+        with TitleCache(args.cache, ruleset_version()) as title_cache:
+            output_path, stats = clean_shard(shard_dir, index, cache=title_cache, **options)
+    else:
+        output_path, stats = clean_shard(shard_dir, index, **options)
+    print(
+        f"{output_path}: {stats['total_rows']} rows, {stats['good']} good, {stats['cleaned']} cleaned,"
+        f" {stats['removed']} removed"
+    )
+
+
+def print_merge(shard_dir: Path, output_csv: Path):
+    output_path, stats = merge_shards(shard_dir, output_csv)
+    print(
+        f"{output_path}: {stats['total_rows']} rows, {stats['good']} good, {stats['cleaned']} cleaned,"
+        f" {stats['removed']} removed"
+    )
+    for reason, count in sorted(stats["removed_reasons"].items(), key=lambda kv: -kv[1]):
+        print(f"  {reason:<24} {count:>10}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Clean a large CSV on several machines: split it into shards, clean each shard anywhere, merge."
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+    split = commands.add_parser("split", help="Partition an input CSV into shards of consecutive rows")
+    split.add_argument("input_csv", help="Input CSV")
+    split.add_argument("shard_dir", help="Directory for the shards and their manifest")
+    split.add_argument("--shards", type=int, required=True, help="Number of shards")
+    clean = commands.add_parser("clean", help="Clean one shard (run on any node that can read the shard directory)")
+    clean.add_argument("shard_dir", help="Directory written by split")
+    clean.add_argument("--shard", type=int, required=True, help="Shard number, from 0")
+    clean.add_argument("--rule-hits", action="store_true", help="Count rule hits")
+    clean.add_argument("--trace", action="store_true", help="Add a Trace column")
+    clean.add_argument("--classify", action="store_true", help="Add Function and Seniority columns")
+    clean.add_argument("--checkpoint", action="store_true", help="Write in committed chunks; rerun to resume")
+    clean.add_argument("--cache", help="SQLite title cache local to this node")
+    clean.add_argument("--threads", type=int, default=1, help="Cleaning threads (0: default for this interpreter)")
+    merge = commands.add_parser("merge", help="Reassemble the cleaned shards in row order and combine their stats")
+    merge.add_argument("shard_dir", help="Directory written by split")
+    merge.add_argument("output_csv", help="Merged cleaned CSV")
+    args = parser.parse_args()
+    if args.command == "split":
+        print_split(Path(args.input_csv), Path(args.shard_dir), args.shards)
+    elif args.command == "clean":
+        print_clean(Path(args.shard_dir), args.shard, args)
+    else:
+        print_merge(Path(args.shard_dir), Path(args.output_csv))
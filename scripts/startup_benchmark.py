@@ -0,0 +1,66 @@
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+
+# Each scenario runs in a fresh interpreter, which reports its own wall time and peak RSS.
+PROBE = """
+import json, resource, sys, time
+start = time.perf_counter()
+{code}
+elapsed = time.perf_counter() - start
+print(json.dumps({{
+    "seconds": elapsed,
+    "max_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+    "pandas": "pandas" in sys.modules,
+}}))
+"""
+SCENARIOS = {
+    "interpreter": "pass",
+    "clean_job_title": "import job_title_cleaning\njob_title_cleaning.clean_job_title('Sr. Research Assoc | Lab')",
+    "custom_code": (
+        "import importlib.machinery, importlib.util\n"
+        "loader = importlib.machinery.SourceFileLoader('custom_code', 'hs-custom_code_action.py')\n"
+        "module = importlib.util.module_from_spec(importlib.util.spec_from_loader(loader.name, loader))\n"
+        "loader.exec_module(module)\n"
+        "module.main({'inputFields': {'jobTitle': 'Sr. Research Assoc | Lab'}})"
+    ),
+    "read_titles": "import job_title_cleaning\njob_title_cleaning.read_titles('tests/test_data.csv')",
+}
+
+
+def measure(code: str, runs: int) -> dict:
+    samples = []
+    for _ in range(runs):
+        out = subprocess.run(
+            [sys.executable, "-c", PROBE.format(code=code)], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout
+        samples.append(json.loads(out))
+    return {
+        "seconds": statistics.median(sample["seconds"] for sample in samples),
+        "max_rss_kb": statistics.median(sample["max_rss_kb"] for sample in samples),
+        "pandas": samples[-1]["pandas"],
+    }
+
+
+def print_benchmark(runs: int):
+    print(f"{'Scenario':<18} {'Import+first call':>18} {'Peak RSS':>10}  pandas loaded")
+    for name, code in SCENARIOS.items():
+        result = measure(code, runs)
+        print(
+            f"{name:<18} {result['seconds'] * 1000:>15.1f} ms {result['max_rss_kb'] / 1024:>7.1f} MB  "
+            f"{'yes' if result['pandas'] else 'no'}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Measure process start cost (time to import and make a first call, peak RSS) per entry point."
+    )
+    parser.add_argument("--runs", type=int, default=5, help="Fresh interpreters per scenario (median reported)")
+    args = parser.parse_args()
+    print_benchmark(args.runs)
@@ -0,0 +1,52 @@
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import job_title_cleaning as jtc  # noqa: E402
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+def load_titles(input_csv: Path, copies: int) -> list:
+    """Distinct titles from ``input_csv``, made unique per copy so every thread count cleans the same cold work."""
+    _, originals = jtc.read_titles(input_csv)
+    base = list(dict.fromkeys(originals))
+    return [f"{title} {copy}" if copy else title for copy in range(copies) for title in base]
+
+
+def measure(titles: list, threads: int) -> float:
+    """Titles per second cleaning ``titles`` on ``threads`` threads with a fresh engine (no learned state)."""
+    engine = jtc.active_engine().with_profile(f"bench-{threads}", {})
+    started = time.perf_counter()
+    jtc.clean_job_titles(titles, threads=threads, engine=engine)
+    return len(titles) / (time.perf_counter() - started)
+
+
+def print_benchmark(input_csv: Path, copies: int, thread_counts: list):
+    titles = load_titles(input_csv, copies)
+    gil_enabled = getattr(sys, "_is_gil_enabled", lambda: True)()
+    print(
+        f"Python {sys.version.split()[0]}, GIL {'enabled' if gil_enabled else 'disabled'}, "
+        f"default threads {jtc.default_threads()}, {len(titles)} distinct titles"
+    )
+    print(f"{'Threads':>7} {'Titles/s':>12} {'Speedup':>8}")
+    measure(titles, 1)  # warm the fuzzy lookups the profiles share, so every run starts from the same state
+    baseline = None
+    for threads in thread_counts:
+        rate = measure(titles, threads)
+        baseline = baseline or rate
+        print(f"{threads:>7} {rate:>12.0f} {rate / baseline:>7.2f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Measure cleaning throughput per thread count; threads only scale on free-threaded Python."
+    )
+    parser.add_argument("--input-csv", default=str(ROOT / "tests" / "test_data.csv"), help="CSV of job titles")
+    parser.add_argument("--copies", type=int, default=20, help="Suffixed copies of each title to clean (default: 20)")
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 2, 4, 8], help="Thread counts to compare")
+    args = parser.parse_args()
+    print_benchmark(Path(args.input_csv), args.copies, args.threads)
@@ -1,12 +1,18 @@
 import argparse
-import pandas as pd
+import sys
 from pathlib import Path
 
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from retention import stored_path  # noqa: E402
+
 
 def validate_job(job_name: str, jobs_dir: Path):
     job_folder = jobs_dir / job_name
-    original_path = job_folder / f"{job_name}-original.csv"
-    cleaned_path = job_folder / f"{job_name}-cleaned.csv"
+    original_path = stored_path(job_folder / f"{job_name}-original.csv")
+    cleaned_path = stored_path(job_folder / f"{job_name}-cleaned.csv")
 
     if not original_path.exists() or not cleaned_path.exists():
         raise FileNotFoundError(f"Missing original/cleaned CSV in {job_folder}")
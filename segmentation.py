@@ -0,0 +1,97 @@
+"""Dictionary segmentation of non-Latin titles into translatable terms.
+
+Chinese and Japanese titles are written without spaces and mostly compose a title from known terms:
+"高级工程师" is 高级 (senior) + 工程师 (engineer), "研发部经理" is 研发 (R&D) + 部 (department) + 经理 (manager).
+A character trie over the ``translation_map`` keys finds the longest key starting at each position, so a
+title is segmented in one left-to-right pass whose cost depends on the title length and the longest key,
+not on the number of keys. The terms' translations are joined in order, which matches the modifier-then-head
+order of these titles. ASCII runs (acronyms such as "IT") are kept, separators become spaces or commas, and a
+title with any non-ASCII character that no key covers is not translated at all.
+"""
+import re
+import unicodedata
+
+# Marks the end of a key in a trie node; no title character is the empty string.
+_TERM = ""
+# Separators NFKC leaves non-ASCII.
+_SEPARATORS = {"、": ",", "·": " ", "・": " ", "。": " "}
+_space_before_pattern = re.compile(r'\s+([,)\]])')
+_space_after_pattern = re.compile(r'([(\[])\s+')
+
+
+class TranslationTrie:
+    """Greedy longest-match translation over the non-ASCII keys of a translation map."""
+
+    def __init__(self, translation_map: dict, normalise=None):
+        """``normalise`` is applied to keys, so they match titles that went through the same normalisation."""
+        self.root = {}
+        self.terms = 0
+        for key, translation in translation_map.items():
+            key = (normalise(key) if normalise else key).strip().lower()
+            if not key or any(ch.isascii() for ch in key):
+                continue  # only runs of non-ASCII text are segmented
+            node = self.root
+            for ch in key:
+                node = node.setdefault(ch, {})
+            node[_TERM] = translation
+            self.terms += 1
+
+    def _longest_match(self, text: str, start: int):
+        """``(end, translation)`` of the longest key starting at ``start``, or None."""
+        node = self.root
+        found = None
+        for end in range(start, len(text)):
+            node = node.get(text[end].lower())
+            if node is None:
+                break
+            if _TERM in node:
+                found = (end + 1, node[_TERM])
+        return found
+
+    def segment(self, text: str):
+        """
+        ``[(piece, translation)]`` covering ``text``; ``translation`` is None for ASCII runs and separators.
+        Returns None if some non-ASCII character is not covered by a key.
+        """
+        pieces = []
+        i = 0
+        while i < len(text):
+            ch = text[i]
+            if ch.isascii():
+                j = i + 1
+                while j < len(text) and text[j].isascii():
+                    j += 1
+                pieces.append((text[i:j], None))
+                i = j
+                continue
+            match = self._longest_match(text, i)
+            if match is not None:
+                end, translation = match
+                pieces.append((text[i:end], translation))
+                i = end
+                continue
+            separator = _SEPARATORS.get(ch) or unicodedata.normalize("NFKC", ch)
+            if not separator.isascii() or separator.isalnum():
+                return None
+            if unicodedata.category(ch)[0] in "ZP" or separator.isspace():
+                pieces.append((separator, None))
+                i += 1
+                continue
+            return None
+        return pieces
+
+    def translate(self, text: str):
+        """English title for ``text`` if every non-ASCII term in it is known, else None."""
+        if not self.terms:
+            return None
+        pieces = self.segment(text)
+        if pieces is None or all(translation is None for _, translation in pieces):
+            return None
+        parts = []
+        for piece, translation in pieces:
+            if translation is None:
+                parts.append(piece)
+            else:
+                parts.append(f" {translation} ")
+        text = " ".join("".join(parts).split())
+        return _space_after_pattern.sub(r'\1', _space_before_pattern.sub(r'\1', text))
@@ -0,0 +1,236 @@
+"""Deterministic sharding of large cleaning runs, so several machines can clean one file through plain files.
+
+``split_csv`` partitions an input CSV into shard files of consecutive rows in a shard directory and then writes
+``manifest.json`` with each shard's file, checksum, first global row and row count. Any node that can read the
+directory (a shared mount, or a copy of the manifest and its shard) runs ``clean_shard`` for a shard. It cleans
+with ``clean_csv_file``, numbering rows from the shard's first global row, and leaves ``<shard>.cleaned.csv``
+and ``<shard>.stats.json`` next to it. The stats are written last, so they mark a finished shard.
+``merge_shards`` checks that every shard is finished and was cleaned from the same split with the same ruleset
+and options. It then concatenates the outputs in shard order, which is the input's ``Index`` order, and
+combines the stats. The merged file is byte-identical to cleaning the whole input on one machine.
+
+Shards hold consecutive rows, so merging is a streaming concatenation. Each shard dedupes its own titles, so a
+title found in several shards is cleaned once per shard.
+"""
+import csv
+import json
+import os
+import shutil
+from pathlib import Path
+
+from checkpoint import file_sha256
+from job_analytics import AnalyticsSketch
+from job_title_cleaning import active_engine, clean_csv_file
+
+MANIFEST_NAME = "manifest.json"
+_COPY_CHUNK_SIZE = 1024 * 1024
+
+
+def _write_json(path: Path, data: dict) -> None:
+    tmp_path = path.with_name(f"{path.name}.tmp")
+    tmp_path.write_text(json.dumps(data, ensure_ascii=False, indent=2), encoding="utf-8")
+    os.replace(tmp_path, path)
+
+
+def _read_rows(input_csv):
+    """The header and a generator of data rows of ``input_csv``; blank lines are skipped, as ``read_titles`` does."""
+    f = open(input_csv, newline="", encoding="utf-8-sig")
+    reader = csv.reader(f)
+    header = next(reader, None)
+
+    def rows():
+        with f:
+            for row in reader:
+                if row:
+                    yield row
+
+    return header, rows()
+
+
+def split_csv(input_csv, shard_dir, shards: int) -> dict:
+    """
+    Split ``input_csv`` into up to ``shards`` files of consecutive rows (sizes differ by at most one row) in
+    ``shard_dir`` and return the manifest. Splitting the same file the same way always gives the same shards.
+    Raises ValueError when the input has no rows.
+    """
+    if shards < 1:
+        raise ValueError("Need at least one shard")
+    shard_dir = Path(shard_dir)
+    shard_dir.mkdir(parents=True, exist_ok=True)
+    header, rows = _read_rows(input_csv)
+    total_rows = sum(1 for _ in rows)
+    if header is None or total_rows == 0:
+        raise ValueError("Input has no rows")
+    shards = min(shards, total_rows)
+    base, extra = divmod(total_rows, shards)
+
+    manifest = {
+        "input": Path(input_csv).name,
+        "input_sha256": file_sha256(input_csv),
+        "total_rows": total_rows,
+        "shards": [],
+    }
+    header, rows = _read_rows(input_csv)
+    first_row = 0
+    for index in range(shards):
+        count = base + (1 if index < extra else 0)
+        name = f"shard-{index:05d}"
+        path = shard_dir / f"{name}.csv"
+        with path.open("w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(header)
+            for _ in range(count):
+                writer.writerow(next(rows))
+        manifest["shards"].append(
+            {"name": name, "file": path.name, "sha256": file_sha256(path), "first_row": first_row, "rows": count}
+        )
+        first_row += count
+    _write_json(shard_dir / MANIFEST_NAME, manifest)
+    return manifest
+
+
+def load_manifest(shard_dir) -> dict:
+    """The manifest ``split_csv`` wrote to ``shard_dir``; raises ValueError if there is none."""
+    try:
+        return json.loads((Path(shard_dir) / MANIFEST_NAME).read_text(encoding="utf-8"))
+    except FileNotFoundError:
+        raise ValueError(f"No {MANIFEST_NAME} in {shard_dir}; split the input first") from None
+
+
+def shard_outputs(shard_dir, shard: dict):
+    """``(cleaned_csv, stats_json)`` paths of a manifest ``shard``."""
+    shard_dir = Path(shard_dir)
+    return shard_dir / f"{shard['name']}.cleaned.csv", shard_dir / f"{shard['name']}.stats.json"
+
+
+def clean_shard(
+    shard_dir,
+    index: int,
+    count_rule_hits=False,
+    include_trace=False,
+    cache=None,
+    engine=None,
+    taxonomy=None,
+    checkpoint=False,
+    threads=1,
+):
+    """
+    Clean shard number ``index`` of ``shard_dir`` like ``clean_csv_file`` (same options) and record its stats.
+    Returns ``(output_path, stats)``. Raises ValueError for an unknown shard or a shard file that differs from
+    the one split (e.g. a partial copy).
+    """
+    manifest = load_manifest(shard_dir)
+    if not 0 <= index < len(manifest["shards"]):
+        raise ValueError(f"No shard {index}; the split has {len(manifest['shards'])}")
+    shard = manifest["shards"][index]
+    shard_path = Path(shard_dir) / shard["file"]
+    if file_sha256(shard_path) != shard["sha256"]:
+        raise ValueError(f"{shard['file']} does not match the manifest")
+    if engine is None:
+        engine = active_engine()
+    output_path, stats_path = shard_outputs(shard_dir, shard)
+    stats_path.unlink(missing_ok=True)  # the shard is unfinished until its new stats are written
+
+    _, stats = clean_csv_file(
+        shard_path,
+        output_path,
+        count_rule_hits=count_rule_hits,
+        include_trace=include_trace,
+        cache=cache,
+        engine=engine,
+        taxonomy=taxonomy,
+        checkpoint=checkpoint,
+        threads=threads,
+        row_offset=shard["first_row"],
+        analytics_state=True,
+    )
+    _write_json(
+        stats_path,
+        {
+            "shard": shard["name"],
+            "sha256": shard["sha256"],
+            "ruleset_version": engine.version,
+            "options": {
+                "rule_hits": count_rule_hits,
+                "trace": include_trace,
+                "taxonomy_version": taxonomy.version if taxonomy is not None else None,
+            },
+            "stats": stats,
+        },
+    )
+    return output_path, stats
+
+
+def _shard_records(shard_dir, manifest: dict) -> list:
+    """Each shard's stats record, checked to come from this split with one ruleset and one set of options."""
+    records, unfinished = [], []
+    for shard in manifest["shards"]:
+        _, stats_path = shard_outputs(shard_dir, shard)
+        try:
+            records.append(json.loads(stats_path.read_text(encoding="utf-8")))
+        except FileNotFoundError:
+            unfinished.append(shard["name"])
+    if unfinished:
+        raise ValueError(f"Shards not cleaned yet: {', '.join(unfinished)}")
+    for shard, record in zip(manifest["shards"], records):
+        if record["sha256"] != shard["sha256"] or record["stats"]["total_rows"] != shard["rows"]:
+            raise ValueError(f"{shard['name']} was cleaned from another split")
+        for name in ("ruleset_version", "options"):
+            if record[name] != records[0][name]:
+                raise ValueError(f"{shard['name']} was cleaned with other {name.replace('_', ' ')} than the first")
+    return records
+
+
+def combine_stats(shard_stats: list) -> dict:
+    """
+    Job stats of the whole input from each shard's ``clean_csv_file`` stats (with ``analytics_state``). The
+    analytics come from the shards' merged sketches, so distinct counts are estimates.
+    """
+    stats = {"total_rows": 0, "good": 0, "cleaned": 0, "removed": 0, "removed_reasons": {}}
+    analytics = AnalyticsSketch()
+    for part in shard_stats:
+        for name in ("total_rows", "good", "cleaned", "removed"):
+            stats[name] += part[name]
+        for reason, count in part["removed_reasons"].items():
+            stats["removed_reasons"][reason] = stats["removed_reasons"].get(reason, 0) + count
+        analytics.merge(AnalyticsSketch.from_dict(part["analytics_state"]))
+    stats["analytics"] = analytics.summary()
+    if "rule_hits" in shard_stats[0]:
+        stats["rule_hits"] = {}
+        stats["title_rule_hits"] = {}
+        for part in shard_stats:
+            for name, count in part["rule_hits"].items():
+                stats["rule_hits"][name] = stats["rule_hits"].get(name, 0) + count
+            stats["title_rule_hits"].update(part["title_rule_hits"])
+    if "cache_hits" in shard_stats[0]:
+        # Counted per distinct title of each shard.
+        for name in ("cache_hits", "cache_misses"):
+            stats[name] = sum(part.get(name, 0) for part in shard_stats)
+    return stats
+
+
+def merge_shards(shard_dir, output_csv):
+    """
+    Concatenate the cleaned shards of ``shard_dir`` into ``output_csv`` in row order and combine their stats.
+    Returns ``(output_path, stats)``. Raises ValueError if a shard is unfinished or does not belong with the
+    others; ``output_csv`` is only replaced once the merge is complete.
+    """
+    manifest = load_manifest(shard_dir)
+    records = _shard_records(shard_dir, manifest)
+    output_path = Path(output_csv)
+    tmp_path = output_path.with_name(f"{output_path.name}.tmp")
+    header = None
+    with tmp_path.open("wb") as out:
+        for shard in manifest["shards"]:
+            cleaned_path, _ = shard_outputs(shard_dir, shard)
+            with cleaned_path.open("rb") as f:
+                shard_header = f.readline()
+                if header is None:
+                    header = shard_header
+                    out.write(header)
+                elif shard_header != header:
+                    tmp_path.unlink()
+                    raise ValueError(f"{cleaned_path.name} has other columns than the first shard")
+                shutil.copyfileobj(f, out, _COPY_CHUNK_SIZE)
+    os.replace(tmp_path, output_path)
+    return output_path, combine_stats([record["stats"] for record in records])
@@ -1,7 +1,20 @@
 import sys
 from pathlib import Path
 
+import pytest
+
 # Ensure project root is on sys.path for test imports
 ROOT = Path(__file__).resolve().parents[1]
 if str(ROOT) not in sys.path:
     sys.path.insert(0, str(ROOT))
+
+
+@pytest.fixture()
+def client(tmp_path):
+    """Test client of an app storing jobs under this test's tmp_path, without the background threads."""
+    from app import create_app
+
+    app = create_app(tmp_path / "jobs", background_tasks=False)
+    app.config["TESTING"] = True
+    with app.test_client() as client:
+        yield client
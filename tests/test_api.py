@@ -1,20 +1,9 @@
 import io
 import json
 import os
+import threading
 from pathlib import Path
 
-import pytest
-
-
-@pytest.fixture()
-def client(tmp_path, monkeypatch):
-    monkeypatch.setenv("JOBS_DIR", str(tmp_path / "jobs"))
-    from app import app  # import after setting env
-
-    app.config["TESTING"] = True
-    with app.test_client() as client:
-        yield client
-
 
 def upload_sample(client):
     data = "Original Job Title\ncto\nn/a\nCEO\n"
@@ -73,3 +62,12 @@ def test_validate_with_nonstandard_header(client):
     payload = val_resp.get_json()
     assert payload["job"] == job_name
     assert payload["changed_rows"] >= 1
+
+
+def test_app_stores_jobs_where_it_was_created(client, tmp_path):
+    import app as app_module
+
+    assert upload_sample(client).status_code == 200
+    assert app_module.JOBS_DIR == tmp_path / "jobs"
+    assert json.loads((tmp_path / "jobs" / "jobs.json").read_text())[0]["name"] == "JobTitleClean001"
+    assert not any(thread.name in ("resume-interrupted-jobs", "retention") for thread in threading.enumerate())
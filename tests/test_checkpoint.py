@@ -0,0 +1,229 @@
+import csv
+import io
+import json
+from pathlib import Path
+
+import pytest
+
+import checkpoint
+import job_title_cleaning as jtc
+from checkpoint import Checkpoint, CheckpointBusy
+from classification import load_taxonomy
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+def upload(client, data: str, **fields):
+    return client.post(
+        "/api/upload",
+        data={"file": (io.BytesIO(data.encode()), "big.csv"), **fields},
+        content_type="multipart/form-data",
+    )
+
+
+def write_input(path: Path) -> Path:
+    with (ROOT / "tests" / "test_data.csv").open(encoding="utf-8-sig", newline="") as f:
+        titles = [row[0] for row in csv.reader(f) if row]
+    with path.open("w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["Job Title", "Row"])
+        for idx, title in enumerate(titles * 3):
+            writer.writerow([title, idx])
+    return path
+
+
+def crash_after(monkeypatch, commits: int):
+    """Make the next checkpointed run die after ``commits`` commits, leaving half a chunk written."""
+    original = Checkpoint.commit
+    calls = []
+
+    def commit(self, rows, state):
+        original(self, rows, state)
+        calls.append(rows)
+        if len(calls) == commits:
+            self.output.write("Half,Written,Row")
+            self.output.flush()
+            raise KeyboardInterrupt
+
+    monkeypatch.setattr(Checkpoint, "commit", commit)
+
+
+@pytest.mark.parametrize("options", [{}, {"include_trace": True, "count_rule_hits": True, "classify": True}])
+def test_checkpointed_run_matches_plain_run(tmp_path, options):
+    source = write_input(tmp_path / "in.csv")
+    if options.pop("classify", False):
+        options["taxonomy"] = load_taxonomy()
+    _, expected = jtc.clean_csv_file(source, tmp_path / "plain.csv", **options)
+    _, stats = jtc.clean_csv_file(source, tmp_path / "chunked.csv", checkpoint=True, chunk_rows=37, **options)
+    assert (tmp_path / "chunked.csv").read_bytes() == (tmp_path / "plain.csv").read_bytes()
+    assert stats == expected
+    assert sorted(path.name for path in tmp_path.iterdir()) == [
+        "chunked.csv",
+        "chunked.csv.checkpoint.lock",
+        "in.csv",
+        "plain.csv",
+    ]
+
+
+def test_interrupted_run_resumes_from_last_commit(tmp_path, monkeypatch):
+    source = write_input(tmp_path / "in.csv")
+    taxonomy = load_taxonomy()
+    _, expected = jtc.clean_csv_file(source, tmp_path / "plain.csv", include_trace=True, taxonomy=taxonomy)
+
+    output = tmp_path / "out.csv"
+    with monkeypatch.context() as patch:
+        crash_after(patch, 3)
+        with pytest.raises(KeyboardInterrupt):
+            jtc.clean_csv_file(source, output, include_trace=True, taxonomy=taxonomy, checkpoint=True, chunk_rows=37)
+    assert not output.exists()
+    marker = json.loads((tmp_path / "out.csv.checkpoint.json").read_text())
+    assert marker["rows"] == 3 * 37
+
+    cleaned = []
+    clean = jtc.clean_job_title_with_reason
+
+    def counting_clean(title, *args, **kwargs):
+        cleaned.append(title)
+        return clean(title, *args, **kwargs)
+
+    monkeypatch.setattr(jtc, "clean_job_title_with_reason", counting_clean)
+    _, stats = jtc.clean_csv_file(source, output, include_trace=True, taxonomy=taxonomy, checkpoint=True, chunk_rows=37)
+    assert output.read_bytes() == (tmp_path / "plain.csv").read_bytes()
+    assert stats == expected
+    originals = jtc.read_titles(source)[1]
+    # Titles of committed chunks come from the journal instead of being cleaned again.
+    assert not set(cleaned) & set(originals[: 3 * 37])
+    assert not (tmp_path / "out.csv.checkpoint.json").exists()
+    assert not (tmp_path / "out.csv.partial").exists()
+
+
+def test_checkpoint_of_other_options_is_not_reused(tmp_path, monkeypatch):
+    source = write_input(tmp_path / "in.csv")
+    jtc.clean_csv_file(source, tmp_path / "plain.csv")
+    with monkeypatch.context() as patch:
+        crash_after(patch, 2)
+        with pytest.raises(KeyboardInterrupt):
+            jtc.clean_csv_file(source, tmp_path / "out.csv", include_trace=True, checkpoint=True, chunk_rows=37)
+    jtc.clean_csv_file(source, tmp_path / "out.csv", checkpoint=True, chunk_rows=37)
+    assert (tmp_path / "out.csv").read_bytes() == (tmp_path / "plain.csv").read_bytes()
+
+
+def test_busy_checkpoint_is_refused(tmp_path):
+    source = write_input(tmp_path / "in.csv")
+    output = tmp_path / "out.csv"
+    with Checkpoint(output, {}):
+        with pytest.raises(CheckpointBusy):
+            jtc.clean_csv_file(source, output, checkpoint=True)
+    jtc.clean_csv_file(source, output, checkpoint=True)
+    assert output.exists()
+
+
+def test_file_sha256(tmp_path):
+    path = tmp_path / "data.bin"
+    path.write_bytes(b"abc")
+    assert checkpoint.file_sha256(path) == "ba7816bf8f01cfea414140de5dae2223b00361a396177a9cb410ff61f20015ad"
+
+
+def test_resume_api_finishes_interrupted_job(client, monkeypatch):
+    import app as app_module
+
+    data = "Original Job Title\n" + "\n".join(["Sr Analyst", "n/a", "Head|Sales", "ceo", "Lead Sientist"] * 20) + "\n"
+    job = upload(client, data, trace="1").get_json()["job"]
+    folder = app_module.JOBS_DIR / job["name"]
+    cleaned_path = folder / job["cleaned_filename"]
+    expected = cleaned_path.read_bytes()
+
+    # Re-create the state of a worker that died mid-job: listed as running, output only partly committed.
+    cleaned_path.unlink()
+    job_entry = dict(job, status="running")
+    app_module.update_job(job_entry)
+    with monkeypatch.context() as patch:
+        crash_after(patch, 1)
+        with pytest.raises(KeyboardInterrupt):
+            jtc.clean_csv_file(
+                folder / job["original_filename"],
+                cleaned_path,
+                count_rule_hits=True,
+                include_trace=True,
+                engine=jtc.active_engine(),
+                checkpoint=True,
+                chunk_rows=10,
+            )
+    resumed = []
+    load = Checkpoint.load
+
+    def recording_load(self):
+        state = load(self)
+        resumed.append(state and state["rows"])
+        return state
+
+    monkeypatch.setattr(Checkpoint, "load", recording_load)
+
+    resp = client.post(f"/api/jobs/{job['name']}/resume")
+    assert resp.status_code == 200
+    assert resumed == [10]  # continued after the committed chunk (with the default chunk size)
+    body = resp.get_json()
+    assert body["job"]["status"] == "complete"
+    # Cache counts depend on what earlier runs left in the shared title cache.
+    ignored = {"cache_hits", "cache_misses"}
+    assert {k: v for k, v in body["job"]["stats"].items() if k not in ignored} == {
+        k: v for k, v in job["stats"].items() if k not in ignored
+    }
+    assert body["download_url"] == f"/api/download/{job['name']}"
+    assert cleaned_path.read_bytes() == expected
+    listed = next(item for item in client.get("/api/jobs").get_json()["jobs"] if item["name"] == job["name"])
+    assert listed["status"] == "complete"
+
+    # Completed jobs are left alone.
+    assert client.post(f"/api/jobs/{job['name']}/resume").status_code == 200
+    assert client.post("/api/jobs/JobTitleClean999/resume").status_code == 404
+    assert client.post("/api/jobs/bad/resume").status_code == 400
+
+
+def test_restarted_worker_resumes_running_jobs(client):
+    import app as app_module
+
+    job = upload(client, "Original Job Title\nSr Analyst\nceo\n").get_json()["job"]
+    cleaned_path = app_module.JOBS_DIR / job["name"] / job["cleaned_filename"]
+    expected = cleaned_path.read_bytes()
+    cleaned_path.unlink()
+    app_module.update_job(dict(job, status="running"))
+
+    assert app_module.resume_interrupted_jobs() == [job["name"]]
+    assert cleaned_path.read_bytes() == expected
+    assert app_module.resume_interrupted_jobs() == []
+
+
+def test_job_is_locked_before_it_is_listed_as_running(client, monkeypatch):
+    import app as app_module
+
+    job = upload(client, "Original Job Title\nSr Analyst\nceo\n").get_json()["job"]
+    seen = []
+
+    def clean_while_another_worker_starts(*args, **kwargs):
+        # A worker starting now finds the job running, but cannot take it over.
+        seen.append((app_module.find_job(job["name"])["status"], app_module.resume_interrupted_jobs()))
+        raise CheckpointBusy("the output is being cleaned elsewhere")
+
+    monkeypatch.setattr(app_module, "clean_csv_file", clean_while_another_worker_starts)
+    job_entry = dict(job, status="new")
+    with pytest.raises(CheckpointBusy):
+        app_module.run_job(job_entry, jtc.active_engine())
+    assert seen == [("running", [])]
+
+    with app_module.job_lock(job["name"]):
+        assert client.post(f"/api/jobs/{job['name']}/resume").status_code == 409
+        assert app_module.resume_interrupted_jobs() == []
+
+
+def test_upload_answers_409_when_its_job_is_taken_over(client, monkeypatch):
+    import app as app_module
+
+    def busy(*args, **kwargs):
+        raise CheckpointBusy("the output is being cleaned elsewhere")
+
+    monkeypatch.setattr(app_module, "clean_csv_file", busy)
+    resp = upload(client, "Original Job Title\nSr Analyst\n")
+    assert resp.status_code == 409
+    body = resp.get_json()
+    assert body["progress_url"] == f"/api/jobs/{body['job']['name']}/progress"
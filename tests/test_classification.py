@@ -0,0 +1,117 @@
+import csv
+import importlib.machinery
+import importlib.util
+import io
+import json
+from pathlib import Path
+
+import pytest
+
+from classification import Taxonomy, load_taxonomy
+from job_title_cleaning import clean_csv_file
+
+TAXONOMY = {
+    "functions": {
+        "Research": ["research", "scientist"],
+        "Lab": ["laboratory", "lab manager"],
+        "Sales": ["sales"],
+    },
+    "seniority": [
+        {"level": "C-level", "terms": ["chief", "ceo"]},
+        {"level": "VP", "terms": ["vice president"]},
+        {"level": "Director", "terms": ["director", "head"]},
+        {"level": "Manager", "terms": ["manager"]},
+        {"level": "Senior", "terms": ["senior"]},
+        {"level": "Junior", "terms": ["assistant", "research associate"]},
+    ],
+    "phrases": {"assistant professor": ["Research", None]},
+}
+
+
+def load_custom_code():
+    path = Path(__file__).resolve().parent.parent / "hs-custom_code_action.py"
+    loader = importlib.machinery.SourceFileLoader("custom_code", str(path))
+    spec = importlib.util.spec_from_loader(loader.name, loader)
+    module = importlib.util.module_from_spec(spec)
+    loader.exec_module(module)
+    return module
+
+
+@pytest.mark.parametrize(
+    "title,expected",
+    [
+        ("Senior Research Scientist", ("Research", "Senior")),
+        ("Vice President of Sales", ("Sales", "VP")),  # "vice president" wins over its words
+        ("Lab Manager", ("Lab", "Manager")),  # phrase takes the seniority of its words
+        ("Research Associate", ("Research", "Junior")),
+        ("Assistant Professor", ("Research", "")),  # explicit phrase overrides "assistant"
+        ("Head of Laboratory Research Scientists", ("Research", "Director")),  # most terms, plural
+        ("Sales Laboratory", ("Sales", "")),  # tie goes to the earliest term
+        ("Chief Executive", ("", "C-level")),
+        ("Gardener", ("", "")),
+        (None, ("", "")),
+    ],
+)
+def test_classify(title, expected):
+    assert Taxonomy(TAXONOMY).classify(title) == expected
+
+
+def test_default_taxonomy():
+    taxonomy = load_taxonomy()
+    assert taxonomy.classify("Chief Executive Officer") == ("Executive", "C-level")
+    assert taxonomy.classify("Senior Software Engineer") == ("Engineering", "Senior")
+    assert taxonomy.classify("Clinical Research Associate") == ("Clinical", "Junior")
+    assert taxonomy.classify("Postdoctoral Researcher") == ("Research", "Junior")
+    assert load_taxonomy() is taxonomy  # compiled once per file version
+
+
+def test_clean_csv_file_adds_function_and_seniority(tmp_path):
+    input_path = tmp_path / "input.csv"
+    input_path.write_text("Job Title\nsr research scientist\nn/a\nceo\nsr research scientist\n", encoding="utf-8")
+    output_path = tmp_path / "output.csv"
+    clean_csv_file(input_path, output_path, taxonomy=load_taxonomy())
+    with output_path.open(encoding="utf-8-sig", newline="") as f:
+        rows = list(csv.DictReader(f))
+    assert [(row["Function"], row["Seniority"]) for row in rows] == [
+        ("Research", "Senior"),
+        ("", ""),
+        ("Executive", "C-level"),
+        ("Research", "Senior"),
+    ]
+
+    clean_csv_file(input_path, output_path)
+    with output_path.open(encoding="utf-8-sig", newline="") as f:
+        assert "Function" not in next(csv.reader(f))
+
+
+def test_upload_and_explain_classify(client):
+    import app as app_module
+
+    data = "Job Title\nsr lab manager\n"
+    resp = client.post(
+        "/api/upload",
+        data={"file": (io.BytesIO(data.encode()), "classify.csv"), "classify": "1"},
+        content_type="multipart/form-data",
+    )
+    job = resp.get_json()["job"]
+    assert job["options"]["classify"] is True
+    assert job["options"]["taxonomy_version"] == load_taxonomy().version
+    with (app_module.JOBS_DIR / job["name"] / job["cleaned_filename"]).open(encoding="utf-8-sig", newline="") as f:
+        (row,) = list(csv.DictReader(f))
+    assert (row["Function"], row["Seniority"]) == ("Lab", "Manager")
+
+    explained = client.get("/api/explain?title=VP%20Sales&classify=1").get_json()
+    assert (explained["function"], explained["seniority"]) == ("Sales", "VP")
+    assert "function" not in client.get("/api/explain?title=VP%20Sales").get_json()
+
+
+def test_custom_code_action_classifies_like_the_app():
+    custom_code = load_custom_code()
+    taxonomy = load_taxonomy()
+    for title in ["Senior Research Scientist", "Lab Managers", "Chief Executive Officer", "Sales", "Gardener"]:
+        assert custom_code.classify_title(title) == taxonomy.classify(title)
+
+    event = {"inputFields": {"jobTitle": "sr lab tech", "classifyTitle": "true"}}
+    fields = custom_code.main(event)["outputFields"]
+    assert (fields["function"], fields["seniority"]) == taxonomy.classify(fields["newTitle"])
+    assert "function" not in custom_code.main({"inputFields": {"jobTitle": "sr lab tech"}})["outputFields"]
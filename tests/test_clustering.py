@@ -0,0 +1,69 @@
+import io
+
+from clustering import cluster_report, cluster_titles, titles_match
+
+
+def test_titles_match():
+    assert titles_match("senior research associate", "senior research assoc")
+    assert titles_match("senior researcher associate", "senior research associate")
+    assert titles_match("clinical data manager", "clinical dta manager") is False  # short words need an exact/prefix match
+    assert titles_match("clinical laboratory manager", "clinical labratory manager")
+    assert titles_match("manager research", "research manager")
+    assert not titles_match("senior research associate", "senior research assistant")
+    assert not titles_match("research associate", "senior research associate")
+
+
+def test_cluster_titles_picks_most_frequent_variant():
+    counts = {
+        "Senior Research Associate": 10,
+        "Senior Research Assoc": 3,
+        "Senior Researcher Associate": 2,
+        "Senior Research Assistant": 4,
+        "Lab Manager": 3,
+        "北京": 2,
+        "北京大学": 1,
+    }
+    (cluster,) = cluster_titles(counts)
+    assert cluster["canonical"] == "Senior Research Associate"
+    assert cluster["rows"] == 15
+    assert [variant["title"] for variant in cluster["variants"]] == [
+        "Senior Research Associate",
+        "Senior Research Assoc",
+        "Senior Researcher Associate",
+    ]
+    assert cluster["suggested_rules"] == [
+        ["Senior Research Assoc", "Senior Research Associate", "full"],
+        ["Senior Researcher Associate", "Senior Research Associate", "full"],
+    ]
+
+
+def test_cluster_report_scales_past_pairwise():
+    titles = []
+    for i in range(3000):
+        titles += [f"Project Manager {i}", f"Project Managr {i}", f"Site {i} Coordinator"]
+    report = cluster_report(titles + ["", ""], top=5)
+    assert report["distinct_titles"] == 9000
+    # Numbers differ between clusters, so every number yields one manager/managr pair and nothing else.
+    assert report["clusters"] == 3000
+    assert report["clustered_titles"] == 6000
+    assert len(report["top"]) == 5
+
+
+def test_clusters_endpoint(client):
+    rows = ["Senior Research Associate"] * 3 + ["Senior Research Assoc", "Director", "n/a"]
+    data = "Original Job Title\n" + "\n".join(rows) + "\n"
+    resp = client.post(
+        "/api/upload",
+        data={"file": (io.BytesIO(data.encode()), "clusters.csv")},
+        content_type="multipart/form-data",
+    )
+    job = resp.get_json()["job"]
+
+    report = client.get(f"/api/clusters/{job['name']}").get_json()
+    assert report["job"] == job["name"]
+    assert report["clusters"] == 1
+    assert report["top"][0]["canonical"] == "Senior Research Associate"
+    assert client.get(f"/api/clusters/{job['name']}").get_json() == report  # served from the stored report
+
+    assert client.get("/api/clusters/JobTitleClean999").status_code == 404
+    assert client.get("/api/clusters/../etc").status_code in (400, 404)
@@ -121,3 +121,14 @@ def test_main_handles_exception():
     assert output["outcome"] == "error"
     assert output["error_state"] == 1
     assert output["newTitle"] == ""
+
+
+def test_main_rule_profile():
+    default = custom_code.main({"inputFields": {"jobTitle": "PI"}})["outputFields"]
+    research = custom_code.main({"inputFields": {"jobTitle": "PI", "ruleProfile": "research"}})["outputFields"]
+    assert default["newTitle"] == "Primary Investigator"
+    assert research["newTitle"] == "Principal Investigator"
+
+    unknown = custom_code.main({"inputFields": {"jobTitle": "PI", "ruleProfile": "nope"}})["outputFields"]
+    assert unknown["outcome"] == "error"
+    assert "Unknown rule profile" in unknown["error"]
@@ -0,0 +1,51 @@
+import csv
+import random
+from pathlib import Path
+
+import job_title_cleaning as jtc
+from job_title_cleaning import clean_job_title_with_reason
+
+ROOT = Path(__file__).resolve().parents[1]
+
+# Characters that switch individual stages on or off, including non-ASCII look-alikes.
+_ALPHABET = list("abcdefghijklmnopqrstuvwxyzASDIKOP 0123456789") + list(
+    "&@_-|/\\\"'`.,;:!?()[]{}<>\t\n\xa0–—ſİKéü博士“”"
+)
+_WORDS = ["And", "and", "Post", "doc", "Doc", "other -", "phd", "Sr", "Lab", "iv", "2nd", "&amp;", "ceo", "x@y.com"]
+
+
+def _corpus():
+    titles = []
+    for name in ("tests/test_data.csv", "feedback1.csv"):
+        with (ROOT / name).open(encoding="utf-8-sig", newline="") as f:
+            titles.extend(cell for row in csv.reader(f) for cell in row)
+    rng = random.Random(11)
+    for _ in range(4000):
+        parts = []
+        for _ in range(rng.randint(1, 4)):
+            if rng.random() < 0.5:
+                parts.append(rng.choice(_WORDS))
+            else:
+                parts.append("".join(rng.choice(_ALPHABET) for _ in range(rng.randint(1, 8))))
+        titles.append(rng.choice([" ", "", "-", "/"]).join(parts))
+    return titles
+
+
+def test_fast_path_matches_full_pipeline():
+    titles = _corpus()
+    expected = [clean_job_title_with_reason(t, fast_path=False) for t in titles]
+    # Two passes: the second one also exercises canonical titles learned during the first.
+    for _ in range(2):
+        assert [clean_job_title_with_reason(t) for t in titles] == expected
+
+
+def test_canonical_titles_are_fixed_points():
+    for title in list(jtc.active_engine().canonical_titles):
+        assert clean_job_title_with_reason(title, fast_path=False) == (title, "")
+
+
+def test_canonical_title_is_learned():
+    title = "Principal Platform Cartographer"
+    jtc.active_engine().canonical_titles.discard(title)
+    assert clean_job_title_with_reason(title) == (title, "")
+    assert title in jtc.active_engine().canonical_titles
@@ -0,0 +1,101 @@
+import random
+
+import job_title_cleaning as jtc
+from fuzzy_correction import DICTIONARY_PATH, FuzzyCorrector, osa_distance
+from job_title_cleaning import clean_job_title_with_reason
+
+VOCABULARY = ["researcher", "research", "trainee", "trainer", "manager", "scientist", "advisor", "analyst", "chair"]
+
+
+def test_lookup():
+    fuzzy = FuzzyCorrector(VOCABULARY, max_distance=2, min_word_length=5, protected_words=["lecteur"])
+    assert fuzzy.lookup("reseacher") == "researcher"
+    assert fuzzy.lookup("sceintist") == "scientist"  # transposition counts as one edit
+    assert fuzzy.lookup("manger") == "manager"
+    assert fuzzy.lookup("manageer") == "manager"
+    assert fuzzy.lookup("managr") == "manager"
+    assert fuzzy.lookup("mangr") is None  # two edits, but short words only get one
+    assert fuzzy.lookup("trainex") is None  # trainee and trainer tie
+    assert fuzzy.lookup("researcher") is None  # already canonical
+    assert fuzzy.lookup("managers") is None  # plural of a vocabulary word
+    assert fuzzy.lookup("mngr") is None  # shorter than min_word_length
+    assert fuzzy.lookup("lecteur") is None  # protected
+
+
+def test_lookup_matches_linear_scan():
+    fuzzy = FuzzyCorrector(VOCABULARY, max_distance=2)
+    rng = random.Random(1)
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    for _ in range(2000):
+        word = list(rng.choice(VOCABULARY))
+        for _ in range(rng.randint(0, 3)):
+            op = rng.randrange(3)
+            pos = rng.randrange(len(word))
+            if op == 0:
+                word[pos] = rng.choice(letters)
+            elif op == 1 and len(word) > 1:
+                del word[pos]
+            else:
+                word.insert(pos, rng.choice(letters))
+        word = "".join(word)
+        limit = 2 if len(word) >= 8 else 1
+        distances = {candidate: osa_distance(word, candidate, limit) for candidate in VOCABULARY}
+        best = min(distances.values())
+        closest = [candidate for candidate, distance in distances.items() if distance == best]
+        expected = closest[0] if best <= limit and len(closest) == 1 else None
+        if len(word) < 5 or word in VOCABULARY or fuzzy._is_plural(word):
+            expected = None
+        assert fuzzy.lookup(word) == expected, word
+
+
+def test_correct_keeps_case():
+    fuzzy = FuzzyCorrector(VOCABULARY)
+    hits = {}
+    assert fuzzy.correct("Junior reseacher / ANALIST-Trinee", hits) == "Junior researcher / ANALYST-Trainee"
+    assert hits == {"fuzzy:researcher": 1, "fuzzy:analyst": 1, "fuzzy:trainee": 1}
+
+
+def fuzzy_engine(**settings):
+    return jtc.active_engine().with_profile("fuzzy", {"fuzzy": {"enabled": True, **settings}})
+
+
+def test_pipeline_corrects_typos():
+    engine = fuzzy_engine()
+    trace = []
+    hits = {}
+    assert clean_job_title_with_reason("Junior reseacher", hits, trace, engine=engine) == ("Junior Researcher", "")
+    assert hits == {"fuzzy:researcher": 1}
+    assert {"stage": "fuzzy_correction", "before": "Junior reseacher", "after": "Junior researcher"} in trace
+    # Explicit rules still win, and words in other languages are protected.
+    assert clean_job_title_with_reason("Lecteur", engine=engine)[0] == "Lecturer"
+    assert clean_job_title_with_reason("Technicien de Laboratoire", engine=engine)[0] == "Technicien de Laboratoire"
+
+
+def test_dictionary_words_are_never_corrected():
+    titles = [
+        "Senior Oncologist",
+        "Minister of Health",
+        "Reader in Chemistry",
+        "Waiter",
+        "Waiters",
+        "Preacher",
+        "Consulting Engineer",
+        "Translate",
+    ]
+    for engine in (fuzzy_engine(), fuzzy_engine(max_distance=2)):
+        for title in titles:
+            assert clean_job_title_with_reason(title, engine=engine) == (title, ""), title
+    fuzzy = FuzzyCorrector(VOCABULARY, dictionary_path=DICTIONARY_PATH)
+    assert fuzzy.lookup("manger") is None  # a word in its own right
+    assert fuzzy.lookup("reseacher") == "researcher"
+
+
+def test_fuzzy_correction_is_opt_in():
+    base = jtc.active_engine()
+    assert clean_job_title_with_reason("Junior reseacher", engine=base)[0] == "Junior Reseacher"
+    assert base.fuzzy.max_distance == 0 and not base.fuzzy.dictionary
+    engine = fuzzy_engine()
+    assert engine.version != base.version
+    assert engine.fuzzy.max_distance == 1
+    same = base.with_profile("same", {"abbreviation_map": {"pi": "Principal investigator"}})
+    assert same.fuzzy is base.fuzzy
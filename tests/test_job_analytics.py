@@ -0,0 +1,100 @@
+import io
+import json
+import random
+
+from job_analytics import HEAVY_HITTER_CAPACITY, AnalyticsSketch, HyperLogLog, JobAnalytics
+from job_title_cleaning import clean_csv_file
+
+
+def test_counts_are_exact_for_many_distinct_titles():
+    rng = random.Random(5)
+    stream = ["Engineer"] * 5000 + ["Manager"] * 3000 + [f"Title {i}" for i in range(20000)]
+    rng.shuffle(stream)
+    analytics = JobAnalytics()
+    for title in stream:
+        analytics.add(title, title.upper(), "cleaned")
+    summary = analytics.summary(top=3)
+    assert summary["top_titles"] == [["Engineer", 5000], ["Manager", 3000], ["Title 0", 1]]
+    assert summary["distinct_titles"] == summary["distinct_cleaned_titles"] == 20002
+
+
+def test_merged_analytics_match_single_pass():
+    rows = [("Sr Engineer", "Senior Engineer", "cleaned")] * 3 + [("n/a", "", "junk_value"), ("CEO", "CEO", "unchanged")]
+    whole, first, second = JobAnalytics(), JobAnalytics(), JobAnalytics()
+    for index, row in enumerate(rows):
+        whole.add(*row)
+        (first if index % 2 else second).add(*row)
+    first.merge(second)
+    assert first.summary() == whole.summary()
+
+
+def test_sketch_survives_a_json_round_trip_and_merges():
+    analytics = JobAnalytics()
+    for index in range(2000):
+        analytics.add(f"Title {index % 700}", f"Cleaned {index % 300}", "cleaned")
+    analytics.add("n/a", "", "junk_value")
+    sketch = AnalyticsSketch.from_dict(json.loads(json.dumps(analytics.sketch().to_dict())))
+    summary, exact = sketch.summary(), analytics.summary()
+    assert summary["top_cleaned_titles"] == exact["top_cleaned_titles"]
+    assert summary["top_titles_error"] == 6  # rows of the 257th most frequent cleaned title
+    for name in ("reasons", "title_lengths", "cleaned_lengths"):
+        assert summary[name] == exact[name]
+    assert abs(summary["distinct_titles"] - 701) <= 701 * 0.05
+    sketch.merge(analytics.sketch())
+    assert sketch.summary()["reasons"] == {"cleaned": 4000, "junk_value": 2}
+    assert sketch.summary()["top_cleaned_titles"][0] == ["Cleaned 0", 14]
+
+
+def test_sketch_size_does_not_grow_with_distinct_titles():
+    sizes = []
+    for distinct in (1_000, 50_000):
+        analytics = JobAnalytics()
+        for index in range(distinct):
+            analytics.add(f"Title {index:06d}", f"Cleaned {index:06d}", "cleaned", rows=1 + index % 7)
+        sketch = analytics.sketch()
+        assert len(sketch.top_titles.counts) == len(sketch.top_cleaned.counts) == HEAVY_HITTER_CAPACITY
+        assert abs(sketch.summary()["distinct_titles"] - distinct) <= distinct * 0.05
+        sizes.append(len(json.dumps(sketch.to_dict())))
+    assert sizes[1] < sizes[0] * 1.01
+
+
+def test_hyperloglog_estimates_and_merges():
+    left, right = HyperLogLog(), HyperLogLog()
+    for i in range(30000):
+        left.add(f"title {i}")
+    for i in range(20000, 50000):
+        right.add(f"title {i}")
+    assert abs(left.count() - 30000) < 30000 * 0.05
+    left.merge(right)
+    assert abs(left.count() - 50000) < 50000 * 0.05
+    small = HyperLogLog()
+    for title in ["a", "b", "c", "a"]:
+        small.add(title)
+    assert small.count() == 3
+
+
+def test_clean_csv_file_reports_analytics(tmp_path):
+    input_path = tmp_path / "input.csv"
+    input_path.write_text("Job Title\nsr engineer\nsr engineer\nSenior Engineer\nn/a\nCEO\n\n", encoding="utf-8")
+    _, stats = clean_csv_file(input_path, tmp_path / "output.csv")
+    analytics = stats["analytics"]
+    assert analytics["distinct_titles"] == 4
+    assert analytics["distinct_cleaned_titles"] == 2
+    assert analytics["top_titles"][0] == ["sr engineer", 2]
+    assert analytics["top_cleaned_titles"][0] == ["Senior Engineer", 3]
+    assert sum(analytics["reasons"].values()) == stats["total_rows"]
+    assert analytics["reasons"]["junk_value"] == 1
+    assert analytics["title_lengths"]["buckets"]["10-19"] == 3
+    assert analytics["cleaned_lengths"]["max"] == len("Chief Executive Officer")
+
+
+def test_jobs_endpoint_includes_analytics(client):
+    data = "Job Title\nsr engineer\nDirector\nn/a\n"
+    resp = client.post(
+        "/api/upload",
+        data={"file": (io.BytesIO(data.encode()), "analytics.csv")},
+        content_type="multipart/form-data",
+    )
+    name = resp.get_json()["job"]["name"]
+    job = next(job for job in client.get("/api/jobs").get_json()["jobs"] if job["name"] == name)
+    assert job["stats"]["analytics"]["reasons"] == {"cleaned": 1, "junk_value": 1, "unchanged": 1}
@@ -0,0 +1,141 @@
+import io
+import json
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from job_listing import JobListing, encode_cursor, parse_time
+
+START = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+
+def write_jobs(path, count: int, start: int = 1) -> list:
+    jobs = json.loads(path.read_text()) if path.exists() else []
+    for num in range(start, start + count):
+        jobs.append(
+            {
+                "name": f"JobTitleClean{num:03d}",
+                "status": "error" if num % 3 == 0 else "complete",
+                "created_at": (START + timedelta(hours=num)).isoformat(),
+            }
+        )
+    path.write_text(json.dumps(jobs))
+    return jobs
+
+
+def all_pages(listing, limit, **filters) -> list:
+    names, cursor = [], None
+    while True:
+        jobs, cursor = listing.page(listing.version()[0], cursor=cursor, limit=limit, **filters)
+        assert len(jobs) <= limit
+        names.extend(job["name"] for job in jobs)
+        if cursor is None:
+            return names
+
+
+def test_pages_cover_every_job_once_in_order(tmp_path):
+    path = tmp_path / "jobs.json"
+    jobs = write_jobs(path, 1001)
+    listing = JobListing(path)
+    names = [job["name"] for job in jobs]
+
+    assert all_pages(listing, 50) == names[::-1]
+    assert all_pages(listing, 7, sort="created_at") == names
+    assert all_pages(listing, 1000, sort="name")[998:1000] == ["JobTitleClean999", "JobTitleClean1000"]
+    assert all_pages(listing, 1001, sort="-name")[:2] == ["JobTitleClean1001", "JobTitleClean1000"]
+
+
+def test_filters_by_status_and_creation_time(tmp_path):
+    path = tmp_path / "jobs.json"
+    write_jobs(path, 30)
+    listing = JobListing(path)
+    assert all_pages(listing, 4, statuses={"error"}) == [f"JobTitleClean{num:03d}" for num in range(30, 0, -3)]
+    since = parse_time((START + timedelta(hours=10)).isoformat())
+    until = parse_time("2026-01-01T20:00:00")
+    assert all_pages(listing, 3, sort="created_at", since=since, until=until) == [
+        f"JobTitleClean{num:03d}" for num in range(10, 20)
+    ]
+    assert all_pages(listing, 3, statuses={"expired"}) == []
+
+
+def test_new_jobs_do_not_shift_later_pages(tmp_path):
+    path = tmp_path / "jobs.json"
+    write_jobs(path, 10)
+    listing = JobListing(path)
+    first, cursor = listing.page(listing.version()[0], limit=4)
+    assert [job["name"][-3:] for job in first] == ["010", "009", "008", "007"]
+    write_jobs(path, 5, start=11)
+    second, _ = listing.page(listing.version()[0], cursor=cursor, limit=4)
+    assert [job["name"][-3:] for job in second] == ["006", "005", "004", "003"]
+
+
+def test_job_list_is_parsed_once_per_version(tmp_path):
+    path = tmp_path / "jobs.json"
+    write_jobs(path, 5)
+    decorated = []
+    listing = JobListing(path, decorated.append)
+    for _ in range(3):
+        listing.page(listing.version()[0], limit=2)
+    assert len(decorated) == 5
+    write_jobs(path, 1, start=6)
+    listing.page(listing.version()[0], limit=2)
+    assert len(decorated) == 11
+
+
+def test_bad_sorts_and_cursors_are_rejected(tmp_path):
+    path = tmp_path / "jobs.json"
+    write_jobs(path, 3)
+    listing = JobListing(path)
+    version = listing.version()[0]
+    for options in (
+        {"sort": "status"},
+        {"cursor": "not-a-cursor"},
+        {"cursor": encode_cursor("name", (16, "JobTitleClean001"))},  # issued for another sort
+        {"cursor": encode_cursor("created_at", ("x", 1, 2))},
+    ):
+        with pytest.raises(ValueError):
+            listing.page(version, **options)
+    missing = JobListing(tmp_path / "missing.json")
+    assert missing.version() == ("none", None)
+    assert missing.page("none") == ([], None)
+
+
+def test_jobs_endpoint_pages_and_revalidates(client):
+    def upload():
+        return client.post(
+            "/api/upload",
+            data={"file": (io.BytesIO(b"Original Job Title\nSr Analyst\n"), "listing.csv")},
+            content_type="multipart/form-data",
+        ).get_json()["job"]["name"]
+
+    upload()
+    newest = upload()
+    resp = client.get("/api/jobs?limit=1")
+    assert resp.status_code == 200
+    body = resp.get_json()
+    assert [job["name"] for job in body["jobs"]] == [newest]
+    assert body["jobs"][0]["created_at_display"]
+    assert body["next_cursor"]
+    assert resp.headers["Cache-Control"] == "no-cache"
+    assert resp.headers["Last-Modified"]
+    etag = resp.headers["ETag"]
+
+    second = client.get(f"/api/jobs?limit=1&cursor={body['next_cursor']}").get_json()["jobs"]
+    assert second[0]["name"] != newest
+
+    unchanged = client.get("/api/jobs?limit=1", headers={"If-None-Match": etag})
+    assert unchanged.status_code == 304
+    assert unchanged.data == b""
+    assert unchanged.headers["ETag"] == etag
+    assert client.get("/api/jobs?limit=2", headers={"If-None-Match": etag}).status_code == 200
+
+    latest = upload()
+    changed = client.get("/api/jobs?limit=1", headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["ETag"] != etag
+    assert changed.get_json()["jobs"][0]["name"] == latest
+
+    listed = client.get("/api/jobs?status=complete&since=2000-01-01&sort=-name&limit=500").get_json()["jobs"]
+    assert latest in [job["name"] for job in listed]
+    for query in ("limit=0", "limit=x", "limit=501", "sort=size", "cursor=zzz", "since=yesterday"):
+        assert client.get(f"/api/jobs?{query}").status_code == 400, query
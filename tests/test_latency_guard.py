@@ -0,0 +1,112 @@
+import importlib.machinery
+import importlib.util
+import random
+import time
+from pathlib import Path
+
+import pytest
+
+import job_title_cleaning as jtc
+from job_title_cleaning import clean_job_title_with_reason, truncate_title
+
+# Per-title bounds, generous for slow CI machines; before the guard some of these inputs took seconds.
+GUARDED_SECONDS = 0.02
+UNGUARDED_SECONDS = 0.5
+
+
+def load_custom_code():
+    path = Path(__file__).resolve().parent.parent / "hs-custom_code_action.py"
+    loader = importlib.machinery.SourceFileLoader("custom_code", str(path))
+    spec = importlib.util.spec_from_loader(loader.name, loader)
+    module = importlib.util.module_from_spec(spec)
+    loader.exec_module(module)
+    return module
+
+
+def _pathological_inputs():
+    rng = random.Random(7)
+    return {
+        "paragraph": "Senior software engineer and manager of the data team / lead " * 300,
+        "email_local_part": ("a." * 5000 + "@") * 3,
+        "at_signs": "a@" * 10000,
+        "roman_like": "ab i " * 5000,
+        "slashes": "abcd/" * 5000,
+        "ands": "x And " * 5000,
+        "noise": "".join(rng.choice("!@#$%^&*()_+-=ab ") for _ in range(20000)),
+        "cjk": "经理" * 10000,
+        "digits": "1 " * 10000,
+        "long_word": "a" * 20000,
+    }
+
+
+def _worst_seconds(title, engine, repeat=3):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        clean_job_title_with_reason(title, engine=engine)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def test_oversized_titles_are_rejected():
+    limit = jtc.active_engine().max_title_length
+    assert clean_job_title_with_reason("Engineer " * 100) == (None, "too_long")
+    title = ("Lab Manager " * 50)[:limit]
+    assert clean_job_title_with_reason(title)[1] != "too_long"
+    assert clean_job_title_with_reason(f"  {title}  ")[1] != "too_long"  # measured after stripping
+
+    trace = []
+    clean_job_title_with_reason("x" * (limit + 1), trace=trace)
+    assert trace == [{"stage": "too_long", "before": "x" * (limit + 1), "after": None}]
+
+
+def test_truncate_policy_cuts_at_a_word_boundary():
+    limits = {"max_title_length": 40, "oversize_policy": "truncate"}
+    engine = jtc.active_engine().with_profile("truncate", {"limits": limits})
+    assert engine.version != jtc.active_engine().version
+    title = "Senior Research Scientist at the Institute of Molecular Biology"
+    assert clean_job_title_with_reason(title, engine=engine) == ("Senior Research Scientist at The", "")
+
+    trace = []
+    clean_job_title_with_reason(title, engine=engine, trace=trace)
+    assert trace[0] == {"stage": "truncate", "before": title, "after": "Senior Research Scientist at the"}
+
+
+def test_truncate_title():
+    assert truncate_title("Lab Manager", 20) == "Lab Manager"
+    assert truncate_title("Lab Manager of things", 13) == "Lab Manager"
+    assert truncate_title("Lab Manager", 11) == "Lab Manager"
+    assert truncate_title("Lab Management", 10) == "Lab Manage"  # the only space would keep less than half
+    assert truncate_title("x" * 50, 10) == "x" * 10
+
+
+def test_invalid_oversize_policy_is_rejected():
+    with pytest.raises(ValueError):
+        jtc.active_engine().with_profile("bad", {"limits": {"oversize_policy": "ignore"}})
+
+
+@pytest.mark.parametrize("name", sorted(_pathological_inputs()))
+def test_pathological_inputs_have_bounded_latency(name):
+    title = _pathological_inputs()[name]
+    assert _worst_seconds(title, jtc.active_engine()) < GUARDED_SECONDS
+    truncating = jtc.active_engine().with_profile("truncate", {"limits": {"oversize_policy": "truncate"}})
+    assert _worst_seconds(title, truncating) < GUARDED_SECONDS
+    # Without the guard every stage still runs in time linear in the input.
+    unguarded = jtc.active_engine().with_profile("unguarded", {"limits": {"max_title_length": 0}})
+    assert _worst_seconds(title, unguarded, repeat=1) < UNGUARDED_SECONDS
+
+
+def test_bounded_email_pattern_still_removes_addresses():
+    assert clean_job_title_with_reason("Data Analyst jane.doe@example.org") == ("Data Analyst", "")
+    assert clean_job_title_with_reason("first.last+tag@mail.example.co.uk") == (None, "empty")
+
+
+def test_custom_code_action_applies_the_limits():
+    custom_code = load_custom_code()
+    assert custom_code.limits == jtc.DEFAULT_LIMITS
+    assert custom_code.clean_job_title_with_reason("Engineer " * 100) == (None, "too_long")
+    start = time.perf_counter()
+    result = custom_code.main({"inputFields": {"jobTitle": ("a." * 5000 + "@") * 3}})
+    assert time.perf_counter() - start < GUARDED_SECONDS
+    assert result["outputFields"]["outcome"] == "removed"
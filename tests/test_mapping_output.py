@@ -0,0 +1,68 @@
+import csv
+from pathlib import Path
+
+import pytest
+
+from classification import load_taxonomy
+from job_title_cleaning import clean_csv_file
+
+TEST_DATA = Path(__file__).with_name("test_data.csv")
+
+
+def read_csv(path: Path) -> list:
+    with path.open(newline="", encoding="utf-8-sig") as f:
+        return list(csv.DictReader(f))
+
+
+def test_mapping_and_row_ids_reproduce_the_row_output(tmp_path):
+    _, row_stats = clean_csv_file(TEST_DATA, tmp_path / "rows.csv", include_trace=True)
+    _, stats = clean_csv_file(
+        TEST_DATA,
+        tmp_path / "mapping.csv",
+        include_trace=True,
+        output_format="mapping",
+        row_ids_csv=tmp_path / "ids.csv",
+    )
+    rows = read_csv(tmp_path / "rows.csv")
+    mapping = {entry["Mapping Id"]: entry for entry in read_csv(tmp_path / "mapping.csv")}
+    row_ids = read_csv(tmp_path / "ids.csv")
+
+    assert stats.pop("mapping_rows") == len(mapping) < len(rows)
+    assert stats == row_stats
+    assert [entry["Index"] for entry in row_ids] == [row["Index"] for row in rows]
+    assert list(mapping) == [str(num) for num in range(1, len(mapping) + 1)]
+    assert sum(int(entry["Occurrences"]) for entry in mapping.values()) == len(rows)
+    for row, row_id in zip(rows, row_ids):
+        entry = mapping[row_id["Mapping Id"]]
+        for column in ("Original Job Title", "Cleaned Job Title", "Has Changed", "Removed Reason", "Trace"):
+            assert entry[column] == row[column], column
+    assert (tmp_path / "mapping.csv").stat().st_size < (tmp_path / "rows.csv").stat().st_size
+
+
+def test_raw_variants_get_their_own_mapping(tmp_path):
+    source = tmp_path / "input.csv"
+    source.write_text("Job Title\nSr Analyst\nn/a\n Sr Analyst\nSr Analyst\nCEO\n", encoding="utf-8")
+    _, stats = clean_csv_file(source, tmp_path / "mapping.csv", output_format="mapping", taxonomy=load_taxonomy())
+    mapping = read_csv(tmp_path / "mapping.csv")
+    assert [(entry["Original Job Title"], entry["Occurrences"]) for entry in mapping] == [
+        ("Sr Analyst", "2"),
+        ("n/a", "1"),
+        (" Sr Analyst", "1"),
+        ("CEO", "1"),
+    ]
+    assert mapping[0]["Cleaned Job Title"] == mapping[2]["Cleaned Job Title"] == "Senior Analyst"
+    assert (mapping[1]["Cleaned Job Title"], mapping[1]["Removed Reason"]) == ("", "junk_value")
+    assert mapping[0]["Seniority"] and "Trace" not in mapping[0]
+    assert (stats["total_rows"], stats["removed"], stats["mapping_rows"]) == (5, 1, 4)
+    assert not (tmp_path / "ids.csv").exists()
+
+
+def test_mapping_output_options_are_checked(tmp_path):
+    for options in (
+        {"output_format": "mapping", "checkpoint": True},
+        {"output_format": "parquet"},
+        {"row_ids_csv": tmp_path / "ids.csv"},
+    ):
+        with pytest.raises(ValueError):
+            clean_csv_file(TEST_DATA, tmp_path / "out.csv", **options)
+    assert not (tmp_path / "out.csv").exists() and not (tmp_path / "ids.csv").exists()
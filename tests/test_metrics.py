@@ -0,0 +1,81 @@
+import io
+import json
+import os
+
+from metrics import MetricsRegistry
+
+
+def test_registry_renders_prometheus_text(tmp_path):
+    registry = MetricsRegistry(tmp_path)
+    rows = registry.counter("rows_total", "Rows.", ("outcome",))
+    latency = registry.histogram("latency_seconds", "Latency.", buckets=(0.1, 1.0))
+    in_flight = registry.gauge("in_flight", "Jobs.")
+
+    rows.inc(3, outcome="cleaned")
+    latency.observe(0.5)
+    in_flight.inc()
+
+    text = registry.render()
+    assert "# TYPE rows_total counter" in text
+    assert 'rows_total{outcome="cleaned"} 3' in text
+    assert 'latency_seconds_bucket{le="0.1"} 0' in text
+    assert 'latency_seconds_bucket{le="1"} 1' in text
+    assert 'latency_seconds_bucket{le="+Inf"} 1' in text
+    assert "latency_seconds_count 1" in text
+    assert "in_flight 1" in text
+
+
+def test_registry_merges_other_processes(tmp_path):
+    registry = MetricsRegistry(tmp_path)
+    rows = registry.counter("rows_total", "Rows.", ("outcome",))
+    in_flight = registry.gauge("in_flight", "Jobs.")
+    rows.inc(2, outcome="removed")
+    in_flight.inc()
+
+    # A worker that has since exited: its counters still count, its gauges do not.
+    dead_pid = 2**22 + 7
+    (tmp_path / f"metrics-{dead_pid}.json").write_text(
+        json.dumps({"rows_total": {json.dumps(["removed"]): 5}, "in_flight": {"[]": 4}})
+    )
+
+    text = registry.render()
+    assert 'rows_total{outcome="removed"} 7' in text
+    assert "in_flight 1" in text
+    # The exited worker's file is folded into the merged file, so the totals hold without it.
+    assert not (tmp_path / f"metrics-{dead_pid}.json").exists()
+    assert 'rows_total{outcome="removed"} 7' in registry.render()
+
+
+def test_registry_keeps_forked_and_reused_pid_updates(tmp_path):
+    # A file under our own pid, left before our first write, is an exited process's (pid reuse).
+    (tmp_path / f"metrics-{os.getpid()}.json").write_text(json.dumps({"rows_total": {"[]": 5}}))
+    registry = MetricsRegistry(tmp_path, flush_interval=60)
+    rows = registry.counter("rows_total", "Rows.")
+    rows.inc()
+    rows.inc()
+    assert json.loads((tmp_path / f"metrics-{os.getpid()}.json").read_text()) == {"rows_total": {"[]": 1}}
+
+    pid = os.fork()
+    if pid == 0:
+        rows.inc(10)
+        registry.flush()
+        os._exit(0)
+    os.waitpid(pid, 0)
+    assert "rows_total 17" in registry.render()
+
+
+def test_metrics_endpoint_reports_job(client):
+    data = "Original Job Title\ncto\nn/a\nCEO\n"
+    resp = client.post(
+        "/api/upload",
+        data={"file": (io.BytesIO(data.encode()), "sample.csv")},
+        content_type="multipart/form-data",
+    )
+    assert resp.status_code == 200
+    client.get("/api/jobs")
+
+    text = client.get("/metrics").get_data(as_text=True)
+    assert 'jobtitle_request_duration_seconds_count{endpoint="upload"}' in text
+    assert 'jobtitle_requests_total{endpoint="jobs",status="200"}' in text
+    assert 'jobtitle_rows_removed_total{reason="junk_value"}' in text
+    assert "jobtitle_jobs_in_flight 0" in text
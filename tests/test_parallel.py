@@ -0,0 +1,83 @@
+import sys
+import threading
+from pathlib import Path
+
+import job_title_cleaning as jtc
+
+TEST_DATA = Path(__file__).with_name("test_data.csv")
+
+
+def fresh_engine(name: str):
+    return jtc.active_engine().with_profile(name, {})
+
+
+def test_clean_job_titles_matches_sequential_cleaning():
+    _, originals = jtc.read_titles(TEST_DATA)
+    titles = originals + ["Reserch Scientist", "Sr. Analyst", "Reserch Scientist"]
+    expected = [jtc.clean_job_title_with_reason(title) for title in titles]
+    assert jtc.clean_job_titles(titles, threads=4, engine=fresh_engine("parallel-4")) == expected
+    assert jtc.clean_job_titles(titles) == expected
+    assert jtc.clean_job_titles([], threads=4) == []
+
+
+def test_csv_output_does_not_depend_on_thread_count(tmp_path):
+    outputs = {}
+    for threads in (1, 3):
+        output = tmp_path / f"cleaned-{threads}.csv"
+        _, stats = jtc.clean_csv_file(
+            TEST_DATA,
+            output,
+            count_rule_hits=True,
+            include_trace=True,
+            engine=fresh_engine(f"csv-{threads}"),
+            checkpoint=True,
+            chunk_rows=200,
+            threads=threads,
+        )
+        outputs[threads] = (output.read_bytes(), stats)
+    assert outputs[3] == outputs[1]
+
+
+def test_threads_share_one_engine():
+    engine = fresh_engine("shared")
+    titles = [f"Sr Reserch Analyst {num}" for num in range(300)] + ["PI | R&D", "n/a", "高级工程师"]
+    expected = [jtc.clean_job_title_with_reason(title) for title in titles]
+    results, errors = [], []
+
+    def work():
+        try:
+            results.append(jtc.clean_job_titles(titles, threads=2, engine=engine))
+        except Exception as exc:  # pragma: no cover - reported below
+            errors.append(exc)
+
+    workers = [threading.Thread(target=work) for _ in range(4)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    assert errors == []
+    assert results == [expected] * 4
+
+
+def test_learn_keeps_what_workers_found():
+    engine = jtc.active_engine().with_profile("learn", {"fuzzy": {"enabled": True}})
+    scratch = jtc.CleaningScratch(frozenset(engine.canonical_titles))
+    title = "Principal Platform Cartographer"
+    assert jtc.clean_job_title_with_reason(title, engine=engine, scratch=scratch) == (title, "")
+    cleaned, _ = jtc.clean_job_title_with_reason("Laboratory Coordinatr", engine=engine, scratch=scratch)
+    assert cleaned == "Laboratory Coordinator"
+    assert title in scratch.canonical_titles
+    assert title not in engine.canonical_titles
+    assert scratch.fuzzy_memo["coordinatr"] == "coordinator"
+    assert "coordinatr" not in engine.fuzzy._memo
+
+    engine.learn(scratch)
+    assert title in engine.canonical_titles
+    assert engine.fuzzy._memo["coordinatr"] == "coordinator"
+
+
+def test_default_threads():
+    if getattr(sys, "_is_gil_enabled", lambda: True)():
+        assert jtc.default_threads() == 1
+    else:
+        assert jtc.default_threads() >= 1
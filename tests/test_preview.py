@@ -0,0 +1,90 @@
+import csv
+import io
+from collections import Counter
+from pathlib import Path
+
+import pytest
+
+from job_title_cleaning import clean_csv_file, read_titles
+from preview import preview, sample_titles, wilson_interval
+
+TEST_DATA = Path(__file__).with_name("test_data.csv")
+
+
+def test_sample_is_uniform_and_reproducible():
+    source = "Job Title\n" + "".join(f"Title {num}\n" for num in range(50))
+    counts = Counter()
+    for seed in range(2000):
+        sample, total_rows = sample_titles(io.StringIO(source), 5, seed)
+        assert total_rows == 50
+        assert [number for number, _ in sample] == sorted(number for number, _ in sample)
+        counts.update(number for number, _ in sample)
+    assert sum(counts.values()) == 10000
+    assert min(counts.values()) > 140 and max(counts.values()) < 260  # 200 expected per row
+    assert sample_titles(io.StringIO(source), 5, 7) == sample_titles(io.StringIO(source), 5, 7)
+
+
+def test_titles_come_from_the_cleaned_column(tmp_path):
+    path = tmp_path / "input.csv"
+    path.write_text('﻿Company,Job Title\nAcme,"  Sr. Analyst, Finance "\n\nBeta\n', encoding="utf-8")
+    assert sample_titles(path, 10) == ([(0, "Sr. Analyst, Finance"), (1, "")], 2)
+    path.write_text("Job Title\n", encoding="utf-8")
+    with pytest.raises(ValueError):
+        sample_titles(path)
+
+
+def test_full_sample_is_exact(tmp_path):
+    _, stats = clean_csv_file(TEST_DATA, tmp_path / "cleaned.csv")
+    result = preview(TEST_DATA, 10_000)
+    assert result["exact"] and result["sample_rows"] == result["total_rows"] == stats["total_rows"]
+    for outcome in ("good", "cleaned", "removed"):
+        figures = result["outcomes"][outcome]
+        assert figures["projected_rows"] == figures["projected_rows_low"] == stats[outcome]
+    assert {reason: figures["sampled"] for reason, figures in result["removed_reasons"].items()} == (
+        stats["removed_reasons"]
+    )
+    assert all(example["original"] != example["cleaned"] for example in result["examples"])
+
+
+def test_intervals_cover_the_full_run(tmp_path):
+    _, titles = read_titles(TEST_DATA)
+    path = tmp_path / "large.csv"
+    with path.open("w", newline="", encoding="utf-8") as f:
+        csv.writer(f).writerows([["Job Title"]] + [[titles[num % len(titles)]] for num in range(20_000)])
+    _, stats = clean_csv_file(path, tmp_path / "cleaned.csv")
+    result = preview(path, 800, seed=3)
+    assert result["total_rows"] == 20_000 and not result["exact"]
+    for outcome in ("good", "cleaned", "removed"):
+        figures = result["outcomes"][outcome]
+        assert figures["projected_rows_low"] <= stats[outcome] <= figures["projected_rows_high"], outcome
+    assert wilson_interval(0, 100, 1000)[0] == 0.0
+    low, high = wilson_interval(50, 100, 10**9)
+    assert 0.40 < low < 0.41 and 0.59 < high < 0.60
+
+
+def test_preview_endpoint(client):
+    data = "Job Title\n" + "Sr Analyst\nn/a\nCEO\n" * 500
+    resp = client.post(
+        "/api/preview",
+        data={"file": (io.BytesIO(data.encode()), "big.csv"), "sample": "60", "seed": "4"},
+        content_type="multipart/form-data",
+    )
+    assert resp.status_code == 200
+    body = resp.get_json()
+    assert (body["filename"], body["total_rows"], body["sample_rows"]) == ("big.csv", 1500, 60)
+    assert sum(figures["sampled"] for figures in body["outcomes"].values()) == 60
+    assert set(body["removed_reasons"]) == {"junk_value"}
+
+    def post(name, content, **fields):
+        return client.post(
+            "/api/preview",
+            data={"file": (io.BytesIO(content), name), **fields},
+            content_type="multipart/form-data",
+        )
+
+    assert post("big.csv", data.encode(), sample="0").status_code == 400
+    assert post("big.csv", data.encode(), seed="x").status_code == 400
+    assert post("big.txt", data.encode()).status_code == 400
+    assert post("empty.csv", b"").status_code == 400
+    assert post("latin1.csv", "Job Title\nGérant\n".encode("latin-1")).status_code == 400
+    assert client.post("/api/preview").status_code == 400
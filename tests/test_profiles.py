@@ -0,0 +1,97 @@
+import io
+import json
+
+import pytest
+
+import job_title_cleaning as jtc
+from job_title_cleaning import apply_overlay, clean_job_title_with_reason, profile_engine
+
+
+@pytest.fixture()
+def profiles_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(jtc, "RULES_PROFILES_DIR", tmp_path / "profiles")
+    (tmp_path / "profiles").mkdir()
+    return tmp_path / "profiles"
+
+
+def test_apply_overlay():
+    tables = {
+        "junk_values": ["n/a", "none"],
+        "abbreviation_map": {"pi": "Primary investigator", "vp": "Vice president"},
+        "abbreviation_entries": [("Sr ", "Senior ", "partial"), ("Lab ", "Laboratory ", "partial")],
+    }
+    overlay = {
+        "junk_values": {"add": ["tbd"], "remove": ["none"]},
+        "abbreviation_map": {"pi": "Principal investigator", "vp": None},
+        "abbreviation_entries": [["sr ", "Senior-Level ", "partial"], ["Lab ", None, "partial"], ["Mgr", "Manager", "partial"]],
+    }
+    merged = apply_overlay(tables, overlay)
+    assert merged["junk_values"] == ["n/a", "tbd"]
+    assert merged["abbreviation_map"] == {"pi": "Principal investigator"}
+    assert merged["abbreviation_entries"] == [("sr ", "Senior-Level ", "partial"), ("Mgr", "Manager", "partial")]
+    assert tables["abbreviation_map"]["vp"] == "Vice president"  # base tables are left alone
+
+
+def test_profile_shares_base_engine():
+    base = jtc.active_engine()
+    research = profile_engine("research")
+    assert profile_engine("research") is research
+    assert profile_engine("") is base
+    assert research.profile == "research"
+    assert research.version != base.version
+
+    assert clean_job_title_with_reason("PI") == ("Primary Investigator", "")
+    assert clean_job_title_with_reason("PI", engine=research) == ("Principal Investigator", "")
+    assert clean_job_title_with_reason("Lab Tech", engine=research) == ("Lab Technician", "")
+
+    base_rules = {id(rule) for rule in base.misspelling_rules + base.abbreviation_rules}
+    own = [rule for rule in research.misspelling_rules + research.abbreviation_rules if id(rule) not in base_rules]
+    assert [rule["name"] for rule in own] == ["abbreviation:pi"]
+    assert research.junk_values is base.junk_values
+
+    with pytest.raises(KeyError):
+        profile_engine("missing")
+    with pytest.raises(KeyError):
+        profile_engine("../default")
+
+
+def test_profile_file_edits_are_picked_up(profiles_dir):
+    path = profiles_dir / "sales.json"
+    path.write_text(json.dumps({"abbreviation_map": {"ae": "Account executive"}}))
+    first = profile_engine("sales")
+    assert clean_job_title_with_reason("AE", engine=first) == ("Account Executive", "")
+    assert jtc.profile_names() == ["sales"]
+
+    path.write_text(json.dumps({"abbreviation_map": {"ae": "Account Executive (Sales)"}}))
+    second = profile_engine("sales")
+    assert second is not first
+    assert clean_job_title_with_reason("AE", engine=second)[0] == "Account Executive (Sales)"
+
+
+def test_profile_per_request(client):
+    explained = client.post("/api/explain", json={"title": "PI", "profile": "research"}).get_json()
+    assert explained["cleaned"] == "Principal Investigator"
+    assert client.get("/api/explain?title=PI").get_json()["cleaned"] == "Primary Investigator"
+
+    info = client.get("/api/rules?profile=research").get_json()
+    assert info["profile"] == "research"
+    assert "research" in info["profiles"]
+
+    resp = client.post(
+        "/api/upload",
+        data={"file": (io.BytesIO(b"Original Job Title\nPI\n"), "pi.csv"), "profile": "research"},
+        content_type="multipart/form-data",
+    )
+    assert resp.status_code == 200
+    job = resp.get_json()["job"]
+    assert job["options"] == {"trace": False, "profile": "research"}
+    assert job["ruleset_version"] == profile_engine("research").version
+
+    resp = client.post(
+        "/api/upload",
+        data={"file": (io.BytesIO(b"Original Job Title\nPI\n"), "pi.csv"), "profile": "nope"},
+        content_type="multipart/form-data",
+    )
+    assert resp.status_code == 400
+    assert "Unknown rule profile" in resp.get_json()["error"]
+    assert client.get("/api/explain?title=PI&profile=nope").status_code == 400
@@ -0,0 +1,196 @@
+import csv
+import io
+import json
+from pathlib import Path
+
+import job_title_cleaning as jtc
+from checkpoint import Checkpoint
+from progress import ProgressReporter, read_progress, write_progress
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+def upload(client, data: str, **fields):
+    return client.post(
+        "/api/upload",
+        data={"file": (io.BytesIO(data.encode()), "progress.csv"), **fields},
+        content_type="multipart/form-data",
+    )
+
+
+def events(resp) -> list:
+    assert resp.status_code == 200
+    assert resp.mimetype == "text/event-stream"
+    return [
+        json.loads(line[len("data: ") :]) for line in resp.get_data(as_text=True).splitlines() if line.startswith("data: ")
+    ]
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_reporter_throttles_and_estimates():
+    clock = FakeClock()
+    published = []
+    reporter = ProgressReporter(published.append, interval=0.5, clock=clock)
+
+    reporter(0, 1000, {})
+    clock.now += 0.1
+    reporter(100, 1000, {"good": 60, "cleaned": 30, "removed": 10})  # within the interval: dropped
+    clock.now += 0.9
+    reporter(200, 1000, {"good": 120, "cleaned": 60, "removed": 20})
+    clock.now += 0.1
+    reporter(1000, 1000, {"good": 600, "cleaned": 300, "removed": 100})  # final: always published
+
+    assert [snapshot["rows_done"] for snapshot in published] == [0, 200, 1000]
+    assert published[0]["eta_seconds"] is None
+    assert published[1] == {
+        "rows_done": 200,
+        "total_rows": 1000,
+        "percent": 20.0,
+        "rows_per_second": 200,
+        "eta_seconds": 4.0,
+        "elapsed_seconds": 1.0,
+        "good": 120,
+        "cleaned": 60,
+        "removed": 20,
+    }
+    assert published[2]["eta_seconds"] == 0.0
+
+
+def test_resumed_run_rates_count_only_new_rows():
+    clock = FakeClock()
+    published = []
+    reporter = ProgressReporter(published.append, interval=0, clock=clock)
+    reporter(500, 1000, {})
+    clock.now += 2
+    reporter(700, 1000, {})
+    assert published[-1]["rows_per_second"] == 100
+    assert published[-1]["eta_seconds"] == 3.0
+
+
+def test_clean_csv_file_reports_each_chunk(tmp_path):
+    with (ROOT / "tests" / "test_data.csv").open(encoding="utf-8-sig", newline="") as f:
+        titles = [row[0] for row in csv.reader(f) if row]
+    source = tmp_path / "in.csv"
+    with source.open("w", encoding="utf-8", newline="") as f:
+        csv.writer(f).writerows([["Job Title"], *([title] for title in titles)])
+
+    calls = []
+    _, stats = jtc.clean_csv_file(
+        source,
+        tmp_path / "out.csv",
+        checkpoint=True,
+        chunk_rows=50,
+        progress=lambda rows, total, counters: calls.append((rows, total, dict(counters))),
+    )
+    total = len(titles)
+    assert [rows for rows, _, _ in calls] == [0, *range(50, total, 50), total]
+    assert all(call_total == total for _, call_total, _ in calls)
+    assert calls[-1][2]["good"] == stats["good"] and calls[-1][2]["removed"] == stats["removed"]
+
+    calls.clear()
+    jtc.clean_csv_file(source, tmp_path / "plain.csv", progress=lambda *args: calls.append(args[:2]))
+    assert calls == [(0, total), (total, total)]
+
+
+def test_progress_is_reported_within_a_chunk(tmp_path, monkeypatch):
+    monkeypatch.setattr(jtc, "PROGRESS_TITLES", 10)
+    source = tmp_path / "in.csv"
+    source.write_text("Job Title\n" + "\n".join(f"Analyst {n % 35}" for n in range(100)) + "\n", encoding="utf-8")
+
+    for kwargs in ({"checkpoint": True, "chunk_rows": 1000}, {}):
+        calls = []
+        jtc.clean_csv_file(source, tmp_path / "out.csv", progress=lambda rows, total, _: calls.append(rows), **kwargs)
+        # 35 distinct titles in batches of 10; the first three batches cover the rows holding them.
+        assert calls == [0, 30, 60, 90, 100]
+
+
+def test_progress_file_round_trip(tmp_path):
+    path = tmp_path / "job-progress.json"
+    assert read_progress(path) is None
+    write_progress(path, {"status": "running", "rows_done": 5})
+    assert read_progress(path) == {"status": "running", "rows_done": 5}
+
+
+def test_progress_stream_of_finished_job(client):
+    job = upload(client, "Original Job Title\nSr Analyst\nn/a\nceo\n").get_json()["job"]
+    received = events(client.get(f"/api/jobs/{job['name']}/progress"))
+    assert len(received) == 1
+    final = received[0]
+    assert final["status"] == "complete"
+    assert final["job"] == job["name"]
+    assert final["rows_done"] == final["total_rows"] == 3
+    assert (final["good"], final["cleaned"], final["removed"]) == (
+        job["stats"]["good"],
+        job["stats"]["cleaned"],
+        job["stats"]["removed"],
+    )
+
+
+def test_async_upload_streams_progress_until_complete(client):
+    data = "Original Job Title\n" + "\n".join(["Sr Analyst", "Head|Sales", "n/a"] * 50) + "\n"
+    resp = upload(client, data, **{"async": "1"})
+    assert resp.status_code == 202
+    body = resp.get_json()
+    name = body["job"]["name"]
+    assert body["job"]["status"] == "running"
+    assert body["progress_url"] == f"/api/jobs/{name}/progress"
+
+    received = events(client.get(body["progress_url"]))
+    assert received[-1]["status"] == "complete"
+    assert all(snapshot["status"] == "running" for snapshot in received[:-1])
+    assert received[-1]["rows_done"] == 150
+    assert client.get(f"/api/download/{name}").status_code == 200
+
+
+def test_progress_stream_of_deduplicated_job(client):
+    data = "Original Job Title\nLab Tech\nSr Analyst\n"
+    upload(client, data)
+    job = upload(client, data).get_json()["job"]
+    assert "deduplicated_from" in job
+    # No progress was recorded for it, so the stream reports the job's stored outcome.
+    received = events(client.get(f"/api/jobs/{job['name']}/progress"))
+    assert len(received) == 1
+    assert received[0]["status"] == "complete"
+    assert received[0]["rows_done"] == received[0]["total_rows"] == 2
+    assert received[0]["removed"] == job["stats"]["removed"]
+
+
+def test_progress_stream_rejects_unknown_jobs(client):
+    assert client.get("/api/jobs/bad/progress").status_code == 400
+    assert client.get("/api/jobs/JobTitleClean999/progress").status_code == 404
+
+
+def test_progress_stream_ends_when_a_running_job_stalls(client, monkeypatch):
+    import app as app_module
+
+    job = upload(client, "Original Job Title\nSr Analyst\n").get_json()["job"]
+    write_progress(app_module.progress_path(job["name"]), {"job": job["name"], "status": "running", "rows_done": 0})
+    monkeypatch.setattr(app_module, "PROGRESS_POLL_SECONDS", 0.01)
+    monkeypatch.setattr(app_module, "PROGRESS_STALL_SECONDS", 0.05)
+    latency = app_module.REQUEST_LATENCY.registry.samples.get("jobtitle_request_duration_seconds", {})
+    before = latency.get('["progress"]', {}).get("sum", 0.0)
+
+    with client.get(f"/api/jobs/{job['name']}/progress") as resp:
+        received = events(resp)
+    assert [snapshot["status"] for snapshot in received] == ["running", "stalled"]
+    assert "resume" in received[-1]["error"]
+    # The stream is timed until it ends, not until the view returns its generator.
+    assert latency['["progress"]']["sum"] - before >= 0.05
+
+
+def test_background_job_already_being_cleaned_is_left_to_its_worker(client):
+    import app as app_module
+
+    job = upload(client, "Original Job Title\nSr Analyst\n").get_json()["job"]
+    output = app_module.JOBS_DIR / job["name"] / job["cleaned_filename"]
+    with Checkpoint(output, {}):
+        app_module.run_job_in_background(job, jtc.active_engine())
+    runs = [json.loads(line) for line in app_module.LOG_PATH.read_text().splitlines()]
+    assert runs[-1]["job"] == job["name"] and runs[-1]["status"] == "busy"
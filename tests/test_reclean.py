@@ -0,0 +1,147 @@
+import csv
+import io
+import json
+import random
+from pathlib import Path
+
+import pytest
+
+import job_title_cleaning as jtc
+from job_title_cleaning import RuleEngine, clean_csv_file, load_ruleset
+from reclean import changed_triggers, reclean_jobs
+
+DATA_PATH = Path(__file__).parent / "test_data.csv"
+
+
+@pytest.fixture()
+def custom_rules(tmp_path, monkeypatch):
+    monkeypatch.setattr(jtc, "RULES_SNAPSHOT_DIR", tmp_path / "snapshots")
+    path = tmp_path / "custom.json"
+    path.write_text(jtc.RULES_PATH.read_text(encoding="utf-8"), encoding="utf-8")
+    yield path
+    jtc.reload_rules(jtc.RULES_PATH, force=True)
+
+
+def _edit_rules(path: Path, edit) -> None:
+    tables = json.loads(path.read_text(encoding="utf-8"))
+    edit(tables)
+    path.write_text(json.dumps(tables), encoding="utf-8")
+    jtc.reload_rules(path)
+
+
+def _change_rules(tables):
+    tables["junk_values"].append("quizmaster")
+    for entry in tables["abbreviation_entries"]:
+        if entry[0] == "Sr ":
+            entry[1] = "Senior-Level "
+    tables["misspelling_entries"].append(["Bioinf", "Bioinformatician", "partial"])
+    del tables["abbreviation_map"]["ceo"]
+
+
+def _load_tables(tables):
+    tables = dict(tables)
+    for key in ("misspelling_entries", "abbreviation_entries"):
+        tables[key] = [tuple(entry) for entry in tables[key]]
+    return tables
+
+
+def _upload(client, data: str) -> dict:
+    resp = client.post(
+        "/api/upload",
+        data={"file": (io.BytesIO(data.encode()), "reclean.csv")},
+        content_type="multipart/form-data",
+    )
+    assert resp.status_code == 200
+    return resp.get_json()["job"]
+
+
+def test_changed_triggers():
+    base = load_ruleset(jtc.RULES_PATH)
+    old = RuleEngine(base)
+    assert changed_triggers(old, RuleEngine(base)) == set()
+
+    edited = json.loads(json.dumps(base))
+    _change_rules(edited)
+    assert changed_triggers(old, RuleEngine(_load_tables(edited))) == {"quizmaster", "sr ", "bioinf", "ceo"}
+
+    reordered = json.loads(json.dumps(base))
+    reordered["abbreviation_entries"].reverse()
+    assert changed_triggers(old, RuleEngine(_load_tables(reordered))) is None
+
+    limited = json.loads(json.dumps(base))
+    limited["limits"] = dict(old.limits, max_title_length=20)
+    assert changed_triggers(old, RuleEngine(_load_tables(limited))) is None
+
+
+def test_reclean_only_touches_affected_titles(client, custom_rules, tmp_path):
+    import app as app_module
+
+    with DATA_PATH.open(encoding="utf-8-sig", newline="") as f:
+        titles = [row[0] for row in csv.reader(f) if row]
+    extra = ["Sr Bioinf", "Quizmaster", "ceo", "Sr Lab Tech", "Lead Bioinf"]
+    rows = titles + extra * 3
+    random.Random(3).shuffle(rows)
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows([["Original Job Title"]] + [[row] for row in rows])
+    job = _upload(client, buffer.getvalue())
+    job_folder = app_module.JOBS_DIR / job["name"]
+
+    jtc.reload_rules(custom_rules)
+    _edit_rules(custom_rules, _change_rules)
+    (report,) = reclean_jobs(app_module.JOBS_DIR, job_names=[job["name"]])
+
+    assert report["mode"] == "incremental"
+    assert report["titles_checked"] < report["titles"] / 2
+    assert report["rows_changed"] >= len(extra) * 3
+
+    expected_path = tmp_path / "expected.csv"
+    _, expected_stats = clean_csv_file(job_folder / job["original_filename"], expected_path, count_rule_hits=True)
+    assert (job_folder / job["cleaned_filename"]).read_bytes() == expected_path.read_bytes()
+
+    jobs = json.loads((app_module.JOBS_DIR / "jobs.json").read_text())
+    stored = next(entry for entry in jobs if entry["name"] == job["name"])
+    assert stored["ruleset_version"] == jtc.ruleset_version()
+    for key in ("total_rows", "good", "cleaned", "removed", "removed_reasons", "analytics"):
+        assert stored["stats"][key] == expected_stats[key]
+    hits = json.loads((job_folder / stored["rule_hits_filename"]).read_text())
+    assert hits["hits"] == expected_stats["rule_hits"]
+    assert hits["titles"] == expected_stats["title_rule_hits"]
+
+    (again,) = reclean_jobs(app_module.JOBS_DIR, job_names=[job["name"]])
+    assert again["mode"] == "current"
+
+
+def test_reclean_without_archive_cleans_in_full(client, custom_rules, tmp_path):
+    import app as app_module
+
+    job = _upload(client, "Original Job Title\nSr Enginer\nDirector\nceo\n")
+    (app_module.RULESETS_DIR / f"{job['ruleset_version']}.json").unlink()
+
+    jtc.reload_rules(custom_rules)
+    _edit_rules(custom_rules, _change_rules)
+    dry = reclean_jobs(app_module.JOBS_DIR, dry_run=True, job_names=[job["name"]])
+    assert dry[0]["mode"] == "full"
+    assert dry[0]["rows_changed"] == 2
+
+    (report,) = reclean_jobs(app_module.JOBS_DIR, job_names=[job["name"]])
+    assert (report["mode"], report["titles_checked"], report["rows_changed"]) == ("full", 3, 2)
+    job_folder = app_module.JOBS_DIR / job["name"]
+    expected_path = tmp_path / "expected.csv"
+    clean_csv_file(job_folder / job["original_filename"], expected_path)
+    assert (job_folder / job["cleaned_filename"]).read_bytes() == expected_path.read_bytes()
+
+
+def test_reclean_rechecks_every_title_when_limits_change(client, custom_rules):
+    import app as app_module
+
+    long_title = "Senior Clinical Research Coordinator"
+    job = _upload(client, f"Original Job Title\n{long_title}\nDirector\n")
+
+    jtc.reload_rules(custom_rules)
+    _edit_rules(custom_rules, lambda tables: tables.update(limits=dict(jtc.DEFAULT_LIMITS, max_title_length=20)))
+    (report,) = reclean_jobs(app_module.JOBS_DIR, job_names=[job["name"]])
+    assert (report["mode"], report["titles_checked"], report["rows_changed"]) == ("full", 2, 1)
+
+    jobs = json.loads((app_module.JOBS_DIR / "jobs.json").read_text())
+    stored = next(entry for entry in jobs if entry["name"] == job["name"])
+    assert stored["stats"]["removed_reasons"] == {"too_long": 1}
@@ -0,0 +1,209 @@
+import gzip
+import io
+import json
+import os
+import tarfile
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import pytest
+
+from retention import apply_retention, policy_from_env, rotate_log, stored_path
+
+NOW = datetime(2026, 6, 1, tzinfo=timezone.utc)
+
+
+def make_job(jobs_dir: Path, name: str, age_days: float, rows: int = 2000, status="complete", link_from=None) -> dict:
+    folder = jobs_dir / name
+    folder.mkdir(parents=True)
+    job = {
+        "name": name,
+        "status": status,
+        "created_at": (NOW - timedelta(days=age_days)).isoformat(),
+        "original_filename": f"{name}-original.csv",
+        "cleaned_filename": f"{name}-cleaned.csv",
+    }
+    headers = {"original_filename": "Job Title", "cleaned_filename": "Original Job Title,Cleaned Job Title"}
+    for key, header in headers.items():
+        if link_from is not None:
+            os.link(jobs_dir / link_from / f"{link_from}{job[key][len(name):]}", folder / job[key])
+        else:
+            lines = [header] + [f"Lab Tech {idx},Laboratory Technician {idx}" for idx in range(rows)]
+            (folder / job[key]).write_text("\n".join(lines) + "\n")
+    metadata_path = jobs_dir / "jobs.json"
+    jobs = json.loads(metadata_path.read_text()) if metadata_path.exists() else []
+    metadata_path.write_text(json.dumps(jobs + [job]))
+    return job
+
+
+def tree(root: Path) -> dict:
+    return {str(path.relative_to(root)): path.read_bytes() for path in sorted(root.rglob("*")) if path.is_file()}
+
+
+def upload(client, data: str) -> dict:
+    return client.post(
+        "/api/upload",
+        data={"file": (io.BytesIO(data.encode()), "old.csv")},
+        content_type="multipart/form-data",
+    ).get_json()["job"]
+
+
+def test_old_jobs_are_compressed_and_stay_readable(client, monkeypatch):
+    import app as app_module
+
+    monkeypatch.setenv("RETENTION_COMPRESS_DAYS", "7")
+    data = "Original Job Title\n" + "\n".join(["Sr Analyst", "Lab Tech", "Head|Sales", "n/a"] * 100) + "\n"
+    job = upload(client, data)
+    name = job["name"]
+    app_module.update_job(dict(job, created_at=(datetime.now(timezone.utc) - timedelta(days=30)).isoformat()))
+    download = client.get(f"/api/download/{name}").data
+    validation = client.get(f"/api/validate/{name}").get_json()
+    clusters = client.get(f"/api/clusters/{name}").get_json()
+    folder = app_module.JOBS_DIR / name
+
+    before = tree(folder)
+    preview = app_module.run_retention(dry_run=True)
+    assert tree(folder) == before
+    planned = next(action for action in preview["actions"] if action["job"] == name)
+    assert planned["action"] == "compress" and planned["bytes_reclaimed"] > 0
+
+    report = app_module.run_retention()
+    done = next(action for action in report["actions"] if action["job"] == name)
+    assert done == planned
+    assert not (folder / job["cleaned_filename"]).exists()
+    assert stored_path(folder / job["cleaned_filename"]).name == f"{name}-cleaned.csv.gz"
+    assert stored_path(folder / job["original_filename"]).name == f"{name}-original.csv.gz"
+
+    resp = client.get(f"/api/download/{name}")
+    assert resp.status_code == 200
+    assert resp.headers["Content-Disposition"] == f"attachment; filename={name}-cleaned.csv"
+    assert resp.data == download
+    assert client.get(f"/api/validate/{name}").get_json() == validation
+    assert client.get(f"/api/clusters/{name}").get_json() == clusters
+    assert not any(action["job"] == name for action in app_module.run_retention()["actions"])
+
+
+def test_compressed_jobs_still_deduplicate_uploads(client, monkeypatch):
+    import app as app_module
+
+    monkeypatch.setenv("RETENTION_COMPRESS_DAYS", "7")
+    data = "Original Job Title\n" + "\n".join(["Sr Analyst", "Lab Tech", "n/a"] * 50) + "\n"
+    job = upload(client, data)
+    download = client.get(f"/api/download/{job['name']}").data
+    app_module.update_job(dict(job, created_at=(datetime.now(timezone.utc) - timedelta(days=30)).isoformat()))
+    app_module.run_retention()
+
+    again = upload(client, data)
+    assert again["deduplicated_from"] == job["name"]
+    folder = app_module.JOBS_DIR / again["name"]
+    assert sorted(path.name for path in folder.glob("*.csv*")) == [
+        f"{again['name']}-cleaned.csv.gz",
+        f"{again['name']}-original.csv.gz",
+    ]
+    assert client.get(f"/api/download/{again['name']}").data == download
+
+
+def test_dry_run_reports_what_a_real_run_reclaims(tmp_path):
+    jobs_dir = tmp_path / "jobs"
+    make_job(jobs_dir, "JobTitleClean001", 40)
+    make_job(jobs_dir, "JobTitleClean002", 20, link_from="JobTitleClean001")  # a deduplicated upload
+    make_job(jobs_dir, "JobTitleClean003", 10)
+    make_job(jobs_dir, "JobTitleClean004", 1)
+    make_job(jobs_dir, "JobTitleClean005", 90, status="running")
+    policy = {"compress_after_days": 7, "expire_after_days": 30, "max_total_bytes": 190_000}
+
+    before = tree(jobs_dir)
+    planned = apply_retention(jobs_dir, policy, dry_run=True, now=NOW)
+    assert tree(jobs_dir) == before
+    report = apply_retention(jobs_dir, policy, now=NOW)
+    assert report == dict(planned, dry_run=False)
+    assert [(action["job"], action["action"]) for action in report["actions"]] == [
+        ("JobTitleClean002", "compress"),
+        ("JobTitleClean003", "compress"),
+        ("JobTitleClean001", "delete"),
+        ("JobTitleClean002", "delete"),
+    ]
+    # The files shared with the expired job only count once they are gone, so compressing them reclaims nothing yet.
+    assert report["actions"][0]["bytes_reclaimed"] < 0 < report["actions"][3]["bytes_reclaimed"]
+    assert report["job_bytes"] == sum(path.stat().st_size for path in jobs_dir.glob("JobTitleClean00[34]/*"))
+    assert report["job_bytes"] <= 190_000
+
+    jobs = {job["name"]: job for job in json.loads((jobs_dir / "jobs.json").read_text())}
+    expired = [name for name, job in jobs.items() if job["status"] == "expired"]
+    assert expired == ["JobTitleClean001", "JobTitleClean002"]
+    assert not (jobs_dir / "JobTitleClean001").exists()
+    assert jobs["JobTitleClean005"]["status"] == "running"  # running jobs are never touched
+    assert (jobs_dir / "JobTitleClean004" / "JobTitleClean004-cleaned.csv").exists()
+
+
+def test_shared_files_are_compressed_once(tmp_path):
+    jobs_dir = tmp_path / "jobs"
+    make_job(jobs_dir, "JobTitleClean001", 20)
+    make_job(jobs_dir, "JobTitleClean002", 10, link_from="JobTitleClean001")
+    sizes = [path.stat().st_size for path in sorted((jobs_dir / "JobTitleClean001").iterdir())]
+    text = (jobs_dir / "JobTitleClean001" / "JobTitleClean001-cleaned.csv").read_text()
+
+    report = apply_retention(jobs_dir, {"compress_after_days": 7}, now=NOW)
+    first = (jobs_dir / "JobTitleClean001" / "JobTitleClean001-cleaned.csv.gz").stat()
+    second = (jobs_dir / "JobTitleClean002" / "JobTitleClean002-cleaned.csv.gz").stat()
+    assert (first.st_ino, first.st_nlink) == (second.st_ino, 2)
+    assert first.st_mtime == pytest.approx(
+        (jobs_dir / "JobTitleClean002" / "JobTitleClean002-original.csv.gz").stat().st_mtime, abs=5
+    )
+    with gzip.open(jobs_dir / "JobTitleClean002" / "JobTitleClean002-cleaned.csv.gz", "rt") as f:
+        assert f.read() == text
+    compressed = [path.stat().st_size for path in sorted((jobs_dir / "JobTitleClean001").iterdir())]
+    assert report["bytes_reclaimed"] == sum(sizes) - sum(compressed)
+
+
+def test_expired_jobs_are_archived(tmp_path):
+    jobs_dir = tmp_path / "jobs"
+    make_job(jobs_dir, "JobTitleClean001", 100)
+    expected = tree(jobs_dir / "JobTitleClean001")
+    archive_dir = tmp_path / "archive"
+
+    report = apply_retention(jobs_dir, {"expire_after_days": 30, "archive_dir": str(archive_dir)}, now=NOW)
+    archive_path = archive_dir / "JobTitleClean001.tar.gz"
+    assert report["actions"] == [
+        {
+            "job": "JobTitleClean001",
+            "action": "archive",
+            "bytes_reclaimed": sum(len(data) for data in expected.values()),
+            "archive": str(archive_path),
+        }
+    ]
+    with tarfile.open(archive_path) as tar:
+        tar.extractall(tmp_path / "restored", filter="data")
+    assert tree(tmp_path / "restored" / "JobTitleClean001") == expected
+    job = json.loads((jobs_dir / "jobs.json").read_text())[0]
+    assert (job["status"], job["archive"], job["expired_at"]) == ("expired", str(archive_path), NOW.isoformat())
+
+
+def test_runs_log_rotation(tmp_path):
+    log_path = tmp_path / "runs.log"
+    contents = []
+    for idx in range(4):
+        contents.append("".join(json.dumps({"job": f"JobTitleClean{idx:03d}", "n": n}) + "\n" for n in range(100)))
+        log_path.write_text(contents[-1])
+        planned = rotate_log(log_path, 1000, 2, dry_run=True)
+        assert log_path.read_text() == contents[-1]
+        assert rotate_log(log_path, 1000, 2) == planned > 0
+    assert not log_path.exists()
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["runs.log.1.gz", "runs.log.2.gz"]
+    with gzip.open(tmp_path / "runs.log.1.gz", "rt") as f:
+        assert f.read() == contents[3]
+    with gzip.open(tmp_path / "runs.log.2.gz", "rt") as f:
+        assert f.read() == contents[2]
+
+    log_path.write_text("small\n")
+    assert rotate_log(log_path, 1000, 2) == 0
+    assert rotate_log(log_path, 0, 2) == 0
+
+
+def test_policy_from_env():
+    environ = {"RETENTION_EXPIRE_DAYS": "90", "RETENTION_ARCHIVE_DIR": "/srv/archive", "RUNS_LOG_BACKUPS": "0"}
+    policy = policy_from_env(environ)
+    assert policy["expire_after_days"] == 90
+    assert policy["archive_dir"] == "/srv/archive"
+    assert policy["log_backups"] == 0
+    assert policy["compress_after_days"] == 0
@@ -0,0 +1,74 @@
+import csv
+import random
+from pathlib import Path
+
+import pytest
+
+import job_title_cleaning as jtc
+from job_title_cleaning import clean_csv_file, clean_job_title_with_reason
+
+
+def _corpus():
+    titles = []
+    data_path = Path(__file__).parent / "test_data.csv"
+    with data_path.open(encoding="utf-8-sig", newline="") as f:
+        titles.extend(row[0] for row in csv.reader(f) if row)
+    rng = random.Random(7)
+    engine = jtc.active_engine()
+    fragments = [entry[0] for entry in engine.misspelling_entries + engine.abbreviation_entries]
+    fragments += [entry[1] for entry in engine.misspelling_entries + engine.abbreviation_entries]
+    fragments += list(engine.abbreviation_map)
+    for _ in range(3000):
+        words = [rng.choice(fragments) for _ in range(rng.randint(1, 3))]
+        titles.append(rng.choice([" ", "-", ""]).join(words))
+    return titles
+
+
+@pytest.fixture()
+def restore_rule_order():
+    yield
+    jtc.use_rule_frequencies(None)
+
+
+def test_rule_hits_are_counted():
+    hits = {}
+    cleaned, _ = clean_job_title_with_reason("Sr Tech", hits)
+    assert cleaned == "Senior Technician"
+    assert hits == {"abbreviation:Sr ": 1, "abbreviation:Tech": 1}
+
+
+def test_clean_csv_file_reports_rule_hits(tmp_path):
+    input_path = tmp_path / "input.csv"
+    input_path.write_text("Original Job Title\nceo\nSr Scientist\nSr. Analyst\nDirector\n")
+    _, stats = clean_csv_file(input_path, tmp_path / "out.csv", count_rule_hits=True)
+    assert stats["rule_hits"]["abbreviation:ceo"] == 1
+    assert stats["rule_hits"]["abbreviation:Sr "] == 1
+    assert stats["rule_hits"]["abbreviation:Sr."] == 1
+
+    _, stats = clean_csv_file(input_path, tmp_path / "out.csv")
+    assert "rule_hits" not in stats
+
+
+def test_frequency_ordering_matches_declared_order(restore_rule_order):
+    titles = _corpus()
+    expected = [clean_job_title_with_reason(t) for t in titles]
+    rng = random.Random(3)
+    for _ in range(3):
+        hits = {name: rng.randint(0, 50) for name in jtc.rule_names()}
+        jtc.use_rule_frequencies(hits, total_titles=60)
+        assert [clean_job_title_with_reason(t) for t in titles] == expected
+
+
+def test_overlapping_rules_do_not_commute():
+    rules = {rule["name"]: rule for rule in jtc.active_engine().abbreviation_rules}
+    assert not jtc._rules_commute(rules["abbreviation:Lab "], rules["abbreviation:Lab Assist"])
+    assert not jtc._rules_commute(rules["abbreviation:Pg "], rules["abbreviation:Mfg"])  # boundary changes
+    assert jtc._rules_commute(rules["abbreviation:Mfg"], rules["abbreviation:Exec "])
+
+
+def test_rule_hit_report_lists_never_fired():
+    report = jtc.rule_hit_report({"abbreviation:ceo": 9, "abbreviation:Sr ": 3}, total_titles=10, top=1)
+    assert report["hot"] == [{"rule": "abbreviation:ceo", "hits": 9, "rate": 0.9}]
+    assert "abbreviation:Sr " not in report["never_fired"]
+    assert "abbreviation:Mfg" in report["never_fired"]
+    assert len(report["never_fired"]) == report["rules"] - 2
@@ -0,0 +1,125 @@
+import json
+from pathlib import Path
+
+import pytest
+
+import job_title_cleaning as jtc
+from reclean import archive_ruleset
+from ruleset_diff import diff_rulesets, load_tables
+
+TEST_DATA = Path(__file__).with_name("test_data.csv")
+EXTRA_TITLES = {"Labtechician": 40, "Lab Co-Ordinator": 7, "testing": 12, "医生": 3, "Sr Analyst": 9}
+
+
+def corpus() -> dict:
+    _, originals = jtc.read_titles(TEST_DATA)
+    occurrences = dict(EXTRA_TITLES)
+    for title in originals:
+        occurrences[title] = occurrences.get(title, 0) + 1
+    return occurrences
+
+
+def candidate_tables(**changes) -> dict:
+    tables = jtc.active_engine().tables()
+    tables["version"] = "candidate"
+    tables["misspelling_entries"] = [entry for entry in tables["misspelling_entries"] if entry[0] != "Labtechician"]
+    tables["junk_values"] = [value for value in tables["junk_values"] if value != "testing"]
+    tables["translation_map"] = dict(tables["translation_map"], **{"医生": "Physician"})
+    tables.update(changes)
+    return tables
+
+
+def brute_force(occurrences, engine_a, engine_b) -> dict:
+    changed = {}
+    for title in occurrences:
+        before = jtc.clean_job_title_with_reason(title, engine=engine_a)
+        after = jtc.clean_job_title_with_reason(title, engine=engine_b)
+        if before != after:
+            changed[title] = (before, after)
+    return changed
+
+
+def changed_titles(report) -> set:
+    return {sample["title"] for rule in report["rules"] for sample in rule["samples"]}
+
+
+def test_incremental_diff_matches_cleaning_everything_twice():
+    occurrences = corpus()
+    engine_a = jtc.RuleEngine(jtc.active_engine().tables())
+    engine_b = engine_a.derive(candidate_tables())
+    report = diff_rulesets(occurrences, engine_a, engine_b, threads=2, samples=1000)
+
+    expected = brute_force(occurrences, engine_a, engine_b)
+    assert report["mode"] == "incremental"
+    assert report["titles_checked"] < report["distinct_titles"] == len(occurrences)
+    assert changed_titles(report) == set(expected)
+    assert report["changed_titles"] == len(expected)
+    assert report["changed_rows"] == sum(occurrences[title] for title in expected)
+    assert report["total_rows"] == sum(occurrences.values())
+
+    rules = {rule["rule"]: rule for rule in report["rules"]}
+    assert rules["misspelling:Labtechician"]["rows"] == 40
+    assert rules["reason:junk_value"]["samples"][0] == {
+        "title": "testing",
+        "rows": occurrences["testing"],
+        "a": "",
+        "b": "Testing",
+        "a_reason": "junk_value",
+        "b_reason": "",
+    }
+    assert rules["tables"]["samples"][0]["b"] == "Physician"
+    assert report["kinds"]["restored"]["titles"] >= 1 and report["kinds"]["changed"]["titles"] >= 2
+    assert report["samples"][0]["title"] == "Labtechician"
+
+
+def test_untraceable_changes_check_every_title():
+    occurrences = corpus()
+    engine_a = jtc.RuleEngine(jtc.active_engine().tables())
+    limits = dict(engine_a.limits, max_title_length=20)
+    engine_b = engine_a.derive(candidate_tables(limits=limits))
+    report = diff_rulesets(occurrences, engine_a, engine_b)
+    assert (report["mode"], report["titles_checked"]) == ("full", len(occurrences))
+    assert report["changed_titles"] == len(brute_force(occurrences, engine_a, engine_b))
+    assert report["kinds"]["removed"]["titles"] > 0
+
+    same = diff_rulesets(occurrences, engine_a, engine_a.derive(engine_a.tables()))
+    assert (same["mode"], same["titles_checked"], same["changed_rows"], same["rules"]) == ("identical", 0, 0, [])
+
+
+def test_candidate_shares_unchanged_stages():
+    engine_a = jtc.RuleEngine(jtc.active_engine().tables())
+    engine_b = engine_a.derive(candidate_tables())
+    shared = {id(rule) for rule in engine_a.misspelling_rules}
+    assert all(id(rule) in shared for rule in engine_b.misspelling_rules)
+    assert engine_b.fuzzy is engine_a.fuzzy
+    assert engine_b.preserve_caps is engine_a.preserve_caps
+
+
+def test_rulesets_are_loaded_by_file_version_or_profile(tmp_path):
+    rules_path = tmp_path / "candidate.json"
+    rules_path.write_text(json.dumps(candidate_tables()), encoding="utf-8")
+    assert load_tables(str(rules_path))["version"] == "candidate"
+    engine = jtc.RuleEngine(candidate_tables())
+    archive_ruleset(engine, tmp_path / "rulesets")
+    assert jtc.ruleset_hash(load_tables(engine.version, tmp_path / "rulesets")) == engine.version
+    assert load_tables("current") == jtc.active_engine().tables()
+    for profile in jtc.profile_names():
+        assert jtc.ruleset_hash(load_tables(profile)) == jtc.profile_engine(profile).version
+    with pytest.raises(ValueError):
+        load_tables("no-such-ruleset", tmp_path / "rulesets")
+
+
+def test_replacement_edits_are_attributed_to_their_rule():
+    engine_a = jtc.RuleEngine(jtc.active_engine().tables())
+    tables = engine_a.tables()
+    tables["abbreviation_entries"] = [
+        (pattern, "Assoc. Professor" if pattern == "A/Prof" else replacement, match_type)
+        for pattern, replacement, match_type in tables["abbreviation_entries"]
+    ]
+    engine_b = engine_a.derive(tables)
+    report = diff_rulesets({"A/Prof of Biology": 4, "Lab Tech": 2}, engine_a, engine_b)
+
+    assert report["mode"] == "incremental" and report["changed_titles"] == 1
+    (rule,) = report["rules"]
+    assert (rule["rule"], rule["titles"], rule["rows"]) == ("abbreviation:A/Prof", 1, 4)
+    assert rule["samples"][0]["b"].startswith("Assoc. Professor")
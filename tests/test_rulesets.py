@@ -0,0 +1,96 @@
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+import job_title_cleaning as jtc
+from job_title_cleaning import clean_job_title_with_reason
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "scripts"))
+
+import build_custom_code  # noqa: E402
+
+
+@pytest.fixture()
+def custom_rules(tmp_path, monkeypatch):
+    """A writable copy of the default ruleset; the default is restored afterwards."""
+    monkeypatch.setattr(jtc, "RULES_SNAPSHOT_DIR", tmp_path / "snapshots")
+    path = tmp_path / "custom.json"
+    path.write_text(jtc.RULES_PATH.read_text(encoding="utf-8"), encoding="utf-8")
+    yield path
+    jtc.reload_rules(jtc.RULES_PATH, force=True)
+
+
+def _add_junk_value(path: Path, value: str) -> None:
+    tables = json.loads(path.read_text(encoding="utf-8"))
+    tables["junk_values"].append(value)
+    path.write_text(json.dumps(tables), encoding="utf-8")
+
+
+def test_version_is_hash_of_rules_file():
+    assert jtc.ruleset_version() == jtc.ruleset_hash(jtc.load_ruleset(jtc.RULES_PATH))
+    assert jtc.active_engine().name == "default"
+
+
+def test_custom_code_action_matches_rules_file():
+    current = build_custom_code.CUSTOM_CODE_PATH.read_text(encoding="utf-8")
+    profiles = build_custom_code.load_profiles(jtc.RULES_PROFILES_DIR)
+    taxonomy = build_custom_code.load_taxonomy_file(build_custom_code.TAXONOMY_PATH)
+    assert build_custom_code.build(current, jtc.load_ruleset(jtc.RULES_PATH), profiles, taxonomy) == current
+
+
+def test_reload_swaps_ruleset(custom_rules):
+    default_version = jtc.ruleset_version()
+    assert jtc.reload_rules(custom_rules) is False  # same tables, same version
+    assert clean_job_title_with_reason("Quizmaster") == ("Quizmaster", "")
+
+    _add_junk_value(custom_rules, "quizmaster")
+    assert jtc.reload_rules() is True
+    assert jtc.ruleset_version() != default_version
+    assert clean_job_title_with_reason("Quizmaster") == (None, "junk_value")
+    assert jtc.reload_rules() is False  # unchanged file is not recompiled
+
+
+def test_engine_passed_in_is_used_throughout(custom_rules):
+    default_engine = jtc.active_engine()
+    _add_junk_value(custom_rules, "quizmaster")
+    jtc.reload_rules(custom_rules)
+    assert clean_job_title_with_reason("Quizmaster", engine=default_engine) == ("Quizmaster", "")
+
+
+def test_snapshot_is_reused(tmp_path):
+    snapshots = tmp_path / "snapshots"
+    first = jtc.compile_ruleset(jtc.RULES_PATH, snapshots)
+    files = list(snapshots.glob("*.pickle"))
+    assert [f.name for f in files] == [f"{first.version}-{jtc.SNAPSHOT_FORMAT}.pickle"]
+
+    second = jtc.compile_ruleset(jtc.RULES_PATH, snapshots)
+    assert second is not first
+    assert second.version == first.version
+    assert second.canonical_titles == first.canonical_titles
+    assert clean_job_title_with_reason("sr lab tech", engine=second) == clean_job_title_with_reason("sr lab tech")
+
+    files[0].write_bytes(b"not a pickle")
+    assert jtc.compile_ruleset(jtc.RULES_PATH, snapshots).version == first.version
+
+
+def test_rules_endpoints(client, custom_rules):
+    info = client.get("/api/rules").get_json()
+    assert info["version"] == jtc.ruleset_version()
+
+    jtc.reload_rules(custom_rules)
+    _add_junk_value(custom_rules, "quizmaster")
+    resp = client.post("/api/rules/reload")
+    assert resp.status_code == 200
+    assert resp.get_json()["changed"] is True
+    assert client.get("/api/explain?title=Quizmaster").get_json()["reason"] == "junk_value"
+
+    version = jtc.ruleset_version()
+    custom_rules.write_text("{not json", encoding="utf-8")
+    resp = client.post("/api/rules/reload")
+    assert resp.status_code == 400
+    assert resp.get_json()["version"] == version
+    # A broken file never replaces the ruleset that is serving requests.
+    assert client.get("/api/explain?title=Quizmaster").get_json()["reason"] == "junk_value"
@@ -0,0 +1,87 @@
+import importlib.machinery
+import importlib.util
+import random
+from pathlib import Path
+
+import pytest
+
+import job_title_cleaning as jtc
+from job_title_cleaning import clean_job_title_with_reason, remove_diacritics
+from segmentation import TranslationTrie
+
+TERMS = {
+    "高级": "Senior",
+    "工程师": "Engineer",
+    "工程": "Engineering",
+    "研发": "Research and development",
+    "部": "Department",
+    "经理": "Manager",
+    "研究生": "Graduate student",
+    "研究": "Research",
+}
+
+
+def load_custom_code():
+    path = Path(__file__).resolve().parent.parent / "hs-custom_code_action.py"
+    loader = importlib.machinery.SourceFileLoader("custom_code", str(path))
+    spec = importlib.util.spec_from_loader(loader.name, loader)
+    module = importlib.util.module_from_spec(spec)
+    loader.exec_module(module)
+    return module
+
+
+def test_longest_match_segmentation():
+    trie = TranslationTrie(TERMS)
+    assert trie.segment("高级工程师") == [("高级", "Senior"), ("工程师", "Engineer")]
+    assert trie.translate("高级工程师") == "Senior Engineer"
+    assert trie.translate("研发部 经理") == "Research and development Department Manager"
+    assert trie.translate("研究生") == "Graduate student"  # longest key wins over 研究
+    assert trie.translate("IT经理") == "IT Manager"
+    assert trie.translate("研发、工程") == "Research and development, Engineering"
+    assert trie.translate("高级工程师（研发）") == "Senior Engineer (Research and development)"
+    assert trie.translate("北京经理") is None  # 北京 is not a known term
+    assert trie.translate("Manager") is None
+    assert TranslationTrie({}).translate("经理") is None
+
+
+def test_large_dictionary_translates_in_bulk():
+    rng = random.Random(4)
+    alphabet = [chr(code) for code in range(0x4E00, 0x4E00 + 400)]
+    terms = {}
+    while len(terms) < 5000:
+        terms["".join(rng.choices(alphabet, k=rng.randint(1, 4)))] = f"T{len(terms)}"
+    trie = TranslationTrie(terms)
+    keys = list(terms)
+    for _ in range(500):
+        picked = rng.sample(keys, 3)
+        translated = trie.translate("".join(picked))
+        # Greedy segmentation may split the concatenation differently, but always covers it with known terms.
+        assert translated is not None
+        assert all(part.startswith("T") for part in translated.split())
+
+
+def test_pipeline_translates_compound_titles():
+    assert clean_job_title_with_reason("高级工程师") == ("Senior Engineer", "")
+    assert clean_job_title_with_reason("研发部 经理") == ("Research and Development Department Manager", "")
+    assert clean_job_title_with_reason("副主任医师") == ("Associate Chief Physician", "")
+    assert clean_job_title_with_reason("선임 연구원") == ("Senior Researcher", "")  # keys normalised like titles
+    assert clean_job_title_with_reason("北京大学") == ("北京大学", "non_latin_preserved")
+
+    trace = []
+    clean_job_title_with_reason("IT经理", trace=trace)
+    assert {"stage": "segmented_translation", "before": "IT经理", "after": "IT Manager"} in trace
+
+
+def test_profile_engines_share_or_rebuild_the_trie():
+    base = jtc.active_engine()
+    assert base.with_profile("plain", {}).translation_trie is base.translation_trie
+    engine = base.with_profile("beijing", {"translation_map": {"北京": "Beijing"}})
+    assert engine.translation_trie is not base.translation_trie
+    assert clean_job_title_with_reason("北京经理", engine=engine) == ("Beijing Manager", "")
+
+
+@pytest.mark.parametrize("title", ["高级工程师", "研发部 经理", "IT经理", "销售代表、客户经理", "선임 연구원", "北京大学"])
+def test_custom_code_action_segments_like_the_app(title):
+    custom_code = load_custom_code()
+    translated = jtc.active_engine().translation_trie.translate(remove_diacritics(title))
+    assert custom_code.translate_terms(remove_diacritics(title)) == translated
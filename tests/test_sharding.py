@@ -0,0 +1,81 @@
+import json
+from pathlib import Path
+
+import pytest
+
+import job_title_cleaning as jtc
+from sharding import clean_shard, load_manifest, merge_shards, shard_outputs, split_csv
+
+TEST_DATA = Path(__file__).with_name("test_data.csv")
+
+
+def test_split_is_deterministic_and_keeps_every_row(tmp_path):
+    source = tmp_path / "input.csv"
+    source.write_text(
+        '﻿Job Title,Company\n"Sr. Analyst, Finance",Acme\n\n"Head\nof Sales",Beta\nn/a,Gamma\nLab Tech,\n',
+        encoding="utf-8",
+    )
+    manifest = split_csv(source, tmp_path / "a", 3)
+    assert [(shard["first_row"], shard["rows"]) for shard in manifest["shards"]] == [(0, 2), (2, 1), (3, 1)]
+    assert split_csv(source, tmp_path / "b", 3) == manifest
+    assert load_manifest(tmp_path / "a") == manifest
+    assert (tmp_path / "a" / "shard-00000.csv").read_bytes() == (tmp_path / "b" / "shard-00000.csv").read_bytes()
+
+    _, originals = jtc.read_titles(source)
+    titles = []
+    for shard in manifest["shards"]:
+        _, part = jtc.read_titles(tmp_path / "a" / shard["file"])
+        titles.extend(part)
+    assert titles == originals
+    assert len(split_csv(source, tmp_path / "c", 10)["shards"]) == 4
+    with pytest.raises(ValueError):
+        split_csv(source, tmp_path / "d", 0)
+
+
+def test_merged_shards_match_a_single_run(tmp_path):
+    shard_dir = tmp_path / "shards"
+    manifest = split_csv(TEST_DATA, shard_dir, 4)
+    options = {"count_rule_hits": True, "include_trace": True}
+    for index in reversed(range(len(manifest["shards"]))):  # nodes finish in any order
+        clean_shard(shard_dir, index, checkpoint=index % 2 == 0, threads=index % 3 + 1, **options)
+    output_path, stats = merge_shards(shard_dir, tmp_path / "merged.csv")
+
+    _, expected = jtc.clean_csv_file(TEST_DATA, tmp_path / "single.csv", **options)
+    assert output_path.read_bytes() == (tmp_path / "single.csv").read_bytes()
+    merged_analytics, analytics = stats.pop("analytics"), expected.pop("analytics")
+    assert stats == expected
+    # Shards merge fixed-size sketches: exact counts and top titles, estimated distinct counts.
+    assert merged_analytics.pop("top_titles_error") == 0
+    for name in ("distinct_titles", "distinct_cleaned_titles"):
+        exact = analytics.pop(name)
+        assert abs(merged_analytics.pop(name) - exact) <= max(exact * 0.05, 2)
+    assert merged_analytics == analytics
+
+
+def test_merge_refuses_incomplete_or_mismatched_shards(tmp_path):
+    shard_dir = tmp_path / "shards"
+    manifest = split_csv(TEST_DATA, shard_dir, 3)
+    clean_shard(shard_dir, 0)
+    clean_shard(shard_dir, 2)
+    with pytest.raises(ValueError, match="shard-00001"):
+        merge_shards(shard_dir, tmp_path / "merged.csv")
+    assert not (tmp_path / "merged.csv").exists()
+
+    clean_shard(shard_dir, 1, include_trace=True)
+    with pytest.raises(ValueError, match="options"):
+        merge_shards(shard_dir, tmp_path / "merged.csv")
+    clean_shard(shard_dir, 1)
+    _, stats_path = shard_outputs(shard_dir, manifest["shards"][1])
+    record = json.loads(stats_path.read_text())
+    stats_path.write_text(json.dumps(dict(record, ruleset_version="other")))
+    with pytest.raises(ValueError, match="ruleset"):
+        merge_shards(shard_dir, tmp_path / "merged.csv")
+
+    shard_path = shard_dir / manifest["shards"][1]["file"]
+    shard_path.write_text(shard_path.read_text()[:-20])
+    with pytest.raises(ValueError, match="manifest"):
+        clean_shard(shard_dir, 1)
+    with pytest.raises(ValueError):
+        clean_shard(shard_dir, 3)
+    with pytest.raises(ValueError):
+        load_manifest(tmp_path)
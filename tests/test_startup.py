@@ -0,0 +1,34 @@
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+def loaded_modules(code: str) -> set:
+    out = subprocess.run(
+        [sys.executable, "-c", f"{code}\nimport sys\nprint(' '.join(sys.modules))"],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+    return set(out.split())
+
+
+def test_title_cleaning_does_not_import_pandas():
+    modules = loaded_modules(
+        "import job_title_cleaning as jtc\n"
+        "jtc.clean_job_title('Sr Analyst')\n"
+        "jtc.clean_job_title_with_reason('Head|Sales', trace=[])\n"
+        "import classification\n"
+        "classification.load_taxonomy().classify('Senior Research Scientist')"
+    )
+    assert "job_title_cleaning" in modules
+    assert "pandas" not in modules
+    assert "numpy" not in modules
+
+
+def test_csv_entry_points_load_pandas_on_demand():
+    modules = loaded_modules("import job_title_cleaning as jtc\njtc.read_titles('tests/test_data.csv')")
+    assert "pandas" in modules
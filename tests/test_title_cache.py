@@ -0,0 +1,78 @@
+import io
+
+from job_title_cleaning import clean_csv_file, ruleset_version
+from title_cache import TitleCache
+
+
+def test_cache_round_trip_and_version_invalidation(tmp_path):
+    path = tmp_path / "cache.sqlite3"
+    with TitleCache(path, "v1") as cache:
+        cache.put_many({"ceo": ("Chief Executive Officer", "", {"abbreviation:ceo": 1}), "n/a": (None, "junk_value", {})})
+        assert cache.get_many(["ceo", "n/a", "cto"]) == {
+            "ceo": ("Chief Executive Officer", "", {"abbreviation:ceo": 1}),
+            "n/a": (None, "junk_value", {}),
+        }
+    with TitleCache(path, "v2") as cache:
+        assert cache.get_many(["ceo"]) == {}
+        cache.put_many({"ceo": ("CEO", "", {})})
+        # Two versions in use at once (e.g. jobs on different profiles) keep each other's entries.
+        with TitleCache(path, "v1") as other:
+            assert other.get_many(["ceo"])["ceo"][0] == "Chief Executive Officer"
+        assert cache.get_many(["ceo"]) == {"ceo": ("CEO", "", {})}
+        assert len(cache) == 3
+
+
+def test_cache_drops_titles_unused_for_max_age(tmp_path):
+    with TitleCache(tmp_path / "cache.sqlite3", "v1", max_age_days=1) as cache:
+        cache.put_many({"ceo": ("CEO", "", {}), "cto": ("CTO", "", {})})
+        with cache.conn:
+            cache.conn.execute("UPDATE titles SET last_used = last_used - 2 * 86400 WHERE raw = 'ceo'")
+        assert cache.evict() == 1
+        assert cache.get_many(["ceo", "cto"]) == {"cto": ("CTO", "", {})}
+
+
+def test_cache_evicts_least_recently_used(tmp_path):
+    with TitleCache(tmp_path / "cache.sqlite3", "v1", max_entries=10) as cache:
+        cache.put_many({f"title {i}": (f"Title {i}", "", {}) for i in range(10)})
+        cache.get_many(["title 0"])  # refresh so it survives eviction
+        cache.put_many({"title 10": ("Title 10", "", {})})
+        assert len(cache) == 9
+        remaining = cache.get_many([f"title {i}" for i in range(11)])
+        assert "title 0" in remaining and "title 10" in remaining
+
+
+def test_clean_csv_file_reuses_cache(tmp_path):
+    input_path = tmp_path / "input.csv"
+    input_path.write_text("Original Job Title\nSr Tech\nceo\nSr Tech\nn/a\n")
+    plain_path = tmp_path / "plain.csv"
+    _, plain_stats = clean_csv_file(input_path, plain_path, count_rule_hits=True)
+
+    with TitleCache(tmp_path / "cache.sqlite3", ruleset_version()) as cache:
+        first_path = tmp_path / "first.csv"
+        second_path = tmp_path / "second.csv"
+        _, first = clean_csv_file(input_path, first_path, count_rule_hits=True, cache=cache)
+        _, second = clean_csv_file(input_path, second_path, count_rule_hits=True, cache=cache)
+
+    assert (first["cache_hits"], first["cache_misses"]) == (0, 3)
+    assert (second["cache_hits"], second["cache_misses"]) == (3, 0)
+    assert second["rule_hits"] == plain_stats["rule_hits"] == {
+        "abbreviation:Sr ": 2,
+        "abbreviation:Tech": 2,
+        "abbreviation:ceo": 1,
+    }
+    assert first_path.read_bytes() == second_path.read_bytes() == plain_path.read_bytes()
+
+
+def test_upload_uses_shared_cache(client):
+    stats = []
+    # Same titles in a different order, so the second upload is not deduplicated as an identical file.
+    for data in ("Original Job Title\nCTO\nn/a\nceo\n", "Original Job Title\nceo\nCTO\nn/a\n"):
+        resp = client.post(
+            "/api/upload",
+            data={"file": (io.BytesIO(data.encode()), "sample.csv")},
+            content_type="multipart/form-data",
+        )
+        assert resp.status_code == 200
+        stats.append(resp.get_json()["job"]["stats"])
+    assert stats[0]["cache_hits"] + stats[0]["cache_misses"] == 3
+    assert (stats[1]["cache_hits"], stats[1]["cache_misses"]) == (3, 0)
@@ -0,0 +1,70 @@
+import csv
+import json
+from pathlib import Path
+
+from job_title_cleaning import clean_csv_file, clean_job_title_with_reason
+
+
+def test_trace_names_the_rule_that_fired():
+    trace = []
+    cleaned, reason = clean_job_title_with_reason("lecture hall manager", trace=trace)
+    assert cleaned == "Lecturer Hall Manager"
+    assert reason == ""
+    assert trace[0] == {
+        "stage": "misspelling:Lecture",
+        "before": "lecture hall manager",
+        "after": "Lecturer hall manager",
+    }
+    assert trace[-1]["stage"] == "casing"
+    assert trace[-1]["after"] == cleaned
+
+
+def test_trace_records_removal():
+    trace = []
+    assert clean_job_title_with_reason('"n/a"', trace=trace) == (None, "junk_value")
+    assert [step["stage"] for step in trace] == ["edge_punctuation", "junk_value"]
+    assert trace[-1]["after"] is None
+
+
+def test_trace_does_not_change_results():
+    data_path = Path(__file__).parent / "test_data.csv"
+    with data_path.open(encoding="utf-8-sig", newline="") as f:
+        titles = [row[0] for row in csv.reader(f) if row]
+    # Tracing only records the stages; results and rule hits must match untraced calls, with or without the fast path.
+    titles += ["Senior " * 40 + "Analyst", "  Head And Finance | R&D / Ops  ", "博士后", "123", "Founder iv"]
+    for title in titles:
+        for fast_path in (True, False):
+            trace, traced_hits, hits = [], {}, {}
+            result = clean_job_title_with_reason(title, traced_hits, trace, fast_path)
+            assert result == clean_job_title_with_reason(title, hits, fast_path=fast_path), title
+            assert traced_hits == hits, title
+            if trace and result[0] is not None:
+                assert trace[-1]["after"] == result[0]
+
+
+def test_clean_csv_file_trace_column(tmp_path):
+    input_path = tmp_path / "input.csv"
+    output_path = tmp_path / "output.csv"
+    input_path.write_text("Original Job Title\nSr Tech\nDirector\n")
+
+    clean_csv_file(input_path, output_path, include_trace=True)
+    with output_path.open(encoding="utf-8-sig", newline="") as f:
+        rows = list(csv.DictReader(f))
+    stages = [step["stage"] for step in json.loads(rows[0]["Trace"])]
+    assert stages == ["abbreviation:Sr ", "abbreviation:Tech"]
+    assert json.loads(rows[1]["Trace"]) == []
+
+    clean_csv_file(input_path, output_path)
+    with output_path.open(encoding="utf-8-sig", newline="") as f:
+        assert "Trace" not in csv.DictReader(f).fieldnames
+
+
+def test_explain_endpoint(client):
+    resp = client.post("/api/explain", json={"title": "Lecture Hall Manager"})
+    assert resp.status_code == 200
+    data = resp.get_json()
+    assert data["cleaned"] == "Lecturer Hall Manager"
+    assert data["steps"][0]["stage"] == "misspelling:Lecture"
+
+    assert client.get("/api/explain?title=ceo").get_json()["cleaned"] == "Chief Executive Officer"
+    assert client.post("/api/explain", json={}).status_code == 400
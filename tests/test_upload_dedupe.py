@@ -0,0 +1,47 @@
+import io
+import os
+
+
+def upload(client, data: str, **fields):
+    return client.post(
+        "/api/upload",
+        data={"file": (io.BytesIO(data.encode()), "dupe.csv"), **fields},
+        content_type="multipart/form-data",
+    )
+
+
+def test_identical_upload_reuses_earlier_job(client):
+    import app as app_module
+
+    data = "Original Job Title\nSr Analyst\nn/a\nHead|Sales\n"
+    first = upload(client, data).get_json()["job"]
+    second_resp = upload(client, data)
+    assert second_resp.status_code == 200
+    second = second_resp.get_json()["job"]
+
+    assert second["name"] != first["name"]
+    assert second["deduplicated_from"] == first["name"]
+    assert second["sha256"] == first["sha256"]
+    assert second["stats"] == first["stats"]
+
+    first_cleaned = app_module.JOBS_DIR / first["name"] / first["cleaned_filename"]
+    second_cleaned = app_module.JOBS_DIR / second["name"] / second["cleaned_filename"]
+    assert second_cleaned.read_bytes() == first_cleaned.read_bytes()
+    assert os.path.samefile(first_cleaned, second_cleaned)
+
+    download = client.get(f"/api/download/{second['name']}")
+    assert download.status_code == 200
+    assert download.data == first_cleaned.read_bytes()
+
+
+def test_different_content_or_options_are_cleaned_again(client):
+    data = "Original Job Title\nLead Sientist\n"
+    first = upload(client, data).get_json()["job"]
+
+    changed = upload(client, data + "ceo\n").get_json()["job"]
+    assert "deduplicated_from" not in changed
+    assert changed["sha256"] != first["sha256"]
+
+    traced = upload(client, data, trace="1").get_json()["job"]
+    assert "deduplicated_from" not in traced
+    assert traced["options"] == {"trace": True}
@@ -0,0 +1,110 @@
+"""Persistent raw title -> (cleaned, reason) cache shared by the CLI, clean_csv_file and the Flask app.
+
+Entries are keyed by ruleset version, so editing the rules invalidates them automatically. Entries of
+other versions are left alone: jobs on different rule profiles (or a job still running on the previous
+ruleset) share one cache without clearing each other's titles. Versions that are no longer used age out
+instead: the cache is kept under ``max_entries`` by evicting the least recently used titles, and titles
+unused for ``max_age_days`` are dropped. SQLite handles locking between processes.
+"""
+import json
+import sqlite3
+import time
+from pathlib import Path
+
+DEFAULT_MAX_ENTRIES = 2_000_000
+DEFAULT_MAX_AGE_DAYS = 30
+# SQLite's default limit on bound parameters is 999 on older builds.
+_BATCH = 500
+
+
+class TitleCache:
+    def __init__(
+        self, path, ruleset_version: str, max_entries: int = DEFAULT_MAX_ENTRIES, max_age_days=DEFAULT_MAX_AGE_DAYS
+    ):
+        self.path = Path(path)
+        self.version = ruleset_version
+        self.max_entries = max_entries
+        self.max_age_days = max_age_days
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(self.path), timeout=30)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS titles ("
+            " version TEXT NOT NULL, raw TEXT NOT NULL, cleaned TEXT, reason TEXT NOT NULL,"
+            " rule_hits TEXT NOT NULL, last_used REAL NOT NULL, PRIMARY KEY (version, raw)"
+            ") WITHOUT ROWID"
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS titles_last_used ON titles (last_used)")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def get_many(self, titles) -> dict:
+        """Return ``{raw: (cleaned, reason, rule_hits)}`` for the titles that are cached."""
+        found = {}
+        titles = list(titles)
+        now = time.time()
+        with self.conn:
+            for start in range(0, len(titles), _BATCH):
+                batch = titles[start : start + _BATCH]
+                marks = ",".join("?" * len(batch))
+                rows = self.conn.execute(
+                    f"SELECT raw, cleaned, reason, rule_hits FROM titles WHERE version = ? AND raw IN ({marks})",
+                    [self.version, *batch],
+                ).fetchall()
+                for raw, cleaned, reason, rule_hits in rows:
+                    found[raw] = (cleaned, reason, json.loads(rule_hits))
+                if rows:
+                    hit_marks = ",".join("?" * len(rows))
+                    self.conn.execute(
+                        f"UPDATE titles SET last_used = ? WHERE version = ? AND raw IN ({hit_marks})",
+                        [now, self.version, *(row[0] for row in rows)],
+                    )
+        return found
+
+    def put_many(self, results: dict) -> None:
+        """Store ``{raw: (cleaned, reason, rule_hits)}`` and evict old entries if over the limit."""
+        now = time.time()
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO titles (version, raw, cleaned, reason, rule_hits, last_used)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    (self.version, raw, cleaned, reason, json.dumps(rule_hits or {}), now)
+                    for raw, (cleaned, reason, rule_hits) in results.items()
+                ),
+            )
+        self.evict()
+
+    def __len__(self) -> int:
+        return self.conn.execute("SELECT COUNT(*) FROM titles").fetchone()[0]
+
+    def evict(self) -> int:
+        """
+        Drop titles unused for ``max_age_days`` (0: keep them), then trim the cache to 90% of ``max_entries`` once
+        it exceeds the limit; returns rows removed.
+        """
+        removed = 0
+        if self.max_age_days:
+            with self.conn:
+                removed = self.conn.execute(
+                    "DELETE FROM titles WHERE last_used < ?", (time.time() - self.max_age_days * 86400,)
+                ).rowcount
+        count = len(self)
+        if count <= self.max_entries:
+            return removed
+        excess = count - int(self.max_entries * 0.9)
+        with self.conn:
+            self.conn.execute(
+                "DELETE FROM titles WHERE (version, raw) IN"
+                " (SELECT version, raw FROM titles ORDER BY last_used LIMIT ?)",
+                (excess,),
+            )
+        return removed + excess